@@ -282,3 +282,88 @@ ALTER TABLE items
     ADD COLUMN IF NOT EXISTS passage_id UUID REFERENCES passages(id) ON DELETE SET NULL;
 
 CREATE INDEX IF NOT EXISTS ix_items_passage ON items(passage_id);
+
+-- ----------------------------------------------------------------------------
+-- item_bank_generations — invalidation counter for compiled mock blueprints
+--
+-- mock_exam.generate_mock_items samples from an in-process index of item ids
+-- per skill and b-band. Statement-level triggers bump a bank's counter when
+-- an item's difficulty, review status, soft delete or bank changes, or a
+-- question's skill tags do; attempts_count updates leave it alone. No FK to
+-- item_banks so a cascading bank delete can still bump.
+-- ----------------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS item_bank_generations (
+    bank_id UUID PRIMARY KEY,
+    generation BIGINT NOT NULL DEFAULT 1,
+    bumped_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE OR REPLACE FUNCTION bump_item_bank_generations(banks UUID[]) RETURNS void
+LANGUAGE sql AS $$
+    INSERT INTO item_bank_generations (bank_id)
+    SELECT DISTINCT b FROM unnest(banks) AS b WHERE b IS NOT NULL
+    ON CONFLICT (bank_id) DO UPDATE
+       SET generation = item_bank_generations.generation + 1,
+           bumped_at = CURRENT_TIMESTAMP
+$$;
+
+CREATE OR REPLACE FUNCTION items_bump_bank_generation() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM bump_item_bank_generations(ARRAY(SELECT bank_id FROM new_rows));
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM bump_item_bank_generations(ARRAY(SELECT bank_id FROM old_rows));
+    ELSE
+        PERFORM bump_item_bank_generations(ARRAY(
+            SELECT unnest(ARRAY[o.bank_id, n.bank_id])
+            FROM old_rows o JOIN new_rows n ON n.id = o.id
+            WHERE (o.irt_difficulty, o.review_status, o.deleted_at, o.bank_id)
+                  IS DISTINCT FROM
+                  (n.irt_difficulty, n.review_status, n.deleted_at, n.bank_id)
+        ));
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION content_skills_bump_bank_generation() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM bump_item_bank_generations(ARRAY(
+            SELECT i.bank_id FROM new_rows c JOIN items i ON i.id = c.content_id
+            WHERE c.content_kind = 'question'));
+    ELSE
+        PERFORM bump_item_bank_generations(ARRAY(
+            SELECT i.bank_id FROM old_rows c JOIN items i ON i.id = c.content_id
+            WHERE c.content_kind = 'question'));
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_items_generation_ins ON items;
+CREATE TRIGGER trg_items_generation_ins
+    AFTER INSERT ON items REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION items_bump_bank_generation();
+
+DROP TRIGGER IF EXISTS trg_items_generation_upd ON items;
+CREATE TRIGGER trg_items_generation_upd
+    AFTER UPDATE ON items REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION items_bump_bank_generation();
+
+DROP TRIGGER IF EXISTS trg_items_generation_del ON items;
+CREATE TRIGGER trg_items_generation_del
+    AFTER DELETE ON items REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION items_bump_bank_generation();
+
+DROP TRIGGER IF EXISTS trg_content_skills_generation_ins ON content_skills;
+CREATE TRIGGER trg_content_skills_generation_ins
+    AFTER INSERT ON content_skills REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION content_skills_bump_bank_generation();
+
+DROP TRIGGER IF EXISTS trg_content_skills_generation_del ON content_skills;
+CREATE TRIGGER trg_content_skills_generation_del
+    AFTER DELETE ON content_skills REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION content_skills_bump_bank_generation();
@@ -61,6 +61,9 @@ CREATE TABLE IF NOT EXISTS knowledge_chunks (
     -- pgvector embedding (1024-dim, same model as item_embeddings).
     embedding vector(1024),
     text_hash VARCHAR(64) NOT NULL,
+    -- Which embedder wrote `embedding` (services/embeddings.py). Retrieval
+    -- only compares vectors from the active model.
+    embedding_model VARCHAR(80),
     -- Auditing / lifecycle
     license VARCHAR(80) NOT NULL DEFAULT 'EUREKA-Internal',
     attribution TEXT,
@@ -79,6 +82,12 @@ CREATE INDEX IF NOT EXISTS idx_chunks_text_fts
 CREATE INDEX IF NOT EXISTS idx_chunks_embedding_hnsw
     ON knowledge_chunks USING hnsw (embedding vector_cosine_ops);
 
+-- Databases created before embedding_model existed (alembic
+-- chunk_embedding_model_001). Their vectors were all the sha256 stand-in.
+ALTER TABLE knowledge_chunks ADD COLUMN IF NOT EXISTS embedding_model VARCHAR(80);
+UPDATE knowledge_chunks SET embedding_model = 'stub-sha256-1024'
+ WHERE embedding IS NOT NULL AND embedding_model IS NULL;
+
 -- ----------------------------------------------------------------------------
 -- agent_sessions — one per conversation
 -- ----------------------------------------------------------------------------
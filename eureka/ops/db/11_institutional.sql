@@ -194,3 +194,77 @@ CREATE TABLE IF NOT EXISTS lti_keys (
 );
 
 CREATE INDEX IF NOT EXISTS idx_lti_keys_active ON lti_keys(is_active) WHERE is_active = TRUE;
+
+-- ----------------------------------------------------------------------------
+-- cohort_snapshots — precomputed analytics + at-risk roster, one per cohort
+--
+-- Written by the `cohort.snapshot.refresh` job. Triggers below mark a
+-- snapshot stale when a member logs an attempt or a mock changes, and drop
+-- it when the cohort's membership or blueprints change. A table rather than
+-- a MATERIALIZED VIEW so only the cohorts that moved are recomputed.
+-- Mirrors alembic/versions/20261019_add_cohort_snapshots.py.
+-- ----------------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS cohort_snapshots (
+    cohort_id UUID PRIMARY KEY REFERENCES cohorts(id) ON DELETE CASCADE,
+    aggregate JSONB NOT NULL,
+    at_risk JSONB NOT NULL,
+    -- The targets the snapshot was computed for.
+    params JSONB NOT NULL DEFAULT '{}'::jsonb,
+    computed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    stale_since TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS ix_cohort_snapshots_stale
+    ON cohort_snapshots(stale_since) WHERE stale_since IS NOT NULL;
+
+CREATE OR REPLACE FUNCTION cohort_snapshots_mark_stale() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE cohort_snapshots cs
+       SET stale_since = timezone('utc', now())
+     WHERE cs.stale_since IS NULL
+       AND cs.cohort_id IN (
+           SELECT m.cohort_id
+           FROM cohort_memberships m
+           WHERE m.left_at IS NULL
+             AND m.role = 'learner'
+             AND m.user_id IN (SELECT DISTINCT user_id FROM new_rows)
+       );
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION cohort_snapshots_drop() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        DELETE FROM cohort_snapshots WHERE cohort_id = OLD.cohort_id;
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        DELETE FROM cohort_snapshots WHERE cohort_id = NEW.cohort_id;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_attempt_logs_cohort_stale ON attempt_logs;
+CREATE TRIGGER trg_attempt_logs_cohort_stale
+    AFTER INSERT ON attempt_logs
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION cohort_snapshots_mark_stale();
+
+DROP TRIGGER IF EXISTS trg_mock_attempts_cohort_stale ON mock_attempts;
+CREATE TRIGGER trg_mock_attempts_cohort_stale
+    AFTER UPDATE ON mock_attempts
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION cohort_snapshots_mark_stale();
+
+DROP TRIGGER IF EXISTS trg_cohort_memberships_snapshot ON cohort_memberships;
+CREATE TRIGGER trg_cohort_memberships_snapshot
+    AFTER INSERT OR UPDATE OR DELETE ON cohort_memberships
+    FOR EACH ROW EXECUTE FUNCTION cohort_snapshots_drop();
+
+DROP TRIGGER IF EXISTS trg_cohort_blueprints_snapshot ON cohort_blueprints;
+CREATE TRIGGER trg_cohort_blueprints_snapshot
+    AFTER INSERT OR UPDATE OR DELETE ON cohort_blueprints
+    FOR EACH ROW EXECUTE FUNCTION cohort_snapshots_drop();
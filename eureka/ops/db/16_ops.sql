@@ -56,6 +56,21 @@ CREATE INDEX IF NOT EXISTS idx_jobs_pull
 
 CREATE INDEX IF NOT EXISTS idx_jobs_kind ON background_jobs(kind, queued_at DESC);
 
+-- Wake LISTENing workers when jobs land. Statement-level: a bulk enqueue is one
+-- notification, however many rows it carries.
+CREATE OR REPLACE FUNCTION background_jobs_notify() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM pg_notify('background_jobs', '');
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_background_jobs_notify ON background_jobs;
+CREATE TRIGGER trg_background_jobs_notify
+    AFTER INSERT ON background_jobs
+    FOR EACH STATEMENT EXECUTE FUNCTION background_jobs_notify();
+
 
 -- ---------------------------------------------------------------------------
 -- 14.4  Autocomplete: trigram indexes on the things users search
@@ -67,6 +67,67 @@ CREATE TABLE IF NOT EXISTS usmle_attempts (
 CREATE INDEX IF NOT EXISTS idx_usmle_attempts_user ON usmle_attempts(user_id);
 CREATE INDEX IF NOT EXISTS idx_usmle_attempts_question ON usmle_attempts(question_id);
 
+-- USMLE per-user rollup: attempts by subject x difficulty, kept current by a
+-- statement-level AFTER INSERT trigger so get_usmle_statistics reads a few
+-- rows instead of the user's whole history. Subject and difficulty are taken
+-- from the question at attempt time. The medical-school service applies the
+-- same DDL at startup (app/ddl.py); USMLE_STATS_ROLLUP=true reads from it.
+CREATE TABLE IF NOT EXISTS usmle_user_subject_stats (
+    user_id UUID NOT NULL,
+    subject VARCHAR(100) NOT NULL,
+    difficulty_level VARCHAR(50) NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    correct INTEGER NOT NULL DEFAULT 0,
+    timed_attempts INTEGER NOT NULL DEFAULT 0,      -- time_spent_seconds > 0
+    time_spent_seconds INTEGER NOT NULL DEFAULT 0,  -- summed over timed attempts
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, subject, difficulty_level)
+);
+
+CREATE OR REPLACE FUNCTION usmle_attempts_rollup() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO usmle_user_subject_stats AS s
+           (user_id, subject, difficulty_level, attempts, correct,
+            timed_attempts, time_spent_seconds, updated_at)
+    SELECT n.user_id, q.subject, q.difficulty_level,
+           count(*),
+           count(*) FILTER (WHERE n.is_correct),
+           count(*) FILTER (WHERE n.time_spent_seconds > 0),
+           coalesce(sum(n.time_spent_seconds) FILTER (WHERE n.time_spent_seconds > 0), 0),
+           CURRENT_TIMESTAMP
+      FROM new_rows n
+      JOIN usmle_questions q ON q.id = n.question_id
+     GROUP BY n.user_id, q.subject, q.difficulty_level
+    ON CONFLICT (user_id, subject, difficulty_level) DO UPDATE
+       SET attempts = s.attempts + EXCLUDED.attempts,
+           correct = s.correct + EXCLUDED.correct,
+           timed_attempts = s.timed_attempts + EXCLUDED.timed_attempts,
+           time_spent_seconds = s.time_spent_seconds + EXCLUDED.time_spent_seconds,
+           updated_at = EXCLUDED.updated_at;
+    RETURN NULL;
+END $$;
+
+DROP TRIGGER IF EXISTS trg_usmle_attempts_rollup ON usmle_attempts;
+CREATE TRIGGER trg_usmle_attempts_rollup
+    AFTER INSERT ON usmle_attempts
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION usmle_attempts_rollup();
+
+-- Backfill once, when the rollup is first created over existing attempts.
+INSERT INTO usmle_user_subject_stats
+       (user_id, subject, difficulty_level, attempts, correct,
+        timed_attempts, time_spent_seconds)
+SELECT a.user_id, q.subject, q.difficulty_level,
+       count(*),
+       count(*) FILTER (WHERE a.is_correct),
+       count(*) FILTER (WHERE a.time_spent_seconds > 0),
+       coalesce(sum(a.time_spent_seconds) FILTER (WHERE a.time_spent_seconds > 0), 0)
+  FROM usmle_attempts a
+  JOIN usmle_questions q ON q.id = a.question_id
+ WHERE NOT EXISTS (SELECT 1 FROM usmle_user_subject_stats)
+ GROUP BY a.user_id, q.subject, q.difficulty_level;
+
 -- Clinical Cases
 CREATE TABLE IF NOT EXISTS clinical_cases (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -271,6 +332,20 @@ CREATE TABLE IF NOT EXISTS medication_database (
 CREATE INDEX IF NOT EXISTS idx_medication_generic_name ON medication_database(generic_name);
 CREATE INDEX IF NOT EXISTS idx_medication_drug_class ON medication_database(drug_class);
 
+-- Medication search: generic + brand names as one lower-cased string, with a
+-- trigram index over it for substring (LIKE '%..%') and word-similarity
+-- (%>) matches. array_to_string is only STABLE, so the wrapper is declared
+-- IMMUTABLE to be indexable; it only ever sees text[].
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE OR REPLACE FUNCTION medication_search_text(generic_name TEXT, brand_names TEXT[])
+RETURNS TEXT LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT lower(generic_name || ' ' || coalesce(array_to_string(brand_names, ' '), ''))
+$$;
+
+CREATE INDEX IF NOT EXISTS idx_medication_search_trgm
+    ON medication_database USING GIN (medication_search_text(generic_name, brand_names) gin_trgm_ops);
+
 -- HIPAA Audit Logs
 CREATE TABLE IF NOT EXISTS hipaa_audit_logs (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -297,9 +372,10 @@ DO $$
 BEGIN
     RAISE NOTICE '✅ Medical School tables created successfully!';
     RAISE NOTICE '';
-    RAISE NOTICE 'Tables created: 10';
+    RAISE NOTICE 'Tables created: 11';
     RAISE NOTICE '  - usmle_questions';
     RAISE NOTICE '  - usmle_attempts';
+    RAISE NOTICE '  - usmle_user_subject_stats';
     RAISE NOTICE '  - clinical_cases';
     RAISE NOTICE '  - case_attempts';
     RAISE NOTICE '  - osce_stations';
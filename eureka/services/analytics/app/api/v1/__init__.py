@@ -151,18 +151,12 @@ async def identify_at_risk(
     """Identify at-risk students (staff only; alerts are stamped with the
     caller's org so later reads stay org-scoped)"""
     org = _require_staff_org(user)
-    alerts = await analytics_service.identify_at_risk_students(
+    return await analytics_service.identify_at_risk_students(
         db=db,
-        course_id=request.course_id
+        course_id=request.course_id,
+        incremental=request.incremental,
+        org_id=org
     )
-    stamped = False
-    for alert in alerts:
-        if getattr(alert, "org_id", None) is None:
-            alert.org_id = org
-            stamped = True
-    if stamped:
-        await db.commit()
-    return alerts
 
 
 @router.get("/at-risk/student/{user_id}", response_model=List[AtRiskAlertResponse])
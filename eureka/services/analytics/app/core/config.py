@@ -20,6 +20,12 @@ class Settings(BaseSettings):
     AT_RISK_THRESHOLD: float = 0.6  # 60% risk score triggers alert
     LOW_ENGAGEMENT_DAYS: int = 7  # Days of inactivity = low engagement
     FAILING_THRESHOLD: float = 0.6  # Below 60% = failing
+    INACTIVITY_DAYS: int = 14  # No activity for longer = prolonged inactivity
+    GRADE_TREND_WINDOW_DAYS: int = 42  # Scores used for the grade trend
+    GRADE_DECLINE_PER_WEEK: float = 2.0  # Score points lost per week = declining
+    MISSED_DEADLINE_EVENT_TYPES: list = ["deadline_missed", "assignment_missed"]
+    MISSED_DEADLINES_THRESHOLD: int = 2  # In the last 4 weeks
+    ENGAGEMENT_DROP_RATIO: float = 0.5  # Last week's active days vs the 3 before
     
     # Performance metrics
     PERFORMANCE_EXCELLENT: float = 0.9  # 90%+
@@ -299,3 +299,21 @@ class CohortAnalytics(Base):
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow)
     last_calculated = Column(DateTime, default=datetime.utcnow)
+
+
+# 9. Risk Scoring Runs - At-Risk Engine Watermarks
+class RiskScoringRun(Base):
+    """One at-risk engine run; incremental runs rescore from the last one"""
+    __tablename__ = "risk_scoring_runs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    course_id = Column(UUID(as_uuid=True), index=True)  # NULL = every course
+    incremental = Column(Boolean, default=False)
+
+    # Outcome
+    students_scored = Column(Integer, default=0)
+    alerts_created = Column(Integer, default=0)
+
+    # Timestamps
+    started_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    finished_at = Column(DateTime)
@@ -290,6 +290,7 @@ class IdentifyAtRiskRequest(BaseModel):
     course_id: Optional[UUID] = None
     organization_id: Optional[UUID] = None
     severity_threshold: Optional[AlertSeverity] = None
+    incremental: bool = False  # rescore only students active since the last run
 
 
 class ComparePerformanceRequest(BaseModel):
@@ -8,11 +8,9 @@ from typing import List, Optional, Dict
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
-from app.core.models import (
-    StudentAnalytics, AtRiskAlert, EngagementEvent,
-    PerformanceTrend, MetricType, AlertSeverity, TrendDirection
-)
+from app.core.models import StudentAnalytics, AtRiskAlert, EngagementEvent
 from app.core.config import get_settings
+from app.services import risk_engine
 
 settings = get_settings()
 
@@ -150,107 +148,16 @@ class AnalyticsService:
     async def identify_at_risk_students(
         self,
         db: AsyncSession,
-        course_id: Optional[UUID] = None
+        course_id: Optional[UUID] = None,
+        *,
+        incremental: bool = False,
+        org_id: Optional[UUID] = None
     ) -> List[AtRiskAlert]:
-        """Identify students at risk of failing or dropping out"""
-        alerts = []
-        
-        query = select(StudentAnalytics)
-        if course_id:
-            query = query.where(StudentAnalytics.course_id == course_id)
-        
-        result = await db.execute(query)
-        all_analytics = result.scalars().all()
-        
-        for analytics in all_analytics:
-            risk_factors = []
-            risk_score = 0.0
-            
-            # Check low engagement
-            if analytics.days_active < settings.LOW_ENGAGEMENT_DAYS:
-                risk_factors.append("low_engagement")
-                risk_score += 0.3
-            
-            # Check failing performance
-            if analytics.average_assessment_score < settings.FAILING_THRESHOLD * 100:
-                risk_factors.append("failing_grades")
-                risk_score += 0.4
-            
-            # Check inactivity
-            if analytics.last_activity:
-                days_inactive = (datetime.utcnow() - analytics.last_activity).days
-                if days_inactive > 14:
-                    risk_factors.append("prolonged_inactivity")
-                    risk_score += 0.3
-            
-            # Create alert if at risk
-            if risk_score >= settings.AT_RISK_THRESHOLD:
-                existing_alert = await db.execute(
-                    select(AtRiskAlert).where(
-                        and_(
-                            AtRiskAlert.user_id == analytics.user_id,
-                            AtRiskAlert.course_id == analytics.course_id,
-                            AtRiskAlert.is_active == True,
-                            AtRiskAlert.is_resolved == False
-                        )
-                    )
-                )
-                
-                alert = existing_alert.scalar_one_or_none()
-                
-                if not alert:
-                    severity = self._calculate_alert_severity(risk_score)
-                    alert = AtRiskAlert(
-                        user_id=analytics.user_id,
-                        course_id=analytics.course_id,
-                        alert_type="at_risk",
-                        severity=severity,
-                        risk_score=risk_score,
-                        contributing_factors=risk_factors,
-                        message=self._generate_alert_message(risk_factors, risk_score),
-                        recommendation=self._generate_recommendation(risk_factors)
-                    )
-                    db.add(alert)
-                    alerts.append(alert)
-        
-        await db.commit()
-        
-        for alert in alerts:
-            await db.refresh(alert)
-        
-        return alerts
-    
-    def _calculate_alert_severity(self, risk_score: float) -> AlertSeverity:
-        """Determine alert severity from risk score"""
-        if risk_score >= 0.9:
-            return AlertSeverity.CRITICAL
-        elif risk_score >= 0.75:
-            return AlertSeverity.HIGH
-        elif risk_score >= 0.6:
-            return AlertSeverity.MEDIUM
-        else:
-            return AlertSeverity.LOW
-    
-    def _generate_alert_message(self, factors: List[str], score: float) -> str:
-        """Generate human-readable alert message"""
-        if "failing_grades" in factors and "low_engagement" in factors:
-            return f"Student is at risk (score: {score:.1%}): Poor performance combined with low engagement"
-        elif "failing_grades" in factors:
-            return f"Student is at risk (score: {score:.1%}): Consistently low assessment scores"
-        elif "low_engagement" in factors:
-            return f"Student is at risk (score: {score:.1%}): Very low course engagement"
-        else:
-            return f"Student is at risk (score: {score:.1%}): Multiple concerning factors"
-    
-    def _generate_recommendation(self, factors: List[str]) -> str:
-        """Generate actionable recommendation"""
-        recommendations = []
-        
-        if "failing_grades" in factors:
-            recommendations.append("Schedule one-on-one tutoring")
-        if "low_engagement" in factors:
-            recommendations.append("Send motivational check-in")
-        if "prolonged_inactivity" in factors:
-            recommendations.append("Contact student to identify barriers")
-        
-        return "; ".join(recommendations) if recommendations else "Monitor progress closely"
+        """Identify students at risk of failing or dropping out.
+
+        Scoring is set-based over the whole cohort (app/services/risk_engine.py);
+        `incremental` rescores only students with activity since the last run.
+        """
+        return await risk_engine.identify_at_risk(
+            db, course_id, incremental=incremental, org_id=org_id
+        )
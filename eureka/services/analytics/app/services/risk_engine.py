@@ -0,0 +1,335 @@
+"""
+Analytics Dashboard Service - At-Risk Engine
+
+Scores a whole cohort of (student, course) pairs at once. Every signal comes
+from a grouped query over the cohort rather than a query per student:
+
+  1. student_analytics     days active, average score, last activity
+  2. engagement_events     last event, active days this week vs the three
+                           before, missed-deadline events (last 4 weeks)
+  3. performance_trends    grade slope over GRADE_TREND_WINDOW_DAYS
+  4. at_risk_alerts        pairs that already have an open alert
+
+Signals are lined up as arrays, turned into a factor matrix and scored with
+one matrix-vector product, and new alerts go out in a single INSERT.
+
+An incremental run only rescores pairs with new events, trends or
+recalculated analytics since the last run for the same scope, plus pairs
+whose last activity crossed the inactivity line since then.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import and_, func, insert, literal, or_, select, union
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.models import (
+    AlertSeverity, AtRiskAlert, EngagementEvent, MetricType,
+    PerformanceTrend, RiskScoringRun, StudentAnalytics,
+)
+
+settings = get_settings()
+
+# Column order of the factor matrix, and each factor's weight in the score.
+FACTORS = (
+    "low_engagement",
+    "failing_grades",
+    "prolonged_inactivity",
+    "declining_grades",
+    "missed_deadlines",
+    "engagement_drop",
+)
+WEIGHTS = np.array([0.3, 0.4, 0.3, 0.2, 0.2, 0.2])
+
+_GRADE_METRICS = (MetricType.ASSESSMENT_SCORE, MetricType.PERFORMANCE)
+_SECONDS_PER_DAY = 86400.0
+
+
+@dataclass
+class CohortSignals:
+    """One entry per (student, course) pair; NaN where a signal is unknown."""
+    user_ids: List[UUID]
+    course_ids: List[UUID]
+    org_ids: List[Optional[UUID]]
+    days_active: np.ndarray
+    average_score: np.ndarray
+    days_inactive: np.ndarray
+    grade_slope: np.ndarray          # score points per day
+    missed_deadlines: np.ndarray
+    recent_active_days: np.ndarray   # last 7 days
+    prior_active_days: np.ndarray    # the 21 days before that
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+
+def score_cohort(signals: CohortSignals) -> Tuple[np.ndarray, np.ndarray]:
+    """(risk scores, boolean factor matrix with columns in FACTORS order)."""
+    n = len(signals)
+    flags = np.zeros((n, len(FACTORS)), dtype=bool)
+    if n == 0:
+        return np.zeros(0), flags
+
+    flags[:, 0] = np.nan_to_num(signals.days_active) < settings.LOW_ENGAGEMENT_DAYS
+    flags[:, 1] = np.nan_to_num(signals.average_score) < settings.FAILING_THRESHOLD * 100
+    with np.errstate(invalid="ignore"):
+        flags[:, 2] = np.floor(signals.days_inactive) > settings.INACTIVITY_DAYS
+        flags[:, 3] = signals.grade_slope * 7 <= -settings.GRADE_DECLINE_PER_WEEK
+    flags[:, 4] = signals.missed_deadlines >= settings.MISSED_DEADLINES_THRESHOLD
+    prior_weekly = signals.prior_active_days / 3
+    flags[:, 5] = (prior_weekly >= 1) & (
+        signals.recent_active_days < settings.ENGAGEMENT_DROP_RATIO * prior_weekly
+    )
+
+    scores = np.minimum(flags @ WEIGHTS, 1.0)
+    return scores, flags
+
+
+def alert_severity(risk_score: float) -> AlertSeverity:
+    """Determine alert severity from risk score"""
+    if risk_score >= 0.9:
+        return AlertSeverity.CRITICAL
+    elif risk_score >= 0.75:
+        return AlertSeverity.HIGH
+    elif risk_score >= 0.6:
+        return AlertSeverity.MEDIUM
+    else:
+        return AlertSeverity.LOW
+
+
+def alert_message(factors: List[str], score: float) -> str:
+    """Generate human-readable alert message"""
+    if "failing_grades" in factors and "low_engagement" in factors:
+        return f"Student is at risk (score: {score:.1%}): Poor performance combined with low engagement"
+    elif "failing_grades" in factors:
+        return f"Student is at risk (score: {score:.1%}): Consistently low assessment scores"
+    elif "low_engagement" in factors:
+        return f"Student is at risk (score: {score:.1%}): Very low course engagement"
+    elif factors == ["declining_grades"]:
+        return f"Student is at risk (score: {score:.1%}): Assessment scores trending down"
+    else:
+        return f"Student is at risk (score: {score:.1%}): Multiple concerning factors"
+
+
+def alert_recommendation(factors: List[str]) -> str:
+    """Generate actionable recommendation"""
+    recommendations = []
+
+    if "failing_grades" in factors:
+        recommendations.append("Schedule one-on-one tutoring")
+    if "declining_grades" in factors:
+        recommendations.append("Review recent assessments with the student")
+    if "low_engagement" in factors or "engagement_drop" in factors:
+        recommendations.append("Send motivational check-in")
+    if "missed_deadlines" in factors:
+        recommendations.append("Agree a catch-up plan for missed deadlines")
+    if "prolonged_inactivity" in factors:
+        recommendations.append("Contact student to identify barriers")
+
+    return "; ".join(recommendations) if recommendations else "Monitor progress closely"
+
+
+# ============= Queries =============
+
+async def _last_run(db: AsyncSession, course_id: Optional[UUID]) -> Optional[datetime]:
+    """Start of the latest run covering this scope (a run over every course
+    covers a single course too)."""
+    scope = RiskScoringRun.course_id.is_(None)
+    if course_id:
+        scope = or_(scope, RiskScoringRun.course_id == course_id)
+    result = await db.execute(select(func.max(RiskScoringRun.started_at)).where(scope))
+    return result.scalar_one_or_none()
+
+
+def _changed_pairs(since: datetime, now: datetime):
+    inactive_line = timedelta(days=settings.INACTIVITY_DAYS + 1)
+    return union(
+        select(EngagementEvent.user_id, EngagementEvent.course_id).where(
+            EngagementEvent.occurred_at >= since,
+            EngagementEvent.course_id.isnot(None),
+        ),
+        select(PerformanceTrend.user_id, PerformanceTrend.course_id).where(
+            PerformanceTrend.recorded_at >= since
+        ),
+        select(StudentAnalytics.user_id, StudentAnalytics.course_id).where(
+            or_(
+                StudentAnalytics.last_calculated >= since,
+                StudentAnalytics.last_activity.between(since - inactive_line, now - inactive_line),
+            )
+        ),
+    ).subquery()
+
+
+def _cohort(course_id: Optional[UUID], since: Optional[datetime], now: datetime):
+    days_since = func.extract("epoch", literal(now) - StudentAnalytics.last_activity) / _SECONDS_PER_DAY
+    query = select(
+        StudentAnalytics.user_id,
+        StudentAnalytics.course_id,
+        StudentAnalytics.org_id,
+        StudentAnalytics.days_active,
+        StudentAnalytics.average_assessment_score,
+        days_since.label("days_inactive"),
+    )
+    if course_id:
+        query = query.where(StudentAnalytics.course_id == course_id)
+    if since is not None:
+        changed = _changed_pairs(since, now)
+        query = query.join(
+            changed,
+            and_(changed.c.user_id == StudentAnalytics.user_id, changed.c.course_id == StudentAnalytics.course_id),
+        )
+    return query.subquery()
+
+
+def _on_cohort(pairs, model):
+    return and_(model.user_id == pairs.c.user_id, model.course_id == pairs.c.course_id)
+
+
+async def load_signals(
+    db: AsyncSession,
+    course_id: Optional[UUID] = None,
+    since: Optional[datetime] = None,
+    now: Optional[datetime] = None,
+) -> Tuple[CohortSignals, set]:
+    """Signals for the cohort, plus the pairs that already have an open alert."""
+    now = now or datetime.utcnow()
+    cohort = _cohort(course_id, since, now)
+
+    rows = (await db.execute(select(cohort))).all()
+    # Signal queries join on distinct pairs so a duplicated analytics row
+    # does not double-count events.
+    pairs = select(cohort.c.user_id, cohort.c.course_id).distinct().subquery()
+    index: Dict[Tuple[UUID, UUID], int] = {(r.user_id, r.course_id): i for i, r in enumerate(rows)}
+    n = len(rows)
+
+    def column(values, dtype=float):
+        return np.array([np.nan if v is None else v for v in values], dtype=dtype)
+
+    signals = CohortSignals(
+        user_ids=[r.user_id for r in rows],
+        course_ids=[r.course_id for r in rows],
+        org_ids=[r.org_id for r in rows],
+        days_active=column([r.days_active for r in rows]),
+        average_score=column([r.average_assessment_score for r in rows]),
+        days_inactive=column([r.days_inactive for r in rows]),
+        grade_slope=np.full(n, np.nan),
+        missed_deadlines=np.zeros(n),
+        recent_active_days=np.zeros(n),
+        prior_active_days=np.zeros(n),
+    )
+    if n == 0:
+        return signals, set()
+
+    week_ago = now - timedelta(days=7)
+    window_start = now - timedelta(days=28)
+    day = func.date_trunc("day", EngagementEvent.occurred_at)
+    events = await db.execute(
+        select(
+            EngagementEvent.user_id,
+            EngagementEvent.course_id,
+            func.max(EngagementEvent.occurred_at),
+            func.count(func.distinct(day)).filter(EngagementEvent.occurred_at >= week_ago),
+            func.count(func.distinct(day)).filter(EngagementEvent.occurred_at < week_ago),
+            func.count().filter(EngagementEvent.event_type.in_(settings.MISSED_DEADLINE_EVENT_TYPES)),
+        )
+        .join(pairs, _on_cohort(pairs, EngagementEvent))
+        .where(EngagementEvent.occurred_at >= window_start, EngagementEvent.occurred_at <= now)
+        .group_by(EngagementEvent.user_id, EngagementEvent.course_id)
+    )
+    for user_id, course, last_event, recent, prior, missed in events.all():
+        i = index[(user_id, course)]
+        signals.recent_active_days[i] = recent
+        signals.prior_active_days[i] = prior
+        signals.missed_deadlines[i] = missed
+        if last_event is not None:
+            since_event = (now - last_event).total_seconds() / _SECONDS_PER_DAY
+            # student_analytics.last_activity is only as fresh as its last
+            # recalculation; an event seen here is at least as recent.
+            if np.isnan(signals.days_inactive[i]) or since_event < signals.days_inactive[i]:
+                signals.days_inactive[i] = since_event
+
+    days = func.extract("epoch", PerformanceTrend.period_end) / _SECONDS_PER_DAY
+    trends = await db.execute(
+        select(
+            PerformanceTrend.user_id,
+            PerformanceTrend.course_id,
+            func.regr_slope(PerformanceTrend.metric_value, days),
+        )
+        .join(pairs, _on_cohort(pairs, PerformanceTrend))
+        .where(
+            PerformanceTrend.metric_type.in_(_GRADE_METRICS),
+            PerformanceTrend.period_end >= now - timedelta(days=settings.GRADE_TREND_WINDOW_DAYS),
+        )
+        .group_by(PerformanceTrend.user_id, PerformanceTrend.course_id)
+        .having(func.count() >= 3)
+    )
+    for user_id, course, slope in trends.all():
+        if slope is not None:
+            signals.grade_slope[index[(user_id, course)]] = slope
+
+    open_alerts = await db.execute(
+        select(AtRiskAlert.user_id, AtRiskAlert.course_id)
+        .join(pairs, _on_cohort(pairs, AtRiskAlert))
+        .where(AtRiskAlert.is_active == True, AtRiskAlert.is_resolved == False)
+        .distinct()
+    )
+    return signals, {(u, c) for u, c in open_alerts.all()}
+
+
+# ============= Run =============
+
+async def identify_at_risk(
+    db: AsyncSession,
+    course_id: Optional[UUID] = None,
+    *,
+    incremental: bool = False,
+    org_id: Optional[UUID] = None,
+) -> List[AtRiskAlert]:
+    """Score the cohort and insert alerts for pairs over AT_RISK_THRESHOLD
+    that have no open alert. New alerts carry the student's org, or
+    `org_id` where the analytics row has none. Returns the new alerts."""
+    started_at = datetime.utcnow()
+    since = await _last_run(db, course_id) if incremental else None
+
+    signals, open_pairs = await load_signals(db, course_id, since, started_at)
+    scores, flags = score_cohort(signals)
+
+    rows = []
+    for i in np.flatnonzero(scores >= settings.AT_RISK_THRESHOLD):
+        pair = (signals.user_ids[i], signals.course_ids[i])
+        if pair in open_pairs:
+            continue
+        open_pairs.add(pair)
+        factors = [name for name, on in zip(FACTORS, flags[i]) if on]
+        risk_score = round(float(scores[i]), 4)
+        rows.append({
+            "user_id": pair[0],
+            "course_id": pair[1],
+            "org_id": signals.org_ids[i] or org_id,
+            "alert_type": "at_risk",
+            "severity": alert_severity(risk_score),
+            "risk_score": risk_score,
+            "contributing_factors": factors,
+            "message": alert_message(factors, risk_score),
+            "recommendation": alert_recommendation(factors),
+        })
+
+    alerts: List[AtRiskAlert] = []
+    if rows:
+        result = await db.scalars(insert(AtRiskAlert).returning(AtRiskAlert), rows)
+        alerts = list(result.all())
+
+    db.add(RiskScoringRun(
+        course_id=course_id,
+        incremental=since is not None,
+        students_scored=len(signals),
+        alerts_created=len(alerts),
+        started_at=started_at,
+        finished_at=datetime.utcnow(),
+    ))
+    await db.commit()
+    return alerts
@@ -0,0 +1,138 @@
+"""Add cohort_snapshots — precomputed cohort analytics + at-risk roster.
+
+The cohort dashboard and at-risk roster were recomputed from raw attempts on
+every page load. One row per cohort now holds both, written by the
+`cohort.snapshot.refresh` job (see app/services/cohort_analytics.py).
+
+Invalidation lives in the database so that no write path can forget it:
+
+  - attempt_logs INSERT and mock_attempts UPDATE set `stale_since` on the
+    snapshots of every cohort the affected learners belong to. Statement-
+    level with a transition table, so a bulk insert of a session's attempts
+    is one UPDATE, and the `stale_since IS NULL` guard makes every attempt
+    after the first a no-op until the next refresh.
+  - cohort_memberships and cohort_blueprints changes delete the snapshot,
+    since its learner set or blueprint list is simply wrong afterwards. This
+    also covers erasure: the membership row cascades away with the user, and
+    the roster carrying their email goes with it.
+
+A per-cohort table rather than a MATERIALIZED VIEW: a materialized view can
+only be refreshed whole, and the job refreshes just the cohorts that moved.
+
+ops/db/11_institutional.sql gains the same DDL in the same commit (P1.2's
+drift rule).
+
+Revision ID: cohort_snapshots_001
+Revises: nclex_framework_001
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "cohort_snapshots_001"
+down_revision = "nclex_framework_001"
+branch_labels = None
+depends_on = None
+
+
+_FUNCTIONS = """
+CREATE OR REPLACE FUNCTION cohort_snapshots_mark_stale() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE cohort_snapshots cs
+       SET stale_since = timezone('utc', now())
+     WHERE cs.stale_since IS NULL
+       AND cs.cohort_id IN (
+           SELECT m.cohort_id
+           FROM cohort_memberships m
+           WHERE m.left_at IS NULL
+             AND m.role = 'learner'
+             AND m.user_id IN (SELECT DISTINCT user_id FROM new_rows)
+       );
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION cohort_snapshots_drop() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        DELETE FROM cohort_snapshots WHERE cohort_id = OLD.cohort_id;
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        DELETE FROM cohort_snapshots WHERE cohort_id = NEW.cohort_id;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+"""
+
+_TRIGGERS = """
+CREATE TRIGGER trg_attempt_logs_cohort_stale
+    AFTER INSERT ON attempt_logs
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION cohort_snapshots_mark_stale();
+
+CREATE TRIGGER trg_mock_attempts_cohort_stale
+    AFTER UPDATE ON mock_attempts
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION cohort_snapshots_mark_stale();
+
+CREATE TRIGGER trg_cohort_memberships_snapshot
+    AFTER INSERT OR UPDATE OR DELETE ON cohort_memberships
+    FOR EACH ROW EXECUTE FUNCTION cohort_snapshots_drop();
+
+CREATE TRIGGER trg_cohort_blueprints_snapshot
+    AFTER INSERT OR UPDATE OR DELETE ON cohort_blueprints
+    FOR EACH ROW EXECUTE FUNCTION cohort_snapshots_drop();
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        "cohort_snapshots",
+        sa.Column(
+            "cohort_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("cohorts.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("aggregate", postgresql.JSONB(), nullable=False),
+        sa.Column("at_risk", postgresql.JSONB(), nullable=False),
+        sa.Column(
+            "params",
+            postgresql.JSONB(),
+            nullable=False,
+            server_default=sa.text("'{}'::jsonb"),
+        ),
+        sa.Column(
+            "computed_at",
+            sa.DateTime(),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.Column("stale_since", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("cohort_id"),
+    )
+    op.create_index(
+        "ix_cohort_snapshots_stale",
+        "cohort_snapshots",
+        ["stale_since"],
+        postgresql_where=sa.text("stale_since IS NOT NULL"),
+    )
+    op.execute(_FUNCTIONS)
+    op.execute(_TRIGGERS)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_cohort_blueprints_snapshot ON cohort_blueprints")
+    op.execute("DROP TRIGGER IF EXISTS trg_cohort_memberships_snapshot ON cohort_memberships")
+    op.execute("DROP TRIGGER IF EXISTS trg_mock_attempts_cohort_stale ON mock_attempts")
+    op.execute("DROP TRIGGER IF EXISTS trg_attempt_logs_cohort_stale ON attempt_logs")
+    op.execute("DROP FUNCTION IF EXISTS cohort_snapshots_drop()")
+    op.execute("DROP FUNCTION IF EXISTS cohort_snapshots_mark_stale()")
+    op.drop_index("ix_cohort_snapshots_stale", table_name="cohort_snapshots")
+    op.drop_table("cohort_snapshots")
@@ -0,0 +1,132 @@
+"""Per-bank generation counter for compiled mock blueprints.
+
+mock_exam.generate_mock_items now samples from an in-process index of
+item ids per skill and IRT b-band instead of querying every start. The
+index has to go stale exactly when its inputs change: an item's
+difficulty (IRT calibration), review status, soft delete or bank, or a
+question's skill tags. item_bank_generations holds one counter per bank,
+bumped by statement-level triggers on items and content_skills, and an
+index is reused only while the counters it was compiled against are
+unchanged.
+
+The UPDATE trigger compares old and new rows through transition tables
+(column-list triggers cannot have them), so the attempts_count bumps on
+every answered question never invalidate anything. One bump per bank per
+statement, so a calibration run's single UPDATE ... FROM stage is one bump.
+
+No FK to item_banks: a bank delete cascades to its items, and the items
+trigger would otherwise try to bump a bank that is going away.
+
+ops/db/08_item_bank.sql gains the same DDL in the same commit (P1.2's
+drift rule).
+
+Revision ID: item_bank_generations_001
+Revises: chunk_embedding_model_001
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+
+revision = "item_bank_generations_001"
+down_revision = "chunk_embedding_model_001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+    CREATE TABLE IF NOT EXISTS item_bank_generations (
+        bank_id UUID PRIMARY KEY,
+        generation BIGINT NOT NULL DEFAULT 1,
+        bumped_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+    op.execute("""
+    CREATE OR REPLACE FUNCTION bump_item_bank_generations(banks UUID[]) RETURNS void
+    LANGUAGE sql AS $$
+        INSERT INTO item_bank_generations (bank_id)
+        SELECT DISTINCT b FROM unnest(banks) AS b WHERE b IS NOT NULL
+        ON CONFLICT (bank_id) DO UPDATE
+           SET generation = item_bank_generations.generation + 1,
+               bumped_at = CURRENT_TIMESTAMP
+    $$;
+    """)
+    op.execute("""
+    CREATE OR REPLACE FUNCTION items_bump_bank_generation() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            PERFORM bump_item_bank_generations(ARRAY(SELECT bank_id FROM new_rows));
+        ELSIF TG_OP = 'DELETE' THEN
+            PERFORM bump_item_bank_generations(ARRAY(SELECT bank_id FROM old_rows));
+        ELSE
+            PERFORM bump_item_bank_generations(ARRAY(
+                SELECT unnest(ARRAY[o.bank_id, n.bank_id])
+                FROM old_rows o JOIN new_rows n ON n.id = o.id
+                WHERE (o.irt_difficulty, o.review_status, o.deleted_at, o.bank_id)
+                      IS DISTINCT FROM
+                      (n.irt_difficulty, n.review_status, n.deleted_at, n.bank_id)
+            ));
+        END IF;
+        RETURN NULL;
+    END;
+    $$;
+    """)
+    op.execute("""
+    CREATE OR REPLACE FUNCTION content_skills_bump_bank_generation() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            PERFORM bump_item_bank_generations(ARRAY(
+                SELECT i.bank_id FROM new_rows c JOIN items i ON i.id = c.content_id
+                WHERE c.content_kind = 'question'));
+        ELSE
+            PERFORM bump_item_bank_generations(ARRAY(
+                SELECT i.bank_id FROM old_rows c JOIN items i ON i.id = c.content_id
+                WHERE c.content_kind = 'question'));
+        END IF;
+        RETURN NULL;
+    END;
+    $$;
+    """)
+    op.execute("""
+    CREATE TRIGGER trg_items_generation_ins
+        AFTER INSERT ON items REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION items_bump_bank_generation();
+    """)
+    op.execute("""
+    CREATE TRIGGER trg_items_generation_upd
+        AFTER UPDATE ON items REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION items_bump_bank_generation();
+    """)
+    op.execute("""
+    CREATE TRIGGER trg_items_generation_del
+        AFTER DELETE ON items REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION items_bump_bank_generation();
+    """)
+    op.execute("""
+    CREATE TRIGGER trg_content_skills_generation_ins
+        AFTER INSERT ON content_skills REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION content_skills_bump_bank_generation();
+    """)
+    op.execute("""
+    CREATE TRIGGER trg_content_skills_generation_del
+        AFTER DELETE ON content_skills REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION content_skills_bump_bank_generation();
+    """)
+
+
+def downgrade() -> None:
+    for trigger, table in (
+        ("trg_items_generation_ins", "items"),
+        ("trg_items_generation_upd", "items"),
+        ("trg_items_generation_del", "items"),
+        ("trg_content_skills_generation_ins", "content_skills"),
+        ("trg_content_skills_generation_del", "content_skills"),
+    ):
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger} ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS content_skills_bump_bank_generation()")
+    op.execute("DROP FUNCTION IF EXISTS items_bump_bank_generation()")
+    op.execute("DROP FUNCTION IF EXISTS bump_item_bank_generations(UUID[])")
+    op.execute("DROP TABLE IF EXISTS item_bank_generations")
@@ -0,0 +1,48 @@
+"""Wake idle workers with NOTIFY when jobs are inserted.
+
+The worker used to poll background_jobs every few seconds. A statement-level
+AFTER INSERT trigger now sends NOTIFY background_jobs, and worker.py LISTENs
+on a dedicated connection, so new work starts as soon as the enqueueing
+transaction commits. One notification per statement, so an `enqueue_many()`
+fan-out of thousands of rows is one wakeup, and Postgres folds identical
+notifications within a transaction into one.
+
+Polling stays as the fallback (a lost listener connection, jobs scheduled in
+the future, retries coming off their backoff), just at a much lower rate.
+
+ops/db/16_ops.sql gains the same DDL in the same commit (P1.2's drift rule).
+
+Revision ID: jobs_notify_001
+Revises: cohort_snapshots_001
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+
+revision = "jobs_notify_001"
+down_revision = "cohort_snapshots_001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+    CREATE OR REPLACE FUNCTION background_jobs_notify() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        PERFORM pg_notify('background_jobs', '');
+        RETURN NULL;
+    END;
+    $$;
+    """)
+    op.execute("""
+    CREATE TRIGGER trg_background_jobs_notify
+        AFTER INSERT ON background_jobs
+        FOR EACH STATEMENT EXECUTE FUNCTION background_jobs_notify();
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_background_jobs_notify ON background_jobs")
+    op.execute("DROP FUNCTION IF EXISTS background_jobs_notify()")
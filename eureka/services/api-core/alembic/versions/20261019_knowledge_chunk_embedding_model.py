@@ -0,0 +1,47 @@
+"""Record which embedder wrote each knowledge_chunks vector.
+
+item_embeddings is keyed on (item_id, model), so vectors from two models
+never meet. knowledge_chunks has a single embedding column, and nothing
+said which model filled it: after switching EMBEDDING_BACKEND, retrieval
+would have compared the new model's query vector against the old model's
+chunk vectors. The column lets retrieval filter to the active model and
+lets `embeddings.reembed_chunks` find exactly the rows a swap left behind.
+
+Every vector written before this was the sha256 stand-in, so existing rows
+are labelled with it.
+
+knowledge_chunks is created by ops/db/09_tutor.sql rather than by alembic,
+hence IF EXISTS. 09_tutor.sql gains the same DDL in the same commit (P1.2's
+drift rule).
+
+Revision ID: chunk_embedding_model_001
+Revises: jobs_notify_001
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+
+revision = "chunk_embedding_model_001"
+down_revision = "jobs_notify_001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "ALTER TABLE IF EXISTS knowledge_chunks "
+        "ADD COLUMN IF NOT EXISTS embedding_model VARCHAR(80)"
+    )
+    op.execute("""
+    DO $$ BEGIN
+        IF to_regclass('knowledge_chunks') IS NOT NULL THEN
+            UPDATE knowledge_chunks SET embedding_model = 'stub-sha256-1024'
+             WHERE embedding IS NOT NULL AND embedding_model IS NULL;
+        END IF;
+    END $$;
+    """)
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE IF EXISTS knowledge_chunks DROP COLUMN IF EXISTS embedding_model")
@@ -26,7 +26,7 @@ Endpoint map
   POST  /me/study-plan/weeks/{id}/log        record minutes / completed items
 
 12.4 Offline sync
-  GET   /me/offline-pack                     get or refresh item pack (ETag)
+  GET   /me/offline-pack                     get or refresh item pack (ETag, delta, gzip)
   POST  /me/offline-pack/replay              replay attempts collected offline
 
 12.5 Live tutoring marketplace
@@ -40,6 +40,7 @@ Endpoint map
 
 from __future__ import annotations
 
+import gzip
 import hashlib
 from datetime import datetime, timezone
 from typing import Optional
@@ -401,22 +402,52 @@ async def log_study_minutes(
 # ---------------------------------------------------------------------------
 
 
+def _client_etag(header: Optional[str]) -> Optional[str]:
+    """First entity tag in an If-None-Match header, unquoted, W/ dropped."""
+    if not header:
+        return None
+    tag = header.split(",")[0].strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    return tag.strip('"') or None
+
+
 @router.get("/me/offline-pack")
 async def get_offline_pack(
     response: Response,
     if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
     max_items: int = Query(20, ge=1, le=100),
+    delta: bool = Query(False, description="Only send items the If-None-Match pack lacks"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    bundle = await off_svc.build_item_pack(
+    # The manifest is enough to answer If-None-Match; the pack is only
+    # assembled when something changed.
+    manifest = await off_svc.pack_manifest(
         db, user_id=current_user.id, max_items=max_items,
     )
-    response.headers["ETag"] = bundle.etag
-    if if_none_match and if_none_match == bundle.etag:
+    client_etag = _client_etag(if_none_match)
+    if client_etag == manifest.etag:
+        response.headers["ETag"] = manifest.etag
         response.status_code = 304
         return None
-    return OfflineBundleResponse.model_validate(bundle, from_attributes=True)
+
+    pack = await off_svc.build_item_pack(
+        db, user_id=current_user.id, max_items=max_items,
+        manifest=manifest, base_etag=client_etag if delta else None,
+    )
+    body = OfflineBundleResponse.model_validate(pack.bundle, from_attributes=True)
+    body = body.model_copy(update={"payload_jsonb": pack.payload})
+    headers = {"ETag": manifest.etag, "Vary": "Accept-Encoding"}
+    if accept_encoding and "gzip" in accept_encoding.lower():
+        return Response(
+            content=gzip.compress(body.model_dump_json().encode("utf-8"), compresslevel=6),
+            media_type="application/json",
+            headers={**headers, "Content-Encoding": "gzip"},
+        )
+    response.headers.update(headers)
+    return body
 
 
 @router.post("/me/offline-pack/replay", response_model=OfflineReplayResponse)
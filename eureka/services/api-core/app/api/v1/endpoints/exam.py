@@ -130,6 +130,7 @@ async def list_my_attempts(
 @router.post("/irt/calibrate", response_model=CalibrateResponse)
 async def run_calibration(
     min_attempts: int = Query(3, ge=1, le=50),
+    method: str = Query("jml", pattern="^(jml|mml)$"),
     db: AsyncSession = Depends(get_db),
     _: User = Depends(require_admin),
 ) -> CalibrateResponse:
@@ -145,8 +146,11 @@ async def run_calibration(
     it, and calls POST /mcat/irt/calibrate instead, which applies the
     documented threshold in docs/mcat/IRT_CALIBRATION.md and refuses below
     it.
+
+    method=mml fits by marginal maximum likelihood instead of the default
+    joint fit; see services/irt.py.
     """
-    result = await calibrate(db, min_attempts_per_item=min_attempts)
+    result = await calibrate(db, min_attempts_per_item=min_attempts, method=method)
     await db.commit()
     return CalibrateResponse(
         items_calibrated=len(result.items),
@@ -51,8 +51,8 @@ from app.schemas.item_bank import (
     VariantResponse,
 )
 from app.services.item_search import (
-    DEFAULT_EMBED_MODEL,
     hybrid_search,
+    index_text,
     upsert_item_embedding,
 )
 from app.services.variant_generator import (
@@ -67,12 +67,7 @@ router = APIRouter()
 
 def _index_text(item: Item) -> str:
     """The text projection used for keyword + embedding indexing."""
-    parts = [
-        item.content.get("stem") or item.content.get("vignette") or "",
-        " ".join(item.content.get("options", []) or []),
-        item.explanation or "",
-    ]
-    return " ".join(p for p in parts if p)
+    return index_text(item.content, item.explanation)
 
 
 # ---------------------------------------------------------------------------
@@ -415,7 +410,6 @@ async def search_items(
         bank_id=bank_id,
         framework_filter=framework.value if framework else None,
         skill_id=skill_id,
-        embed_model=DEFAULT_EMBED_MODEL,
     )
 
     if not hits:
@@ -35,6 +35,14 @@ class Settings(BaseSettings):
     # Redis
     REDIS_URL: str = Field(default="redis://localhost:6379/0", env="REDIS_URL")
     REDIS_MAX_CONNECTIONS: int = Field(default=50, env="REDIS_MAX_CONNECTIONS")
+
+    # Request audit trail (app/services/audit_writer.py). AUDIT_SINK is "db"
+    # (batched inserts into audit_events) or "jsonl" (gzip segments under
+    # AUDIT_SPOOL_DIR). A db batch that fails to insert is spooled either way.
+    AUDIT_SINK: str = Field(default="db", env="AUDIT_SINK")
+    AUDIT_SPOOL_DIR: str = Field(default="/var/lib/eureka/audit", env="AUDIT_SPOOL_DIR")
+    AUDIT_QUEUE_SIZE: int = Field(default=10000, env="AUDIT_QUEUE_SIZE")
+    AUDIT_BATCH_SIZE: int = Field(default=500, env="AUDIT_BATCH_SIZE")
     
     # Stripe (test-prep + resume billing). TEST keys in dev; prod keys come
     # from the deployment environment — never committed. Unset = billing
@@ -168,6 +176,11 @@ class Settings(BaseSettings):
     AI_MODEL: str = Field(default="claude-sonnet-4-20250514", env="AI_MODEL")
     AI_MAX_TOKENS: int = Field(default=2000, env="AI_MAX_TOKENS")
     AI_TEMPERATURE: float = Field(default=0.7, env="AI_TEMPERATURE")
+    # Embeddings for item search + RAG (app/services/embeddings.py). "hashed"
+    # is the model-free CI stand-in; "local" runs EMBEDDING_MODEL on CPU via
+    # sentence-transformers (optional dependency) and must be 1024-dim.
+    EMBEDDING_BACKEND: str = Field(default="hashed", env="EMBEDDING_BACKEND")
+    EMBEDDING_MODEL: str = Field(default="BAAI/bge-large-en-v1.5", env="EMBEDDING_MODEL")
 
     # Monitoring
     SENTRY_DSN: Optional[str] = Field(default=None, env="SENTRY_DSN")
@@ -4,6 +4,7 @@ Database configuration for EUREKA API Core
 Sets up SQLAlchemy async engine and session management.
 """
 
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.pool import NullPool
@@ -33,6 +34,16 @@ engine = create_async_engine(
     poolclass=NullPool if settings.ENVIRONMENT == "test" else None,
 )
 
+
+@event.listens_for(engine.sync_engine, "connect")
+def _install_codecs(dbapi_connection, _record) -> None:
+    # pgvector's binary wire format, so embeddings bind and COPY as float32
+    # rather than as decimal strings. A no-op where the extension is absent.
+    from app.services.embeddings import install_vector_codec
+
+    dbapi_connection.run_async(install_vector_codec)
+
+
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -2,103 +2,116 @@
 Audit Middleware for EUREKA
 
 Logs all API actions for compliance (FERPA, HIPAA, COPPA).
+
+A plain ASGI middleware: it watches the response start for the status,
+stamps X-Request-ID on it, and after the response builds one record and
+queues it on app/services/audit_writer.py, which persists it off the
+request path. The identity fields (user_id, org_id, role) are read from
+request.state once the inner middleware and the route have run, so they
+are filled in for authenticated calls rather than read before tenancy has
+set them.
 """
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-import logging
 import time
 import uuid
+from datetime import datetime, timezone
+from urllib.parse import parse_qsl
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services import audit_writer
+
 
-logger = logging.getLogger(__name__)
+def _as_uuid(value):
+    if value is None or isinstance(value, uuid.UUID):
+        return value
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
 
 
-class AuditMiddleware(BaseHTTPMiddleware):
+class AuditMiddleware:
     """Middleware to audit all API requests for compliance"""
-    
-    EXCLUDED_PATHS = [
+
+    EXCLUDED_PATHS = (
         "/health",
         "/ready",
         "/docs",
         "/redoc",
         "/openapi.json",
         "/static",
-    ]
-    
-    SENSITIVE_ACTIONS = [
+    )
+
+    SENSITIVE_ACTIONS = frozenset({
         "POST",
         "PUT",
         "PATCH",
         "DELETE",
-    ]
-    
-    async def dispatch(self, request: Request, call_next):
+    })
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
-        Log request details for audit trail.
-        
+        Record request details for the audit trail.
+
         For compliance with FERPA (7 years) and HIPAA (6 years),
-        we log all state-changing operations.
+        we persist all state-changing operations, and every error.
         """
         # Skip audit for excluded paths
-        if any(request.url.path.startswith(path) for path in self.EXCLUDED_PATHS):
-            return await call_next(request)
-        
+        if scope["type"] != "http" or scope["path"].startswith(self.EXCLUDED_PATHS):
+            await self.app(scope, receive, send)
+            return
+
         # Generate request ID
         request_id = str(uuid.uuid4())
-        request.state.request_id = request_id
-        
-        # Extract request metadata
-        start_time = time.time()
-        
-        audit_data = {
-            "request_id": request_id,
-            "method": request.method,
-            "path": request.url.path,
-            "query_params": dict(request.query_params),
-            "ip_address": request.client.host if request.client else None,
-            "user_agent": request.headers.get("user-agent"),
-            "org_id": getattr(request.state, "org_id", None),
-            "user_id": getattr(request.state, "user_id", None),
-            "role": getattr(request.state, "role", None),
-        }
-        
-        # Process request
-        response = await call_next(request)
-        
-        # Calculate duration
-        duration_ms = (time.time() - start_time) * 1000
-        
-        # Log audit entry for sensitive operations or errors
-        should_audit = (
-            request.method in self.SENSITIVE_ACTIONS or
-            response.status_code >= 400
-        )
-        
-        if should_audit:
-            audit_data.update({
-                "status_code": response.status_code,
+        state = scope.setdefault("state", {})
+        state["request_id"] = request_id
+        header = (b"x-request-id", request_id.encode())
+
+        occurred_at = datetime.now(timezone.utc)
+        start_time = time.perf_counter()
+        status_code = 500
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [
+                    h for h in message.get("headers", []) if h[0].lower() != b"x-request-id"
+                ] + [header]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            method = scope["method"]
+            if method in self.SENSITIVE_ACTIONS or status_code >= 400:
+                await self._audit(scope, state, request_id, status_code, occurred_at, start_time)
+
+    async def _audit(self, scope, state, request_id, status_code, occurred_at, start_time) -> None:
+        duration_ms = (time.perf_counter() - start_time) * 1000
+        headers = dict(scope.get("headers") or ())
+        client = scope.get("client")
+        user_agent = headers.get(b"user-agent")
+        await audit_writer.record({
+            "event_name": f"http.{scope['method'].lower()}",
+            "severity": "warn" if status_code >= 400 else "info",
+            "actor_user_id": _as_uuid(state.get("user_id")),
+            "org_id": _as_uuid(state.get("org_id")),
+            "request_ip": client[0] if client else None,
+            "user_agent": user_agent.decode("latin-1")[:500] if user_agent else None,
+            "occurred_at": occurred_at,
+            "metadata": {
+                "request_id": request_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "query_params": dict(parse_qsl(scope.get("query_string", b"").decode("latin-1"))),
+                "status_code": status_code,
                 "duration_ms": round(duration_ms, 2),
-                "timestamp": time.time(),
-            })
-            
-            # Log level based on status
-            if response.status_code >= 500:
-                log_level = logging.ERROR
-            elif response.status_code >= 400:
-                log_level = logging.WARNING
-            else:
-                log_level = logging.INFO
-            
-            logger.log(
-                log_level,
-                f"AUDIT: {request.method} {request.url.path} - {response.status_code}",
-                extra=audit_data
-            )
-            
-            # TODO: Write to audit_logs table for compliance
-            # This would be done via a background task to avoid blocking
-        
-        # Add request ID to response headers
-        response.headers["X-Request-ID"] = request_id
-        
-        return response
+                "user_id": str(state["user_id"]) if state.get("user_id") else None,
+                "role": state.get("role"),
+            },
+        })
@@ -2,22 +2,211 @@
 Rate Limiting Middleware
 
 Implements rate limiting using Redis to prevent abuse and ensure fair usage.
+
+Algorithm. An approximate sliding window built from two fixed-window
+counters: the count in the current window plus the previous window's count
+weighted by how much of it still overlaps the sliding window. Both counters
+live in one small Redis hash per client + endpoint, updated by one Lua
+script, so a check is one round trip and the key is two integers. The first
+version kept a sorted set with one member per request and ran
+ZREMRANGEBYSCORE/ZCARD/ZADD/EXPIRE on every request; at our request rate
+those sets were the largest keys in Redis.
+
+The approximation assumes requests in the previous window were spread
+evenly. It can admit a little more or less than an exact log around a
+burst at a window edge, which is the usual trade for O(1) state.
+
+Token leasing. For limits large enough that one request is a small share
+(default 100/min), the middleware asks the store for a handful of tokens
+at once and spends them locally for up to LEASE_SECONDS, so most requests
+never touch Redis. Leased tokens are already counted in Redis, so leasing
+never admits more than the limit across workers. Tokens a worker leases
+and does not use before the lease expires are handed back on its next
+store call for that key, in the same round trip: the store subtracts them
+from the window they were counted in before estimating. Without the refund
+a steady 55/min against 100/min lost nine tokens per request and was
+rejected 45 times a minute. Tight limits (login, password reset) lease one
+token at a time, i.e. not at all.
+
+Connections come from one ConnectionPool per Redis URL, shared by every
+middleware instance in the process and capped at REDIS_MAX_CONNECTIONS.
+On a Redis error the request is allowed (fail open), as before.
+
+InMemoryRateLimitStore implements the same algorithm in a dict, for tests
+and single-process development.
 """
 
+from __future__ import annotations
+
+import json
+import logging
+import math
 import time
-from fastapi import Request, HTTPException, status
-from starlette.middleware.base import BaseHTTPMiddleware
-from typing import Optional, Callable
+from dataclasses import dataclass, field
+from typing import Optional, Protocol
+
 import redis.asyncio as aioredis
-import logging
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.core.config import get_settings
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+LEASE_SECONDS = 1.0
+LEASE_MAX_TOKENS = 10
+
+_SKIP_PATHS = frozenset({"/health", "/", "/docs", "/redoc", "/openapi.json"})
+
+
+class RateLimitStore(Protocol):
+    async def acquire(
+        self, key: str, *, limit: int, window: int, tokens: int, now: float,
+        refund: int = 0, refund_window: int = 0,
+    ) -> tuple[int, int, int]:
+        """Take up to `tokens` from key's budget.
+
+        `refund` unused tokens of an expired lease are first returned to
+        window index `refund_window`, if that window still counts.
+
+        Returns (granted, remaining, reset): how many were granted (0 means
+        the request is over the limit), the estimated budget left after the
+        grant, and the epoch second the current window ends.
+        """
+        ...
+
+
+def _take(prev: float, cur: float, *, limit: int, window: int, tokens: int, now: float) -> tuple[int, int, float]:
+    """The sliding-window arithmetic, shared by the in-memory store and the
+    tests. Mirrors _ACQUIRE_LUA line for line."""
+    elapsed = (now % window) / window
+    estimate = prev * (1.0 - elapsed) + cur
+    granted = max(0, min(tokens, math.floor(limit - estimate)))
+    remaining = max(0, math.floor(limit - estimate - granted))
+    return granted, remaining, estimate
+
+
+# ---------------------------------------------------------------------------
+# Redis store
+# ---------------------------------------------------------------------------
+
+# KEYS[1] = hash key. ARGV = limit, window, tokens, now, refund, refund_window.
+# Fields are window indices; only the current and previous are ever read,
+# and the key expires two windows after its last write.
+_ACQUIRE_LUA = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local tokens = tonumber(ARGV[3])
+local now = tonumber(ARGV[4])
+local refund = tonumber(ARGV[5])
+local refund_window = tonumber(ARGV[6])
+local cur = math.floor(now / window)
+if refund > 0 and (refund_window == cur or refund_window == cur - 1) then
+  if redis.call('HINCRBY', KEYS[1], refund_window, -refund) < 0 then
+    redis.call('HSET', KEYS[1], refund_window, 0)
+  end
+end
+local counts = redis.call('HMGET', KEYS[1], cur, cur - 1)
+local c = tonumber(counts[1]) or 0
+local p = tonumber(counts[2]) or 0
+local elapsed = (now - cur * window) / window
+local estimate = p * (1 - elapsed) + c
+local granted = math.max(0, math.min(tokens, math.floor(limit - estimate)))
+if granted > 0 then
+  redis.call('HINCRBY', KEYS[1], cur, granted)
+  redis.call('HDEL', KEYS[1], cur - 2)
+  redis.call('EXPIRE', KEYS[1], window * 2)
+end
+local remaining = math.max(0, math.floor(limit - estimate - granted))
+return {granted, remaining, (cur + 1) * window}
+"""
+
+_pools: dict[str, aioredis.ConnectionPool] = {}
+
+
+def _shared_pool(url: str) -> aioredis.ConnectionPool:
+    pool = _pools.get(url)
+    if pool is None:
+        pool = _pools[url] = aioredis.ConnectionPool.from_url(
+            url,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            decode_responses=True,
+        )
+    return pool
+
+
+class RedisRateLimitStore:
+    """Two-counter sliding window in one Redis hash per key."""
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+    def __init__(self, redis_url: Optional[str] = None):
+        self.redis_url = redis_url or settings.REDIS_URL
+        self._client: Optional[aioredis.Redis] = None
+        self._script = None
+
+    def _redis(self):
+        if self._client is None:
+            self._client = aioredis.Redis(connection_pool=_shared_pool(self.redis_url))
+            self._script = self._client.register_script(_ACQUIRE_LUA)
+        return self._script
+
+    async def acquire(
+        self, key: str, *, limit: int, window: int, tokens: int, now: float,
+        refund: int = 0, refund_window: int = 0,
+    ) -> tuple[int, int, int]:
+        script = self._redis()
+        granted, remaining, reset = await script(
+            keys=[key], args=[limit, window, tokens, now, refund, refund_window],
+        )
+        return int(granted), int(remaining), int(reset)
+
+
+# ---------------------------------------------------------------------------
+# In-memory store
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class InMemoryRateLimitStore:
+    """Same algorithm as RedisRateLimitStore, in a dict. Tests and dev only:
+    every process keeps its own counts."""
+
+    counts: dict[str, dict[int, int]] = field(default_factory=dict)
+    calls: int = 0
+
+    async def acquire(
+        self, key: str, *, limit: int, window: int, tokens: int, now: float,
+        refund: int = 0, refund_window: int = 0,
+    ) -> tuple[int, int, int]:
+        self.calls += 1
+        cur = int(now // window)
+        windows = self.counts.setdefault(key, {})
+        if refund and refund_window in windows and refund_window >= cur - 1:
+            windows[refund_window] = max(0, windows[refund_window] - refund)
+        granted, remaining, _ = _take(
+            windows.get(cur - 1, 0), windows.get(cur, 0),
+            limit=limit, window=window, tokens=tokens, now=now,
+        )
+        if granted:
+            windows[cur] = windows.get(cur, 0) + granted
+            windows.pop(cur - 2, None)
+        return granted, remaining, (cur + 1) * window
+
+
+# ---------------------------------------------------------------------------
+# Middleware
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class _Lease:
+    tokens: int
+    expires: float
+    remaining: int
+    reset: int
+    window: int  # index of the window the tokens were counted in
+
+
+class RateLimitMiddleware:
     """
     Rate limiting middleware using Redis.
 
@@ -25,29 +214,41 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
     - Anonymous users (by IP)
     - Authenticated users (by user ID)
     - Different endpoints can have different limits
+
+    A plain ASGI middleware rather than BaseHTTPMiddleware, so an allowed
+    request pays for one dict lookup (or one script call) and a header
+    append, not an extra task and a response stream wrapper.
     """
 
     def __init__(
         self,
-        app,
+        app: ASGIApp,
         redis_url: Optional[str] = None,
         default_limit: int = 100,
-        default_window: int = 60
+        default_window: int = 60,
+        store: Optional[RateLimitStore] = None,
+        lease_seconds: float = LEASE_SECONDS,
+        lease_max_tokens: int = LEASE_MAX_TOKENS,
     ):
         """
         Initialize rate limiter.
 
         Args:
-            app: FastAPI application
+            app: ASGI application
             redis_url: Redis connection URL
             default_limit: Default request limit per window
             default_window: Default time window in seconds
+            store: Counter backend; RedisRateLimitStore(redis_url) if omitted
+            lease_seconds: How long locally leased tokens stay spendable
+            lease_max_tokens: Most tokens leased per store call (1 disables leasing)
         """
-        super().__init__(app)
-        self.redis_url = redis_url or settings.REDIS_URL
-        self.redis_client: Optional[aioredis.Redis] = None
+        self.app = app
+        self.store: RateLimitStore = store or RedisRateLimitStore(redis_url)
         self.default_limit = default_limit
         self.default_window = default_window
+        self.lease_seconds = lease_seconds
+        self.lease_max_tokens = lease_max_tokens
+        self._leases: dict[str, _Lease] = {}
 
         # Endpoint-specific rate limits (requests per minute)
         self.endpoint_limits = {
@@ -61,60 +262,32 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         # Authenticated users get higher limits
         self.auth_multiplier = 2.0
 
-    async def get_redis_client(self) -> aioredis.Redis:
-        """Get or create Redis client."""
-        if self.redis_client is None:
-            self.redis_client = await aioredis.from_url(
-                self.redis_url,
-                encoding="utf-8",
-                decode_responses=True
-            )
-        return self.redis_client
-
-    def get_identifier(self, request: Request) -> str:
+    def get_identifier(self, scope: Scope) -> str:
         """
         Get unique identifier for rate limiting.
 
         Uses user ID if authenticated, otherwise IP address.
-
-        Args:
-            request: FastAPI request object
-
-        Returns:
-            Unique identifier string
         """
-        # Try to get user ID from request state (set by auth middleware)
-        user_id = getattr(request.state, "user_id", None)
+        # request.state is scope["state"]; the auth layer sets user_id there.
+        user_id = (scope.get("state") or {}).get("user_id")
         if user_id:
             return f"user:{user_id}"
 
         # Fall back to IP address
-        forwarded = request.headers.get("X-Forwarded-For")
-        if forwarded:
-            ip = forwarded.split(",")[0].strip()
-        else:
-            ip = request.client.host if request.client else "unknown"
-
-        return f"ip:{ip}"
+        for name, value in scope.get("headers") or ():
+            if name == b"x-forwarded-for":
+                return f"ip:{value.decode('latin-1').split(',')[0].strip()}"
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
 
-    def get_limits(self, request: Request, is_authenticated: bool) -> tuple[int, int]:
+    def get_limits(self, path: str, is_authenticated: bool) -> tuple[int, int]:
         """
         Get rate limits for the current request.
 
-        Args:
-            request: FastAPI request object
-            is_authenticated: Whether user is authenticated
-
         Returns:
             Tuple of (limit, window_seconds)
         """
-        path = request.url.path
-
-        # Check if endpoint has specific limits
-        if path in self.endpoint_limits:
-            limit, window = self.endpoint_limits[path]
-        else:
-            limit, window = self.default_limit, self.default_window
+        limit, window = self.endpoint_limits.get(path, (self.default_limit, self.default_window))
 
         # Authenticated users get higher limits
         if is_authenticated:
@@ -122,6 +295,13 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
 
         return limit, window
 
+    def _lease_size(self, limit: int) -> int:
+        return max(1, min(self.lease_max_tokens, limit // 10))
+
+    def _prune_leases(self, now: float) -> None:
+        if len(self._leases) > 10_000:
+            self._leases = {k: v for k, v in self._leases.items() if v.expires > now}
+
     async def check_rate_limit(
         self,
         identifier: str,
@@ -132,124 +312,102 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         """
         Check if request is within rate limit.
 
-        Uses sliding window algorithm with Redis.
-
-        Args:
-            identifier: Unique identifier for the client
-            limit: Maximum number of requests allowed
-            window: Time window in seconds
-            endpoint: API endpoint path
+        Spends a locally leased token when one is left, otherwise asks the
+        store for a new lease, handing back what the expired one left over.
 
         Returns:
             Tuple of (is_allowed, rate_limit_info)
         """
-        redis = await self.get_redis_client()
-        current_time = time.time()
-        window_start = current_time - window
-
-        # Redis key for this identifier and endpoint
+        now = time.time()
         key = f"rate_limit:{identifier}:{endpoint}"
 
-        try:
-            # Use Redis sorted set with timestamps as scores
-            pipe = redis.pipeline()
-
-            # Remove old entries outside the window
-            pipe.zremrangebyscore(key, 0, window_start)
-
-            # Count requests in current window
-            pipe.zcard(key)
-
-            # Add current request
-            pipe.zadd(key, {str(current_time): current_time})
-
-            # Set expiry on the key
-            pipe.expire(key, window)
-
-            # Execute pipeline
-            results = await pipe.execute()
-            request_count = results[1]  # Count before adding current request
-
-            # Check if limit exceeded
-            is_allowed = request_count < limit
-
-            # Calculate reset time
-            reset_time = int(current_time + window)
-
-            rate_limit_info = {
+        lease = self._leases.get(key)
+        if lease is not None and lease.tokens > 0 and lease.expires > now:
+            lease.tokens -= 1
+            return True, {
                 "limit": limit,
-                "remaining": max(0, limit - request_count - 1),
-                "reset": reset_time,
-                "retry_after": window if not is_allowed else None
+                "remaining": lease.remaining + lease.tokens,
+                "reset": lease.reset,
             }
 
-            return is_allowed, rate_limit_info
-
+        # Drop the old lease before the call: if the call fails after the
+        # store applied the refund, retrying it would refund twice.
+        lease = self._leases.pop(key, None)
+        try:
+            granted, remaining, reset = await self.store.acquire(
+                key, limit=limit, window=window, tokens=self._lease_size(limit), now=now,
+                refund=lease.tokens if lease is not None else 0,
+                refund_window=lease.window if lease is not None else 0,
+            )
         except Exception as e:
             logger.error(f"Rate limit check failed: {e}")
             # On Redis failure, allow the request (fail open)
             return True, {
                 "limit": limit,
                 "remaining": limit,
-                "reset": int(current_time + window)
+                "reset": int(now + window)
             }
 
-    async def dispatch(self, request: Request, call_next: Callable):
-        """
-        Process request with rate limiting.
-
-        Args:
-            request: FastAPI request object
-            call_next: Next middleware in chain
-
-        Returns:
-            Response object
-        """
-        # Skip rate limiting for health check and docs
-        if request.url.path in ["/health", "/", "/docs", "/redoc", "/openapi.json"]:
-            return await call_next(request)
-
-        # Get identifier and limits
-        identifier = self.get_identifier(request)
-        is_authenticated = "user:" in identifier
-        limit, window = self.get_limits(request, is_authenticated)
-
-        # Check rate limit
-        is_allowed, rate_info = await self.check_rate_limit(
-            identifier, limit, window, request.url.path
-        )
-
-        # Add rate limit headers to response
-        async def add_rate_limit_headers(response):
-            response.headers["X-RateLimit-Limit"] = str(rate_info["limit"])
-            response.headers["X-RateLimit-Remaining"] = str(rate_info["remaining"])
-            response.headers["X-RateLimit-Reset"] = str(rate_info["reset"])
-            return response
+        if granted == 0:
+            return False, {
+                "limit": limit,
+                "remaining": 0,
+                "reset": reset,
+                "retry_after": max(1, math.ceil(reset - now)),
+            }
 
-        if not is_allowed:
-            # Rate limit exceeded
-            logger.warning(
-                f"Rate limit exceeded for {identifier} on {request.url.path}"
+        if granted > 1:
+            self._prune_leases(now)
+            self._leases[key] = _Lease(
+                tokens=granted - 1, expires=now + self.lease_seconds,
+                remaining=remaining, reset=reset, window=reset // window - 1,
             )
+        return True, {
+            "limit": limit,
+            "remaining": remaining + granted - 1,
+            "reset": reset,
+        }
 
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail="Rate limit exceeded. Please try again later.",
-                headers={
-                    "X-RateLimit-Limit": str(rate_info["limit"]),
-                    "X-RateLimit-Remaining": "0",
-                    "X-RateLimit-Reset": str(rate_info["reset"]),
-                    "Retry-After": str(rate_info["retry_after"])
-                }
-            )
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in _SKIP_PATHS:
+            await self.app(scope, receive, send)
+            return
 
-        # Process request
-        response = await call_next(request)
+        path = scope["path"]
+        identifier = self.get_identifier(scope)
+        is_authenticated = identifier.startswith("user:")
+        limit, window = self.get_limits(path, is_authenticated)
 
-        # Add rate limit headers
-        response = await add_rate_limit_headers(response)
+        is_allowed, rate_info = await self.check_rate_limit(identifier, limit, window, path)
+        headers = [
+            (b"x-ratelimit-limit", str(rate_info["limit"]).encode()),
+            (b"x-ratelimit-remaining", str(rate_info["remaining"]).encode()),
+            (b"x-ratelimit-reset", str(rate_info["reset"]).encode()),
+        ]
 
-        return response
+        if not is_allowed:
+            logger.warning(f"Rate limit exceeded for {identifier} on {path}")
+            body = json.dumps(
+                {"detail": "Rate limit exceeded. Please try again later."}
+            ).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": headers + [
+                    (b"retry-after", str(rate_info["retry_after"]).encode()),
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
 
 
 # Decorator for applying rate limits to specific endpoints
@@ -72,6 +72,7 @@ from app.models.institutional import (
     Cohort,
     CohortMembership,
     CohortBlueprint,
+    CohortSnapshot,
     SsoIdpConfig,
     LtiPlatform,
     LtiKey,
@@ -291,6 +292,7 @@ __all__ = [
     "Cohort",
     "CohortMembership",
     "CohortBlueprint",
+    "CohortSnapshot",
     "SsoIdpConfig",
     "LtiPlatform",
     "LtiKey",
@@ -98,6 +98,8 @@ class KnowledgeChunk(Base):
     skill_id = Column(UUID(as_uuid=True), ForeignKey("skills.id", ondelete="SET NULL"), nullable=True)
     # `embedding` column is pgvector — manipulated via raw SQL.
     text_hash = Column(String(64), nullable=False)
+    # Which embedder wrote `embedding`; retrieval compares like with like.
+    embedding_model = Column(String(80), nullable=True)
     license = Column(String(80), nullable=False, default="EUREKA-Internal")
     attribution = Column(Text, nullable=True)
     is_active = Column(Boolean, nullable=False, default=True)
@@ -100,6 +100,25 @@ class CohortBlueprint(Base):
     __table_args__ = (UniqueConstraint("cohort_id", "blueprint_id", name="uq_cohort_blueprint"),)
 
 
+class CohortSnapshot(Base):
+    """Precomputed analytics + at-risk roster for one cohort.
+
+    Refreshed by the `cohort.snapshot.refresh` job. Database triggers set
+    `stale_since` when a member logs an attempt or a mock changes, and
+    delete the row when the cohort's membership or blueprints change. See app/services/cohort_analytics.py for the read policy.
+    """
+
+    __tablename__ = "cohort_snapshots"
+
+    cohort_id = Column(UUID(as_uuid=True), ForeignKey("cohorts.id", ondelete="CASCADE"), primary_key=True)
+    aggregate = Column(JSONB, nullable=False)
+    at_risk = Column(JSONB, nullable=False)
+    # The targets it was computed for; a snapshot for old targets is not served.
+    params = Column(JSONB, nullable=False, default=dict)
+    computed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    stale_since = Column(DateTime, nullable=True)
+
+
 class SsoIdpConfig(Base):
     __tablename__ = "sso_idp_configs"
 
@@ -161,7 +180,7 @@ class LtiKey(Base):
 
 
 __all__ = [
-    "Cohort", "CohortMembership", "CohortBlueprint",
+    "Cohort", "CohortMembership", "CohortBlueprint", "CohortSnapshot",
     "SsoIdpConfig", "LtiPlatform", "LtiKey",
     "CohortStatus", "CohortRole", "SsoProtocol",
 ]
@@ -0,0 +1,200 @@
+"""
+Asynchronous writer for the request audit trail.
+
+FERPA and HIPAA retention means every state-changing call has to land
+somewhere durable, and for years. AuditMiddleware used to emit a log line
+inline and leave a TODO for the table; a log line is neither durable nor
+queryable, and writing a row inline would put an INSERT on every POST.
+
+So the middleware only builds a record and hands it to this module. One
+background task per process drains a bounded asyncio.Queue: it takes what
+is waiting (up to AUDIT_BATCH_SIZE), writes the batch, and repeats, so
+under light load a record is written as soon as it arrives and under heavy
+load the batches grow and the insert count does not.
+
+Sinks:
+  - "db" (default): one executemany INSERT into audit_events per batch.
+  - "jsonl": append to rotating gzip JSON-lines segments under
+    AUDIT_SPOOL_DIR. Each batch is its own gzip member, flushed and fsynced,
+    so a crash loses at most the batch in flight and every segment stays a
+    valid gzip stream.
+A db batch that fails to insert (database down, a bad foreign key) goes to
+the segment store instead, so a record is never dropped for a db error.
+Spooled segments are plain `zcat`-able JSON lines for replay.
+
+Backpressure. When the queue is full, submit() counts it
+(eureka_audit_queue_full_total) and waits for room instead of dropping the
+record: under overload a write request slows down rather than going
+unaudited. stop() drains the queue before returning, and main.py's
+lifespan calls it on shutdown.
+
+Outside a running writer (tests drive the app without its lifespan), a
+record goes to the log as it used to.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class SegmentStore:
+    """Rotating, gzip-compressed JSON-lines segments in one directory."""
+
+    def __init__(self, directory: str, max_bytes: int = 64 << 20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._path: Optional[str] = None
+
+    def _segment(self) -> str:
+        if self._path is None or os.path.getsize(self._path) >= self.max_bytes:
+            os.makedirs(self.directory, exist_ok=True)
+            stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+            self._path = os.path.join(self.directory, f"audit-{stamp}-{os.getpid()}.jsonl.gz")
+        return self._path
+
+    def append(self, rows: list[dict]) -> None:
+        """Blocking; callers on the event loop run it in a thread."""
+        payload = "".join(json.dumps(r, default=str) + "\n" for r in rows).encode()
+        path = self._segment()
+        with open(path, "ab") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb") as gz:
+                gz.write(payload)
+            raw.flush()
+            os.fsync(raw.fileno())
+
+
+async def _insert_rows(rows: list[dict]) -> None:
+    from app.core.database import AsyncSessionLocal
+    from app.models.integrations import AuditEvent
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(AuditEvent.__table__.insert(), rows)
+        await db.commit()
+
+
+class AuditWriter:
+    """Bounded queue plus the task that drains it."""
+
+    def __init__(
+        self,
+        *,
+        sink: str = "db",
+        spool_dir: str,
+        maxsize: int = 10000,
+        batch_size: int = 500,
+        insert: Callable[[list[dict]], Any] = _insert_rows,
+    ):
+        if sink not in ("db", "jsonl"):
+            raise ValueError(f"unknown audit sink: {sink}")
+        self.sink = sink
+        self.batch_size = batch_size
+        self.segments = SegmentStore(spool_dir)
+        self._insert = insert
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="audit-writer")
+
+    async def submit(self, record: dict) -> None:
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            metrics.audit_queue_full_total.inc()
+            await self._queue.put(record)
+
+    async def stop(self) -> None:
+        """Write everything queued, then end the task."""
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            first = await self._queue.get()
+            batch = [] if first is None else [first]
+            stopping = first is None
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if item is None:
+                    stopping = True
+                    continue
+                batch.append(item)
+            if batch:
+                await self._write(batch)
+            metrics.audit_queue_depth.set(self._queue.qsize())
+            if stopping and self._queue.empty():
+                return
+
+    async def _write(self, batch: list[dict]) -> None:
+        if self.sink == "db":
+            try:
+                await self._insert(batch)
+                metrics.audit_records_total.inc(len(batch), sink="db")
+                return
+            except Exception:
+                metrics.audit_write_failures_total.inc(sink="db")
+                logger.exception("audit insert failed; spooling %d records", len(batch))
+        try:
+            await asyncio.to_thread(self.segments.append, batch)
+            metrics.audit_records_total.inc(len(batch), sink="jsonl")
+        except Exception:
+            # Nowhere left to put them. Say so loudly, with the records.
+            metrics.audit_write_failures_total.inc(sink="jsonl")
+            for record in batch:
+                logger.error("AUDIT (unpersisted): %s", json.dumps(record, default=str))
+
+
+_writer: Optional[AuditWriter] = None
+
+
+def start_writer() -> AuditWriter:
+    """Start the process writer from settings. Called from main.py's lifespan."""
+    from app.core.config import settings
+
+    global _writer
+    _writer = AuditWriter(
+        sink=settings.AUDIT_SINK,
+        spool_dir=settings.AUDIT_SPOOL_DIR,
+        maxsize=settings.AUDIT_QUEUE_SIZE,
+        batch_size=settings.AUDIT_BATCH_SIZE,
+    )
+    _writer.start()
+    return _writer
+
+
+async def stop_writer() -> None:
+    global _writer
+    if _writer is not None:
+        await _writer.stop()
+        _writer = None
+
+
+async def record(entry: dict) -> None:
+    """Queue one audit record, or log it when no writer is running."""
+    writer = _writer
+    if writer is not None and writer.running:
+        await writer.submit(entry)
+        return
+    status = (entry.get("metadata") or {}).get("status_code", 0)
+    level = logging.ERROR if status >= 500 else logging.WARNING if status >= 400 else logging.INFO
+    logger.log(level, "AUDIT: %s", entry.get("event_name"), extra={"audit": entry})
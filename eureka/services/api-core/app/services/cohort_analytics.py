@@ -25,22 +25,51 @@ We compute four sub-scores in [0, 1] (1 = healthy) and combine.
 
 Each output row carries the per-signal scores so the UI / admin can
 explain "Why is this learner flagged?"
+
+Query shape. The first version loaded the learner ids, then ran one query
+per target skill code and one per cohort blueprint, each shipping the full
+id array back to Postgres; at-risk ran five more. A 300-learner cohort
+with eight target skills and three blueprints was fourteen round trips and
+fourteen ANY(:users) probes for one dashboard. Both reads are now a single
+statement: the learner set is a CTE, and the per-skill and per-blueprint
+numbers are GROUP BYs over it folded into one row with json_agg.
+
+Snapshots. Instructors reload these pages far more often than a cohort's
+learners change the answer, so `cohort_snapshots` keeps one precomputed
+aggregate + roster per cohort, written by the `cohort.snapshot.refresh`
+job. Triggers (ops/db/11_institutional.sql) mark a snapshot stale when a
+member logs an attempt or a mock changes, and delete it outright when the
+membership or blueprints change. A read serves the snapshot only when it is
+not stale, younger than SNAPSHOT_MAX_AGE, and was computed for the
+cohort's current targets; anything else computes live and leaves the
+rewrite to `cohort.snapshot.sweep`, so a GET never writes.
+
+This is a table and not a MATERIALIZED VIEW on purpose: REFRESH
+MATERIALIZED VIEW recomputes every cohort at once, and the point is to
+recompute only the ones whose learners did something.
 """
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+import json
+from dataclasses import asdict, dataclass, field
 from datetime import datetime, timedelta
 from typing import Any
 from uuid import UUID
 
 from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.exam import MockAttempt, MockAttemptStatus
-from app.models.institutional import (
-    Cohort, CohortBlueprint, CohortMembership, CohortRole,
-)
+from app.models.institutional import Cohort, CohortSnapshot, CohortStatus
+
+
+# A snapshot older than this is not served even if nothing marked it stale:
+# "last 7 days" drifts on its own, and a stale mark that raced a refresh
+# (see refresh_snapshot) is lost. The sweep refreshes at SNAPSHOT_REFRESH_AGE
+# so an idle cohort's snapshot is replaced before it expires.
+SNAPSHOT_MAX_AGE = timedelta(hours=1)
+SNAPSHOT_REFRESH_AGE = timedelta(minutes=45)
 
 
 @dataclass
@@ -86,264 +115,381 @@ class LearnerRisk:
         }
 
 
+# ---------------------------------------------------------------------------
+# SQL
 # ---------------------------------------------------------------------------
 
+_LEARNERS = """
+learners AS (
+    SELECT DISTINCT user_id
+    FROM cohort_memberships
+    WHERE cohort_id = :cohort AND left_at IS NULL AND role = 'learner'
+)
+"""
 
-async def _active_learner_ids(db: AsyncSession, cohort_id: UUID) -> list[UUID]:
-    r = await db.execute(
-        select(CohortMembership.user_id).where(
-            CohortMembership.cohort_id == cohort_id,
-            CohortMembership.left_at.is_(None),
-            CohortMembership.role == CohortRole.LEARNER,
-        )
-    )
-    return [row[0] for row in r.fetchall()]
+_AGGREGATE_SQL = f"""
+WITH {_LEARNERS},
+skill AS (
+    SELECT
+        s.code,
+        COUNT(lsm.user_id) AS n,
+        AVG(lsm.mastery)::float AS mean_mastery,
+        COUNT(*) FILTER (WHERE lsm.mastery >= :thr) AS at_threshold
+    FROM learner_skill_mastery lsm
+    JOIN learners l ON l.user_id = lsm.user_id
+    JOIN skills s ON s.id = lsm.skill_id
+    WHERE s.code = ANY(:codes)
+    GROUP BY s.code
+),
+engagement AS (
+    SELECT COUNT(*) AS total,
+           COUNT(*) FILTER (WHERE a.created_at >= :seven) AS last7,
+           COUNT(DISTINCT a.user_id) FILTER (WHERE a.created_at >= :seven) AS active7
+    FROM attempt_logs a
+    JOIN learners l ON l.user_id = a.user_id
+),
+mocks AS (
+    SELECT
+        m.blueprint_id,
+        MIN(cb.created_at) AS linked_at,
+        AVG(m.scaled_score)::float AS mean_scaled,
+        AVG(m.pass_probability)::float AS mean_pp,
+        COUNT(*) FILTER (WHERE m.predicted_pass) AS n_predicted_pass,
+        COUNT(*) AS n_total
+    FROM mock_attempts m
+    JOIN learners l ON l.user_id = m.user_id
+    JOIN cohort_blueprints cb
+      ON cb.blueprint_id = m.blueprint_id AND cb.cohort_id = :cohort
+    WHERE m.status = 'submitted'
+    GROUP BY m.blueprint_id
+)
+SELECT
+    (SELECT COUNT(*) FROM learners) AS n_learners,
+    e.total, e.last7, e.active7,
+    (SELECT COALESCE(json_agg(skill), '[]'::json) FROM skill) AS skills,
+    (SELECT COALESCE(json_agg(mocks ORDER BY mocks.linked_at), '[]'::json) FROM mocks) AS mocks
+FROM engagement e
+"""
 
+_AT_RISK_SQL = f"""
+WITH {_LEARNERS},
+hits AS (
+    SELECT lsm.user_id,
+           COUNT(DISTINCT s.code) FILTER (WHERE lsm.mastery >= :thr) AS hits
+    FROM learner_skill_mastery lsm
+    JOIN learners l ON l.user_id = lsm.user_id
+    JOIN skills s ON s.id = lsm.skill_id
+    WHERE s.code = ANY(:codes)
+    GROUP BY lsm.user_id
+),
+traj AS (
+    SELECT a.user_id,
+           COUNT(*) FILTER (WHERE a.created_at >= :seven) AS recent,
+           COUNT(*) FILTER (WHERE a.created_at < :seven) AS prior
+    FROM attempt_logs a
+    JOIN learners l ON l.user_id = a.user_id
+    WHERE a.created_at >= :fourteen
+    GROUP BY a.user_id
+),
+mock AS (
+    SELECT m.user_id, MAX(m.pass_probability)::float AS best_pp
+    FROM mock_attempts m
+    JOIN learners l ON l.user_id = m.user_id
+    WHERE m.status = 'submitted'
+      AND m.blueprint_id IN (
+          SELECT blueprint_id FROM cohort_blueprints WHERE cohort_id = :cohort
+      )
+    GROUP BY m.user_id
+)
+SELECT
+    l.user_id,
+    u.email,
+    COALESCE(u.display_name, u.first_name || ' ' || u.last_name) AS display_name,
+    COALESCE(h.hits, 0) AS hits,
+    COALESCE(t.recent, 0) AS recent,
+    COALESCE(t.prior, 0) AS prior,
+    mk.best_pp
+FROM learners l
+LEFT JOIN users u ON u.id = l.user_id
+LEFT JOIN hits h ON h.user_id = l.user_id
+LEFT JOIN traj t ON t.user_id = l.user_id
+LEFT JOIN mock mk ON mk.user_id = l.user_id
+ORDER BY l.user_id
+"""
 
-async def aggregate(db: AsyncSession, cohort_id: UUID) -> CohortAggregate:
-    cohort = await db.get(Cohort, cohort_id)
-    if cohort is None:
-        raise ValueError("cohort not found")
 
-    learner_ids = await _active_learner_ids(db, cohort_id)
-    n_learners = len(learner_ids)
+def _json(value: Any) -> Any:
+    # asyncpg hands json columns back as text unless a codec is registered.
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def _params(cohort: Cohort) -> dict:
+    """The cohort settings a snapshot was computed for."""
+    return {
+        "target_skill_codes": list(cohort.target_skill_codes or []),
+        "target_mastery": float(cohort.target_mastery),
+        "min_weekly_attempts": int(cohort.min_weekly_attempts or 0),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Live computation
+# ---------------------------------------------------------------------------
+
+
+async def _compute_aggregate(db: AsyncSession, cohort: Cohort) -> CohortAggregate:
+    codes = list(cohort.target_skill_codes or [])
+    threshold = float(cohort.target_mastery)
+    seven_days_ago = datetime.utcnow() - timedelta(days=7)
+    row = (await db.execute(
+        text(_AGGREGATE_SQL),
+        {"cohort": str(cohort.id), "codes": codes, "thr": threshold, "seven": seven_days_ago},
+    )).mappings().one()
+
+    n_learners = int(row["n_learners"] or 0)
     if n_learners == 0:
         return CohortAggregate(
-            cohort_id=cohort_id, name=cohort.name, org_id=cohort.org_id,
+            cohort_id=cohort.id, name=cohort.name, org_id=cohort.org_id,
             n_learners=0, n_active_learners_7d=0,
-            target_skill_codes=list(cohort.target_skill_codes or []),
-            target_mastery_threshold=float(cohort.target_mastery),
+            target_skill_codes=codes,
+            target_mastery_threshold=threshold,
             per_skill=[], mocks_summary={},
             attempts_total=0, attempts_last_7d=0,
         )
 
-    # Per-skill aggregate: for each target skill_code, mean mastery
-    # + how many learners are at / above threshold.
+    # Per-skill aggregate, in target order; a code nobody has attempted
+    # has no group and reports zeros.
+    by_code = {s["code"]: s for s in _json(row["skills"])}
     per_skill: list[dict] = []
-    threshold = float(cohort.target_mastery)
-    for code in (cohort.target_skill_codes or []):
-        r = await db.execute(
-            text(
-                """
-                SELECT
-                    COUNT(lsm.user_id) AS n,
-                    AVG(lsm.mastery)::float AS mean_mastery,
-                    SUM(CASE WHEN lsm.mastery >= :thr THEN 1 ELSE 0 END) AS at_threshold
-                FROM learner_skill_mastery lsm
-                JOIN skills s ON s.id = lsm.skill_id
-                WHERE s.code = :code AND lsm.user_id = ANY(:users)
-                """
-            ),
-            {"thr": threshold, "code": code, "users": [str(u) for u in learner_ids]},
-        )
-        row = r.mappings().one()
+    for code in codes:
+        s = by_code.get(code, {})
+        at_threshold = int(s.get("at_threshold") or 0)
         per_skill.append({
             "code": code,
-            "n_with_attempts": int(row["n"] or 0),
-            "mean_mastery": round(float(row["mean_mastery"] or 0), 3),
-            "at_threshold_count": int(row["at_threshold"] or 0),
-            "at_threshold_pct": (
-                round(float(row["at_threshold"] or 0) / n_learners * 100, 1)
-                if n_learners else 0
-            ),
+            "n_with_attempts": int(s.get("n") or 0),
+            "mean_mastery": round(float(s.get("mean_mastery") or 0), 3),
+            "at_threshold_count": at_threshold,
+            "at_threshold_pct": round(at_threshold / n_learners * 100, 1),
         })
 
-    # Engagement: attempts in last 7 days
-    seven_days_ago = datetime.utcnow() - timedelta(days=7)
-    r = await db.execute(
-        text(
-            """
-            SELECT COUNT(*) AS total,
-                   COUNT(*) FILTER (WHERE created_at >= :seven) AS last7,
-                   COUNT(DISTINCT user_id) FILTER (WHERE created_at >= :seven) AS active7
-            FROM attempt_logs
-            WHERE user_id = ANY(:users)
-            """
-        ),
-        {"users": [str(u) for u in learner_ids], "seven": seven_days_ago},
-    )
-    row = r.mappings().one()
-    attempts_total = int(row["total"] or 0)
-    attempts_last_7d = int(row["last7"] or 0)
-    n_active_learners_7d = int(row["active7"] or 0)
-
-    # Mocks summary: latest submitted mock per learner on each cohort blueprint
-    bp_r = await db.execute(
-        select(CohortBlueprint).where(CohortBlueprint.cohort_id == cohort_id)
-    )
-    bp_rows = list(bp_r.scalars().all())
-    mocks_summary: dict = {"per_blueprint": []}
-    for cb in bp_rows:
-        mr = await db.execute(
-            text(
-                """
-                SELECT
-                    AVG(scaled_score)::float AS mean_scaled,
-                    AVG(pass_probability)::float AS mean_pp,
-                    COUNT(*) FILTER (WHERE predicted_pass) AS n_predicted_pass,
-                    COUNT(*) AS n_total
-                FROM mock_attempts
-                WHERE blueprint_id = :bp AND user_id = ANY(:users)
-                  AND status = 'submitted'
-                """
-            ),
-            {"bp": str(cb.blueprint_id), "users": [str(u) for u in learner_ids]},
-        )
-        row = mr.mappings().one()
-        if int(row["n_total"] or 0) > 0:
-            mocks_summary["per_blueprint"].append({
-                "blueprint_id": str(cb.blueprint_id),
-                "mean_scaled_score": round(float(row["mean_scaled"] or 0), 1),
-                "mean_pass_probability": round(float(row["mean_pp"] or 0), 3),
-                "n_predicted_pass": int(row["n_predicted_pass"] or 0),
-                "n_total": int(row["n_total"] or 0),
-            })
+    mocks_summary: dict = {"per_blueprint": [
+        {
+            "blueprint_id": str(m["blueprint_id"]),
+            "mean_scaled_score": round(float(m["mean_scaled"] or 0), 1),
+            "mean_pass_probability": round(float(m["mean_pp"] or 0), 3),
+            "n_predicted_pass": int(m["n_predicted_pass"] or 0),
+            "n_total": int(m["n_total"] or 0),
+        }
+        for m in _json(row["mocks"])
+    ]}
 
     return CohortAggregate(
-        cohort_id=cohort_id, name=cohort.name, org_id=cohort.org_id,
+        cohort_id=cohort.id, name=cohort.name, org_id=cohort.org_id,
         n_learners=n_learners,
-        n_active_learners_7d=n_active_learners_7d,
-        target_skill_codes=list(cohort.target_skill_codes or []),
+        n_active_learners_7d=int(row["active7"] or 0),
+        target_skill_codes=codes,
         target_mastery_threshold=threshold,
         per_skill=per_skill,
         mocks_summary=mocks_summary,
-        attempts_total=attempts_total,
-        attempts_last_7d=attempts_last_7d,
+        attempts_total=int(row["total"] or 0),
+        attempts_last_7d=int(row["last7"] or 0),
     )
 
 
-async def at_risk(db: AsyncSession, cohort_id: UUID) -> list[LearnerRisk]:
-    cohort = await db.get(Cohort, cohort_id)
-    if cohort is None:
-        raise ValueError("cohort not found")
+def _score(
+    user_id: UUID,
+    email: str | None,
+    display_name: str | None,
+    *,
+    hits: int,
+    recent: int,
+    prior: int,
+    best_pp: float | None,
+    n_codes: int,
+    threshold: float,
+    min_weekly: int,
+) -> LearnerRisk:
+    """One learner's row from their counts. Pure, so the checklist is testable."""
+    # S_mastery: fraction of target skills at or above threshold. A skill
+    # with no mastery row reads as 0, which a zero threshold still passes.
+    n_target = max(1, n_codes)
+    if threshold <= 0:
+        hits = n_codes
+    s_mastery = hits / n_target
+
+    # S_engagement
+    s_engagement = min(1.0, recent / max(1, min_weekly)) if min_weekly > 0 else (1.0 if recent > 0 else 0.0)
+
+    # S_trajectory: change in attempts (proxy until we have time-series mastery)
+    if prior == 0 and recent == 0:
+        s_trajectory = 0.0
+    else:
+        change = (recent - prior) / max(1, prior)
+        s_trajectory = min(1.0, max(0.0, (change + 0.5) / 1.0))
+
+    # S_mock
+    s_mock = float(best_pp or 0.0)
+
+    combined = (
+        0.35 * s_mastery
+        + 0.20 * s_engagement
+        + 0.20 * s_trajectory
+        + 0.25 * s_mock
+    )
+    notes: list[str] = []
+    if s_mastery < 0.5:
+        notes.append(f"only {hits}/{n_target} target skills at threshold ({threshold})")
+    if min_weekly > 0 and recent < min_weekly:
+        notes.append(f"{recent} attempts last 7d (target: {min_weekly})")
+    if s_mock and s_mock < 0.5:
+        notes.append(f"latest mock pass probability {s_mock:.2f}")
+    if recent == 0 and prior > 0:
+        notes.append("no activity in the last 7 days")
+
+    return LearnerRisk(
+        user_id=user_id, email=email, display_name=display_name,
+        score_mastery=s_mastery, score_engagement=s_engagement,
+        score_trajectory=s_trajectory, score_mock=s_mock,
+        combined=combined, at_risk=(combined < 0.5),
+        notes=notes,
+    )
 
-    learner_ids = await _active_learner_ids(db, cohort_id)
-    if not learner_ids:
-        return []
 
-    target_codes = list(cohort.target_skill_codes or [])
+async def _compute_at_risk(db: AsyncSession, cohort: Cohort) -> list[LearnerRisk]:
+    codes = list(cohort.target_skill_codes or [])
     threshold = float(cohort.target_mastery)
     min_weekly = int(cohort.min_weekly_attempts or 0)
-    seven_days_ago = datetime.utcnow() - timedelta(days=7)
-    two_weeks_ago = datetime.utcnow() - timedelta(days=14)
+    now = datetime.utcnow()
+    r = await db.execute(
+        text(_AT_RISK_SQL),
+        {
+            "cohort": str(cohort.id), "codes": codes, "thr": threshold,
+            "seven": now - timedelta(days=7), "fourteen": now - timedelta(days=14),
+        },
+    )
+    out = [
+        _score(
+            row["user_id"], row["email"], row["display_name"],
+            hits=int(row["hits"]), recent=int(row["recent"]), prior=int(row["prior"]),
+            best_pp=row["best_pp"],
+            n_codes=len(codes), threshold=threshold, min_weekly=min_weekly,
+        )
+        for row in r.mappings()
+    ]
+    out.sort(key=lambda r: r.combined)
+    return out
 
-    # Per-learner mastery on target skills (now + 2w ago for trajectory)
-    sql_mastery = """
-    SELECT
-        lsm.user_id,
-        s.code,
-        lsm.mastery,
-        lsm.last_practiced_at
-    FROM learner_skill_mastery lsm
-    JOIN skills s ON s.id = lsm.skill_id
-    WHERE s.code = ANY(:codes) AND lsm.user_id = ANY(:users)
-    """
-    mastery_now: dict[str, dict[str, float]] = {}
-    mast_r = await db.execute(
-        text(sql_mastery),
-        {"codes": target_codes, "users": [str(u) for u in learner_ids]},
+
+# ---------------------------------------------------------------------------
+# Snapshots
+# ---------------------------------------------------------------------------
+
+
+def _usable(
+    snapshot: CohortSnapshot | None, cohort: Cohort, now: datetime | None = None
+) -> bool:
+    if snapshot is None or snapshot.stale_since is not None:
+        return False
+    now = now or datetime.utcnow()
+    if now - snapshot.computed_at > SNAPSHOT_MAX_AGE:
+        return False
+    return snapshot.params == _params(cohort)
+
+
+async def _load(db: AsyncSession, cohort_id: UUID) -> tuple[Cohort, CohortSnapshot | None]:
+    """The cohort and its snapshot, in one round trip."""
+    row = (await db.execute(
+        select(Cohort, CohortSnapshot)
+        .outerjoin(CohortSnapshot, CohortSnapshot.cohort_id == Cohort.id)
+        .where(Cohort.id == cohort_id)
+    )).first()
+    if row is None:
+        raise ValueError("cohort not found")
+    return row[0], row[1]
+
+
+def _aggregate_from(cohort: Cohort, stored: dict) -> CohortAggregate:
+    # Identity comes from the live row, so a rename shows at once.
+    return CohortAggregate(
+        cohort_id=cohort.id, name=cohort.name, org_id=cohort.org_id, **stored,
     )
-    for row in mast_r.mappings():
-        mastery_now.setdefault(str(row["user_id"]), {})[row["code"]] = float(row["mastery"])
-
-    # Trajectory proxy: count of attempts in last 7d vs prior 7d as a simple signal
-    sql_traj = """
-    SELECT user_id,
-           COUNT(*) FILTER (WHERE created_at >= :seven) AS recent,
-           COUNT(*) FILTER (WHERE created_at < :seven AND created_at >= :fourteen) AS prior
-    FROM attempt_logs
-    WHERE user_id = ANY(:users)
-    GROUP BY user_id
+
+
+def _risk_from(stored: dict) -> LearnerRisk:
+    return LearnerRisk(**{**stored, "user_id": UUID(stored["user_id"])})
+
+
+async def refresh_snapshot(db: AsyncSession, cohort_id: UUID) -> CohortSnapshot:
+    """Recompute and store one cohort's snapshot. The caller commits.
+
+    A stale mark written after this refresh started survives it. One that
+    raced the compute from an earlier-started transaction can be cleared,
+    which SNAPSHOT_MAX_AGE bounds.
     """
-    traj_r = await db.execute(
-        text(sql_traj),
-        {"users": [str(u) for u in learner_ids],
-         "seven": seven_days_ago, "fourteen": two_weeks_ago},
+    started = datetime.utcnow()
+    cohort, _ = await _load(db, cohort_id)
+    agg = await _compute_aggregate(db, cohort)
+    risks = await _compute_at_risk(db, cohort)
+    stored = asdict(agg)
+    for key in ("cohort_id", "name", "org_id"):
+        stored.pop(key)
+    values = {
+        "cohort_id": cohort.id,
+        "aggregate": stored,
+        "at_risk": [r.to_dict() for r in risks],
+        "params": _params(cohort),
+        "computed_at": started,
+        "stale_since": None,
+    }
+    stmt = pg_insert(CohortSnapshot).values(**values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CohortSnapshot.cohort_id],
+        set_={
+            "aggregate": stmt.excluded.aggregate,
+            "at_risk": stmt.excluded.at_risk,
+            "params": stmt.excluded.params,
+            "computed_at": stmt.excluded.computed_at,
+            "stale_since": text(
+                "CASE WHEN cohort_snapshots.stale_since > excluded.computed_at "
+                "THEN cohort_snapshots.stale_since END"
+            ),
+        },
     )
-    traj_by_user = {str(row["user_id"]): (int(row["recent"]), int(row["prior"])) for row in traj_r.mappings()}
+    await db.execute(stmt)
+    return await db.get(CohortSnapshot, cohort.id, populate_existing=True)
 
-    # Latest mock per learner — use the best across cohort blueprints
-    bp_r = await db.execute(
-        select(CohortBlueprint).where(CohortBlueprint.cohort_id == cohort_id)
-    )
-    bp_ids = [str(cb.blueprint_id) for cb in bp_r.scalars().all()]
-    mock_pp_by_user: dict[str, float] = {}
-    if bp_ids:
-        mock_r = await db.execute(
-            text(
-                """
-                SELECT user_id, MAX(pass_probability)::float AS best_pp
-                FROM mock_attempts
-                WHERE user_id = ANY(:users)
-                  AND blueprint_id = ANY(:bps)
-                  AND status = 'submitted'
-                GROUP BY user_id
-                """
-            ),
-            {"users": [str(u) for u in learner_ids], "bps": bp_ids},
+
+async def snapshots_due(db: AsyncSession, *, limit: int = 200) -> list[UUID]:
+    """Live cohorts whose snapshot is missing, stale, or near expiry."""
+    r = await db.execute(
+        select(Cohort.id)
+        .outerjoin(CohortSnapshot, CohortSnapshot.cohort_id == Cohort.id)
+        .where(
+            Cohort.status.in_([CohortStatus.ACTIVE, CohortStatus.PLANNING]),
+            (CohortSnapshot.cohort_id.is_(None))
+            | (CohortSnapshot.stale_since.is_not(None))
+            | (CohortSnapshot.computed_at < datetime.utcnow() - SNAPSHOT_REFRESH_AGE),
         )
-        mock_pp_by_user = {str(row["user_id"]): float(row["best_pp"] or 0) for row in mock_r.mappings()}
-
-    # Display names from users
-    name_r = await db.execute(
-        text(
-            """
-            SELECT id, email, COALESCE(display_name, first_name || ' ' || last_name) AS display_name
-            FROM users WHERE id = ANY(:users)
-            """
-        ),
-        {"users": [str(u) for u in learner_ids]},
+        .order_by(CohortSnapshot.stale_since.asc().nulls_first())
+        .limit(limit)
     )
-    user_meta = {str(row[0]): (row[1], row[2]) for row in name_r.fetchall()}
-
-    out: list[LearnerRisk] = []
-    for uid in learner_ids:
-        uid_s = str(uid)
-        # S_mastery: fraction of target skills at or above threshold
-        n_target = max(1, len(target_codes))
-        per_code = mastery_now.get(uid_s, {})
-        hits = sum(1 for c in target_codes if per_code.get(c, 0) >= threshold)
-        s_mastery = hits / n_target
-
-        # S_engagement
-        recent, prior = traj_by_user.get(uid_s, (0, 0))
-        s_engagement = min(1.0, recent / max(1, min_weekly)) if min_weekly > 0 else (1.0 if recent > 0 else 0.0)
-
-        # S_trajectory: change in attempts (proxy until we have time-series mastery)
-        if prior == 0 and recent == 0:
-            s_trajectory = 0.0
-        else:
-            change = (recent - prior) / max(1, prior)
-            s_trajectory = min(1.0, max(0.0, (change + 0.5) / 1.0))
-
-        # S_mock
-        s_mock = mock_pp_by_user.get(uid_s, 0.0)
-
-        combined = (
-            0.35 * s_mastery
-            + 0.20 * s_engagement
-            + 0.20 * s_trajectory
-            + 0.25 * s_mock
-        )
-        notes: list[str] = []
-        if s_mastery < 0.5:
-            notes.append(f"only {hits}/{n_target} target skills at threshold ({threshold})")
-        if min_weekly > 0 and recent < min_weekly:
-            notes.append(f"{recent} attempts last 7d (target: {min_weekly})")
-        if s_mock and s_mock < 0.5:
-            notes.append(f"latest mock pass probability {s_mock:.2f}")
-        if recent == 0 and prior > 0:
-            notes.append("no activity in the last 7 days")
-
-        email, display_name = user_meta.get(uid_s, (None, None))
-        out.append(
-            LearnerRisk(
-                user_id=uid, email=email, display_name=display_name,
-                score_mastery=s_mastery, score_engagement=s_engagement,
-                score_trajectory=s_trajectory, score_mock=s_mock,
-                combined=combined, at_risk=(combined < 0.5),
-                notes=notes,
-            )
-        )
-    out.sort(key=lambda r: r.combined)
-    return out
+    return [row[0] for row in r.fetchall()]
+
+
+# ---------------------------------------------------------------------------
+# Public reads
+# ---------------------------------------------------------------------------
+
+
+async def aggregate(db: AsyncSession, cohort_id: UUID) -> CohortAggregate:
+    cohort, snapshot = await _load(db, cohort_id)
+    if _usable(snapshot, cohort):
+        return _aggregate_from(cohort, snapshot.aggregate)
+    return await _compute_aggregate(db, cohort)
+
+
+async def at_risk(db: AsyncSession, cohort_id: UUID) -> list[LearnerRisk]:
+    cohort, snapshot = await _load(db, cohort_id)
+    if _usable(snapshot, cohort):
+        return [_risk_from(r) for r in snapshot.at_risk]
+    return await _compute_at_risk(db, cohort)
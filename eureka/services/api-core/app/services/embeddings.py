@@ -0,0 +1,394 @@
+"""
+Batch embedding pipeline for item_embeddings and knowledge_chunks.
+
+item_search and rag used to embed one text per call and bind every vector
+as a 1024-number decimal string ("[0.012345,...]") that Postgres then
+parsed back. Fine for a handful of rows; hopeless for re-embedding the
+item bank after a model swap. This module is what both now share:
+
+Backends (EMBEDDING_BACKEND):
+  - "hashed" (default): the deterministic sha256 pseudo-embedding CI has
+    always used, vectorised. Model label "stub-sha256-1024", so vectors
+    written before this module existed stay valid.
+  - "local": a sentence-transformers model on CPU (EMBEDDING_MODEL,
+    default BAAI/bge-large-en-v1.5, 1024-dim). The package is optional;
+    without it we log once and fall back to "hashed".
+Every backend embeds a list of texts into one float32 (n, 1024) array.
+
+Vectors cross the wire in pgvector's binary format. `install_vector_codec`
+runs on each new asyncpg connection (app/core/database.py); once it has,
+`vector_param()` hands asyncpg a numpy array, and backfills stream rows
+with binary COPY into a temp table and upsert from there. Without the
+extension the codec is skipped and the text literal is used as before.
+
+Backfills (`backfill_items`, `reembed_chunks`, and rag's ingest) page
+through their table by primary key, skip rows whose sha256 text hash and
+model already match, and overlap embedding the next page (in a thread)
+with writing the current one. Run them from scripts/backfill_embeddings.py
+in a maintenance window, or as the `embeddings.backfill` job.
+
+Query vectors go through a small in-process LRU (`embed_query`), since the
+same few searches repeat far more often than the bank changes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import struct
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional, Protocol, Sequence
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+EMBED_DIM = 1024
+HASHED_MODEL = "stub-sha256-1024"
+QUERY_CACHE_SIZE = 2048
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+
+
+class Embedder(Protocol):
+    model: str
+    dim: int
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """(len(texts), dim) float32, L2-normalised. Blocking."""
+        ...
+
+
+class HashedEmbedder:
+    """sha256 of the text tiled to 1024 dims. Useless semantically; stable."""
+
+    model = HASHED_MODEL
+    dim = EMBED_DIM
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        digests = np.frombuffer(
+            b"".join(hashlib.sha256(t.encode()).digest() for t in texts), dtype=np.uint8
+        ).reshape(len(texts), 32)
+        vecs = (np.tile(digests, self.dim // 32).astype(np.float64) - 127.5) / 127.5
+        norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (vecs / norms).astype(np.float32)
+
+
+class LocalEmbedder:
+    """A sentence-transformers model on CPU."""
+
+    def __init__(self, model_name: str, batch_size: int = 64):
+        from sentence_transformers import SentenceTransformer
+
+        self._model = SentenceTransformer(model_name, device="cpu")
+        self.model = model_name
+        self.dim = int(self._model.get_sentence_embedding_dimension())
+        self.batch_size = batch_size
+        if self.dim != EMBED_DIM:
+            raise ValueError(
+                f"{model_name} embeds to {self.dim} dims; the vector columns hold {EMBED_DIM}"
+            )
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        return self._model.encode(
+            list(texts),
+            batch_size=self.batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        ).astype(np.float32)
+
+
+_embedder: Optional[Embedder] = None
+
+
+def get_embedder() -> Embedder:
+    """The process embedder, built from settings on first use."""
+    global _embedder
+    if _embedder is None:
+        from app.core.config import settings
+
+        if settings.EMBEDDING_BACKEND == "local":
+            try:
+                _embedder = LocalEmbedder(settings.EMBEDDING_MODEL)
+            except ImportError:
+                logger.warning(
+                    "EMBEDDING_BACKEND=local but sentence-transformers is not installed; "
+                    "using hashed embeddings"
+                )
+        elif settings.EMBEDDING_BACKEND != "hashed":
+            raise ValueError(f"unknown EMBEDDING_BACKEND: {settings.EMBEDDING_BACKEND}")
+        if _embedder is None:
+            _embedder = HashedEmbedder()
+    return _embedder
+
+
+def set_embedder(embedder: Optional[Embedder]) -> None:
+    """Swap the process embedder (tests, scripts). None rebuilds from settings."""
+    global _embedder
+    _embedder = embedder
+    _query_cache.clear()
+
+
+def text_hash(value: str) -> str:
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Query cache
+# ---------------------------------------------------------------------------
+
+_query_cache: "OrderedDict[tuple[str, str], np.ndarray]" = OrderedDict()
+
+
+async def embed_query(query: str, embedder: Optional[Embedder] = None) -> np.ndarray:
+    """One query vector, from the LRU when this model has seen the text."""
+    embedder = embedder or get_embedder()
+    key = (embedder.model, query)
+    vec = _query_cache.get(key)
+    if vec is not None:
+        _query_cache.move_to_end(key)
+        return vec
+    vec = (await asyncio.to_thread(embedder.embed, [query]))[0]
+    vec.setflags(write=False)
+    _query_cache[key] = vec
+    if len(_query_cache) > QUERY_CACHE_SIZE:
+        _query_cache.popitem(last=False)
+    return vec
+
+
+# ---------------------------------------------------------------------------
+# pgvector wire format
+# ---------------------------------------------------------------------------
+
+_binary_vectors = False
+
+
+def _encode_vector(value: Any) -> bytes:
+    if isinstance(value, str):
+        value = [float(x) for x in value.strip("[]").split(",")]
+    arr = np.asarray(value, dtype=">f4")
+    return struct.pack(">HH", arr.shape[0], 0) + arr.tobytes()
+
+
+def _decode_vector(data: bytes) -> np.ndarray:
+    dim, _unused = struct.unpack_from(">HH", data)
+    return np.frombuffer(data, dtype=">f4", count=dim, offset=4).astype(np.float32)
+
+
+async def install_vector_codec(conn) -> None:
+    """Teach an asyncpg connection pgvector's binary format, if it has the type."""
+    global _binary_vectors
+    try:
+        await conn.set_type_codec(
+            "vector", schema="public", encoder=_encode_vector, decoder=_decode_vector,
+            format="binary",
+        )
+    except ValueError:
+        # No pgvector on this database; text literals it is.
+        return
+    _binary_vectors = True
+
+
+def _literal(vec: Sequence[float]) -> str:
+    return "[" + ",".join(f"{x:.6f}" for x in vec) + "]"
+
+
+def vector_param(vec: Sequence[float]) -> Any:
+    """A bind value for `CAST(:v AS vector)`: binary when the codec is in."""
+    if _binary_vectors:
+        return np.asarray(vec, dtype=np.float32)
+    return _literal(vec)
+
+
+async def _copy(db: AsyncSession, table: str, columns: list[str], records: list[tuple]) -> None:
+    """Binary COPY into `table` on the session's own connection and transaction."""
+    conn = await db.connection()
+    raw = await conn.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(table, records=records, columns=columns)
+
+
+async def stage(
+    db: AsyncSession,
+    table: str,
+    ddl: str,
+    columns: list[str],
+    records: list[tuple],
+) -> None:
+    """Fill a temp table for one batch: COPY when binary vectors are available,
+    otherwise an executemany INSERT with text literals."""
+    await db.execute(text(f"CREATE TEMP TABLE {table} ({ddl}) ON COMMIT DROP"))
+    if _binary_vectors:
+        await _copy(db, table, columns, records)
+        return
+    vec_cols = {i for i, c in enumerate(columns) if c == "embedding"}
+    rows = [
+        {c: (_literal(v) if i in vec_cols else v) for i, (c, v) in enumerate(zip(columns, r))}
+        for r in records
+    ]
+    values = ", ".join(
+        f"CAST(:{c} AS vector)" if c == "embedding" else f":{c}" for c in columns
+    )
+    await db.execute(
+        text(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({values})"), rows
+    )
+
+
+# ---------------------------------------------------------------------------
+# Backfills
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class BackfillReport:
+    scanned: int = 0
+    embedded: int = 0
+    skipped: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return {"scanned": self.scanned, "embedded": self.embedded, "skipped": self.skipped}
+
+
+async def pipeline(
+    pages: Callable[[], Any],
+    embedder: Embedder,
+    write: Callable[[list[tuple[Any, str]], np.ndarray], Awaitable[None]],
+    report: BackfillReport,
+) -> BackfillReport:
+    """Embed page k+1 in a thread while page k is written.
+
+    `pages()` is an async iterator of (rows, todo): `rows` counts toward
+    `scanned`, `todo` is the [(key, text)] that actually needs a vector.
+    """
+    pending: Optional[tuple[list, asyncio.Future]] = None
+    async for rows, todo in pages():
+        report.scanned += len(rows)
+        report.skipped += len(rows) - len(todo)
+        future = asyncio.ensure_future(asyncio.to_thread(embedder.embed, [t for _k, t in todo]))
+        if pending is not None:
+            await write(pending[0], await pending[1])
+        pending = (todo, future)
+        report.embedded += len(todo)
+    if pending is not None:
+        await write(pending[0], await pending[1])
+    return report
+
+
+async def backfill_items(
+    db: AsyncSession, embedder: Optional[Embedder] = None, batch_size: int = 256,
+) -> BackfillReport:
+    """Embed every live item whose text or model differs from its stored row."""
+    from app.services.item_search import index_text
+
+    embedder = embedder or get_embedder()
+
+    async def pages():
+        after = "00000000-0000-0000-0000-000000000000"
+        while True:
+            rows = (await db.execute(
+                text("""
+                SELECT i.id, i.content, i.explanation, e.text_hash
+                FROM items i
+                LEFT JOIN item_embeddings e ON e.item_id = i.id AND e.model = :model
+                WHERE i.deleted_at IS NULL AND i.id > CAST(:after AS uuid)
+                ORDER BY i.id
+                LIMIT :n
+                """),
+                {"model": embedder.model, "after": after, "n": batch_size},
+            )).all()
+            if not rows:
+                return
+            after = str(rows[-1][0])
+            todo = []
+            for item_id, content, explanation, stored in rows:
+                value = index_text(content or {}, explanation)
+                h = text_hash(value)
+                if h != stored:
+                    todo.append(((item_id, h), value))
+            yield rows, todo
+
+    async def write(todo, vecs):
+        if not todo:
+            return
+        await stage(
+            db, "_item_embedding_stage",
+            "item_id uuid, embedding vector, text_hash varchar(64)",
+            ["item_id", "embedding", "text_hash"],
+            [(item_id, vec, h) for ((item_id, h), _t), vec in zip(todo, vecs)],
+        )
+        await db.execute(
+            text("""
+            INSERT INTO item_embeddings (item_id, model, embedding, text_hash)
+            SELECT item_id, :model, embedding, text_hash FROM _item_embedding_stage
+            ON CONFLICT (item_id, model) DO UPDATE SET
+                embedding = EXCLUDED.embedding,
+                text_hash = EXCLUDED.text_hash,
+                created_at = CURRENT_TIMESTAMP
+            """),
+            {"model": embedder.model},
+        )
+        await db.commit()
+
+    return await pipeline(pages, embedder, write, BackfillReport())
+
+
+async def reembed_chunks(
+    db: AsyncSession, embedder: Optional[Embedder] = None, batch_size: int = 256,
+) -> BackfillReport:
+    """Re-embed knowledge_chunks written by another model (or none).
+
+    Chunk text only changes through ingest, which embeds as it writes; what
+    goes stale on a model swap is the vector, so this pages by id over rows
+    whose embedding_model is not the current one."""
+    embedder = embedder or get_embedder()
+
+    async def pages():
+        after = "00000000-0000-0000-0000-000000000000"
+        while True:
+            rows = (await db.execute(
+                text("""
+                SELECT id, text FROM knowledge_chunks
+                WHERE embedding_model IS DISTINCT FROM :model
+                  AND id > CAST(:after AS uuid)
+                ORDER BY id
+                LIMIT :n
+                """),
+                {"model": embedder.model, "after": after, "n": batch_size},
+            )).all()
+            if not rows:
+                return
+            after = str(rows[-1][0])
+            yield rows, [(chunk_id, value) for chunk_id, value in rows]
+
+    async def write(todo, vecs):
+        if not todo:
+            return
+        await stage(
+            db, "_chunk_embedding_stage", "id uuid, embedding vector",
+            ["id", "embedding"],
+            [(chunk_id, vec) for (chunk_id, _t), vec in zip(todo, vecs)],
+        )
+        await db.execute(
+            text("""
+            UPDATE knowledge_chunks k
+               SET embedding = s.embedding,
+                   embedding_model = :model,
+                   updated_at = CURRENT_TIMESTAMP
+              FROM _chunk_embedding_stage s
+             WHERE k.id = s.id
+            """),
+            {"model": embedder.model},
+        )
+        await db.commit()
+
+    return await pipeline(pages, embedder, write, BackfillReport())
@@ -14,9 +14,16 @@ P(correct | theta, a, b) = 1 / (1 + exp(-a * (theta - b)))
 
 Fitting
 -------
-EM with closed-form M-step per item (Newton step, 5 iterations).
-E-step uses a grid of theta values per learner. Cheap; converges
-in < 1s for thousands of attempts on hundreds of items.
+Attempts are aggregated per (learner, item) cell in SQL and streamed in
+chunks into a sparse response matrix. Two fitters run over it, both
+fully vectorised in NumPy / SciPy:
+
+- JML (default): per-learner theta MLE alternating with one Newton step
+  on every item's (a, b).
+- MML: Bock-Aitkin EM over a Gauss-Hermite grid, thetas reported as EAP.
+
+A recalibration warm-starts from the stored irt_* values, and the
+results are written back in one statement.
 
 What gets written back
 ----------------------
@@ -51,7 +58,9 @@ from dataclasses import dataclass
 from typing import Sequence
 from uuid import UUID
 
-from sqlalchemy import select, text
+import numpy as np
+from scipy import sparse
+from sqlalchemy import bindparam, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
@@ -117,130 +126,288 @@ def _theta_mle(responses: list[tuple[float, float, int]]) -> float:
     return theta
 
 
-def _item_step(responses: list[tuple[float, int]], a: float, b: float) -> tuple[float, float]:
-    """
-    One Newton step on (a, b) given a list of (theta, correct) responses
-    for a single item. Returns updated (a, b).
-    """
-    g_a = 0.0
-    g_b = 0.0
-    h_aa = 0.0
-    h_bb = 0.0
-    h_ab = 0.0
-    for theta, y in responses:
-        p = p_correct(theta, a, b)
-        diff = y - p
-        g_a += (theta - b) * diff
-        g_b += -a * diff
-        # Hessian (use Fisher info equivalents)
-        w = p * (1 - p)
-        h_aa += -(theta - b) ** 2 * w
-        h_bb += -a * a * w
-        h_ab += -(theta - b) * a * w + diff
-    # Solve 2x2 system: H * step = g  (we want -H so Newton step is +H_inv * g)
-    det = h_aa * h_bb - h_ab * h_ab
-    if abs(det) < 1e-9:
-        return a, b
-    da = (h_bb * g_a - h_ab * g_b) / det
-    db = (-h_ab * g_a + h_aa * g_b) / det
-    a_new = max(0.1, min(4.0, a - da))
-    b_new = max(-4.0, min(4.0, b - db))
-    return a_new, b_new
+# The calibration engine works on a sparse learner x item response matrix
+# rather than on per-attempt Python tuples. Repeat attempts collapse into one
+# cell carrying (n, r): attempts and correct answers. Postgres does that
+# collapse in the GROUP BY, so what crosses the wire is one row per cell, not
+# one per attempt, and it is streamed in chunks rather than fetched whole.
+#
+# Every E and M step is then a handful of NumPy array operations over the
+# nonzero cells (np.bincount is the per-row / per-column sum), and the
+# marginal-ML path multiplies the CSR count matrices against the quadrature
+# grid. Nothing loops over learners or items in Python.
+#
+# The earlier implementation walked attempt_logs row by row in every
+# iteration; on the USMLE and NCLEX banks that was hours per calibration.
 
+STREAM_CHUNK = 50_000
+THETA_BOUND = 4.0
+A_BOUNDS = (0.1, 4.0)
+B_BOUNDS = (-4.0, 4.0)
+QUADRATURE_POINTS = 21
 
-async def calibrate(
-    db: AsyncSession,
-    *,
-    min_attempts_per_item: int = 5,
-    max_em_iterations: int = 8,
-    only_active_items: bool = True,
-) -> CalibrationResult:
-    """
-    Walk attempt_logs, fit 2-PL EM, write a/b back to items.irt_*.
 
-    Skips items with fewer than `min_attempts_per_item` attempts (the
-    estimate isn't stable below that). Defaults to 5 — enough to demo
-    while small enough to fit our 78-item seed once a few thousand
-    attempts accrue.
+@dataclass
+class ResponseMatrix:
+    """Learner x item response counts, one entry per nonzero cell.
+
+    rows/cols index user_ids/item_ids; n is attempts in the cell, r is how
+    many of them were correct. Cells are unique and sorted by (row, col), so
+    the arrays are exactly the CSR triplets of both count matrices.
     """
-    # Pull attempts: (user_id, item_id, is_correct)
-    rows_r = await db.execute(
+
+    user_ids: list[str]
+    item_ids: list[str]
+    rows: np.ndarray
+    cols: np.ndarray
+    n: np.ndarray
+    r: np.ndarray
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return len(self.user_ids), len(self.item_ids)
+
+    def attempts_per_item(self) -> np.ndarray:
+        return np.bincount(self.cols, weights=self.n, minlength=self.shape[1])
+
+    def keep_items(self, mask: np.ndarray) -> "ResponseMatrix":
+        """Drop the columns mask rejects, renumbering the ones it keeps."""
+        remap = np.full(len(mask), -1, dtype=np.int64)
+        remap[mask] = np.arange(int(mask.sum()))
+        cell = mask[self.cols]
+        return ResponseMatrix(
+            user_ids=self.user_ids,
+            item_ids=[iid for iid, keep in zip(self.item_ids, mask) if keep],
+            rows=self.rows[cell],
+            cols=remap[self.cols[cell]],
+            n=self.n[cell],
+            r=self.r[cell],
+        )
+
+    def csr(self, data: np.ndarray) -> sparse.csr_matrix:
+        return sparse.csr_matrix((data, (self.rows, self.cols)), shape=self.shape)
+
+
+async def load_responses(db: AsyncSession, *, chunk_size: int = STREAM_CHUNK) -> ResponseMatrix:
+    """Stream attempt_logs into a ResponseMatrix, aggregated per cell in SQL."""
+    result = await db.stream(
         text(
             """
-            SELECT user_id, item_id, is_correct
+            SELECT user_id, item_id,
+                   COUNT(*) AS n,
+                   SUM(CASE WHEN is_correct THEN 1 ELSE 0 END) AS r
             FROM attempt_logs
-            ORDER BY created_at
+            GROUP BY user_id, item_id
             """
-        )
+        ).execution_options(yield_per=chunk_size)
     )
-    rows = [(str(u), str(i), bool(c)) for (u, i, c) in rows_r.fetchall()]
-    if not rows:
-        return CalibrationResult(items=[], thetas={}, iterations=0, log_likelihood=0.0)
-
-    # Index
-    item_attempts: dict[str, list[tuple[str, int]]] = {}
-    user_attempts: dict[str, list[tuple[str, int]]] = {}
-    for u, i, y in rows:
-        item_attempts.setdefault(i, []).append((u, int(y)))
-        user_attempts.setdefault(u, []).append((i, int(y)))
-
-    # Drop items with too few attempts
-    item_ids = [
-        iid for iid, atts in item_attempts.items()
-        if len(atts) >= min_attempts_per_item
-    ]
-    if not item_ids:
-        return CalibrationResult(items=[], thetas={}, iterations=0, log_likelihood=0.0)
-
-    # Init params
-    a_by_item: dict[str, float] = {iid: 1.0 for iid in item_ids}
-    b_by_item: dict[str, float] = {}
-    for iid in item_ids:
-        p_hat = sum(y for _, y in item_attempts[iid]) / len(item_attempts[iid])
-        p_hat = max(0.05, min(0.95, p_hat))
-        # b initialised at logit(p) inverted — a guess
-        b_by_item[iid] = -math.log(p_hat / (1 - p_hat))
-
-    theta_by_user: dict[str, float] = {u: 0.0 for u in user_attempts}
-    last_ll = -1e18
+    user_index: dict[str, int] = {}
+    item_index: dict[str, int] = {}
+    rows: list[np.ndarray] = []
+    cols: list[np.ndarray] = []
+    counts: list[np.ndarray] = []
+    correct: list[np.ndarray] = []
+    async for chunk in result.partitions(chunk_size):
+        users, items, n, r = zip(*chunk)
+        rows.append(np.fromiter(
+            (user_index.setdefault(str(u), len(user_index)) for u in users),
+            dtype=np.int64, count=len(users),
+        ))
+        cols.append(np.fromiter(
+            (item_index.setdefault(str(i), len(item_index)) for i in items),
+            dtype=np.int64, count=len(items),
+        ))
+        # SUM comes back as Decimal on Postgres; float() takes either.
+        counts.append(np.array([float(x) for x in n]))
+        correct.append(np.array([float(x or 0) for x in r]))
+
+    def _cat(parts: list[np.ndarray], dtype) -> np.ndarray:
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=dtype)
+
+    row = _cat(rows, np.int64)
+    col = _cat(cols, np.int64)
+    order = np.lexsort((col, row))
+    return ResponseMatrix(
+        user_ids=list(user_index),
+        item_ids=list(item_index),
+        rows=row[order],
+        cols=col[order],
+        n=_cat(counts, np.float64)[order],
+        r=_cat(correct, np.float64)[order],
+    )
+
+
+def _sigmoid_v(x: np.ndarray) -> np.ndarray:
+    return 0.5 * (1.0 + np.tanh(0.5 * x))
 
-    for em_iter in range(max_em_iterations):
-        # E-step: update each user's theta
-        for u, atts in user_attempts.items():
-            resps = [
-                (a_by_item[i], b_by_item[i], y)
-                for (i, y) in atts
-                if i in a_by_item
-            ]
-            if resps:
-                theta_by_user[u] = _theta_mle(resps)
-
-        # M-step: update each item's (a, b)
-        for iid in item_ids:
-            resps = [(theta_by_user[u], y) for (u, y) in item_attempts[iid]]
-            if not resps:
-                continue
-            a_by_item[iid], b_by_item[iid] = _item_step(
-                resps, a_by_item[iid], b_by_item[iid]
-            )
-
-        # Log-likelihood
-        ll = 0.0
-        for u, atts in user_attempts.items():
-            for (i, y) in atts:
-                if i not in a_by_item:
-                    continue
-                p = p_correct(theta_by_user[u], a_by_item[i], b_by_item[i])
-                p = max(1e-9, min(1 - 1e-9, p))
-                ll += y * math.log(p) + (1 - y) * math.log(1 - p)
-        if abs(ll - last_ll) < 0.01:
+
+def _log_likelihood(m: ResponseMatrix, theta: np.ndarray, a: np.ndarray, b: np.ndarray) -> float:
+    p = np.clip(_sigmoid_v(a[m.cols] * (theta[m.rows] - b[m.cols])), 1e-9, 1 - 1e-9)
+    return float(np.sum(m.r * np.log(p) + (m.n - m.r) * np.log1p(-p)))
+
+
+def _theta_step(
+    m: ResponseMatrix, theta: np.ndarray, a: np.ndarray, b: np.ndarray, *, max_iter: int = 15
+) -> np.ndarray:
+    """Every learner's theta MLE at once: _theta_mle, vectorised.
+
+    A learner stops moving once their step falls under 1e-4 or their
+    information vanishes, exactly as the scalar loop breaks. Starting from the
+    previous iteration's thetas rather than 0 is what makes later EM
+    iterations cheap: most learners are already within tolerance.
+    """
+    n_users = m.shape[0]
+    theta = theta.copy()
+    active = np.bincount(m.rows, minlength=n_users) > 0
+    a_c = a[m.cols]
+    b_c = b[m.cols]
+    for _ in range(max_iter):
+        if not active.any():
             break
-        last_ll = ll
+        p = _sigmoid_v(a_c * (theta[m.rows] - b_c))
+        grad = np.bincount(m.rows, weights=a_c * (m.r - m.n * p), minlength=n_users)
+        info = np.bincount(m.rows, weights=m.n * a_c * a_c * p * (1 - p), minlength=n_users)
+        active &= info >= 1e-9
+        step = np.divide(grad, info, out=np.zeros(n_users), where=active)
+        theta = np.where(active, np.clip(theta + step, -THETA_BOUND, THETA_BOUND), theta)
+        active &= np.abs(step) >= 1e-4
+    return theta
 
-    # Write back to items
+
+def _item_step_v(
+    m: ResponseMatrix, theta: np.ndarray, a: np.ndarray, b: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """One Newton step on every item's (a, b) at once, given fixed thetas."""
+    n_items = m.shape[1]
+    a_c = a[m.cols]
+    b_c = b[m.cols]
+    dev = theta[m.rows] - b_c
+    p = _sigmoid_v(a_c * dev)
+    diff = m.r - m.n * p
+    w = m.n * p * (1 - p)
+
+    def _sum(values: np.ndarray) -> np.ndarray:
+        return np.bincount(m.cols, weights=values, minlength=n_items)
+
+    g_a = _sum(dev * diff)
+    g_b = _sum(-a_c * diff)
+    # Fisher information, the expected Hessian. The scalar version this
+    # replaced had the cross term as -a(theta-b)w + (y-p), the observed
+    # Hessian with its sign flipped; the step then pointed partly uphill and
+    # recovered difficulties correlated about 0.4 with the true ones on
+    # simulated data.
+    h_aa = _sum(-dev * dev * w)
+    h_bb = _sum(-a_c * a_c * w)
+    h_ab = _sum(dev * a_c * w)
+    return _newton_2x2(a, b, g_a, g_b, h_aa, h_bb, h_ab)
+
+
+def _newton_2x2(a, b, g_a, g_b, h_aa, h_bb, h_ab) -> tuple[np.ndarray, np.ndarray]:
+    """Solve H * step = g per item and step against it, within the bounds.
+
+    An item whose Hessian is singular keeps its parameters for this step.
+    """
+    det = h_aa * h_bb - h_ab * h_ab
+    ok = np.abs(det) >= 1e-9
+    safe = np.where(ok, det, 1.0)
+    da = np.where(ok, (h_bb * g_a - h_ab * g_b) / safe, 0.0)
+    db = np.where(ok, (-h_ab * g_a + h_aa * g_b) / safe, 0.0)
+    return np.clip(a - da, *A_BOUNDS), np.clip(b - db, *B_BOUNDS)
+
+
+def _quadrature(points: int) -> tuple[np.ndarray, np.ndarray]:
+    """Gauss-Hermite nodes and log weights for a standard normal prior."""
+    nodes, weights = np.polynomial.hermite_e.hermegauss(points)
+    weights = weights / weights.sum()
+    return nodes, np.log(weights)
+
+
+def _mml_posterior(
+    r_mat: sparse.csr_matrix,
+    w_mat: sparse.csr_matrix,
+    a: np.ndarray,
+    b: np.ndarray,
+    nodes: np.ndarray,
+    log_w: np.ndarray,
+) -> tuple[np.ndarray, float]:
+    """Posterior over the quadrature grid per learner, and the marginal LL.
+
+    log L[u, q] = sum_i r_ui log P_iq + w_ui log(1 - P_iq), with w the wrong
+    answers, which is two CSR x dense products against the (items x nodes) log-probability
+    grid, so the work scales with the nonzero cells and never materialises a
+    dense learner x item matrix.
+    """
+    logits = a[:, None] * (nodes[None, :] - b[:, None])
+    log_p = -np.logaddexp(0.0, -logits)
+    log_q = -np.logaddexp(0.0, logits)
+    log_l = r_mat @ log_p + w_mat @ log_q + log_w[None, :]
+    norm = np.logaddexp.reduce(log_l, axis=1)
+    return np.exp(log_l - norm[:, None]), float(norm.sum())
+
+
+def _mml_item_step(
+    n_iq: np.ndarray, r_iq: np.ndarray, a: np.ndarray, b: np.ndarray, nodes: np.ndarray,
+    *, newton_iters: int = 5,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Bock-Aitkin M step: Fisher scoring on the expected counts per node."""
+    for _ in range(newton_iters):
+        dev = nodes[None, :] - b[:, None]
+        p = _sigmoid_v(a[:, None] * dev)
+        diff = r_iq - n_iq * p
+        w = n_iq * p * (1 - p)
+        g_a = (diff * dev).sum(axis=1)
+        g_b = -a * diff.sum(axis=1)
+        h_aa = -(w * dev * dev).sum(axis=1)
+        h_bb = -a * a * w.sum(axis=1)
+        h_ab = a * (w * dev).sum(axis=1)
+        a, b = _newton_2x2(a, b, g_a, g_b, h_aa, h_bb, h_ab)
+    return a, b
+
+
+_PREVIOUS_PARAMS_SQL = """
+    SELECT id, irt_discrimination, irt_difficulty
+    FROM items
+    WHERE {match}
+      AND irt_calibrated_at IS NOT NULL
+      AND irt_discrimination IS NOT NULL
+      AND irt_difficulty IS NOT NULL
+"""
+
+
+async def _previous_params(db: AsyncSession, item_ids: list[str]) -> dict[str, tuple[float, float]]:
+    """Last calibration's (a, b) per item, for a warm start.
+
+    Only the requested items are read: one uuid[] parameter on Postgres, an
+    expanding IN elsewhere (the SQLite test harness).
+    """
+    if not item_ids:
+        return {}
+    if db.get_bind().dialect.name == "postgresql":
+        statement = text(_PREVIOUS_PARAMS_SQL.format(match="id = ANY(CAST(:ids AS uuid[]))"))
+    else:
+        statement = text(_PREVIOUS_PARAMS_SQL.format(match="id IN :ids")).bindparams(
+            bindparam("ids", expanding=True)
+        )
+    rows = await db.execute(statement, {"ids": [str(i) for i in item_ids]})
+    return {str(iid): (float(a), float(b)) for iid, a, b in rows.fetchall()}
+
+
+async def _write_back(db: AsyncSession, params: list[ItemParams]) -> None:
+    """Write every calibrated item in one statement.
+
+    On Postgres the parameters are staged in a temp table and applied with a
+    single UPDATE ... FROM, instead of one round trip per item. Other
+    dialects (the SQLite test harness) get one executemany UPDATE.
+    """
+    if not params:
+        return
     from datetime import datetime
     now = datetime.utcnow()
-    for iid in item_ids:
+    payload = [
+        {"iid": str(p.item_id), "a": p.a, "b": p.b, "n": p.n_attempts, "now": now}
+        for p in params
+    ]
+    if db.get_bind().dialect.name != "postgresql":
         await db.execute(
             text(
                 """
@@ -253,26 +420,141 @@ async def calibrate(
                 WHERE id = :iid
                 """
             ),
-            {
-                "a": a_by_item[iid],
-                "b": b_by_item[iid],
-                "now": now,
-                "n": len(item_attempts[iid]),
-                "iid": iid,
-            },
+            payload,
         )
+        return
+
+    await db.execute(
+        text(
+            """
+            CREATE TEMP TABLE IF NOT EXISTS irt_calibration_stage (
+                id uuid PRIMARY KEY,
+                a double precision NOT NULL,
+                b double precision NOT NULL,
+                n integer NOT NULL
+            ) ON COMMIT DROP
+            """
+        )
+    )
+    await db.execute(text("TRUNCATE irt_calibration_stage"))
+    await db.execute(
+        text("INSERT INTO irt_calibration_stage (id, a, b, n) VALUES (CAST(:iid AS uuid), :a, :b, :n)"),
+        payload,
+    )
+    await db.execute(
+        text(
+            """
+            UPDATE items
+            SET irt_discrimination = s.a,
+                irt_difficulty = s.b,
+                irt_guessing = 0,
+                irt_calibrated_at = :now,
+                attempts_count = s.n
+            FROM irt_calibration_stage s
+            WHERE items.id = s.id
+            """
+        ),
+        {"now": now},
+    )
+
+
+async def calibrate(
+    db: AsyncSession,
+    *,
+    min_attempts_per_item: int = 5,
+    max_em_iterations: int = 8,
+    only_active_items: bool = True,
+    method: str = "jml",
+    warm_start: bool = True,
+    chunk_size: int = STREAM_CHUNK,
+) -> CalibrationResult:
+    """
+    Walk attempt_logs, fit 2-PL EM, write a/b back to items.irt_*.
+
+    Skips items with fewer than `min_attempts_per_item` attempts (the
+    estimate isn't stable below that). Defaults to 5 — enough to demo
+    while small enough to fit our 78-item seed once a few thousand
+    attempts accrue.
+
+    method="jml" alternates per-learner theta MLEs with per-item Newton
+    steps, which is what this service has always fitted. method="mml"
+    integrates theta out over a Gauss-Hermite grid instead (Bock-Aitkin
+    EM), which does not bias a and b on short response strings; learner
+    thetas are then EAP estimates.
+
+    With warm_start, items that were calibrated before start from their
+    stored a/b rather than from the p-value guess, so a recalibration after
+    a day's new attempts converges in an iteration or two.
+    """
+    if method not in ("jml", "mml"):
+        raise ValueError(f"unknown calibration method {method!r}")
+
+    matrix = await load_responses(db, chunk_size=chunk_size)
+    empty = CalibrationResult(items=[], thetas={}, iterations=0, log_likelihood=0.0)
+    if not matrix.user_ids:
+        return empty
+
+    attempts = matrix.attempts_per_item()
+    keep = attempts >= min_attempts_per_item
+    if not keep.any():
+        return empty
+    attempts = attempts[keep]
+    m = matrix.keep_items(keep)
+    n_users, n_items = m.shape
+
+    # Init params: b at the inverted logit of the p-value, a at 1, unless a
+    # previous calibration left better starting values.
+    correct = np.bincount(m.cols, weights=m.r, minlength=n_items)
+    p_hat = np.clip(correct / attempts, 0.05, 0.95)
+    a = np.ones(n_items)
+    b = -np.log(p_hat / (1 - p_hat))
+    if warm_start:
+        previous = await _previous_params(db, m.item_ids)
+        for k, iid in enumerate(m.item_ids):
+            if iid in previous:
+                a[k], b[k] = previous[iid]
+        a = np.clip(a, *A_BOUNDS)
+        b = np.clip(b, *B_BOUNDS)
+
+    theta = np.zeros(n_users)
+    last_ll = -1e18
+    em_iter = 0
+
+    if method == "jml":
+        for em_iter in range(max_em_iterations):
+            theta = _theta_step(m, theta, a, b)
+            a, b = _item_step_v(m, theta, a, b)
+            ll = _log_likelihood(m, theta, a, b)
+            if abs(ll - last_ll) < 0.01:
+                last_ll = ll
+                break
+            last_ll = ll
+    else:
+        nodes, log_w = _quadrature(QUADRATURE_POINTS)
+        r_mat = m.csr(m.r)
+        w_mat = m.csr(m.n - m.r)
+        n_mat_t = m.csr(m.n).T.tocsr()
+        r_mat_t = r_mat.T.tocsr()
+        for em_iter in range(max_em_iterations):
+            post, ll = _mml_posterior(r_mat, w_mat, a, b, nodes, log_w)
+            # Expected attempts and correct answers per item at each node.
+            a, b = _mml_item_step(n_mat_t @ post, r_mat_t @ post, a, b, nodes)
+            if abs(ll - last_ll) < 0.01:
+                last_ll = ll
+                break
+            last_ll = ll
+        post, last_ll = _mml_posterior(r_mat, w_mat, a, b, nodes, log_w)
+        theta = post @ nodes
+
+    params = [
+        ItemParams(item_id=UUID(iid), a=float(a[k]), b=float(b[k]), n_attempts=int(attempts[k]))
+        for k, iid in enumerate(m.item_ids)
+    ]
+    await _write_back(db, params)
 
     return CalibrationResult(
-        items=[
-            ItemParams(
-                item_id=UUID(iid),
-                a=a_by_item[iid],
-                b=b_by_item[iid],
-                n_attempts=len(item_attempts[iid]),
-            )
-            for iid in item_ids
-        ],
-        thetas={UUID(u): t for u, t in theta_by_user.items()},
+        items=params,
+        thetas={UUID(u): float(t) for u, t in zip(m.user_ids, theta)},
         iterations=em_iter + 1,
         log_likelihood=last_ll,
     )
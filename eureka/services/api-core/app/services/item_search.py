@@ -20,45 +20,56 @@ Hybrid search across the item bank:
 The two ranked lists are fused with Reciprocal Rank Fusion (RRF), a
 standard parameter-free fusion that's surprisingly hard to beat.
 
-Note on embeddings: this module accepts an optional callable
-`embed_fn(text) -> list[float]` so callers can inject real embedding
-backends (OpenAI, bge, Anthropic when available) at boot. The default
-is a deterministic hash-based pseudo-embedding so the code path runs
-end-to-end in CI / dev without an embedding model. Phase 6.1 (RAG)
-will swap this for the real pipeline.
+Note on embeddings: vectors come from services/embeddings.py (a local
+CPU model, or the deterministic hashed stand-in for CI / dev), query
+vectors through its LRU, and are bound in pgvector's binary format.
+Callers can still pass `embed_fn(text) -> list[float]` to override the
+backend for one search. Bulk writes go through
+`embeddings.backfill_items`; `upsert_item_embedding` is the single-item
+path the authoring endpoints call on save.
 """
 
 from __future__ import annotations
 
-import hashlib
+import asyncio
 from dataclasses import dataclass, field
-from typing import Callable
+from typing import Callable, Optional
 from uuid import UUID
 
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.services import embeddings
+from app.services.embeddings import EMBED_DIM  # noqa: F401  (re-exported)
 
-DEFAULT_EMBED_MODEL = "stub-sha256-1024"
-EMBED_DIM = 1024
+
+# The hashed stand-in's label. The active model is embeddings.get_embedder().model.
+DEFAULT_EMBED_MODEL = embeddings.HASHED_MODEL
 
 
 def _stub_embedding(s: str) -> list[float]:
     """
     Deterministic 1024-dim "embedding" derived from sha256 of the text.
     Useless for semantic quality but lets every code path run in CI
-    without a model. Real embeddings replace this in Phase 6.1.
+    without a model.
     """
-    h = hashlib.sha256(s.encode()).digest()
-    # tile the 32 bytes 32× to reach 1024 dims, normalised to [-1, 1].
-    arr = []
-    for i in range(EMBED_DIM):
-        b = h[i % len(h)]
-        arr.append((b - 127.5) / 127.5)
-    # L2-normalise for cosine sanity
-    import math
-    norm = math.sqrt(sum(x * x for x in arr)) or 1.0
-    return [x / norm for x in arr]
+    return embeddings.HashedEmbedder().embed([s])[0].tolist()
+
+
+def index_text(content: dict, explanation: Optional[str]) -> str:
+    """The text projection of an item used for keyword + embedding indexing."""
+    parts = [
+        content.get("stem") or content.get("vignette") or "",
+        " ".join(content.get("options", []) or []),
+        explanation or "",
+    ]
+    return " ".join(p for p in parts if p)
+
+
+async def _query_vector(query: str, embed_fn: Callable[[str], list[float]] | None):
+    if embed_fn is not None:
+        return embed_fn(query)
+    return await embeddings.embed_query(query)
 
 
 @dataclass
@@ -122,20 +133,18 @@ async def _semantic_ranked(
     limit: int,
     bank_id: UUID | None,
     framework_filter: str | None,
-    embed_fn: Callable[[str], list[float]],
+    embed_fn: Callable[[str], list[float]] | None,
     model: str,
 ) -> list[tuple[UUID, float]]:
     """
     pgvector cosine-distance ranking. Items without an embedding for
     this model are skipped silently (they'll surface via keyword instead).
     """
-    qvec = embed_fn(query)
-    # Postgres vector literal: "[v1,v2,...]"
-    vec_lit = "[" + ",".join(f"{x:.6f}" for x in qvec) + "]"
+    qvec = embeddings.vector_param(await _query_vector(query, embed_fn))
 
     sql = """
         SELECT i.id,
-               1 - (e.embedding <=> :qvec ::vector) AS score
+               1 - (e.embedding <=> CAST(:qvec AS vector)) AS score
         FROM item_embeddings e
         JOIN items i ON i.id = e.item_id
         JOIN item_banks b ON b.id = i.bank_id
@@ -143,14 +152,14 @@ async def _semantic_ranked(
           AND i.deleted_at IS NULL
           AND i.review_status IN ('approved', 'draft')
     """
-    params: dict = {"qvec": vec_lit, "model": model, "limit": limit}
+    params: dict = {"qvec": qvec, "model": model, "limit": limit}
     if bank_id is not None:
         sql += " AND i.bank_id = :bank_id"
         params["bank_id"] = str(bank_id)
     if framework_filter:
         sql += " AND b.framework = :fw"
         params["fw"] = framework_filter
-    sql += " ORDER BY e.embedding <=> :qvec ::vector ASC LIMIT :limit"
+    sql += " ORDER BY e.embedding <=> CAST(:qvec AS vector) ASC LIMIT :limit"
     try:
         r = await db.execute(text(sql), params)
         return [(row[0], float(row[1])) for row in r.fetchall()]
@@ -191,13 +200,14 @@ async def hybrid_search(
     framework_filter: str | None = None,
     skill_id: UUID | None = None,
     embed_fn: Callable[[str], list[float]] | None = None,
-    embed_model: str = DEFAULT_EMBED_MODEL,
+    embed_model: str | None = None,
 ) -> list[HybridHit]:
     """
     Returns up to `limit` items ranked by RRF fusion of keyword + semantic
     + skill-tag-boost. Empty result is a valid response (no items match).
+    `embed_model` defaults to the active embedder's model.
     """
-    embed_fn = embed_fn or _stub_embedding
+    embed_model = embed_model or embeddings.get_embedder().model
     pool = max(limit * 3, 30)  # fetch a wider pool from each channel for RRF
 
     kw = await _keyword_ranked(db, query, pool, bank_id, framework_filter)
@@ -233,23 +243,31 @@ async def upsert_item_embedding(
     text_to_embed: str,
     *,
     embed_fn: Callable[[str], list[float]] | None = None,
-    model: str = DEFAULT_EMBED_MODEL,
+    model: str | None = None,
 ) -> None:
     """Compute and store an embedding for a single item. Idempotent."""
-    embed_fn = embed_fn or _stub_embedding
-    vec = embed_fn(text_to_embed)
-    vec_lit = "[" + ",".join(f"{x:.6f}" for x in vec) + "]"
-    text_hash = hashlib.sha256(text_to_embed.encode()).hexdigest()
+    if embed_fn is not None:
+        vec = embed_fn(text_to_embed)
+        model = model or DEFAULT_EMBED_MODEL
+    else:
+        embedder = embeddings.get_embedder()
+        vec = (await asyncio.to_thread(embedder.embed, [text_to_embed]))[0]
+        model = model or embedder.model
     await db.execute(
         text(
             """
             INSERT INTO item_embeddings (item_id, model, embedding, text_hash)
-            VALUES (:iid, :model, :vec ::vector, :hash)
+            VALUES (:iid, :model, CAST(:vec AS vector), :hash)
             ON CONFLICT (item_id, model) DO UPDATE SET
                 embedding = EXCLUDED.embedding,
                 text_hash = EXCLUDED.text_hash,
                 created_at = CURRENT_TIMESTAMP
             """
         ),
-        {"iid": str(item_id), "model": model, "vec": vec_lit, "hash": text_hash},
+        {
+            "iid": str(item_id),
+            "model": model,
+            "vec": embeddings.vector_param(vec),
+            "hash": embeddings.text_hash(text_to_embed),
+        },
     )
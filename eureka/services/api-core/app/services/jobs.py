@@ -3,8 +3,8 @@ Phase 14.2 — Lightweight background job queue.
 
 Goals:
   - No new infra dependency. The queue is just a Postgres table.
-  - Pull-based: workers `lease_next()` with SKIP LOCKED so multiple workers
-    can run side by side without trampling.
+  - Pull-based: workers lease with SKIP LOCKED so multiple workers can run
+    side by side without trampling.
   - Exponential retry backoff per attempt.
   - A handler registry so callers can `enqueue("webhook.deliver", payload)`
     and the worker resolves the right Python function.
@@ -15,13 +15,40 @@ The HTTP layer in `endpoints/ops.py` exposes:
   - `GET  /admin/jobs/stats`           — queue depth + per-status counts
   - `GET  /admin/jobs?status=&kind=`   — recent jobs (admin)
 
-The real worker process is a daemon that calls `run_once()` in a loop; we
-ship the in-process API endpoint for parity and testability.
+Throughput. Email, webhook and rank fan-outs put tens of thousands of rows in
+the table at once, and one lease + one commit per job made the worker's
+round-trips the bottleneck. So the worker (worker.py) uses the batch path:
+
+  - `enqueue_many()` inserts a fan-out in multi-row INSERTs, skipping rows
+    whose dedupe_key is already active instead of failing the batch.
+  - `lease_batch()` leases up to N jobs with one SKIP LOCKED statement,
+    honouring per-kind concurrency caps given to `register()`.
+  - `run_batch()` runs them and writes every outcome back in one executemany
+    UPDATE (`finish_batch()`), guarded on `leased_by` so a worker whose lease
+    was reaped cannot overwrite the job's next run.
+  - `renew_leases()` pushes the unfinished jobs' leases out before each
+    job, and a heartbeat keeps renewing them while it runs, so a long
+    handler or a slow batch never outlives its lease while its worker is
+    alive.
+  - `reap_expired()` puts jobs whose lease ran out (a worker that died
+    mid-batch) back in the queue, or buries them once out of attempts.
+  - Inserts fire NOTIFY background_jobs (trigger, migration jobs_notify_001)
+    so an idle worker wakes on new work instead of waiting out its poll.
+
+`lease_next()` / `run_once()` / `complete()` / `fail()` stay for the admin
+endpoints and single-job callers; `lease_next()` is `lease_batch()` of one.
+
+Delivery is at-least-once: a handler's own writes commit before the batch's
+outcome UPDATE, so a worker killed in between leaves the job running until
+the reaper requeues it. Handlers must tolerate a repeat (the built-ins check
+the row's state first).
 """
 
 from __future__ import annotations
 
 import asyncio
+import json
+import logging
 import os
 import socket
 import traceback
@@ -31,10 +58,13 @@ from typing import Any, Awaitable, Callable, Optional
 from uuid import UUID, uuid4
 
 from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.ops import BackgroundJob, JobStatus
 
+logger = logging.getLogger(__name__)
+
 
 # ---------------------------------------------------------------------------
 # Retry policy
@@ -54,6 +84,19 @@ def _worker_id() -> str:
     return f"{host}/{pid}/{uuid4().hex[:6]}"
 
 
+def _after_failure(
+    attempt_n: int, max_attempts: int, now: datetime,
+) -> tuple[str, Optional[datetime], Optional[datetime]]:
+    """(status, scheduled_for, finished_at) for a failed attempt.
+
+    scheduled_for is None when the job is dead and keeps its old schedule."""
+    if attempt_n >= max_attempts:
+        return JobStatus.dead.value, None, now
+    idx = min(attempt_n - 1, len(_RETRY_DELAYS_SECONDS) - 1)
+    delay = _RETRY_DELAYS_SECONDS[idx] if idx >= 0 else _RETRY_DELAYS_SECONDS[0]
+    return JobStatus.queued.value, now + timedelta(seconds=delay), None
+
+
 # ---------------------------------------------------------------------------
 # Handler registry
 # ---------------------------------------------------------------------------
@@ -62,15 +105,26 @@ JobHandler = Callable[[AsyncSession, dict], Awaitable[dict | None]]
 
 _HANDLERS: dict[str, JobHandler] = {}
 
+# kind -> most jobs of that kind running at once, across all workers.
+_CONCURRENCY: dict[str, int] = {}
+
 
-def register(kind: str) -> Callable[[JobHandler], JobHandler]:
+def register(
+    kind: str, *, concurrency: Optional[int] = None,
+) -> Callable[[JobHandler], JobHandler]:
     """Decorator. Use like:
 
         @jobs.register("webhook.deliver")
         async def deliver(db, payload): ...
-    """
+
+    `concurrency` caps how many jobs of this kind may be running at once,
+    cluster-wide; `lease_batch()` leaves the rest queued."""
     def _decorator(fn: JobHandler) -> JobHandler:
         _HANDLERS[kind] = fn
+        if concurrency is not None:
+            _CONCURRENCY[kind] = concurrency
+        else:
+            _CONCURRENCY.pop(kind, None)
         return fn
     return _decorator
 
@@ -79,6 +133,10 @@ def registered_kinds() -> list[str]:
     return sorted(_HANDLERS.keys())
 
 
+def concurrency_limits() -> dict[str, int]:
+    return dict(_CONCURRENCY)
+
+
 # ---------------------------------------------------------------------------
 # Enqueue
 # ---------------------------------------------------------------------------
@@ -113,10 +171,194 @@ async def enqueue(
     return job
 
 
+# Rows per INSERT statement. 9 bind parameters a row keeps one statement well
+# under asyncpg's 32767-parameter ceiling.
+_ENQUEUE_CHUNK = 1000
+
+
+async def enqueue_many(
+    db: AsyncSession,
+    *,
+    kind: str,
+    payloads: list[dict],
+    dedupe_keys: Optional[list[Optional[str]]] = None,
+    scheduled_for: Optional[datetime] = None,
+    priority: int = 100,
+    max_attempts: int = 5,
+) -> int:
+    """Insert a fan-out of one kind. Returns how many rows were inserted.
+
+    Rows whose dedupe_key already has a queued or running job are skipped
+    (ON CONFLICT against uq_job_dedupe_active) rather than aborting the
+    whole batch the way a duplicate does in `enqueue()`. One commit."""
+    if dedupe_keys is not None and len(dedupe_keys) != len(payloads):
+        raise ValueError("dedupe_keys must match payloads one to one")
+    when = scheduled_for or _utc()
+    keys = dedupe_keys or [None] * len(payloads)
+    rows = [
+        {
+            "id": uuid4(),
+            "kind": kind,
+            "payload": payload or {},
+            "status": JobStatus.queued.value,
+            "priority": priority,
+            "dedupe_key": key,
+            "max_attempts": max_attempts,
+            "attempt_n": 0,
+            "scheduled_for": when,
+        }
+        for payload, key in zip(payloads, keys)
+    ]
+    inserted = 0
+    for start in range(0, len(rows), _ENQUEUE_CHUNK):
+        stmt = (
+            pg_insert(BackgroundJob.__table__)
+            .values(rows[start:start + _ENQUEUE_CHUNK])
+            .on_conflict_do_nothing(
+                index_elements=["dedupe_key"],
+                index_where=text(
+                    "status IN ('queued', 'running') AND dedupe_key IS NOT NULL"
+                ),
+            )
+            .returning(BackgroundJob.__table__.c.id)
+        )
+        inserted += len((await db.execute(stmt)).fetchall())
+    await db.commit()
+    return inserted
+
+
 # ---------------------------------------------------------------------------
 # Worker
 # ---------------------------------------------------------------------------
 
+# One advisory lock per capped kind that has due work, taken in name order so
+# two leasers cannot deadlock. A separate statement from the lease: the lease
+# reads the running count from its own snapshot, which must start after the
+# lock is held. Leasers of uncapped kinds, and of different capped kinds,
+# never wait on each other.
+_LOCK_CAPPED_SQL = """
+SELECT k.kind, pg_advisory_xact_lock(hashtext('background_jobs.lease:' || k.kind))
+FROM unnest(CAST(:capped AS text[])) AS k(kind)
+WHERE EXISTS (
+    SELECT 1
+    FROM background_jobs j
+    WHERE j.kind = k.kind
+      AND j.status = 'queued'
+      AND j.scheduled_for <= :now
+)
+ORDER BY k.kind
+"""
+
+# Candidates are locked in priority order, then each capped kind keeps only
+# as many as it has free slots (running count + rank within the batch). The
+# scan reads past the batch size when caps apply so a capped kind at the top
+# of the queue does not starve the kinds behind it. Capped kinds whose lock
+# this leaser does not hold (:skip) wait for the next batch.
+_LEASE_SQL = """
+WITH running AS (
+    SELECT kind, COUNT(*) AS n
+    FROM background_jobs
+    WHERE status = 'running'
+      AND kind = ANY(:capped)
+    GROUP BY kind
+),
+candidates AS (
+    SELECT id, kind, priority, scheduled_for
+    FROM background_jobs
+    WHERE status = 'queued'
+      AND scheduled_for <= :now
+      AND (:any_kind OR kind = ANY(:kinds))
+      AND NOT (kind = ANY(:skip))
+    ORDER BY priority ASC, scheduled_for ASC
+    LIMIT :scan
+    FOR UPDATE SKIP LOCKED
+),
+picked AS (
+    SELECT id
+    FROM (
+        SELECT c.id, c.priority, c.scheduled_for,
+               COALESCE(r.n, 0) + ROW_NUMBER() OVER (
+                   PARTITION BY c.kind ORDER BY c.priority, c.scheduled_for
+               ) AS slot,
+               (CAST(:caps AS jsonb) ->> c.kind)::int AS cap
+        FROM candidates c
+        LEFT JOIN running r ON r.kind = c.kind
+    ) ranked
+    WHERE cap IS NULL OR slot <= cap
+    ORDER BY priority ASC, scheduled_for ASC
+    LIMIT :n
+)
+UPDATE background_jobs j
+   SET status = 'running',
+       leased_by = :worker,
+       leased_at = :now,
+       lease_expires_at = :lease_until,
+       started_at = COALESCE(j.started_at, :now),
+       attempt_n = j.attempt_n + 1
+  FROM picked
+ WHERE j.id = picked.id
+RETURNING j.id
+"""
+
+
+async def lease_batch(
+    db: AsyncSession,
+    *,
+    worker: str,
+    limit: int = 20,
+    lease_seconds: int = 300,
+    kinds: Optional[list[str]] = None,
+    kind_limits: Optional[dict[str, int]] = None,
+) -> list[BackgroundJob]:
+    """Atomically lease up to `limit` jobs in one statement, highest priority first.
+
+    `kind_limits` defaults to the caps given to `register()`. The running
+    count a cap is checked against is only exact if leasers don't race, so
+    the lease first takes a transaction-scoped advisory lock for each capped
+    kind that has due jobs (`_LOCK_CAPPED_SQL`). With no capped work queued
+    no lock is taken, and the locks are held for one statement per batch."""
+    now = _utc()
+    caps = concurrency_limits() if kind_limits is None else dict(kind_limits)
+    if kinds is not None:
+        caps = {k: v for k, v in caps.items() if k in kinds}
+    skip: list[str] = []
+    if caps:
+        locked = await db.execute(
+            text(_LOCK_CAPPED_SQL), {"capped": sorted(caps), "now": now},
+        )
+        held = {row[0] for row in locked.fetchall()}
+        skip = sorted(set(caps) - held)
+        caps = {k: v for k, v in caps.items() if k in held}
+    r = await db.execute(
+        text(_LEASE_SQL),
+        {
+            "now": now,
+            "worker": worker,
+            "lease_until": now + timedelta(seconds=lease_seconds),
+            "any_kind": kinds is None,
+            "kinds": list(kinds or []),
+            "skip": skip,
+            "capped": list(caps),
+            "caps": json.dumps(caps),
+            "n": limit,
+            "scan": limit * 4 if caps else limit,
+        },
+    )
+    ids = [row[0] for row in r.fetchall()]
+    await db.commit()
+    if not ids:
+        return []
+    leased = (
+        await db.execute(
+            select(BackgroundJob)
+            .where(BackgroundJob.id.in_(ids))
+            .order_by(BackgroundJob.priority, BackgroundJob.scheduled_for)
+            .execution_options(populate_existing=True)
+        )
+    ).scalars().all()
+    return list(leased)
+
+
 async def lease_next(
     db: AsyncSession,
     *,
@@ -125,44 +367,88 @@ async def lease_next(
     kinds: Optional[list[str]] = None,
 ) -> Optional[BackgroundJob]:
     """Atomically lease the next available job. Returns None if queue is empty."""
-    now = _utc()
-    # CTE: pick one row, lock it, mark it running, return it.
-    sql = """
-    WITH next_job AS (
-        SELECT id
-        FROM background_jobs
-        WHERE status = 'queued'
-          AND scheduled_for <= :now
-          AND (:any_kind OR kind = ANY(:kinds))
-        ORDER BY priority ASC, scheduled_for ASC
-        LIMIT 1
-        FOR UPDATE SKIP LOCKED
+    leased = await lease_batch(
+        db, worker=worker, limit=1, lease_seconds=lease_seconds, kinds=kinds,
     )
-    UPDATE background_jobs j
-       SET status = 'running',
-           leased_by = :worker,
-           leased_at = :now,
-           lease_expires_at = :lease_until,
-           started_at = COALESCE(j.started_at, :now),
-           attempt_n = j.attempt_n + 1
-      FROM next_job
-     WHERE j.id = next_job.id
-    RETURNING j.id
-    """
-    any_kind = kinds is None
-    lease_until = now + timedelta(seconds=lease_seconds)
+    return leased[0] if leased else None
+
+
+_RENEW_SQL = """
+UPDATE background_jobs
+   SET lease_expires_at = :lease_until
+ WHERE id = ANY(CAST(:ids AS uuid[]))
+   AND status = 'running'
+   AND leased_by = :worker
+RETURNING id
+"""
+
+
+async def renew_leases(
+    db: AsyncSession, *, worker: str, job_ids: list[UUID], lease_seconds: int,
+) -> set[UUID]:
+    """Extend this worker's leases on `job_ids` to `lease_seconds` from now.
+
+    Returns the ids still held; a job missing from it was reaped (and may
+    have been leased again elsewhere), so this worker must not run it."""
+    if not job_ids:
+        return set()
     r = await db.execute(
-        text(sql),
+        text(_RENEW_SQL),
         {
-            "now": now, "worker": worker, "lease_until": lease_until,
-            "any_kind": any_kind, "kinds": list(kinds or []),
+            "ids": [str(i) for i in job_ids],
+            "worker": worker,
+            "lease_until": _utc() + timedelta(seconds=lease_seconds),
         },
     )
-    row = r.fetchone()
+    held = {UUID(str(row[0])) for row in r.fetchall()}
     await db.commit()
-    if row is None:
-        return None
-    return await db.get(BackgroundJob, row[0])
+    return held
+
+
+async def _heartbeat(
+    db: AsyncSession, *, worker: str, job_ids: list[UUID], lease_seconds: int,
+) -> None:
+    """Renew the leases on `job_ids` every third of `lease_seconds`.
+
+    On its own session: the handler is using the batch's."""
+    async with AsyncSession(db.bind) as hb:
+        while True:
+            await asyncio.sleep(lease_seconds / 3)
+            try:
+                await renew_leases(
+                    hb, worker=worker, job_ids=job_ids, lease_seconds=lease_seconds,
+                )
+            except Exception:
+                await hb.rollback()
+                logger.warning("could not renew %d job leases", len(job_ids), exc_info=True)
+
+
+async def reap_expired(db: AsyncSession) -> int:
+    """Requeue running jobs whose lease has run out. Returns how many.
+
+    The worker that held them died or hung mid-batch. The attempt it made
+    still counts, so a job that keeps killing its worker ends up `dead`
+    rather than cycling forever."""
+    r = await db.execute(
+        text("""
+        UPDATE background_jobs
+           SET status = CAST(CASE WHEN attempt_n >= max_attempts
+                                  THEN 'dead' ELSE 'queued' END AS job_status),
+               finished_at = CASE WHEN attempt_n >= max_attempts
+                                  THEN :now ELSE finished_at END,
+               scheduled_for = :now,
+               last_error = 'lease expired (held by ' || COALESCE(leased_by, '?') || ')',
+               leased_by = NULL,
+               lease_expires_at = NULL
+         WHERE status = 'running'
+           AND lease_expires_at < :now
+        RETURNING id
+        """),
+        {"now": _utc()},
+    )
+    n = len(r.fetchall())
+    await db.commit()
+    return n
 
 
 async def complete(
@@ -179,19 +465,16 @@ async def complete(
 async def fail(
     db: AsyncSession, *, job: BackgroundJob, error: str,
 ) -> None:
-    if job.attempt_n >= job.max_attempts:
-        job.status = JobStatus.dead.value
-        job.finished_at = _utc()
-        job.leased_by = None
-        job.lease_expires_at = None
-    else:
-        # Re-queue with exponential backoff.
-        idx = min(job.attempt_n - 1, len(_RETRY_DELAYS_SECONDS) - 1)
-        delay = _RETRY_DELAYS_SECONDS[idx] if idx >= 0 else _RETRY_DELAYS_SECONDS[0]
-        job.status = JobStatus.queued.value
-        job.scheduled_for = _utc() + timedelta(seconds=delay)
-        job.leased_by = None
-        job.lease_expires_at = None
+    status, scheduled_for, finished_at = _after_failure(
+        job.attempt_n, job.max_attempts, _utc(),
+    )
+    job.status = status
+    if scheduled_for is not None:
+        job.scheduled_for = scheduled_for
+    if finished_at is not None:
+        job.finished_at = finished_at
+    job.leased_by = None
+    job.lease_expires_at = None
     job.last_error = (error or "")[:4000]
     await db.commit()
 
@@ -219,6 +502,133 @@ async def run_once(
     return job
 
 
+@dataclass
+class JobOutcome:
+    """What one leased job came to; `finish_batch()` writes a list of these."""
+    job_id: UUID
+    kind: str
+    attempt_n: int
+    max_attempts: int
+    result: Optional[dict] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def status(self) -> str:
+        if self.ok:
+            return JobStatus.succeeded.value
+        return _after_failure(self.attempt_n, self.max_attempts, _utc())[0]
+
+    def row(self, worker: str, now: datetime) -> dict[str, Any]:
+        if self.ok:
+            status, scheduled_for, finished_at = JobStatus.succeeded.value, None, now
+        else:
+            status, scheduled_for, finished_at = _after_failure(
+                self.attempt_n, self.max_attempts, now,
+            )
+        return {
+            "id": self.job_id,
+            "worker": worker,
+            "status": status,
+            "result": (
+                json.dumps(self.result, default=str)
+                if self.ok and self.result is not None else None
+            ),
+            "error": None if self.ok else self.error[:4000],
+            "scheduled_for": scheduled_for,
+            "finished_at": finished_at,
+        }
+
+
+_FINISH_SQL = """
+UPDATE background_jobs
+   SET status = CAST(:status AS job_status),
+       result_jsonb = COALESCE(CAST(:result AS jsonb), result_jsonb),
+       last_error = COALESCE(:error, last_error),
+       scheduled_for = COALESCE(:scheduled_for, scheduled_for),
+       finished_at = COALESCE(:finished_at, finished_at),
+       leased_by = NULL,
+       lease_expires_at = NULL
+ WHERE id = :id
+   AND status = 'running'
+   AND leased_by = :worker
+"""
+
+
+async def finish_batch(
+    db: AsyncSession, *, worker: str, outcomes: list[JobOutcome],
+) -> None:
+    """Write every outcome of a batch in one executemany UPDATE and commit.
+
+    A job the reaper took back (and maybe another worker re-leased) no longer
+    matches `leased_by = :worker`, so its stale outcome is dropped."""
+    if not outcomes:
+        return
+    now = _utc()
+    await db.execute(text(_FINISH_SQL), [o.row(worker, now) for o in outcomes])
+    await db.commit()
+
+
+async def run_batch(
+    db: AsyncSession,
+    *,
+    worker: Optional[str] = None,
+    limit: int = 20,
+    lease_seconds: int = 300,
+    kinds: Optional[list[str]] = None,
+) -> list[JobOutcome]:
+    """Lease up to `limit` jobs, run them in turn, record the outcomes together.
+
+    Each handler's own writes commit (or roll back, on error) before the next
+    one runs, so one failing job cannot undo another's work. `lease_seconds`
+    only has to cover one renewal interval: the leases of the running job and
+    of those after it are renewed before each job and by a heartbeat while
+    its handler works (never both at once, so the two sessions cannot
+    deadlock on the rows). A job that was reaped in the meantime is
+    skipped and gets no outcome."""
+    worker = worker or _worker_id()
+    leased = await lease_batch(
+        db, worker=worker, limit=limit, lease_seconds=lease_seconds, kinds=kinds,
+    )
+    # Plain values up front: a rollback expires the ORM rows, and lazy
+    # refreshes are not available on an AsyncSession.
+    work = [
+        (JobOutcome(j.id, j.kind, j.attempt_n, j.max_attempts), j.payload or {})
+        for j in leased
+    ]
+    outcomes: list[JobOutcome] = []
+    for i, (outcome, payload) in enumerate(work):
+        unfinished = [o.job_id for o, _ in work[i:]]
+        held = await renew_leases(
+            db, worker=worker, job_ids=unfinished, lease_seconds=lease_seconds,
+        )
+        if outcome.job_id not in held:
+            logger.warning("job %s was reaped before it ran; skipping it", outcome.job_id)
+            continue
+        handler = _HANDLERS.get(outcome.kind)
+        if handler is None:
+            outcome.error = f"no handler registered for kind={outcome.kind}"
+        else:
+            heartbeat = asyncio.create_task(_heartbeat(
+                db, worker=worker, job_ids=unfinished, lease_seconds=lease_seconds,
+            ))
+            try:
+                outcome.result = await handler(db, payload)
+                await db.commit()
+            except Exception as exc:
+                await db.rollback()
+                outcome.error = f"{exc}\n{traceback.format_exc()[-1500:]}"
+            finally:
+                heartbeat.cancel()
+                await asyncio.gather(heartbeat, return_exceptions=True)
+        outcomes.append(outcome)
+    await finish_batch(db, worker=worker, outcomes=outcomes)
+    return outcomes
+
+
 async def stats(db: AsyncSession) -> dict:
     rows = (
         await db.execute(text(
@@ -283,9 +693,12 @@ async def _email_send(db: AsyncSession, payload: dict) -> dict:
     return {"sends": len(sends)}
 
 
-@register("rank.recompute")
+@register("rank.recompute", concurrency=1)
 async def _rank_recompute(db: AsyncSession, payload: dict) -> dict:
-    """Refresh Phase 10.3 marketplace ranking."""
+    """Refresh Phase 10.3 marketplace ranking.
+
+    Every run rescores all published listings, so a second one running
+    alongside only contends for the same rows; the cap keeps it to one."""
     from app.services import marketplace_ranking as rank_svc
     n = await rank_svc.recompute_all_published(db)
     return {"listings_updated": n}
@@ -333,15 +746,97 @@ async def _compliance_delete_sweep(db: AsyncSession, payload: dict) -> dict:
     from app.services import erasure as erasure_svc
     limit = int(payload.get("limit") or 100)
     due = await erasure_svc.due_deletions(db, limit=limit)
-    queued = 0
-    for deletion_id in due:
-        job = await enqueue(
-            db,
-            kind="compliance.delete.execute",
-            payload={"deletion_id": str(deletion_id)},
-            dedupe_key=f"compliance.delete.execute:{deletion_id}",
-            priority=50,
-        )
-        if job is not None:
-            queued += 1
+    queued = await enqueue_many(
+        db,
+        kind="compliance.delete.execute",
+        payloads=[{"deletion_id": str(d)} for d in due],
+        dedupe_keys=[f"compliance.delete.execute:{d}" for d in due],
+        priority=50,
+    )
     return {"due": len(due), "queued": queued}
+
+
+@register("cohort.snapshot.refresh")
+async def _cohort_snapshot_refresh(db: AsyncSession, payload: dict) -> dict:
+    """Recompute one cohort's analytics + at-risk snapshot."""
+    from uuid import UUID as _UUID
+    from app.services import cohort_analytics as cohort_svc
+    cohort_id = payload.get("cohort_id")
+    if not cohort_id:
+        raise ValueError("cohort_id is required")
+    snap = await cohort_svc.refresh_snapshot(db, _UUID(cohort_id))
+    return {"cohort_id": cohort_id, "learners": snap.aggregate.get("n_learners", 0)}
+
+
+@register("cohort.snapshot.sweep")
+async def _cohort_snapshot_sweep(db: AsyncSession, payload: dict) -> dict:
+    """Enqueue a refresh for each cohort whose snapshot is stale, missing or old.
+
+    Same shape as `compliance.delete.sweep`: the triggers only mark, the sweep
+    notices, and the dedupe key keeps a busy cohort to one queued refresh no
+    matter how many attempts its learners log between passes."""
+    from app.services import cohort_analytics as cohort_svc
+    limit = int(payload.get("limit") or 200)
+    due = await cohort_svc.snapshots_due(db, limit=limit)
+    queued = await enqueue_many(
+        db,
+        kind="cohort.snapshot.refresh",
+        payloads=[{"cohort_id": str(c)} for c in due],
+        dedupe_keys=[f"cohort.snapshot.refresh:{c}" for c in due],
+        priority=150,
+    )
+    return {"due": len(due), "queued": queued}
+
+
+@register("recommender.precompute")
+async def _recommender_precompute(db: AsyncSession, payload: dict) -> dict:
+    """Warm the cached recommendations for a batch of learners."""
+    from uuid import UUID as _UUID
+    from app.services import recommender as rec_svc
+    user_ids = [_UUID(u) for u in payload.get("user_ids") or []]
+    if not user_ids:
+        raise ValueError("user_ids is required")
+    return await rec_svc.precompute(db, user_ids)
+
+
+@register("recommender.precompute.sweep")
+async def _recommender_precompute_sweep(db: AsyncSession, payload: dict) -> dict:
+    """Fan `recommender.precompute` out over recently active learners.
+
+    Batches of `batch` learners, one job each. `precompute` skips anyone whose
+    cached result is still current, so a pass over an idle population is one
+    version query per batch. Each batch position has a dedupe key, so while
+    the last pass's jobs are still queued or running a new pass only adds
+    the batches it has beyond them instead of stacking a second full set."""
+    from app.services import recommender as rec_svc
+    batch = int(payload.get("batch") or 200)
+    learners = await rec_svc.active_learners(db, since_days=int(payload.get("since_days") or 14))
+    chunks = [learners[i:i + batch] for i in range(0, len(learners), batch)]
+    queued = await enqueue_many(
+        db,
+        kind="recommender.precompute",
+        payloads=[{"user_ids": [str(u) for u in chunk]} for chunk in chunks],
+        dedupe_keys=[f"recommender.precompute:{i}" for i in range(len(chunks))],
+        priority=200,
+        max_attempts=2,
+    )
+    return {"learners": len(learners), "queued": queued}
+
+
+@register("embeddings.backfill", concurrency=1)
+async def _embeddings_backfill(db: AsyncSession, payload: dict) -> dict:
+    """Embed items and re-embed chunks the active model hasn't written.
+
+    Commits per batch and skips what is already current, so a retry after a
+    timeout picks up where the last attempt stopped. One at a time: two
+    would embed the same rows."""
+    from app.services import embeddings
+    target = payload.get("target") or "all"
+    if target not in ("items", "chunks", "all"):
+        raise ValueError(f"unknown target: {target}")
+    out: dict = {"model": embeddings.get_embedder().model}
+    if target in ("items", "all"):
+        out["items"] = (await embeddings.backfill_items(db)).as_dict()
+    if target in ("chunks", "all"):
+        out["chunks"] = (await embeddings.reembed_chunks(db)).as_dict()
+    return out
@@ -8,117 +8,443 @@ default-bucket histogram for HTTP latency.
 
 If `prometheus_client` is installed later, we can swap the implementation
 without touching call sites.
+
+Recording cost. Every HTTP request passes through observe_http, so the
+recording side is built to stay out of request flame graphs:
+
+  - No lock on the hot path. Each labelled series keeps one small list of
+    cells per thread (a shard), found through a threading.local; the event
+    loop's thread only ever touches its own. A scrape sums the shards.
+    The first version took one module-wide lock for every inc/observe.
+  - Bucket lookup is one bisect. The first version walked every edge and
+    incremented every bucket at or above the value, which the exposition
+    then accumulated a second time, so each `le` line over-counted. Cells
+    now hold per-bucket counts plus an overflow cell and the sum; the count
+    is their total and the exposition accumulates exactly once.
+  - A series resolves once. `metric.labels(...)` returns the series object
+    for a label set, and observe_http caches the pair it needs per
+    (method, prefix, status), so a request does two dict lookups rather
+    than building label tuples for two metrics.
+  - Label strings are rendered once per series, escaped, and reused by
+    every scrape. Series are exposed in first-seen order, not re-sorted.
+
+Multiprocess mode. Under `uvicorn --workers N` each worker has its own
+registry and a scrape lands on one of them at random. Set
+EUREKA_METRICS_DIR to a directory shared by the workers (empty it when the
+server starts, as with prometheus_client's multiprocess directory): each
+process then mirrors its totals into its own mmap'd file there every
+EUREKA_METRICS_FLUSH_INTERVAL seconds from a background thread, and
+expose() merges every file — counters and histograms summed, gauges taken
+from whichever process set them last. The hot path is the same in both
+modes; a scrape may trail the other workers by up to one flush interval.
+
+scripts/bench_metrics.py measures the per-observation cost.
 """
 
 from __future__ import annotations
 
+import json
+import mmap
+import os
+import struct
 import threading
 import time
-from collections import defaultdict
-from typing import Iterable
+import uuid
+from bisect import bisect_left
+from typing import Iterable, Iterator
 
-_LOCK = threading.Lock()
+_MULTIPROC_DIR = os.getenv("EUREKA_METRICS_DIR") or None
+FLUSH_INTERVAL_SECONDS = float(os.getenv("EUREKA_METRICS_FLUSH_INTERVAL", "1"))
 
+_REGISTRY: dict[str, "_Metric"] = {}
 
-class _Counter:
-    def __init__(self, name: str, help_text: str, labels: Iterable[str] = ()):
-        self.name = name
-        self.help_text = help_text
-        self.labels = tuple(labels)
-        self._values: dict[tuple[str, ...], float] = defaultdict(float)
 
-    def inc(self, amount: float = 1.0, **label_values) -> None:
-        key = tuple(label_values.get(lbl, "") for lbl in self.labels)
-        with _LOCK:
-            self._values[key] += amount
+def _escape(value: object) -> str:
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
 
-    def expose(self) -> list[str]:
-        out = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
-        if not self.labels:
-            v = self._values.get((), 0.0)
-            out.append(f"{self.name} {v}")
-        else:
-            for key, v in self._values.items():
-                labels = ",".join(f'{lbl}="{val}"' for lbl, val in zip(self.labels, key))
-                out.append(f"{self.name}{{{labels}}} {v}")
-        return out
 
+# ---------------------------------------------------------------------------
+# Series
+# ---------------------------------------------------------------------------
+
+
+class _Series:
+    """One label set of one metric: per-thread cells, summed on read."""
+
+    __slots__ = ("_width", "_local", "_shards", "_lock")
+
+    def __init__(self, width: int):
+        self._width = width
+        self._local = threading.local()
+        self._shards: list[list[float]] = []
+        self._lock = threading.Lock()
+
+    def _cells(self) -> list[float]:
+        try:
+            return self._local.cells
+        except AttributeError:
+            cells = [0.0] * self._width
+            with self._lock:
+                self._shards.append(cells)
+            self._local.cells = cells
+            return cells
+
+    def totals(self) -> list[float]:
+        with self._lock:
+            shards = list(self._shards)
+        if not shards:
+            return [0.0] * self._width
+        return [sum(col) for col in zip(*shards)]
+
+    def _reset(self) -> None:
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()
+
+
+class _CounterSeries(_Series):
+    __slots__ = ()
+
+    def inc(self, amount: float = 1.0) -> None:
+        try:
+            cells = self._local.cells
+        except AttributeError:
+            cells = self._cells()
+        cells[0] += amount
+
+
+class _GaugeSeries(_Series):
+    """Last write wins, so there is nothing to shard: one value and when it was set."""
+
+    __slots__ = ("_value",)
+
+    def __init__(self, width: int):
+        super().__init__(width)
+        self._value = (0.0, 0.0)
+
+    def set(self, value: float) -> None:
+        self._value = (float(value), time.time())
+
+    def totals(self) -> list[float]:
+        return list(self._value)
+
+    def _reset(self) -> None:
+        self._value = (0.0, 0.0)
+
+
+class _HistogramSeries(_Series):
+    __slots__ = ("_edges",)
+
+    def __init__(self, width: int, edges: tuple[float, ...]):
+        super().__init__(width)
+        self._edges = edges
+
+    def observe(self, seconds: float) -> None:
+        try:
+            cells = self._local.cells
+        except AttributeError:
+            cells = self._cells()
+        # cells: one per bucket, one for +Inf overflow, then the sum.
+        cells[bisect_left(self._edges, seconds)] += 1
+        cells[-1] += seconds
+
+
+# ---------------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------------
+
+
+class _Metric:
+    kind = ""
+    width = 1
+    series_class: type[_Series] = _Series
 
-class _Gauge:
     def __init__(self, name: str, help_text: str, labels: Iterable[str] = ()):
         self.name = name
         self.help_text = help_text
-        self.labels = tuple(labels)
-        self._values: dict[tuple[str, ...], float] = defaultdict(float)
+        self.labels_names = tuple(labels)
+        self._series: dict[tuple, _Series] = {}
+        self._rendered: dict[tuple, tuple[str, ...]] = {}
+        self._lock = threading.Lock()
+        self._header = (
+            f"# HELP {name} {help_text}",
+            f"# TYPE {name} {self.kind}",
+        )
+        _REGISTRY[name] = self
+        if not self.labels_names:
+            self._child(())
 
-    def set(self, value: float, **label_values) -> None:
-        key = tuple(label_values.get(lbl, "") for lbl in self.labels)
-        with _LOCK:
-            self._values[key] = float(value)
+    def _new_series(self) -> _Series:
+        return self.series_class(self.width)
 
-    def expose(self) -> list[str]:
-        out = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge"]
-        if not self.labels:
-            v = self._values.get((), 0.0)
-            out.append(f"{self.name} {v}")
-        else:
-            for key, v in self._values.items():
-                labels = ",".join(f'{lbl}="{val}"' for lbl, val in zip(self.labels, key))
-                out.append(f"{self.name}{{{labels}}} {v}")
+    def _child(self, key: tuple) -> _Series:
+        series = self._series.get(key)
+        if series is None:
+            with self._lock:
+                series = self._series.get(key)
+                if series is None:
+                    series = self._series[key] = self._new_series()
+                    _ensure_writer()
+        return series
+
+    def labels(self, **label_values) -> _Series:
+        """The series for one label set. Hold on to it to skip the lookup."""
+        return self._child(tuple(label_values.get(lbl, "") for lbl in self.labels_names))
+
+    def _label_string(self, key: tuple) -> str:
+        return ",".join(
+            f'{lbl}="{_escape(val)}"' for lbl, val in zip(self.labels_names, key)
+        )
+
+    def _prefixes(self, key: tuple) -> tuple[str, ...]:
+        rendered = self._rendered.get(key)
+        if rendered is None:
+            rendered = self._rendered[key] = self._render_prefixes(self._label_string(key))
+        return rendered
+
+    def _render_prefixes(self, labels: str) -> tuple[str, ...]:
+        return (f"{self.name}{{{labels}}} " if labels else f"{self.name} ",)
+
+    def _lines(self, key: tuple, cells: list[float]) -> list[str]:
+        return [self._prefixes(key)[0] + repr(float(cells[0]))]
+
+    def snapshot(self) -> Iterator[tuple[tuple, list[float]]]:
+        for key, series in list(self._series.items()):
+            yield key, series.totals()
+
+    def render(self, values: Iterable[tuple[tuple, list[float]]]) -> list[str]:
+        out = list(self._header)
+        for key, cells in values:
+            out.extend(self._lines(key, cells))
         return out
 
+    def expose(self) -> list[str]:
+        return self.render(self.snapshot())
+
+
+class _Counter(_Metric):
+    kind = "counter"
+    series_class = _CounterSeries
 
-class _Histogram:
+    def inc(self, amount: float = 1.0, **label_values) -> None:
+        self.labels(**label_values).inc(amount)
+
+
+class _Gauge(_Metric):
+    kind = "gauge"
+    width = 2   # value, time it was set
+    series_class = _GaugeSeries
+
+    def set(self, value: float, **label_values) -> None:
+        self.labels(**label_values).set(value)
+
+
+class _Histogram(_Metric):
     """Single histogram with Prometheus-default buckets (in seconds)."""
+    kind = "histogram"
     BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    width = len(BUCKETS) + 2
 
-    def __init__(self, name: str, help_text: str, labels: Iterable[str] = ()):
-        self.name = name
-        self.help_text = help_text
-        self.labels = tuple(labels)
-        # per-label-tuple: list of bucket counters + sum + count
-        self._buckets: dict[tuple[str, ...], list[int]] = defaultdict(
-            lambda: [0] * len(self.BUCKETS)
-        )
-        self._sum: dict[tuple[str, ...], float] = defaultdict(float)
-        self._count: dict[tuple[str, ...], int] = defaultdict(int)
+    def _new_series(self) -> _Series:
+        return _HistogramSeries(self.width, self.BUCKETS)
 
     def observe(self, seconds: float, **label_values) -> None:
-        key = tuple(label_values.get(lbl, "") for lbl in self.labels)
-        with _LOCK:
-            self._count[key] += 1
-            self._sum[key] += seconds
-            for i, edge in enumerate(self.BUCKETS):
-                if seconds <= edge:
-                    self._buckets[key][i] += 1
+        self.labels(**label_values).observe(seconds)
 
-    def expose(self) -> list[str]:
-        out = [
-            f"# HELP {self.name} {self.help_text}",
-            f"# TYPE {self.name} histogram",
-        ]
-        all_keys = set(self._count.keys()) | set(self._sum.keys()) | set(self._buckets.keys())
-        if not all_keys:
-            all_keys = {()}
-        for key in sorted(all_keys):
-            base_labels = ",".join(f'{lbl}="{val}"' for lbl, val in zip(self.labels, key))
-            sep = "," if base_labels else ""
-            buckets = self._buckets.get(key, [0] * len(self.BUCKETS))
-            cumulative = 0
-            for i, edge in enumerate(self.BUCKETS):
-                cumulative += buckets[i]
-                out.append(
-                    f'{self.name}_bucket{{{base_labels}{sep}le="{edge}"}} {cumulative}'
-                )
-            count = self._count.get(key, 0)
-            out.append(
-                f'{self.name}_bucket{{{base_labels}{sep}le="+Inf"}} {count}'
-            )
-            out.append(f"{self.name}_sum{{{base_labels}}} {self._sum.get(key, 0.0)}")
-            out.append(f"{self.name}_count{{{base_labels}}} {count}")
+    def _render_prefixes(self, labels: str) -> tuple[str, ...]:
+        sep = "," if labels else ""
+        braces = f"{{{labels}}}" if labels else ""
+        buckets = tuple(
+            f'{self.name}_bucket{{{labels}{sep}le="{edge}"}} ' for edge in self.BUCKETS
+        )
+        return buckets + (
+            f'{self.name}_bucket{{{labels}{sep}le="+Inf"}} ',
+            f"{self.name}_sum{braces} ",
+            f"{self.name}_count{braces} ",
+        )
+
+    def _lines(self, key: tuple, cells: list[float]) -> list[str]:
+        prefixes = self._prefixes(key)
+        n = len(self.BUCKETS)
+        out = []
+        cumulative = 0
+        for i in range(n):
+            cumulative += int(cells[i])
+            out.append(f"{prefixes[i]}{cumulative}")
+        count = cumulative + int(cells[n])
+        out.append(f"{prefixes[n]}{count}")
+        out.append(f"{prefixes[n + 1]}{float(cells[n + 1])}")
+        out.append(f"{prefixes[n + 2]}{count}")
         return out
 
 
+# ---------------------------------------------------------------------------
+# Multiprocess mode
+# ---------------------------------------------------------------------------
+
+
+class _MmapFile:
+    """One process's metric values, in a file other processes can read.
+
+    Layout: an 8-byte magic, then the number of bytes in use, then entries.
+    An entry is a uint32 key length, the UTF-8 key, padding to 8 bytes, and
+    two doubles (value, stamp). Entries are only appended, and the used
+    length is written after the entry, so a reader never sees half of one.
+    """
+
+    MAGIC = b"EUREKAM1"
+    _HEADER = struct.Struct("<8sQ")
+    _KEYLEN = struct.Struct("<I")
+    _VALUE = struct.Struct("<dd")
+
+    def __init__(self, path: str, capacity: int = 1 << 16):
+        self.path = path
+        self._fh = open(path, "w+b")
+        self._fh.truncate(capacity)
+        self._map = mmap.mmap(self._fh.fileno(), capacity)
+        self._used = self._HEADER.size
+        self._HEADER.pack_into(self._map, 0, self.MAGIC, self._used)
+        self._offsets: dict[str, int] = {}
+
+    def _grow(self, needed: int) -> None:
+        capacity = len(self._map)
+        while capacity < needed:
+            capacity *= 2
+        self._map.close()
+        self._fh.truncate(capacity)
+        self._map = mmap.mmap(self._fh.fileno(), capacity)
+
+    def write(self, key: str, value: float, stamp: float = 0.0) -> None:
+        offset = self._offsets.get(key)
+        if offset is None:
+            raw = key.encode()
+            start = self._used
+            offset = (start + self._KEYLEN.size + len(raw) + 7) & ~7
+            end = offset + self._VALUE.size
+            if end > len(self._map):
+                self._grow(end)
+            self._KEYLEN.pack_into(self._map, start, len(raw))
+            self._map[start + self._KEYLEN.size:start + self._KEYLEN.size + len(raw)] = raw
+            self._VALUE.pack_into(self._map, offset, value, stamp)
+            self._used = end
+            self._HEADER.pack_into(self._map, 0, self.MAGIC, end)
+            self._offsets[key] = offset
+            return
+        self._VALUE.pack_into(self._map, offset, value, stamp)
+
+    def close(self) -> None:
+        self._map.close()
+        self._fh.close()
+
+    @classmethod
+    def read(cls, path: str) -> Iterator[tuple[str, float, float]]:
+        with open(path, "rb") as fh:
+            data = fh.read()
+        if len(data) < cls._HEADER.size:
+            return
+        magic, used = cls._HEADER.unpack_from(data, 0)
+        if magic != cls.MAGIC:
+            return
+        pos = cls._HEADER.size
+        while pos + cls._KEYLEN.size <= used:
+            (n,) = cls._KEYLEN.unpack_from(data, pos)
+            key = data[pos + cls._KEYLEN.size:pos + cls._KEYLEN.size + n].decode()
+            offset = (pos + cls._KEYLEN.size + n + 7) & ~7
+            value, stamp = cls._VALUE.unpack_from(data, offset)
+            yield key, value, stamp
+            pos = offset + cls._VALUE.size
+
+
+def _file_key(name: str, key: tuple, slot: int) -> str:
+    return json.dumps([name, list(key), slot], separators=(",", ":"))
+
+
+_writer: _MmapFile | None = None
+_writer_pid: int | None = None
+_writer_lock = threading.Lock()
+
+
+def flush() -> None:
+    """Mirror this process's totals into its file. No-op outside multiprocess mode."""
+    if _writer is None:
+        return
+    with _writer_lock:
+        for metric in list(_REGISTRY.values()):
+            for key, cells in metric.snapshot():
+                if isinstance(metric, _Gauge):
+                    _writer.write(_file_key(metric.name, key, 0), cells[0], cells[1])
+                    continue
+                for slot, value in enumerate(cells):
+                    _writer.write(_file_key(metric.name, key, slot), value)
+
+
+def _flush_loop() -> None:
+    while True:
+        time.sleep(FLUSH_INTERVAL_SECONDS)
+        try:
+            flush()
+        except Exception:
+            # A metrics file problem must never take a worker down.
+            pass
+
+
+def _ensure_writer() -> None:
+    global _writer, _writer_pid
+    if _MULTIPROC_DIR is None or _writer_pid == os.getpid():
+        return
+    with _writer_lock:
+        if _writer_pid == os.getpid():
+            return
+        os.makedirs(_MULTIPROC_DIR, exist_ok=True)
+        path = os.path.join(_MULTIPROC_DIR, f"metrics_{os.getpid()}_{uuid.uuid4().hex[:8]}.db")
+        _writer = _MmapFile(path)
+        _writer_pid = os.getpid()
+    threading.Thread(target=_flush_loop, name="metrics-flush", daemon=True).start()
+
+
+def _after_fork() -> None:
+    # A forked worker starts from zero and writes its own file; otherwise it
+    # would report the parent's counts a second time.
+    global _writer, _writer_pid, _writer_lock
+    _writer, _writer_pid, _writer_lock = None, None, threading.Lock()
+    for metric in _REGISTRY.values():
+        metric._lock = threading.Lock()
+        for series in metric._series.values():
+            series._reset()
+    _ensure_writer()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+def _merged(directory: str) -> dict[str, dict[tuple, list[float]]]:
+    """Every process file in directory, summed per series (gauges: latest set wins)."""
+    out: dict[str, dict[tuple, list[float]]] = {}
+    stamps: dict[tuple[str, tuple], float] = {}
+    for entry in sorted(os.listdir(directory)):
+        if not entry.endswith(".db"):
+            continue
+        try:
+            values = list(_MmapFile.read(os.path.join(directory, entry)))
+        except OSError:
+            continue
+        for raw, value, stamp in values:
+            name, key, slot = json.loads(raw)
+            metric = _REGISTRY.get(name)
+            if metric is None:
+                continue
+            key = tuple(key)
+            cells = out.setdefault(name, {}).setdefault(key, [0.0] * metric.width)
+            if isinstance(metric, _Gauge):
+                if stamp >= stamps.get((name, key), -1.0):
+                    stamps[(name, key)] = stamp
+                    cells[0], cells[1] = value, stamp
+            else:
+                cells[slot] += value
+    return out
+
+
 # ---------------------------------------------------------------------------
 # Public metrics
 # ---------------------------------------------------------------------------
@@ -145,26 +471,65 @@ jobs_queue_depth = _Gauge(
 )
 cache_hits_total = _Counter("eureka_cache_hits_total", "Cache hits.")
 cache_misses_total = _Counter("eureka_cache_misses_total", "Cache misses.")
+audit_records_total = _Counter(
+    "eureka_audit_records_total",
+    "Audit records persisted, by sink.",
+    labels=("sink",),
+)
+audit_write_failures_total = _Counter(
+    "eureka_audit_write_failures_total",
+    "Audit batches a sink failed to write, by sink.",
+    labels=("sink",),
+)
+audit_queue_full_total = _Counter(
+    "eureka_audit_queue_full_total",
+    "Requests that waited for room in a full audit queue.",
+)
+audit_queue_depth = _Gauge(
+    "eureka_audit_queue_depth",
+    "Audit records waiting to be written, as of the last batch.",
+)
 
 
 def _path_prefix(path: str) -> str:
     """Cardinality control: only keep the first two URL segments."""
+    parts = path.split("/", 3)
+    if len(parts) > 2 and not parts[0] and parts[1] and parts[2]:
+        return f"/{parts[1]}/{parts[2]}"
     parts = [p for p in path.split("/") if p]
     return "/" + "/".join(parts[:2]) if parts else "/"
 
 
+_http_series: dict[tuple[str, str, int], tuple[_CounterSeries, _HistogramSeries]] = {}
+
+
 def observe_http(*, method: str, path: str, status: int, duration_seconds: float) -> None:
     prefix = _path_prefix(path)
-    http_requests_total.inc(method=method, path_prefix=prefix, status=str(status))
-    http_request_duration_seconds.observe(duration_seconds, method=method, path_prefix=prefix)
+    pair = _http_series.get((method, prefix, status))
+    if pair is None:
+        pair = _http_series[(method, prefix, status)] = (
+            http_requests_total.labels(method=method, path_prefix=prefix, status=str(status)),
+            http_request_duration_seconds.labels(method=method, path_prefix=prefix),
+        )
+    pair[0].inc()
+    pair[1].observe(duration_seconds)
 
 
 def expose() -> str:
-    lines: list[str] = []
-    for m in (
+    metrics = (
         http_requests_total, http_request_duration_seconds,
         jobs_executed_total, jobs_queue_depth,
         cache_hits_total, cache_misses_total,
-    ):
-        lines.extend(m.expose())
+        audit_records_total, audit_write_failures_total,
+        audit_queue_full_total, audit_queue_depth,
+    )
+    lines: list[str] = []
+    if _MULTIPROC_DIR is not None and _writer is not None:
+        flush()
+        merged = _merged(_MULTIPROC_DIR)
+        for m in metrics:
+            lines.extend(m.render(merged.get(m.name, {}).items()))
+    else:
+        for m in metrics:
+            lines.extend(m.expose())
     return "\n".join(lines) + "\n"
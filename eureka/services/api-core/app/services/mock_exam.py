@@ -4,7 +4,8 @@ Mock exam service (Phase 7 Session 7.4, 2026-05).
 generate_mock_items()    Pick N items from the blueprint's source banks,
                          weighted to match skill_weights, within the
                          blueprint's IRT difficulty window. Returns an
-                         ordered list of (item_id, position).
+                         ordered list of (item_id, position). Samples
+                         from a compiled per-bank index, not the tables.
 
 score_mock_attempt()     After the learner submits, fetch every answered
                          item, fit a theta via IRT, map to scaled score,
@@ -14,18 +15,20 @@ score_mock_attempt()     After the learner submits, fetch every answered
 
 from __future__ import annotations
 
-import random
+import time
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from typing import Any
 from uuid import UUID
 
+import numpy as np
 from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.exam import (
     AttemptLog, ExamBlueprint, MockAttempt, MockAttemptItem, MockAttemptStatus,
 )
-from app.models.item_bank import Item, ItemBank
+from app.models.item_bank import Item
 from app.services.irt import (
     estimate_theta_and_se, p_correct, pass_probability, scaled_score,
 )
@@ -34,34 +37,147 @@ from app.services.irt import (
 # ---------------------------------------------------------------------------
 # Item picking
 # ---------------------------------------------------------------------------
+#
+# Mock starts used to run one `ORDER BY random() LIMIT n` per skill quota
+# plus a backfill, each a scan of the tagged items. Now the eligible pool
+# for a (banks, b-window) is compiled once into arrays and sampled in
+# memory, so assembling a 280-item mock costs the same for a bank of 2k
+# items as for one of 200k.
+#
+# An index is reused while item_bank_generations holds the counters it was
+# compiled against; triggers on items and content_skills bump them when a
+# calibration, review or retag changes what a blueprint may draw. The check
+# rides on the same query that resolves the bank slugs. INDEX_MAX_AGE_SECONDS
+# bounds anything the triggers do not see (a skill code renamed) and lets
+# other workers' exposure counts flow back in.
+
+B_BAND_WIDTH = 0.5
+INDEX_MAX_AGE_SECONDS = 3600
+
+_UNCALIBRATED = -1   # band for items with no b yet: in every window
+_OUTSIDE = -2        # b outside the window: backfill only
+
+_BANKS_SQL = """
+SELECT b.id, COALESCE(g.generation, 0)
+FROM item_banks b
+LEFT JOIN item_bank_generations g ON g.bank_id = b.id
+WHERE b.slug = ANY(:slugs)
+ORDER BY b.id
+"""
 
+_ITEMS_SQL = """
+SELECT i.id, i.irt_difficulty
+FROM items i
+WHERE i.bank_id = ANY(:banks)
+  AND i.deleted_at IS NULL
+  AND i.review_status IN ('approved', 'draft')
+"""
 
-async def generate_mock_items(
-    db: AsyncSession,
-    blueprint: ExamBlueprint,
-) -> list[tuple[UUID, int]]:
-    """
-    Returns a list of (item_id, position) tuples — `blueprint.item_count`
-    items balanced across skill_weights, drawn from `blueprint.bank_slugs`,
-    optionally constrained by the IRT b range.
+_TAGS_SQL = """
+SELECT s.code, cs.content_id
+FROM content_skills cs
+JOIN skills s ON s.id = cs.skill_id
+JOIN items i ON i.id = cs.content_id
+WHERE cs.content_kind = 'question'
+  AND i.bank_id = ANY(:banks)
+  AND i.deleted_at IS NULL
+  AND i.review_status IN ('approved', 'draft')
+"""
 
-    Algorithm:
-      1. Compute per-skill quota from skill_weights (normalised + rounded
-         to total = item_count).
-      2. For each (skill, quota) sample `quota` items from the bank(s)
-         tagged into that skill, within the b-range if calibrated.
-      3. If any quota underfills (insufficient items), backfill randomly
-         from the bank pool ignoring skill weights.
-      4. Shuffle positions.
-    """
-    # Resolve bank IDs
-    bank_q = await db.execute(
-        select(ItemBank).where(ItemBank.slug.in_(blueprint.bank_slugs))
+_EXPOSURE_SQL = """
+SELECT mai.item_id, COUNT(*)
+FROM mock_attempt_items mai
+JOIN items i ON i.id = mai.item_id
+WHERE i.bank_id = ANY(:banks)
+GROUP BY mai.item_id
+"""
+
+
+@dataclass
+class _BlueprintIndex:
+    """Everything a blueprint can draw, as arrays over one item ordering."""
+
+    stamp: tuple
+    item_ids: list[UUID]
+    band: np.ndarray                 # b-band per item, or _UNCALIBRATED / _OUTSIDE
+    exposure: np.ndarray             # times served in a mock, this process included
+    by_skill: dict[str, np.ndarray]  # skill code -> in-window item positions
+    built_at: float = field(default_factory=time.monotonic)
+
+
+_INDEXES: dict[tuple, _BlueprintIndex] = {}
+_rng = np.random.default_rng()
+
+
+def _bands(b: np.ndarray, b_lo: float, b_hi: float) -> np.ndarray:
+    """Band number per difficulty; NaN is uncalibrated."""
+    calibrated = ~np.isnan(b)
+    inside = calibrated & (b >= b_lo) & (b <= b_hi)
+    band = np.full(len(b), _OUTSIDE, dtype=np.int64)
+    band[~calibrated] = _UNCALIBRATED
+    band[inside] = np.floor((b[inside] - b_lo) / B_BAND_WIDTH).astype(np.int64)
+    return band
+
+
+def _build_index(
+    stamp: tuple,
+    items: list[tuple[UUID, Any]],
+    tags: list[tuple[str, UUID]],
+    exposure: dict[UUID, int],
+    b_lo: float,
+    b_hi: float,
+) -> _BlueprintIndex:
+    item_ids = [row[0] for row in items]
+    pos = {iid: k for k, iid in enumerate(item_ids)}
+    b = np.array([np.nan if row[1] is None else float(row[1]) for row in items], dtype=float)
+    band = _bands(b, b_lo, b_hi)
+
+    members: dict[str, list[int]] = {}
+    for code, content_id in tags:
+        k = pos.get(content_id)
+        if k is not None and band[k] != _OUTSIDE:
+            members.setdefault(code, []).append(k)
+    by_skill = {code: np.unique(np.array(ks, dtype=np.int64)) for code, ks in members.items()}
+
+    return _BlueprintIndex(
+        stamp=stamp,
+        item_ids=item_ids,
+        band=band,
+        exposure=np.array([exposure.get(iid, 0) for iid in item_ids], dtype=float),
+        by_skill=by_skill,
     )
-    bank_ids = [b.id for b in bank_q.scalars().all()]
-    if not bank_ids:
-        return []
 
+
+async def _blueprint_index(
+    db: AsyncSession,
+    blueprint: ExamBlueprint,
+    b_lo: float,
+    b_hi: float,
+) -> _BlueprintIndex | None:
+    r = await db.execute(text(_BANKS_SQL), {"slugs": list(blueprint.bank_slugs or [])})
+    stamp = tuple((str(bank_id), int(gen)) for bank_id, gen in r.fetchall())
+    if not stamp:
+        return None
+    key = (tuple(bank for bank, _ in stamp), b_lo, b_hi)
+    index = _INDEXES.get(key)
+    if (
+        index is not None
+        and index.stamp == stamp
+        and time.monotonic() - index.built_at < INDEX_MAX_AGE_SECONDS
+    ):
+        return index
+
+    params = {"banks": list(key[0])}
+    items = (await db.execute(text(_ITEMS_SQL), params)).fetchall()
+    tags = (await db.execute(text(_TAGS_SQL), params)).fetchall()
+    exposure = {iid: int(n) for iid, n in (await db.execute(text(_EXPOSURE_SQL), params)).fetchall()}
+    index = _build_index(stamp, items, tags, exposure, b_lo, b_hi)
+    _INDEXES[key] = index
+    return index
+
+
+def _quotas(blueprint: ExamBlueprint) -> dict[str, int]:
+    """Per-skill quota from skill_weights (normalised + rounded to total = item_count)."""
     weights: list[dict[str, Any]] = blueprint.skill_weights or []
     total_weight = sum(float(w.get("weight", 0)) for w in weights) or 1.0
     item_count = blueprint.item_count
@@ -84,69 +200,128 @@ async def generate_mock_items(
                 i += 1
                 if i > 1000:
                     break
+    return quotas
+
+
+def _allocate(n: int, sizes: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """
+    Split n across strata in proportion to their sizes. Each stratum gets
+    the floor of its share; the leftover units go to strata drawn with
+    probability proportional to the fractions dropped, so a band too small
+    for a whole unit still turns up in its share of mocks.
+    """
+    share = n * sizes / sizes.sum()
+    alloc = np.floor(share).astype(np.int64)
+    short = n - int(alloc.sum())
+    if short > 0:
+        frac = share - alloc
+        alloc[rng.choice(len(sizes), short, replace=False, p=frac / frac.sum())] += 1
+    return alloc
+
+
+def _draw(
+    pool: np.ndarray,
+    n: int,
+    exposure: np.ndarray,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """
+    n positions from pool without replacement, favouring rarely served
+    items: Efraimidis-Spirakis keys u^(1/w) with w falling with an item's
+    exposure relative to the pool's mean. A never-served item weighs 1,
+    one served at the mean about a quarter of that, so heavy hitters rest
+    without being excluded.
+    """
+    if n <= 0:
+        return pool[:0]
+    if len(pool) <= n:
+        return pool
+    e = exposure[pool]
+    w = 1.0 / (1.0 + e / (e.mean() + 1.0)) ** 2
+    keys = np.log(rng.random(len(pool))) / w
+    return pool[np.argpartition(-keys, n - 1)[:n]]
+
+
+def _stratified(
+    pool: np.ndarray,
+    n: int,
+    index: _BlueprintIndex,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """Draw n from pool with every b-band represented in proportion to its size."""
+    if len(pool) <= n:
+        return pool
+    bands = index.band[pool]
+    labels, sizes = np.unique(bands, return_counts=True)
+    picked = [
+        _draw(pool[bands == label], int(k), index.exposure, rng)
+        for label, k in zip(labels, _allocate(n, sizes, rng))
+    ]
+    return np.concatenate(picked)
+
+
+def _assemble(
+    index: _BlueprintIndex,
+    quotas: dict[str, int],
+    item_count: int,
+    rng: np.random.Generator,
+) -> list[UUID]:
+    taken = np.zeros(len(index.item_ids), dtype=bool)
+    selected: list[np.ndarray] = []
+    for skill_code, n in quotas.items():
+        pool = index.by_skill.get(skill_code)
+        if pool is None:
+            continue
+        got = _stratified(pool[~taken[pool]], n, index, rng)
+        taken[got] = True
+        selected.append(got)
+
+    # Backfill if short, from the whole pool ignoring skill and b-window.
+    short = item_count - int(taken.sum())
+    if short > 0:
+        got = _draw(np.flatnonzero(~taken), short, index.exposure, rng)
+        taken[got] = True
+        selected.append(got)
+
+    order = np.concatenate(selected)[:item_count] if selected else np.zeros(0, dtype=np.int64)
+    index.exposure[order] += 1
+    rng.shuffle(order)
+    return [index.item_ids[k] for k in order]
+
+
+async def generate_mock_items(
+    db: AsyncSession,
+    blueprint: ExamBlueprint,
+    *,
+    rng: np.random.Generator | None = None,
+) -> list[tuple[UUID, int]]:
+    """
+    Returns a list of (item_id, position) tuples — `blueprint.item_count`
+    items balanced across skill_weights, drawn from `blueprint.bank_slugs`,
+    optionally constrained by the IRT b range.
 
-    # Difficulty window
+    Algorithm:
+      1. Compute per-skill quota from skill_weights (normalised + rounded
+         to total = item_count).
+      2. For each (skill, quota) sample `quota` distinct items tagged into
+         that skill within the b-range (uncalibrated items count as in
+         range), split across 0.5-wide b-bands in proportion to the bands'
+         sizes and weighted away from items served in many mocks.
+      3. If any quota underfills (insufficient items), backfill from the
+         bank pool ignoring skill weights and the b-range.
+      4. Shuffle positions.
+    """
     b_lo, b_hi = (-3.0, 3.0)
     if blueprint.difficulty_b_range and len(blueprint.difficulty_b_range) == 2:
         b_lo, b_hi = float(blueprint.difficulty_b_range[0]), float(blueprint.difficulty_b_range[1])
 
-    selected: list[UUID] = []
-    if quotas:
-        for skill_code, n in quotas.items():
-            sql = """
-            SELECT i.id
-            FROM items i
-            JOIN content_skills cs
-              ON cs.content_kind = 'question' AND cs.content_id = i.id
-            JOIN skills s ON s.id = cs.skill_id
-            WHERE s.code = :code
-              AND i.bank_id = ANY(:banks)
-              AND i.deleted_at IS NULL
-              AND i.review_status IN ('approved', 'draft')
-              AND (i.irt_difficulty IS NULL
-                   OR (i.irt_difficulty BETWEEN :blo AND :bhi))
-            ORDER BY random()
-            LIMIT :n
-            """
-            r = await db.execute(
-                text(sql),
-                {"code": skill_code, "banks": [str(b) for b in bank_ids],
-                 "blo": b_lo, "bhi": b_hi, "n": n},
-            )
-            selected.extend(row[0] for row in r.fetchall())
-
-    # Backfill if short
-    if len(selected) < item_count:
-        sql = """
-        SELECT i.id
-        FROM items i
-        WHERE i.bank_id = ANY(:banks)
-          AND i.deleted_at IS NULL
-          AND i.review_status IN ('approved', 'draft')
-          AND i.id <> ALL(:excluded)
-        ORDER BY random()
-        LIMIT :n
-        """
-        r = await db.execute(
-            text(sql),
-            {
-                "banks": [str(b) for b in bank_ids],
-                "excluded": [str(s) for s in selected] or [str(uuid_zero())],
-                "n": item_count - len(selected),
-            },
-        )
-        selected.extend(row[0] for row in r.fetchall())
-
-    selected = selected[:item_count]
-    random.shuffle(selected)
+    index = await _blueprint_index(db, blueprint, b_lo, b_hi)
+    if index is None:
+        return []
+    selected = _assemble(index, _quotas(blueprint), blueprint.item_count, rng or _rng)
     return [(iid, idx) for idx, iid in enumerate(selected)]
 
 
-def uuid_zero():
-    from uuid import UUID
-    return UUID("00000000-0000-0000-0000-000000000000")
-
-
 # ---------------------------------------------------------------------------
 # Starting + answering + scoring
 # ---------------------------------------------------------------------------
@@ -3,14 +3,37 @@ Phase 12.4 — Offline sync.
 
 `build_item_pack(user, max_items=20)` packages up the learner's most-relevant
 items (currently due for spaced repetition + skill-gap items) into a
-self-contained JSON bundle the mobile client can stash locally. ETag is the
-sha256 of the canonical payload, so the client can `If-None-Match` next time.
+self-contained JSON bundle the mobile client can stash locally. The client
+sends the pack's ETag back as `If-None-Match` next time.
+
+Mobile clients sync on every app foreground, so the common answer is "no
+change" and it has to be cheap:
+
+  pack_manifest()   Candidate ids plus a version key per item (updated_at,
+                    irt_calibrated_at, skill tags), read without loading
+                    item content. Each (item, version) maps to the sha256
+                    of the item's canonical JSON; the ETag hashes those
+                    digests, so a 304 costs three small queries and no
+                    serialisation.
+
+  Item blobs        Content-addressed: the canonical item JSON is stored in
+                    the shared cache under its digest, so two learners whose
+                    packs overlap share one copy, and a blob is only built
+                    from the items table the first time a version is seen.
+
+  Delta packs       With delta=True and a base ETag the client still holds,
+                    the pack carries only items whose digest the base did
+                    not have, the full manifest, and the ids to drop.
+
+offline_bundles rows keep the manifest, not the item content.
 """
 
 from __future__ import annotations
 
 import hashlib
 import json
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from uuid import UUID
@@ -21,6 +44,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.engagement import OfflineBundle, OfflineSyncReceipt
 from app.models.item_bank import Item
 from app.models.skill import ContentSkill, LearnerSkillMastery
+from app.services import cache
+
+BLOB_TTL_SECONDS = 7 * 24 * 3600
+DIGEST_CACHE_SIZE = 20000
 
 
 def _utc() -> datetime:
@@ -63,64 +90,209 @@ async def _candidate_item_ids(
     return [row[0] for row in q.all()]
 
 
-def _serialise_item(it: Item) -> dict:
+def _serialise_item(it: Item, skill_ids: list[str]) -> dict:
     """Reduce an Item ORM row to the offline-friendly subset."""
     return {
         "id": str(it.id),
         "content": it.content,
-        "skill_codes": [],   # filled in below
+        "skill_codes": skill_ids,
         "irt_difficulty": float(it.irt_difficulty) if getattr(it, "irt_difficulty", None) is not None else None,
         "irt_discrimination": float(it.irt_discrimination) if getattr(it, "irt_discrimination", None) is not None else None,
     }
 
 
-async def build_item_pack(
+def _canonical(value) -> str:
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+def _digest(canonical: str) -> str:
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _blob_key(digest: str) -> str:
+    return f"eureka:offline:blob:{digest}"
+
+
+# (item id, version key) -> content digest. Deterministic, so a plain
+# per-process LRU is safe; a miss only costs loading that item once.
+_DIGESTS: OrderedDict[tuple[UUID, str], str] = OrderedDict()
+
+
+def _remember(key: tuple[UUID, str], digest: str) -> None:
+    _DIGESTS[key] = digest
+    _DIGESTS.move_to_end(key)
+    while len(_DIGESTS) > DIGEST_CACHE_SIZE:
+        _DIGESTS.popitem(last=False)
+
+
+@dataclass
+class PackManifest:
+    """What a pack would contain, by digest, without the content."""
+
+    item_ids: list[UUID]
+    digests: list[str]
+    etag: str
+
+    def entries(self) -> list[dict]:
+        return [{"id": str(i), "digest": d} for i, d in zip(self.item_ids, self.digests)]
+
+
+@dataclass
+class ItemPack:
+    bundle: OfflineBundle
+    payload: dict
+    delta_base: Optional[str] = None
+
+
+def _etag(item_ids: list[UUID], digests: list[str]) -> str:
+    lines = "\n".join(f"{i}:{d}" for i, d in zip(item_ids, digests))
+    return hashlib.sha256(lines.encode("utf-8")).hexdigest()[:64]
+
+
+async def _skill_tags(db: AsyncSession, ids: list[UUID]) -> dict[UUID, list[str]]:
+    tags_q = await db.execute(
+        select(ContentSkill.content_id, ContentSkill.skill_id)
+        .where(ContentSkill.content_id.in_(ids))
+    )
+    tags: dict[UUID, list[str]] = {}
+    for content_id, sid in tags_q.all():
+        tags.setdefault(content_id, []).append(str(sid))
+    for codes in tags.values():
+        codes.sort()
+    return tags
+
+
+async def _store_blobs(
+    db: AsyncSession, ids: list[UUID], tags: dict[UUID, list[str]],
+) -> dict[UUID, tuple[str, dict]]:
+    """Serialise `ids` from the items table and cache each under its digest."""
+    items_q = await db.execute(select(Item).where(Item.id.in_(ids)))
+    out: dict[UUID, tuple[str, dict]] = {}
+    for it in items_q.scalars().all():
+        blob = _serialise_item(it, tags.get(it.id, []))
+        digest = _digest(_canonical(blob))
+        await cache.set(_blob_key(digest), blob, ttl_seconds=BLOB_TTL_SECONDS)
+        out[it.id] = (digest, blob)
+    return out
+
+
+async def pack_manifest(
     db: AsyncSession, *, user_id: UUID, max_items: int = 20,
-    ttl_hours: int = 48,
-) -> OfflineBundle:
+) -> PackManifest:
+    """The pack's ids, item digests and ETag; item content is loaded only for
+    versions this process has not digested yet."""
     ids = await _candidate_item_ids(db, user_id=user_id, max_items=max_items)
     if not ids:
-        payload = {"items": [], "skills": []}
-    else:
-        items_q = await db.execute(select(Item).where(Item.id.in_(ids)))
-        items = list(items_q.scalars().all())
-        items_dict = {it.id: _serialise_item(it) for it in items}
-        skills_q = await db.execute(
-            select(ContentSkill.content_id, ContentSkill.skill_id)
-            .where(ContentSkill.content_id.in_(ids))
+        return PackManifest([], [], _etag([], []))
+
+    versions_q = await db.execute(
+        select(Item.id, Item.updated_at, Item.irt_calibrated_at).where(Item.id.in_(ids))
+    )
+    stamps = {iid: (updated, calibrated) for iid, updated, calibrated in versions_q.all()}
+    tags = await _skill_tags(db, ids)
+
+    ids = [i for i in ids if i in stamps]
+    keys = {
+        i: (i, f"{stamps[i][0]}|{stamps[i][1]}|{','.join(tags.get(i, []))}")
+        for i in ids
+    }
+    missing = [i for i in ids if keys[i] not in _DIGESTS]
+    if missing:
+        for iid, (digest, _) in (await _store_blobs(db, missing, tags)).items():
+            _remember(keys[iid], digest)
+    ids = [i for i in ids if keys[i] in _DIGESTS]
+    digests = [_DIGESTS[keys[i]] for i in ids]
+    return PackManifest(ids, digests, _etag(ids, digests))
+
+
+async def _load_blobs(db: AsyncSession, manifest: PackManifest, wanted: list[int]) -> list[dict]:
+    """Item payloads for manifest positions `wanted`, from the blob cache,
+    rebuilding any that expired."""
+    blobs: dict[int, dict] = {}
+    stale: list[int] = []
+    for k in wanted:
+        blob = await cache.get(_blob_key(manifest.digests[k]))
+        if isinstance(blob, dict):
+            blobs[k] = blob
+        else:
+            stale.append(k)
+    if stale:
+        ids = [manifest.item_ids[k] for k in stale]
+        rebuilt = await _store_blobs(db, ids, await _skill_tags(db, ids))
+        for k in stale:
+            if manifest.item_ids[k] in rebuilt:
+                blobs[k] = rebuilt[manifest.item_ids[k]][1]
+    return [blobs[k] for k in wanted if k in blobs]
+
+
+async def build_item_pack(
+    db: AsyncSession, *, user_id: UUID, max_items: int = 20,
+    ttl_hours: int = 48,
+    manifest: Optional[PackManifest] = None,
+    base_etag: Optional[str] = None,
+) -> ItemPack:
+    """
+    Build the pack for `manifest` (computed here when not passed). With
+    `base_etag` naming one of this learner's earlier bundles, the payload is
+    a delta against it: `items` holds only what the base lacked, `removed`
+    the ids to drop, and `manifest` the full list to keep.
+    """
+    if manifest is None:
+        manifest = await pack_manifest(db, user_id=user_id, max_items=max_items)
+
+    base: Optional[dict[str, str]] = None
+    if base_etag and base_etag != manifest.etag:
+        base_q = await db.execute(
+            select(OfflineBundle.payload_jsonb).where(
+                OfflineBundle.user_id == user_id,
+                OfflineBundle.kind == "item_pack",
+                OfflineBundle.etag == base_etag,
+            ).order_by(OfflineBundle.generated_at.desc()).limit(1)
         )
-        for content_id, sid in skills_q.all():
-            items_dict[content_id]["skill_codes"].append(str(sid))
-        payload = {
-            "items": [items_dict[i] for i in ids if i in items_dict],
-            "skills": [],   # caller can layer skill metadata onto items via id
-        }
-    canonical = json.dumps(payload, sort_keys=True, default=str)
-    etag = hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:64]
+        stored = base_q.scalar_one_or_none()
+        if stored and "manifest" in stored:
+            base = {e["id"]: e["digest"] for e in stored["manifest"]}
+
+    positions = range(len(manifest.item_ids))
+    if base is None:
+        wanted = list(positions)
+    else:
+        wanted = [
+            k for k in positions
+            if base.get(str(manifest.item_ids[k])) != manifest.digests[k]
+        ]
+    payload: dict = {
+        "items": await _load_blobs(db, manifest, wanted),
+        "skills": [],   # caller can layer skill metadata onto items via id
+    }
+    if base is not None:
+        keep = {str(i) for i in manifest.item_ids}
+        payload["base"] = base_etag
+        payload["manifest"] = manifest.entries()
+        payload["removed"] = sorted(i for i in base if i not in keep)
 
     # Reuse an existing bundle if the etag matches.
     existing_q = await db.execute(
         select(OfflineBundle).where(
             OfflineBundle.user_id == user_id,
             OfflineBundle.kind == "item_pack",
-            OfflineBundle.etag == etag,
+            OfflineBundle.etag == manifest.etag,
             (OfflineBundle.expires_at.is_(None)) | (OfflineBundle.expires_at > _utc()),
         ).order_by(OfflineBundle.generated_at.desc()).limit(1)
     )
-    cached = existing_q.scalar_one_or_none()
-    if cached is not None:
-        return cached
-
-    bundle = OfflineBundle(
-        user_id=user_id, kind="item_pack", etag=etag,
-        payload_jsonb=payload, size_bytes=len(canonical),
-        item_count=len(payload["items"]),
-        expires_at=_utc() + timedelta(hours=ttl_hours),
-    )
-    db.add(bundle)
-    await db.commit()
-    await db.refresh(bundle)
-    return bundle
+    bundle = existing_q.scalar_one_or_none()
+    if bundle is None:
+        bundle = OfflineBundle(
+            user_id=user_id, kind="item_pack", etag=manifest.etag,
+            payload_jsonb={"manifest": manifest.entries()},
+            size_bytes=len(_canonical(payload)),
+            item_count=len(manifest.item_ids),
+            expires_at=_utc() + timedelta(hours=ttl_hours),
+        )
+        db.add(bundle)
+        await db.commit()
+        await db.refresh(bundle)
+    return ItemPack(bundle=bundle, payload=payload, delta_base=base_etag if base is not None else None)
 
 
 async def record_replay(
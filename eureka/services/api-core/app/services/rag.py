@@ -10,16 +10,20 @@ Three responsibilities:
              return a 0..1 score for how much of the answer is supported
              by the retrieved context.
 
-We share the same stub embedding from item_search (sha256→1024-dim) so
-the path runs end-to-end in CI / dev. Phase 6.5 swaps for a real backend.
+Embeddings come from services/embeddings.py, the same backend as
+item_search. Ingest collects every chunk first and writes them through
+`write_chunks`: batches, skipping chunks whose text hash, model and skill
+are unchanged, embedding the rest in one call per batch and upserting via
+binary COPY. Each chunk records the model that embedded it, and retrieval
+only compares vectors from the active model.
 """
 
 from __future__ import annotations
 
-import hashlib
+import asyncio
 import re
 from dataclasses import dataclass
-from typing import Callable
+from typing import Callable, Optional
 from uuid import UUID
 
 from sqlalchemy import select, text
@@ -28,7 +32,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.agent import ChunkSourceKind, KnowledgeChunk
 from app.models.item_bank import Item
 from app.models.skill import Skill
-from app.services.item_search import _stub_embedding, DEFAULT_EMBED_MODEL
+from app.services import embeddings
+from app.services.item_search import DEFAULT_EMBED_MODEL, _query_vector
 
 
 # ---------------------------------------------------------------------------
@@ -74,6 +79,40 @@ def _chunk_text_for_embedding(text_value: str) -> str:
     return re.sub(r"\s+", " ", text_value).strip()
 
 
+@dataclass
+class ChunkSpec:
+    """One chunk to write: everything upsert_chunk takes except the vector."""
+    source_kind: ChunkSourceKind
+    source_uri: str
+    text_value: str
+    source_id: UUID | None = None
+    tier: str | None = None
+    framework: str | None = None
+    skill_id: UUID | None = None
+    license_: str = "EUREKA-Internal"
+    attribution: str | None = None
+
+
+def _enum_value(v):
+    return v.value if hasattr(v, "value") else v
+
+
+_UPSERT_COLUMNS = """
+    source_kind, source_uri, source_id, text, tier, framework,
+    skill_id, embedding, text_hash, license, attribution, embedding_model
+"""
+
+_UPSERT_CONFLICT = """
+    ON CONFLICT (source_uri) DO UPDATE SET
+      text = EXCLUDED.text,
+      embedding = EXCLUDED.embedding,
+      text_hash = EXCLUDED.text_hash,
+      skill_id = EXCLUDED.skill_id,
+      embedding_model = EXCLUDED.embedding_model,
+      updated_at = CURRENT_TIMESTAMP
+"""
+
+
 async def upsert_chunk(
     db: AsyncSession,
     *,
@@ -93,110 +132,162 @@ async def upsert_chunk(
     re-running with the same URI updates the text + embedding in place.
     Returns the chunk id.
     """
-    embed_fn = embed_fn or _stub_embedding
     cleaned = _chunk_text_for_embedding(text_value)
-    text_hash = hashlib.sha256(cleaned.encode()).hexdigest()
-    vec = embed_fn(cleaned)
-    vec_lit = "[" + ",".join(f"{x:.6f}" for x in vec) + "]"
+    if embed_fn is not None:
+        vec, model = embed_fn(cleaned), DEFAULT_EMBED_MODEL
+    else:
+        embedder = embeddings.get_embedder()
+        vec = (await asyncio.to_thread(embedder.embed, [cleaned]))[0]
+        model = embedder.model
 
     r = await db.execute(
         text(
-            """
-            INSERT INTO knowledge_chunks (
-              source_kind, source_uri, source_id, text, tier, framework,
-              skill_id, embedding, text_hash, license, attribution
-            ) VALUES (
-              :sk, :uri, :sid, :txt, :tier, :fw, :skill, :emb ::vector, :hash, :lic, :att
+            f"""
+            INSERT INTO knowledge_chunks ({_UPSERT_COLUMNS}) VALUES (
+              :sk, :uri, :sid, :txt, :tier, :fw, :skill, CAST(:emb AS vector),
+              :hash, :lic, :att, :model
             )
-            ON CONFLICT (source_uri) DO UPDATE SET
-              text = EXCLUDED.text,
-              embedding = EXCLUDED.embedding,
-              text_hash = EXCLUDED.text_hash,
-              skill_id = EXCLUDED.skill_id,
-              updated_at = CURRENT_TIMESTAMP
+            {_UPSERT_CONFLICT}
             RETURNING id
             """
         ),
         {
-            "sk": source_kind.value if hasattr(source_kind, "value") else source_kind,
+            "sk": _enum_value(source_kind),
             "uri": source_uri,
             "sid": str(source_id) if source_id else None,
             "txt": cleaned,
             "tier": tier,
             "fw": framework,
             "skill": str(skill_id) if skill_id else None,
-            "emb": vec_lit,
-            "hash": text_hash,
+            "emb": embeddings.vector_param(vec),
+            "hash": embeddings.text_hash(cleaned),
             "lic": license_,
             "att": attribution,
+            "model": model,
         },
     )
     return r.scalar_one()
 
 
+async def write_chunks(
+    db: AsyncSession,
+    specs: list[ChunkSpec],
+    *,
+    embedder: Optional[embeddings.Embedder] = None,
+    batch_size: int = 256,
+) -> embeddings.BackfillReport:
+    """Upsert many chunks, embedding only the ones that changed. Commits per batch."""
+    embedder = embedder or embeddings.get_embedder()
+
+    async def pages():
+        for start in range(0, len(specs), batch_size):
+            batch = specs[start:start + batch_size]
+            stored = {
+                row[0]: tuple(row[1:])
+                for row in (await db.execute(
+                    text("""
+                    SELECT source_uri, text_hash, embedding_model, skill_id
+                    FROM knowledge_chunks WHERE source_uri = ANY(:uris)
+                    """),
+                    {"uris": [c.source_uri for c in batch]},
+                )).all()
+            }
+            todo = []
+            for c in batch:
+                cleaned = _chunk_text_for_embedding(c.text_value)
+                h = embeddings.text_hash(cleaned)
+                if stored.get(c.source_uri) != (h, embedder.model, c.skill_id):
+                    todo.append(((c, h), cleaned))
+            yield batch, todo
+
+    async def write(todo, vecs):
+        if not todo:
+            return
+        await embeddings.stage(
+            db, "_chunk_stage",
+            "source_kind text, source_uri text, source_id uuid, text text, tier varchar(40), "
+            "framework text, skill_id uuid, embedding vector, text_hash varchar(64), "
+            "license varchar(80), attribution text",
+            ["source_kind", "source_uri", "source_id", "text", "tier", "framework",
+             "skill_id", "embedding", "text_hash", "license", "attribution"],
+            [
+                (
+                    _enum_value(c.source_kind), c.source_uri, c.source_id, cleaned, c.tier,
+                    c.framework, c.skill_id, vec, h, c.license_, c.attribution,
+                )
+                for ((c, h), cleaned), vec in zip(todo, vecs)
+            ],
+        )
+        await db.execute(
+            text(f"""
+            INSERT INTO knowledge_chunks ({_UPSERT_COLUMNS})
+            SELECT CAST(source_kind AS chunk_source_kind), source_uri, source_id, text,
+                   tier, CAST(framework AS skill_framework), skill_id, embedding,
+                   text_hash, license, attribution, :model
+            FROM _chunk_stage
+            {_UPSERT_CONFLICT}
+            """),
+            {"model": embedder.model},
+        )
+        await db.commit()
+
+    return await embeddings.pipeline(pages, embedder, write, embeddings.BackfillReport())
+
+
 async def ingest_item_bank(db: AsyncSession) -> int:
-    """Walk every approved item and upsert two chunks (stem, explanation).
-    Returns number of chunks written."""
+    """Walk every live item and upsert two chunks (stem, explanation).
+    Returns number of chunks covered."""
     from app.models.item_bank import ItemBank
 
     r = await db.execute(
-        select(Item, ItemBank)
+        select(
+            Item.id, Item.content, Item.explanation, ItemBank.tier, ItemBank.framework,
+            ItemBank.default_license, ItemBank.default_attribution,
+        )
         .join(ItemBank, ItemBank.id == Item.bank_id)
         .where(Item.deleted_at.is_(None))
     )
-    n = 0
-    for item, bank in r.all():
-        stem = (item.content or {}).get("stem") or (item.content or {}).get("vignette") or ""
+    specs: list[ChunkSpec] = []
+    for item_id, content, explanation, tier, framework, license_, attribution in r.all():
+        common = dict(
+            source_id=item_id, tier=tier, framework=_enum_value(framework),
+            license_=license_, attribution=attribution,
+        )
+        stem = (content or {}).get("stem") or (content or {}).get("vignette") or ""
         if stem:
-            await upsert_chunk(
-                db,
+            specs.append(ChunkSpec(
                 source_kind=ChunkSourceKind.ITEM_STEM,
-                source_uri=f"urn:eureka:item:{item.id}:stem",
-                source_id=item.id,
-                text_value=stem,
-                tier=bank.tier,
-                framework=bank.framework.value if hasattr(bank.framework, "value") else bank.framework,
-                license_=bank.default_license,
-                attribution=bank.default_attribution,
-            )
-            n += 1
-        if item.explanation:
-            await upsert_chunk(
-                db,
+                source_uri=f"urn:eureka:item:{item_id}:stem",
+                text_value=stem, **common,
+            ))
+        if explanation:
+            specs.append(ChunkSpec(
                 source_kind=ChunkSourceKind.ITEM_EXPLANATION,
-                source_uri=f"urn:eureka:item:{item.id}:explanation",
-                source_id=item.id,
-                text_value=item.explanation,
-                tier=bank.tier,
-                framework=bank.framework.value if hasattr(bank.framework, "value") else bank.framework,
-                license_=bank.default_license,
-                attribution=bank.default_attribution,
-            )
-            n += 1
-    return n
+                source_uri=f"urn:eureka:item:{item_id}:explanation",
+                text_value=explanation, **common,
+            ))
+    return (await write_chunks(db, specs)).scanned
 
 
 async def ingest_skill_graph(db: AsyncSession) -> int:
     """Skill descriptions become chunks so the tutor can pull definitions."""
     r = await db.execute(select(Skill).where(Skill.is_active.is_(True)))
-    n = 0
+    specs: list[ChunkSpec] = []
     for s in r.scalars().all():
         if not s.description and not s.name:
             continue
-        text_value = f"{s.name}. {s.description or ''}"
-        await upsert_chunk(
-            db,
+        framework = _enum_value(s.framework)
+        specs.append(ChunkSpec(
             source_kind=ChunkSourceKind.SKILL_DESCRIPTION,
-            source_uri=f"urn:eureka:skill:{(s.framework.value if hasattr(s.framework,'value') else s.framework)}:{s.code}",
+            source_uri=f"urn:eureka:skill:{framework}:{s.code}",
             source_id=s.id,
-            text_value=text_value,
+            text_value=f"{s.name}. {s.description or ''}",
             tier=s.tier,
-            framework=s.framework.value if hasattr(s.framework, "value") else s.framework,
+            framework=framework,
             skill_id=s.id,
             license_="EUREKA-Internal",
-        )
-        n += 1
-    return n
+        ))
+    return (await write_chunks(db, specs)).scanned
 
 
 # ---------------------------------------------------------------------------
@@ -218,7 +309,6 @@ async def retrieve(
     embed_fn: Callable[[str], list[float]] | None = None,
 ) -> list[RetrievedChunk]:
     """Hybrid keyword + semantic retrieval over knowledge_chunks."""
-    embed_fn = embed_fn or _stub_embedding
     pool = max(limit * 3, 30)
 
     # Keyword
@@ -238,18 +328,22 @@ async def retrieve(
     kw = [(row[0], float(row[1])) for row in kw_r.fetchall()]
 
     # Semantic
-    qvec = embed_fn(query)
-    vec_lit = "[" + ",".join(f"{x:.6f}" for x in qvec) + "]"
+    qvec = embeddings.vector_param(await _query_vector(query, embed_fn))
     sem_sql = """
-        SELECT id, 1 - (embedding <=> :v ::vector) AS score
+        SELECT id, 1 - (embedding <=> CAST(:v AS vector)) AS score
         FROM knowledge_chunks
         WHERE is_active
+          AND embedding_model = :model
     """
-    sem_params: dict = {"v": vec_lit, "limit": pool}
+    sem_params: dict = {
+        "v": qvec,
+        "model": DEFAULT_EMBED_MODEL if embed_fn else embeddings.get_embedder().model,
+        "limit": pool,
+    }
     if framework_filter:
         sem_sql += " AND framework = :fw"
         sem_params["fw"] = framework_filter
-    sem_sql += " ORDER BY embedding <=> :v ::vector ASC LIMIT :limit"
+    sem_sql += " ORDER BY embedding <=> CAST(:v AS vector) ASC LIMIT :limit"
     try:
         sem_r = await db.execute(text(sem_sql), sem_params)
         sem = [(row[0], float(row[1])) for row in sem_r.fetchall()]
@@ -32,20 +32,46 @@ each item was recommended.
 
 This is a deterministic rule-based scorer. Phase 6.4 will layer an LLM
 rerank on top using natural-language reasoning over the same signals.
+
+Cost. This runs on every learner home page, and used to reload the
+learner, the whole candidate pool and its prerequisite edges, then score
+skill by skill in Python with a note string built for every one of them.
+Now:
+
+  - The candidate pool (skills + prerequisite edges as arrays) is built
+    once per (tiers, frameworks) combination and kept in-process for
+    POOL_TTL_SECONDS. Pools are shared by every learner with the same
+    enrolments.
+  - The five signals are computed as numpy arrays over the whole pool, and
+    notes are rendered only for the skills actually returned.
+  - The ranked result is cached (services/cache.py) under the learner's
+    context version: a hash of their mastery rows (count, last update, how
+    many reviews are due), profile and enrolments. Any mastery write, goal
+    edit or enrolment change moves the version, and so does a review coming
+    due, so a hit is exactly what a recompute would return. Catalog edits
+    reach cached results within RESULT_TTL_SECONDS.
+  - `precompute()` fills that cache for a batch of learners with a handful
+    of queries for the whole batch; the `recommender.precompute.sweep` job
+    fans it out over recently active learners.
 """
 
 from __future__ import annotations
 
+import hashlib
+import time
 from dataclasses import dataclass, field
-from datetime import datetime
-from typing import Any
+from datetime import datetime, timedelta
+from typing import Any, Optional
+from uuid import UUID
 
-from sqlalchemy import and_, select
+import numpy as np
+from sqlalchemy import and_, or_, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.learner import LearnerProfile, TierEnrollment, TierEnrollmentStatus
 from app.models.skill import LearnerSkillMastery, Skill, SkillFramework, SkillPrerequisite
 from app.models.user import User
+from app.services import cache
 
 
 # Map a test_prep / continuing_education tier_context to the underlying
@@ -71,6 +97,18 @@ _LICENSE_TARGET_TO_FRAMEWORK = {
 MASTERY_THRESHOLD = 0.85
 PREREQ_READY_THRESHOLD = 0.70
 
+# Signal weights, in RecommendationReason field order.
+_WEIGHTS = np.array([0.25, 0.25, 0.20, 0.20, 0.10])
+
+# Results are cached this deep so any `limit` the API accepts is a slice.
+RESULT_DEPTH = 50
+RESULT_TTL_SECONDS = 900
+POOL_TTL_SECONDS = 600
+
+
+def _value(v: Any) -> Any:
+    return v.value if hasattr(v, "value") else v
+
 
 @dataclass
 class RecommendationReason:
@@ -94,24 +132,35 @@ class RecommendationReason:
         )
 
 
+@dataclass(frozen=True)
+class CandidateSkill:
+    """The columns of a Skill the scorer and `to_dict()` need.
+
+    Plain values rather than the ORM row, so a pool can outlive the session
+    that loaded it."""
+
+    id: UUID
+    framework: str
+    code: str
+    name: str
+    tier: str
+    bloom_level: Optional[str]
+
+
 @dataclass
 class Recommendation:
-    skill: Skill
+    skill: CandidateSkill
     score: float
     reason: RecommendationReason
 
     def to_dict(self) -> dict[str, Any]:
         return {
             "skill_id": str(self.skill.id),
-            "framework": self.skill.framework.value if hasattr(self.skill.framework, "value") else self.skill.framework,
+            "framework": self.skill.framework,
             "code": self.skill.code,
             "name": self.skill.name,
             "tier": self.skill.tier,
-            "bloom_level": (
-                self.skill.bloom_level.value
-                if (self.skill.bloom_level and hasattr(self.skill.bloom_level, "value"))
-                else self.skill.bloom_level
-            ),
+            "bloom_level": self.skill.bloom_level,
             "score": round(self.score, 4),
             "reason": {
                 "active_tier_fit": round(self.reason.active_tier_fit, 3),
@@ -123,115 +172,255 @@ class Recommendation:
             },
         }
 
+    @classmethod
+    def from_dict(cls, d: dict[str, Any]) -> "Recommendation":
+        return cls(
+            skill=CandidateSkill(
+                id=UUID(d["skill_id"]), framework=d["framework"], code=d["code"],
+                name=d["name"], tier=d["tier"], bloom_level=d["bloom_level"],
+            ),
+            score=d["score"],
+            reason=RecommendationReason(**d["reason"]),
+        )
+
 
 # ---------------------------------------------------------------------------
+# Learner context
+# ---------------------------------------------------------------------------
+
+
+def _empty_context() -> dict[str, Any]:
+    return {
+        "mastery_by_skill": {},
+        "next_review_by_skill": {},
+        "goals": [],
+        "active_tiers": set(),
+        "derived_frameworks": set(),
+    }
+
 
+async def _load_contexts(
+    db: AsyncSession, user_ids: list[UUID]
+) -> dict[UUID, dict[str, Any]]:
+    """Every signal for a batch of learners in three queries, not three each."""
+    ctx = {uid: _empty_context() for uid in user_ids}
 
-async def _load_context(db: AsyncSession, user: User) -> dict[str, Any]:
-    """Pull every signal in a few queries instead of N round-trips."""
-    prof_q = await db.execute(
-        select(LearnerProfile).where(LearnerProfile.user_id == user.id)
+    profiles = await db.execute(
+        select(LearnerProfile.user_id, LearnerProfile.goals)
+        .where(LearnerProfile.user_id.in_(user_ids))
     )
-    profile = prof_q.scalar_one_or_none()
+    for uid, goals in profiles.all():
+        ctx[uid]["goals"] = list(goals or [])
 
-    te_q = await db.execute(
-        select(TierEnrollment)
+    enrollments = await db.execute(
+        select(TierEnrollment.user_id, TierEnrollment.tier, TierEnrollment.tier_context)
         .where(
-            TierEnrollment.user_id == user.id,
+            TierEnrollment.user_id.in_(user_ids),
             TierEnrollment.status.in_(
                 [TierEnrollmentStatus.ACTIVE, TierEnrollmentStatus.PENDING]
             ),
             TierEnrollment.deleted_at.is_(None),
         )
     )
-    enrollments = list(te_q.scalars().all())
+    for uid, tier, tier_context in enrollments.all():
+        c = ctx[uid]
+        c["active_tiers"].add(_value(tier))
+        # Derive interesting frameworks from tier_context (exam / license_target).
+        # An enrolment in test_prep with exam=USMLE_Step_1 should bring USMLE
+        # skills into the candidate pool, even though those skills live in
+        # tier=medical, not tier=test_prep.
+        tc = tier_context or {}
+        if tc.get("exam") in _EXAM_TO_FRAMEWORK:
+            c["derived_frameworks"].add(_EXAM_TO_FRAMEWORK[tc["exam"]].value)
+        if tc.get("license_target") in _LICENSE_TARGET_TO_FRAMEWORK:
+            c["derived_frameworks"].add(
+                _LICENSE_TARGET_TO_FRAMEWORK[tc["license_target"]].value
+            )
 
-    lsm_q = await db.execute(
-        select(LearnerSkillMastery).where(LearnerSkillMastery.user_id == user.id)
+    mastery = await db.execute(
+        select(
+            LearnerSkillMastery.user_id,
+            LearnerSkillMastery.skill_id,
+            LearnerSkillMastery.mastery,
+            LearnerSkillMastery.next_review_at,
+        ).where(LearnerSkillMastery.user_id.in_(user_ids))
     )
-    mastery_rows = list(lsm_q.scalars().all())
-    mastery_by_skill = {str(m.skill_id): float(m.mastery) for m in mastery_rows}
-    next_review_by_skill = {
-        str(m.skill_id): m.next_review_at for m in mastery_rows if m.next_review_at
-    }
+    for uid, skill_id, m, next_review_at in mastery.all():
+        c = ctx[uid]
+        c["mastery_by_skill"][str(skill_id)] = float(m)
+        if next_review_at:
+            c["next_review_by_skill"][str(skill_id)] = next_review_at
+    return ctx
+
+
+# One row per learner: everything the ranking depends on that can change
+# under them. `due` moves when a review comes due, which flips a
+# spaced-repetition signal without any row being written.
+_VERSION_SQL = """
+SELECT u.id, m.n, m.touched, m.due, p.touched, e.n, e.touched
+FROM unnest(CAST(:ids AS uuid[])) AS u(id)
+LEFT JOIN LATERAL (
+    SELECT COUNT(*) AS n,
+           MAX(COALESCE(updated_at, created_at)) AS touched,
+           COUNT(*) FILTER (WHERE next_review_at <= :now) AS due
+    FROM learner_skill_mastery WHERE user_id = u.id
+) m ON TRUE
+LEFT JOIN LATERAL (
+    SELECT MAX(COALESCE(updated_at, created_at)) AS touched
+    FROM learner_profiles WHERE user_id = u.id
+) p ON TRUE
+LEFT JOIN LATERAL (
+    SELECT COUNT(*) AS n, MAX(COALESCE(updated_at, created_at)) AS touched
+    FROM tier_enrollments WHERE user_id = u.id
+) e ON TRUE
+"""
 
-    # Derive interesting frameworks from tier_context (exam / license_target).
-    # An enrolment in test_prep with exam=USMLE_Step_1 should bring USMLE
-    # skills into the candidate pool, even though those skills live in
-    # tier=medical, not tier=test_prep.
-    derived_frameworks: set[SkillFramework] = set()
-    for e in enrollments:
-        ctx = e.tier_context or {}
-        exam = ctx.get("exam")
-        if exam in _EXAM_TO_FRAMEWORK:
-            derived_frameworks.add(_EXAM_TO_FRAMEWORK[exam])
-        target = ctx.get("license_target")
-        if target in _LICENSE_TARGET_TO_FRAMEWORK:
-            derived_frameworks.add(_LICENSE_TARGET_TO_FRAMEWORK[target])
 
+async def _versions(
+    db: AsyncSession, user_ids: list[UUID], now: datetime
+) -> dict[UUID, str]:
+    rows = await db.execute(
+        text(_VERSION_SQL), {"ids": list(user_ids), "now": now}
+    )
     return {
-        "profile": profile,
-        "enrollments": enrollments,
-        "mastery_by_skill": mastery_by_skill,
-        "next_review_by_skill": next_review_by_skill,
-        "goals": (profile.goals if profile else []) or [],
-        "active_tiers": {
-            (e.tier.value if hasattr(e.tier, "value") else e.tier)
-            for e in enrollments
-        },
-        "derived_frameworks": derived_frameworks,
-        "tier_contexts": [e.tier_context for e in enrollments],
+        UUID(str(row[0])): hashlib.sha1(
+            "|".join(str(v) for v in row[1:]).encode()
+        ).hexdigest()[:16]
+        for row in rows.all()
     }
 
 
-async def _candidate_skills(
+def _result_key(user_id: UUID, version: str) -> str:
+    return f"eureka:recs:{user_id}:{version}"
+
+
+# ---------------------------------------------------------------------------
+# Candidate pool
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class _Pool:
+    """Candidate skills plus their prerequisite edges, as arrays."""
+
+    skills: list[CandidateSkill]
+    index: dict[str, int]
+    tier: np.ndarray
+    framework: np.ndarray
+    edge_succ: np.ndarray        # candidate index of each edge's successor
+    edge_pre: np.ndarray         # index into pre_ids of each edge's prerequisite
+    edge_strength: np.ndarray
+    pre_ids: list[str]
+    n_pre: np.ndarray            # prerequisite count per candidate
+    weight: np.ndarray           # summed edge strength per candidate
+    loaded_at: float
+    goal_memo: dict[tuple[str, ...], tuple[np.ndarray, np.ndarray]] = field(
+        default_factory=dict
+    )
+
+    def goals(self, goals: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        """(score, matched goal index or -1) per candidate, memoised per goal list."""
+        key = tuple(goals)
+        hit = self.goal_memo.get(key)
+        if hit is None:
+            scores = np.zeros(len(self.skills))
+            matched = np.full(len(self.skills), -1)
+            if goals:
+                for i, skill in enumerate(self.skills):
+                    score, goal = _goal_alignment_score(skill, goals)
+                    scores[i] = score
+                    if goal is not None:
+                        matched[i] = goals.index(goal)
+            if len(self.goal_memo) >= 256:
+                self.goal_memo.clear()
+            hit = self.goal_memo[key] = (scores, matched)
+        return hit
+
+
+_POOLS: dict[tuple[frozenset[str], frozenset[str]], _Pool] = {}
+
+
+def _build_pool(
+    skills: list[CandidateSkill], edges: list[tuple[str, str, float]]
+) -> _Pool:
+    index = {str(s.id): i for i, s in enumerate(skills)}
+    pre_ids = sorted({pre for _succ, pre, _w in edges})
+    pre_index = {p: i for i, p in enumerate(pre_ids)}
+    n = len(skills)
+    edge_succ = np.array([index[succ] for succ, _p, _w in edges], dtype=np.int64)
+    edge_strength = np.array([w for _s, _p, w in edges], dtype=float)
+    return _Pool(
+        skills=skills,
+        index=index,
+        tier=np.array([s.tier for s in skills], dtype=object),
+        framework=np.array([s.framework for s in skills], dtype=object),
+        edge_succ=edge_succ,
+        edge_pre=np.array([pre_index[p] for _s, p, _w in edges], dtype=np.int64),
+        edge_strength=edge_strength,
+        pre_ids=pre_ids,
+        n_pre=np.bincount(edge_succ, minlength=n),
+        weight=np.bincount(edge_succ, weights=edge_strength, minlength=n),
+        loaded_at=time.monotonic(),
+    )
+
+
+async def _candidate_pool(
     db: AsyncSession,
     active_tiers: set[str],
-    derived_frameworks: set[SkillFramework],
-) -> list[Skill]:
+    derived_frameworks: set[str],
+) -> _Pool:
     """
-    Pull the skill pool to score. Includes skills whose tier matches the
+    The skill pool to score. Includes skills whose tier matches the
     learner's enrolments OR whose framework was derived from an
     enrolment's exam/license_target. For learners with nothing active,
     fall back to high_school + undergraduate.
     """
     if not active_tiers and not derived_frameworks:
         active_tiers = {"high_school", "undergraduate"}
-    conditions = [Skill.is_active.is_(True)]
+    key = (frozenset(active_tiers), frozenset(derived_frameworks))
+    pool = _POOLS.get(key)
+    if pool is not None and time.monotonic() - pool.loaded_at < POOL_TTL_SECONDS:
+        return pool
+
     or_clauses = []
     if active_tiers:
         or_clauses.append(Skill.tier.in_(active_tiers))
     if derived_frameworks:
-        or_clauses.append(Skill.framework.in_(derived_frameworks))
-    if len(or_clauses) == 1:
-        conditions.append(or_clauses[0])
-    elif len(or_clauses) > 1:
-        from sqlalchemy import or_
-        conditions.append(or_(*or_clauses))
-    r = await db.execute(select(Skill).where(and_(*conditions)))
-    return list(r.scalars().all())
-
-
-async def _prereqs_for(
-    db: AsyncSession, skill_ids: list[str]
-) -> dict[str, list[tuple[str, float]]]:
-    """Returns {successor_id: [(prerequisite_id, strength), ...]}."""
-    if not skill_ids:
-        return {}
-    r = await db.execute(
-        select(SkillPrerequisite).where(
-            SkillPrerequisite.successor_id.in_(skill_ids)
+        or_clauses.append(
+            Skill.framework.in_([SkillFramework(f) for f in derived_frameworks])
         )
+    where = and_(Skill.is_active.is_(True), or_(*or_clauses))
+    r = await db.execute(
+        select(
+            Skill.id, Skill.framework, Skill.code, Skill.name, Skill.tier,
+            Skill.bloom_level,
+        ).where(where)
     )
-    out: dict[str, list[tuple[str, float]]] = {}
-    for sp in r.scalars().all():
-        out.setdefault(str(sp.successor_id), []).append(
-            (str(sp.prerequisite_id), float(sp.strength))
+    skills = [
+        CandidateSkill(
+            id=sid, framework=_value(fw), code=code, name=name, tier=tier,
+            bloom_level=_value(bloom) if bloom else None,
         )
-    return out
+        for sid, fw, code, name, tier, bloom in r.all()
+    ]
+    e = await db.execute(
+        select(
+            SkillPrerequisite.successor_id,
+            SkillPrerequisite.prerequisite_id,
+            SkillPrerequisite.strength,
+        ).where(SkillPrerequisite.successor_id.in_(select(Skill.id).where(where)))
+    )
+    edges = [(str(succ), str(pre), float(w)) for succ, pre, w in e.all()]
+    pool = _POOLS[key] = _build_pool(skills, edges)
+    return pool
+
+
+# ---------------------------------------------------------------------------
+# Scoring
+# ---------------------------------------------------------------------------
 
 
-def _goal_alignment_score(skill: Skill, goals: list[str]) -> tuple[float, str | None]:
+def _goal_alignment_score(skill: CandidateSkill, goals: list[str]) -> tuple[float, str | None]:
     """
     Substring match: any goal whose lowercase form appears in the skill's
     name or code earns a hit. Returns (score, matched_goal_or_None).
@@ -257,99 +446,159 @@ def _goal_alignment_score(skill: Skill, goals: list[str]) -> tuple[float, str |
     return best_score, best_match
 
 
-def _prereq_readiness_score(
-    skill_id: str,
-    prereqs: dict[str, list[tuple[str, float]]],
-    mastery_by_skill: dict[str, float],
-) -> tuple[float, int]:
-    """
-    Average prerequisite mastery weighted by edge strength. Returns
-    (score in [0, 1], count_of_prereqs).
-    """
-    edges = prereqs.get(skill_id, [])
-    if not edges:
-        return 1.0, 0  # no prereqs ⇒ ready
-    total_weight = sum(strength for _, strength in edges)
-    score = sum(
-        mastery_by_skill.get(pre_id, 0.0) * strength for pre_id, strength in edges
-    ) / max(total_weight, 0.001)
-    return score, len(edges)
+def _score(pool: _Pool, ctx: dict[str, Any], now: datetime) -> dict[str, np.ndarray]:
+    """All five signals, the total and the mastery vector over the pool."""
+    n = len(pool.skills)
+    mastery = np.zeros(n)
+    due = np.zeros(n)
+    for skill_id, m in ctx["mastery_by_skill"].items():
+        i = pool.index.get(skill_id)
+        if i is not None:
+            mastery[i] = m
+    for skill_id, nr in ctx["next_review_by_skill"].items():
+        i = pool.index.get(skill_id)
+        if i is not None and nr <= now:
+            due[i] = 1.0
+
+    # 1. Active-tier fit. 1.0 for a direct tier match; 0.9 for a framework
+    # match derived from a test_prep / license_target enrolment; 0.5 for any
+    # other tier we still chose to consider.
+    tier_hit = np.isin(pool.tier, list(ctx["active_tiers"]))
+    fw_hit = np.isin(pool.framework, list(ctx["derived_frameworks"]))
+    tier_fit = np.where(tier_hit, 1.0, np.where(fw_hit, 0.9, 0.5))
+
+    # 2. Prereq readiness: prerequisite mastery averaged by edge strength;
+    # a skill with no prerequisites is ready.
+    pre_mastery = np.array(
+        [ctx["mastery_by_skill"].get(p, 0.0) for p in pool.pre_ids], dtype=float
+    )
+    achieved = np.bincount(
+        pool.edge_succ, weights=pool.edge_strength * pre_mastery[pool.edge_pre], minlength=n,
+    )
+    readiness = np.where(
+        pool.n_pre > 0, achieved / np.maximum(pool.weight, 0.001), 1.0
+    )
+
+    # 3. Mastery gap — quadratic bump 4m(1 - m): 1.0 at m=0.5, 0 at extremes.
+    gap = 4.0 * mastery * (1.0 - mastery)
+
+    # 4. Goal alignment
+    goal, goal_idx = pool.goals(ctx["goals"])
+
+    components = np.stack([tier_fit, readiness, gap, goal, due])
+    return {
+        "components": components,
+        "total": _WEIGHTS @ components,
+        "mastery": mastery,
+        "goal_idx": goal_idx,
+    }
+
+
+def _reason(pool: _Pool, i: int, s: dict[str, np.ndarray], ctx: dict[str, Any]) -> RecommendationReason:
+    """The breakdown and notes for one candidate. Only called for the top-k."""
+    skill = pool.skills[i]
+    tier_fit, readiness, gap, goal, due = (float(v) for v in s["components"][:, i])
+    reason = RecommendationReason(tier_fit, readiness, gap, goal, due)
+    if tier_fit == 1.0:
+        reason.notes.append(f"matches your active {skill.tier} enrolment")
+    elif tier_fit == 0.9:
+        reason.notes.append(f"covers a {skill.framework.upper()} exam you're prepping for")
+    n_pre = int(pool.n_pre[i])
+    if n_pre > 0 and readiness >= PREREQ_READY_THRESHOLD:
+        reason.notes.append(f"{n_pre} prerequisite(s) at sufficient mastery")
+    elif n_pre > 0:
+        reason.notes.append(f"prerequisites at {int(readiness * 100)}% mastery; expect challenge")
+    m = float(s["mastery"][i])
+    if m > 0:
+        reason.notes.append(f"in flight (current mastery {int(m * 100)}%)")
+    g = int(s["goal_idx"][i])
+    if g >= 0:
+        reason.notes.append(f"matches your goal “{ctx['goals'][g]}”")
+    if due:
+        reason.notes.append("review is past-due; practice now to prevent decay")
+    return reason
+
+
+def _rank(pool: _Pool, ctx: dict[str, Any], now: datetime, limit: int) -> list[Recommendation]:
+    if not pool.skills:
+        return []
+    s = _score(pool, ctx, now)
+    # Stable, so equal scores keep catalog order as the per-skill loop did.
+    order = np.argsort(-s["total"], kind="stable")
+    # Already mastered — don't recommend.
+    order = order[s["mastery"][order] < MASTERY_THRESHOLD][:limit]
+    return [
+        Recommendation(
+            skill=pool.skills[i], score=float(s["total"][i]), reason=_reason(pool, i, s, ctx)
+        )
+        for i in order
+    ]
+
+
+async def _compute(
+    db: AsyncSession, ctx: dict[str, Any], now: datetime
+) -> list[Recommendation]:
+    pool = await _candidate_pool(db, ctx["active_tiers"], ctx["derived_frameworks"])
+    return _rank(pool, ctx, now, RESULT_DEPTH)
 
 
 async def recommend(
     db: AsyncSession, user: User, limit: int = 10
 ) -> list[Recommendation]:
-    ctx = await _load_context(db, user)
-    candidates = await _candidate_skills(
-        db, ctx["active_tiers"], ctx["derived_frameworks"]
-    )
+    now = datetime.utcnow()
+    version = (await _versions(db, [user.id], now)).get(user.id)
+    key = _result_key(user.id, version) if version else None
+    if key is not None:
+        hit = await cache.get(key)
+        if isinstance(hit, list):
+            return [Recommendation.from_dict(d) for d in hit[:limit]]
 
-    if not candidates:
-        return []
+    ctx = (await _load_contexts(db, [user.id]))[user.id]
+    recs = await _compute(db, ctx, now)
+    if key is not None:
+        await cache.set(key, [r.to_dict() for r in recs], ttl_seconds=RESULT_TTL_SECONDS)
+    return recs[:limit]
+
+
+# ---------------------------------------------------------------------------
+# Bulk precomputation (jobs: recommender.precompute / .sweep)
+# ---------------------------------------------------------------------------
 
-    candidate_ids = [str(s.id) for s in candidates]
-    prereqs = await _prereqs_for(db, candidate_ids)
+
+async def precompute(db: AsyncSession, user_ids: list[UUID]) -> dict[str, int]:
+    """Warm the result cache for a batch of learners.
+
+    Learners whose current version is already cached are skipped, so a
+    repeated sweep costs one version query per batch for the unchanged ones."""
     now = datetime.utcnow()
+    versions = await _versions(db, user_ids, now)
+    stale = []
+    for uid, version in versions.items():
+        if await cache.get(_result_key(uid, version)) is None:
+            stale.append(uid)
+    if stale:
+        contexts = await _load_contexts(db, stale)
+        for uid in stale:
+            recs = await _compute(db, contexts[uid], now)
+            await cache.set(
+                _result_key(uid, versions[uid]),
+                [r.to_dict() for r in recs],
+                ttl_seconds=RESULT_TTL_SECONDS,
+            )
+    return {"learners": len(versions), "computed": len(stale)}
 
-    scored: list[Recommendation] = []
-    for skill in candidates:
-        skill_id = str(skill.id)
-        current_mastery = ctx["mastery_by_skill"].get(skill_id, 0.0)
-        if current_mastery >= MASTERY_THRESHOLD:
-            # Already mastered — don't recommend.
-            continue
-
-        reason = RecommendationReason()
-
-        # 1. Active-tier fit. 1.0 for a direct tier match; 0.9 for a
-        # framework match derived from a test_prep / license_target
-        # enrolment; 0.5 for any other tier we still chose to consider.
-        sk_framework = (
-            skill.framework.value if hasattr(skill.framework, "value") else skill.framework
+
+async def active_learners(
+    db: AsyncSession, *, since_days: int = 14, limit: int = 50000
+) -> list[UUID]:
+    """Learners who practised anything in the last `since_days` days."""
+    r = await db.execute(
+        select(LearnerSkillMastery.user_id)
+        .where(
+            LearnerSkillMastery.last_practiced_at
+            >= datetime.utcnow() - timedelta(days=since_days)
         )
-        derived_fw_values = {
-            (f.value if hasattr(f, "value") else f) for f in ctx["derived_frameworks"]
-        }
-        if skill.tier in ctx["active_tiers"]:
-            reason.active_tier_fit = 1.0
-            reason.notes.append(f"matches your active {skill.tier} enrolment")
-        elif sk_framework in derived_fw_values:
-            reason.active_tier_fit = 0.9
-            reason.notes.append(
-                f"covers a {sk_framework.upper()} exam you're prepping for"
-            )
-        else:
-            reason.active_tier_fit = 0.5
-
-        # 2. Prereq readiness
-        readiness, n_pre = _prereq_readiness_score(skill_id, prereqs, ctx["mastery_by_skill"])
-        reason.prereq_readiness = readiness
-        if n_pre > 0 and readiness >= PREREQ_READY_THRESHOLD:
-            reason.notes.append(f"{n_pre} prerequisite(s) at sufficient mastery")
-        elif n_pre > 0:
-            reason.notes.append(f"prerequisites at {int(readiness * 100)}% mastery; expect challenge")
-
-        # 3. Mastery gap — peak around 0.4 (in-flight, not mastered)
-        # Quadratic bump: gap = 4 * m * (1 - m) — max 1.0 at m=0.5, 0 at extremes.
-        reason.mastery_gap = 4.0 * current_mastery * (1.0 - current_mastery)
-        if current_mastery > 0:
-            reason.notes.append(f"in flight (current mastery {int(current_mastery * 100)}%)")
-
-        # 4. Goal alignment
-        goal_score, matched_goal = _goal_alignment_score(skill, ctx["goals"])
-        reason.goal_alignment = goal_score
-        if matched_goal:
-            reason.notes.append(f"matches your goal “{matched_goal}”")
-
-        # 5. Spaced repetition — past-due review of an attempted skill
-        nr = ctx["next_review_by_skill"].get(skill_id)
-        if nr is not None and nr <= now:
-            reason.spaced_repetition = 1.0
-            reason.notes.append("review is past-due; practice now to prevent decay")
-        else:
-            reason.spaced_repetition = 0.0
-
-        scored.append(Recommendation(skill=skill, score=reason.total, reason=reason))
-
-    scored.sort(key=lambda r: r.score, reverse=True)
-    return scored[:limit]
+        .group_by(LearnerSkillMastery.user_id)
+        .limit(limit)
+    )
+    return [row[0] for row in r.all()]
@@ -115,10 +115,16 @@ async def lifespan(app: FastAPI):
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
 
+    # Request audit trail: records are queued by AuditMiddleware and written
+    # by this task, which must drain before the engine goes away.
+    from app.services import audit_writer
+    audit_writer.start_writer()
+
     yield
 
     # Shutdown
     logger.info("Shutting down EUREKA API Core Service")
+    await audit_writer.stop_writer()
     await engine.dispose()
 
 
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Embed the item bank and knowledge chunks with the configured model.
+
+For a model swap: set EMBEDDING_BACKEND / EMBEDDING_MODEL, then run this in
+the maintenance window. Items get an item_embeddings row for the new model
+(the old model's rows stay until deleted, so search can be pointed back);
+knowledge_chunks are re-embedded in place. Rows that already carry a
+current vector are skipped, and every batch commits, so an interrupted run
+is resumed by running it again.
+
+Prints rows scanned / embedded / skipped and rows per second per table.
+
+Run inside the container:
+
+  docker exec eureka-api-core python scripts/backfill_embeddings.py [--target items|chunks|all] [--batch 256]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import AsyncSessionLocal  # noqa: E402
+from app.services import embeddings  # noqa: E402
+
+
+async def main(target: str, batch: int) -> int:
+    embedder = embeddings.get_embedder()
+    print(f"model={embedder.model} dim={embedder.dim}")
+    steps = []
+    if target in ("items", "all"):
+        steps.append(("item_embeddings", embeddings.backfill_items))
+    if target in ("chunks", "all"):
+        steps.append(("knowledge_chunks", embeddings.reembed_chunks))
+    async with AsyncSessionLocal() as db:
+        for table, run in steps:
+            t = time.perf_counter()
+            report = await run(db, embedder, batch_size=batch)
+            elapsed = time.perf_counter() - t
+            print(
+                f"{table:<18} scanned={report.scanned} embedded={report.embedded} "
+                f"skipped={report.skipped} {report.scanned / max(elapsed, 1e-9):.0f} rows/s"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--target", choices=("items", "chunks", "all"), default="all")
+    ap.add_argument("--batch", type=int, default=256)
+    args = ap.parse_args()
+    sys.exit(asyncio.run(main(args.target, args.batch)))
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Queue throughput of app/services/jobs.py against a real Postgres.
+
+Enqueues N `noop` jobs one at a time with enqueue() and then with
+enqueue_many(), and drains them with run_once() (one lease + one commit per
+job, the old worker loop) and then with run_batch() at the given batch size.
+Prints jobs per second for each. Only `noop` jobs are leased, and every row
+the run inserted is deleted at the end, so it is safe against a dev database
+with other work queued.
+
+Needs DATABASE_URL pointing at a database with the ops schema applied
+(alembic upgrade head, or ops/db/16_ops.sql).
+
+Run:
+  DATABASE_URL=postgresql://... python scripts/bench_jobs.py [--n 5000] [--batch 50]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from uuid import uuid4
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text  # noqa: E402
+
+from app.core.database import AsyncSessionLocal  # noqa: E402
+from app.services import jobs  # noqa: E402
+
+
+def _rate(label: str, n: int, seconds: float) -> None:
+    print(f"{label:<34} {n:>7} jobs  {seconds:7.2f}s  {n / seconds:9.0f} jobs/s")
+
+
+async def _enqueue_each(db, run: str, n: int) -> None:
+    for i in range(n):
+        await jobs.enqueue(db, kind="noop", payload={"bench": run, "i": i})
+
+
+async def _enqueue_many(db, run: str, n: int) -> None:
+    await jobs.enqueue_many(
+        db, kind="noop", payloads=[{"bench": run, "i": i} for i in range(n)],
+    )
+
+
+async def _drain_once(db, n: int) -> int:
+    done = 0
+    while done < n and await jobs.run_once(db, worker="bench", kinds=["noop"]):
+        done += 1
+    return done
+
+
+async def _drain_batch(db, n: int, batch: int) -> int:
+    done = 0
+    while done < n:
+        outcomes = await jobs.run_batch(db, worker="bench", limit=batch, kinds=["noop"])
+        if not outcomes:
+            break
+        done += len(outcomes)
+    return done
+
+
+async def main(n: int, batch: int) -> None:
+    run = uuid4().hex
+    async with AsyncSessionLocal() as db:
+        try:
+            t = time.perf_counter()
+            await _enqueue_each(db, run, n)
+            _rate("enqueue() x N", n, time.perf_counter() - t)
+            t = time.perf_counter()
+            done = await _drain_once(db, n)
+            _rate("run_once() x N", done, time.perf_counter() - t)
+
+            t = time.perf_counter()
+            await _enqueue_many(db, run, n)
+            _rate("enqueue_many()", n, time.perf_counter() - t)
+            t = time.perf_counter()
+            done = await _drain_batch(db, n, batch)
+            _rate(f"run_batch(limit={batch})", done, time.perf_counter() - t)
+        finally:
+            await db.rollback()
+            await db.execute(
+                text("DELETE FROM background_jobs WHERE kind = 'noop' AND payload->>'bench' = :run"),
+                {"run": run},
+            )
+            await db.commit()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--n", type=int, default=5000)
+    ap.add_argument("--batch", type=int, default=50)
+    args = ap.parse_args()
+    asyncio.run(main(args.n, args.batch))
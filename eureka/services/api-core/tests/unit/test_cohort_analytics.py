@@ -0,0 +1,76 @@
+"""
+Unit tests for the pure parts of app/services/cohort_analytics.py.
+
+The aggregation itself is Postgres SQL (CTEs, FILTER, json_agg) and is
+exercised by tests/integration/test_phase9.py against a running stack.
+What is checked here needs no database: the at-risk checklist, which the
+single-statement rewrite moved into `_score`, and the rule deciding when a
+stored snapshot may be served instead of computing live.
+
+Coverage targets:
+  1) An idle learner with no target skills at threshold is flagged, with
+     the notes that explain why.
+  2) A learner on target across every signal is not flagged.
+  3) A zero threshold counts every target skill as hit, as before.
+  4) A snapshot is served only when fresh, unmarked, and computed for the
+     cohort's current targets.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+from app.models.institutional import Cohort, CohortSnapshot
+from app.services import cohort_analytics as ca
+
+
+def _risk(**kw):
+    args = dict(hits=0, recent=0, prior=0, best_pp=None, n_codes=4, threshold=0.85, min_weekly=10)
+    args.update(kw)
+    return ca._score(uuid4(), "l@example.test", "L", **args)
+
+
+def test_idle_learner_is_flagged_with_reasons():
+    r = _risk(prior=12, best_pp=0.3)
+    assert r.at_risk is True
+    assert r.score_trajectory == 0.0
+    assert "only 0/4 target skills at threshold (0.85)" in r.notes
+    assert "0 attempts last 7d (target: 10)" in r.notes
+    assert "latest mock pass probability 0.30" in r.notes
+    assert "no activity in the last 7 days" in r.notes
+
+
+def test_learner_on_target_is_not_flagged():
+    r = _risk(hits=4, recent=20, prior=10, best_pp=0.9)
+    assert r.at_risk is False
+    assert r.notes == []
+    assert r.combined == 0.35 + 0.20 + 0.20 + 0.25 * 0.9
+
+
+def test_zero_threshold_counts_every_target_as_hit():
+    assert _risk(threshold=0.0).score_mastery == 1.0
+
+
+def test_snapshot_served_only_when_fresh_and_current():
+    cohort = Cohort(
+        id=uuid4(), target_skill_codes=["A", "B"],
+        target_mastery=Decimal("0.85"), min_weekly_attempts=5,
+    )
+    now = datetime(2026, 10, 19, 12, 0)
+    snap = CohortSnapshot(
+        cohort_id=cohort.id, params=ca._params(cohort),
+        computed_at=now - timedelta(minutes=5), stale_since=None,
+    )
+    assert ca._usable(snap, cohort, now)
+    assert not ca._usable(None, cohort, now)
+
+    snap.stale_since = now
+    assert not ca._usable(snap, cohort, now)
+    snap.stale_since = None
+
+    assert not ca._usable(snap, cohort, now + ca.SNAPSHOT_MAX_AGE)
+
+    cohort.target_mastery = Decimal("0.90")
+    assert not ca._usable(snap, cohort, now)
@@ -0,0 +1,97 @@
+"""
+Unit tests for the embedding pipeline in app/services/embeddings.py.
+
+Backfill SQL needs Postgres + pgvector; these cover the parts that decide
+what gets embedded and how vectors are encoded.
+
+Coverage targets:
+  1) The vectorised hashed backend reproduces the per-text sha256 stub the
+     existing stored vectors were made with.
+  2) pgvector binary encoding round-trips, and text literals still encode.
+  3) embed_query() serves repeats from its LRU, keyed per model, bounded.
+  4) pipeline() embeds only the rows that need it, counts the rest as
+     skipped, and writes every page in order.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+
+import numpy as np
+import pytest
+
+from app.services import embeddings
+
+
+def _legacy_stub(s: str) -> list[float]:
+    h = hashlib.sha256(s.encode()).digest()
+    arr = [(h[i % len(h)] - 127.5) / 127.5 for i in range(1024)]
+    norm = math.sqrt(sum(x * x for x in arr)) or 1.0
+    return [x / norm for x in arr]
+
+
+class _Counting(embeddings.HashedEmbedder):
+    def __init__(self, model="counting"):
+        self.model = model
+        self.calls: list[list[str]] = []
+
+    def embed(self, texts):
+        self.calls.append(list(texts))
+        return super().embed(texts)
+
+
+def test_hashed_backend_matches_the_legacy_stub():
+    texts = ["Which drug reduces mortality?", "", "ß unicode"]
+    vecs = embeddings.HashedEmbedder().embed(texts)
+    assert vecs.shape == (3, 1024) and vecs.dtype == np.float32
+    for t, v in zip(texts, vecs):
+        assert np.allclose(v, _legacy_stub(t), atol=1e-6)
+    assert embeddings.HashedEmbedder().embed([]).shape == (0, 1024)
+
+
+def test_binary_vector_round_trip():
+    v = np.linspace(-1, 1, 1024, dtype=np.float32)
+    data = embeddings._encode_vector(v)
+    assert len(data) == 4 + 4 * 1024 and data[:2] == (1024).to_bytes(2, "big")
+    assert np.array_equal(embeddings._decode_vector(data), v)
+    assert np.allclose(embeddings._decode_vector(embeddings._encode_vector("[0.5,-0.25]")), [0.5, -0.25])
+
+
+@pytest.mark.asyncio
+async def test_query_cache_is_per_model_and_bounded(monkeypatch):
+    monkeypatch.setattr(embeddings, "QUERY_CACHE_SIZE", 2)
+    embeddings.set_embedder(None)
+    a, b = _Counting("a"), _Counting("b")
+
+    first = await embeddings.embed_query("heart failure", a)
+    again = await embeddings.embed_query("heart failure", a)
+    assert again is first and len(a.calls) == 1
+    assert not first.flags.writeable
+
+    await embeddings.embed_query("heart failure", b)
+    assert len(b.calls) == 1
+    await embeddings.embed_query("renal", a)             # evicts ("a", "heart failure")
+    await embeddings.embed_query("heart failure", a)
+    assert len(a.calls) == 3
+    embeddings.set_embedder(None)
+
+
+@pytest.mark.asyncio
+async def test_pipeline_embeds_only_changed_rows_and_writes_in_order():
+    embedder = _Counting()
+    written = []
+
+    async def pages():
+        yield [1, 2, 3], [(1, "one"), (3, "three")]
+        yield [4, 5], []
+        yield [6], [(6, "six")]
+
+    async def write(todo, vecs):
+        assert len(vecs) == len(todo)
+        written.append([k for k, _t in todo])
+
+    report = await embeddings.pipeline(pages, embedder, write, embeddings.BackfillReport())
+    assert report.as_dict() == {"scanned": 6, "embedded": 3, "skipped": 3}
+    assert written == [[1, 3], [], [6]]
+    assert embedder.calls == [["one", "three"], [], ["six"]]
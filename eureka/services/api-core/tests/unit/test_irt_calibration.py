@@ -0,0 +1,172 @@
+"""
+Unit tests for the 2-PL calibration engine in app/services/irt.py.
+
+The fitters are pure array code over a ResponseMatrix, so most of these
+build the matrix from simulated responses with known parameters and check
+recovery. One test runs calibrate() end to end against an in-memory SQLite
+database carrying only the two tables it reads and writes.
+
+Coverage targets:
+  1) JML and MML both recover simulated difficulties and discriminations.
+  2) The vectorised theta step agrees with the scalar _theta_mle that
+     mock-attempt scoring still uses.
+  3) Repeat attempts collapse into one cell with (n, r) counts.
+  4) calibrate() streams, drops thin items, writes every kept item back,
+     and a second run warm-starts from what the first one wrote.
+"""
+
+from __future__ import annotations
+
+import uuid
+
+import numpy as np
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.services import irt
+
+
+# ── Helpers ────────────────────────────────────────────────────────
+
+
+def _simulate(users: int = 1500, items: int = 60, per_user: int = 30, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    theta = rng.normal(size=users)
+    a = rng.uniform(0.7, 2.0, items)
+    b = rng.normal(size=items)
+    rows = np.repeat(np.arange(users), per_user)
+    cols = np.concatenate([rng.choice(items, per_user, replace=False) for _ in range(users)])
+    p = 1.0 / (1.0 + np.exp(-a[cols] * (theta[rows] - b[cols])))
+    y = (rng.random(len(rows)) < p).astype(float)
+    order = np.lexsort((cols, rows))
+    matrix = irt.ResponseMatrix(
+        user_ids=[str(uuid.uuid4()) for _ in range(users)],
+        item_ids=[str(uuid.uuid4()) for _ in range(items)],
+        rows=rows[order],
+        cols=cols[order],
+        n=np.ones(len(rows)),
+        r=y[order],
+    )
+    return matrix, theta, a, b
+
+
+def _fit_jml(m, iterations=8):
+    theta = np.zeros(m.shape[0])
+    a = np.ones(m.shape[1])
+    b = np.zeros(m.shape[1])
+    for _ in range(iterations):
+        theta = irt._theta_step(m, theta, a, b)
+        a, b = irt._item_step_v(m, theta, a, b)
+    return theta, a, b
+
+
+# ── Recovery ───────────────────────────────────────────────────────
+
+
+def test_jml_recovers_simulated_parameters():
+    m, true_theta, true_a, true_b = _simulate()
+    theta, a, b = _fit_jml(m)
+    assert np.corrcoef(b, true_b)[0, 1] > 0.95
+    assert np.corrcoef(a, true_a)[0, 1] > 0.6
+    assert np.corrcoef(theta, true_theta)[0, 1] > 0.85
+
+
+def test_mml_recovers_simulated_parameters():
+    m, true_theta, true_a, true_b = _simulate()
+    nodes, log_w = irt._quadrature(irt.QUADRATURE_POINTS)
+    r_mat, w_mat = m.csr(m.r), m.csr(m.n - m.r)
+    n_t, r_t = m.csr(m.n).T.tocsr(), r_mat.T.tocsr()
+    a = np.ones(m.shape[1])
+    b = np.zeros(m.shape[1])
+    lls = []
+    for _ in range(10):
+        post, ll = irt._mml_posterior(r_mat, w_mat, a, b, nodes, log_w)
+        lls.append(ll)
+        a, b = irt._mml_item_step(n_t @ post, r_t @ post, a, b, nodes)
+    assert np.corrcoef(b, true_b)[0, 1] > 0.95
+    assert np.corrcoef(a, true_a)[0, 1] > 0.6
+    # EM never decreases the marginal likelihood.
+    assert all(later >= earlier - 1e-6 for earlier, later in zip(lls, lls[1:]))
+    assert np.corrcoef(post @ nodes, true_theta)[0, 1] > 0.85
+
+
+def test_vectorised_theta_step_matches_the_scalar_mle():
+    m, _theta, a, b = _simulate(users=40, items=20, per_user=12, seed=3)
+    fitted = irt._theta_step(m, np.zeros(m.shape[0]), a, b)
+    for u in range(m.shape[0]):
+        cells = m.rows == u
+        responses = [
+            (a[i], b[i], int(y)) for i, y in zip(m.cols[cells], m.r[cells])
+        ]
+        assert fitted[u] == pytest.approx(irt._theta_mle(responses), abs=1e-3)
+
+
+# ── End to end ─────────────────────────────────────────────────────
+
+
+async def _database(attempts):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "CREATE TABLE attempt_logs (user_id TEXT, item_id TEXT, is_correct BOOLEAN)"
+        ))
+        await conn.execute(text(
+            "CREATE TABLE items (id TEXT PRIMARY KEY, irt_discrimination FLOAT, "
+            "irt_difficulty FLOAT, irt_guessing FLOAT, irt_calibrated_at TIMESTAMP, "
+            "attempts_count INTEGER)"
+        ))
+        await conn.execute(
+            text("INSERT INTO attempt_logs VALUES (:u, :i, :y)"),
+            [{"u": u, "i": i, "y": y} for u, i, y in attempts],
+        )
+        await conn.execute(
+            text("INSERT INTO items (id, attempts_count) VALUES (:i, 0)"),
+            [{"i": i} for i in sorted({i for _u, i, _y in attempts})],
+        )
+    return engine
+
+
+@pytest.mark.asyncio
+async def test_calibrate_streams_fits_and_writes_back():
+    m, _theta, _a, _b = _simulate(users=300, items=15, per_user=10, seed=5)
+    attempts = [
+        (m.user_ids[u], m.item_ids[i], bool(y)) for u, i, y in zip(m.rows, m.cols, m.r)
+    ]
+    # A repeat attempt lands in the same cell, and a thin item is skipped.
+    attempts.append(attempts[0])
+    thin = str(uuid.uuid4())
+    attempts.append((m.user_ids[0], thin, True))
+    engine = await _database(attempts)
+
+    async with AsyncSession(engine) as db:
+        matrix = await irt.load_responses(db, chunk_size=97)
+        assert matrix.n.sum() == len(attempts)
+        assert len(matrix.n) == len(attempts) - 1
+
+        first = await irt.calibrate(db, min_attempts_per_item=5, chunk_size=97)
+        await db.commit()
+        assert {str(p.item_id) for p in first.items} == set(m.item_ids)
+        assert len(first.thetas) == 300
+
+        rows = (await db.execute(text(
+            "SELECT id, irt_discrimination, attempts_count FROM items "
+            "WHERE irt_calibrated_at IS NOT NULL"
+        ))).fetchall()
+        assert {r[0] for r in rows} == set(m.item_ids)
+        assert thin not in {r[0] for r in rows}
+
+        # The next run starts from what this one stored.
+        previous = await irt._previous_params(db, m.item_ids)
+        for p in first.items:
+            assert previous[str(p.item_id)] == pytest.approx((p.a, p.b))
+        assert set(await irt._previous_params(db, m.item_ids[:3])) == set(m.item_ids[:3])
+        second = await irt.calibrate(db, min_attempts_per_item=5)
+        assert len(second.items) == 15
+
+        mml = await irt.calibrate(db, min_attempts_per_item=5, method="mml")
+        assert len(mml.items) == 15
+
+        with pytest.raises(ValueError):
+            await irt.calibrate(db, method="bayes")
+    await engine.dispose()
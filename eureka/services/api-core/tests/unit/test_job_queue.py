@@ -0,0 +1,283 @@
+"""
+Unit tests for the batch path of the job queue in app/services/jobs.py.
+
+Leasing and the outcome UPDATE are Postgres statements (SKIP LOCKED, enum
+casts, ON CONFLICT against a partial index) and are exercised by the
+integration suite; these cover the parts that decide what gets written.
+
+Coverage targets:
+  1) A failed attempt walks the retry ladder and is buried once out of
+     attempts; a success clears the lease and stamps finished_at.
+  2) register(concurrency=) feeds lease_batch()'s per-kind caps, and only
+     capped kinds with due work are locked and counted against their cap.
+  3) enqueue_many() compiles to a multi-row INSERT that skips rows whose
+     dedupe_key is already active instead of failing.
+  4) run_batch() runs every leased job, keeps a failing handler from undoing
+     the others' work, and hands every outcome to finish_batch() at once.
+  5) Leases are renewed before each job and by a heartbeat while one runs,
+     so a job that outlives its lease length is not reaped; a job reaped
+     before its turn is skipped.
+  6) The recommender sweep dedupes its fan-out per batch.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.services import jobs
+
+
+NOW = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+
+
+def test_failure_walks_the_retry_ladder_then_buries():
+    assert jobs._after_failure(1, 5, NOW) == ("queued", NOW + timedelta(seconds=60), None)
+    assert jobs._after_failure(4, 5, NOW)[1] == NOW + timedelta(seconds=7200)
+    assert jobs._after_failure(5, 5, NOW) == ("dead", None, NOW)
+
+    failed = jobs.JobOutcome(uuid4(), "noop", 5, 5, error="x" * 5000).row("w", NOW)
+    assert failed["status"] == "dead" and len(failed["error"]) == 4000
+    ok = jobs.JobOutcome(uuid4(), "noop", 1, 5, result={"n": 1}).row("w", NOW)
+    assert ok["status"] == "succeeded" and ok["finished_at"] == NOW
+    assert ok["result"] == '{"n": 1}' and ok["error"] is None
+
+
+def test_register_records_concurrency_caps():
+    assert jobs.concurrency_limits()["rank.recompute"] == 1
+    jobs.register("custom.capped", concurrency=3)(jobs._noop)
+    try:
+        assert jobs.concurrency_limits()["custom.capped"] == 3
+        jobs.register("custom.capped")(jobs._noop)
+        assert "custom.capped" not in jobs.concurrency_limits()
+    finally:
+        jobs._HANDLERS.pop("custom.capped", None)
+
+
+@pytest.mark.asyncio
+async def test_lease_batch_locks_only_capped_kinds_with_due_work():
+    calls = []
+
+    class _Db:
+        async def execute(self, stmt, params=None):
+            calls.append((str(stmt), params))
+            # Of the two capped kinds, only custom.due has queued jobs.
+            rows = [("custom.due", "")] if "pg_advisory" in str(stmt) else []
+            return SimpleNamespace(fetchall=lambda: rows)
+
+        async def commit(self):
+            pass
+
+    caps = {"custom.idle": 1, "custom.due": 2}
+    assert await jobs.lease_batch(_Db(), worker="w", limit=5, kind_limits=caps) == []
+    (lock_sql, lock), (_, lease) = calls
+    assert "pg_advisory_xact_lock" in lock_sql
+    assert lock["capped"] == ["custom.due", "custom.idle"]
+    assert lease["capped"] == ["custom.due"] and lease["caps"] == '{"custom.due": 2}'
+    assert lease["skip"] == ["custom.idle"]
+
+    calls.clear()
+    await jobs.lease_batch(_Db(), worker="w", limit=5, kind_limits={})
+    assert len(calls) == 1 and "pg_advisory" not in calls[0][0]
+    assert calls[0][1]["skip"] == [] and calls[0][1]["scan"] == 5
+
+
+@pytest.mark.asyncio
+async def test_enqueue_many_skips_active_duplicates():
+    captured = []
+
+    class _Db:
+        async def execute(self, stmt):
+            captured.append(stmt)
+            return SimpleNamespace(fetchall=lambda: [(uuid4(),)] * 2)
+
+        async def commit(self):
+            pass
+
+    n = await jobs.enqueue_many(
+        _Db(), kind="email.send",
+        payloads=[{"i": i} for i in range(jobs._ENQUEUE_CHUNK + 1)],
+    )
+    assert len(captured) == 2 and n == 4
+    sql = str(captured[0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (dedupe_key) WHERE status IN ('queued', 'running')" in sql
+    assert "DO NOTHING" in sql and "RETURNING" in sql
+
+    with pytest.raises(ValueError):
+        await jobs.enqueue_many(_Db(), kind="noop", payloads=[{}], dedupe_keys=[])
+
+
+@pytest.mark.asyncio
+async def test_run_batch_isolates_failures_and_finishes_together(monkeypatch):
+    leased = [
+        SimpleNamespace(id=uuid4(), kind=kind, attempt_n=1, max_attempts=5, payload={"k": kind})
+        for kind in ("custom.ok", "custom.boom", "custom.unknown", "custom.ok")
+    ]
+    finished = []
+    calls = []
+
+    async def _lease(db, **kw):
+        return leased
+
+    async def _finish(db, *, worker, outcomes):
+        finished.append((worker, list(outcomes)))
+
+    async def _ok(db, payload):
+        calls.append(payload)
+        return {"ok": True}
+
+    async def _boom(db, payload):
+        raise RuntimeError("boom")
+
+    async def _renew(db, *, worker, job_ids, lease_seconds):
+        return set(job_ids)
+
+    monkeypatch.setattr(jobs, "lease_batch", _lease)
+    monkeypatch.setattr(jobs, "finish_batch", _finish)
+    monkeypatch.setattr(jobs, "renew_leases", _renew)
+    monkeypatch.setitem(jobs._HANDLERS, "custom.ok", _ok)
+    monkeypatch.setitem(jobs._HANDLERS, "custom.boom", _boom)
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with AsyncSession(engine) as db:
+        outcomes = await jobs.run_batch(db, worker="w1", limit=4)
+    await engine.dispose()
+
+    assert [o.status for o in outcomes] == ["succeeded", "queued", "queued", "succeeded"]
+    assert len(calls) == 2
+    assert "boom" in outcomes[1].error
+    assert "no handler registered" in outcomes[2].error
+    assert finished == [("w1", outcomes)]
+
+
+class _Leases:
+    """Stands in for the lease columns: renew_leases() and reap_expired()."""
+
+    def __init__(self, leased, worker):
+        self.loop = asyncio.get_running_loop()
+        self.held = {j.id: (worker, self.loop.time()) for j in leased}
+        self.renewals = []
+
+    async def renew(self, db, *, worker, job_ids, lease_seconds):
+        self.renewals.append(list(job_ids))
+        mine = {i for i in job_ids if self.held.get(i, ("",))[0] == worker}
+        for i in mine:
+            self.held[i] = (worker, self.loop.time() + lease_seconds)
+        return mine
+
+    def reap(self):
+        now = self.loop.time()
+        for i, (_, until) in list(self.held.items()):
+            if until < now:
+                self.held[i] = ("other-worker", now + 60)
+
+
+@pytest.mark.asyncio
+async def test_job_outliving_its_lease_is_renewed_not_reaped(monkeypatch):
+    leased = [
+        SimpleNamespace(id=uuid4(), kind=kind, attempt_n=1, max_attempts=5, payload={})
+        for kind in ("custom.slow", "custom.after")
+    ]
+    leases = _Leases(leased, "w1")
+    finished = []
+
+    async def _lease(db, **kw):
+        return leased
+
+    async def _finish(db, *, worker, outcomes):
+        finished.extend(outcomes)
+
+    async def _slow(db, payload):
+        # Runs for ten lease lengths while a reaper sweeps every 10ms.
+        for _ in range(20):
+            await asyncio.sleep(0.01)
+            leases.reap()
+        return {"done": True}
+
+    async def _after(db, payload):
+        return {"done": True}
+
+    monkeypatch.setattr(jobs, "lease_batch", _lease)
+    monkeypatch.setattr(jobs, "finish_batch", _finish)
+    monkeypatch.setattr(jobs, "renew_leases", leases.renew)
+    monkeypatch.setitem(jobs._HANDLERS, "custom.slow", _slow)
+    monkeypatch.setitem(jobs._HANDLERS, "custom.after", _after)
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with AsyncSession(engine) as db:
+        outcomes = await jobs.run_batch(db, worker="w1", lease_seconds=0.02)
+    await engine.dispose()
+
+    assert [o.status for o in outcomes] == ["succeeded", "succeeded"]
+    assert all(worker == "w1" for worker, _ in leases.held.values())
+    # Both leases renewed before the first job and by the heartbeat while it
+    # ran, then the second job's alone.
+    both = [j.id for j in leased]
+    assert leases.renewals[0] == both
+    assert leases.renewals.count(both) >= 5
+    assert leases.renewals[-1] == [leased[1].id]
+    assert finished == outcomes
+
+
+@pytest.mark.asyncio
+async def test_job_reaped_before_its_turn_is_skipped(monkeypatch):
+    leased = [
+        SimpleNamespace(id=uuid4(), kind="custom.ok", attempt_n=1, max_attempts=5, payload={"n": n})
+        for n in range(3)
+    ]
+    leases = _Leases(leased, "w1")
+    leases.held[leased[1].id] = ("other-worker", leases.loop.time() + 60)
+    ran = []
+
+    async def _lease(db, **kw):
+        return leased
+
+    async def _finish(db, *, worker, outcomes):
+        pass
+
+    async def _ok(db, payload):
+        ran.append(payload["n"])
+
+    monkeypatch.setattr(jobs, "lease_batch", _lease)
+    monkeypatch.setattr(jobs, "finish_batch", _finish)
+    monkeypatch.setattr(jobs, "renew_leases", leases.renew)
+    monkeypatch.setitem(jobs._HANDLERS, "custom.ok", _ok)
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with AsyncSession(engine) as db:
+        outcomes = await jobs.run_batch(db, worker="w1")
+    await engine.dispose()
+
+    assert ran == [0, 2]
+    assert [o.job_id for o in outcomes] == [leased[0].id, leased[2].id]
+
+
+@pytest.mark.asyncio
+async def test_recommender_sweep_dedupes_each_batch(monkeypatch):
+    from app.services import recommender as rec_svc
+
+    learners = [uuid4() for _ in range(5)]
+    calls = []
+
+    async def _active(db, since_days):
+        return learners
+
+    async def _enqueue_many(db, **kw):
+        calls.append(kw)
+        return len(kw["payloads"])
+
+    monkeypatch.setattr(rec_svc, "active_learners", _active)
+    monkeypatch.setattr(jobs, "enqueue_many", _enqueue_many)
+
+    out = await jobs._recommender_precompute_sweep(None, {"batch": 2})
+    assert out == {"learners": 5, "queued": 3}
+    (kw,) = calls
+    assert kw["dedupe_keys"] == [
+        "recommender.precompute:0", "recommender.precompute:1", "recommender.precompute:2",
+    ]
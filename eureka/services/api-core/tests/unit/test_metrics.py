@@ -0,0 +1,93 @@
+"""
+Unit tests for the Prometheus registry in app/services/metrics.py.
+
+Each test builds its own metrics under throwaway names, so nothing here
+depends on what the app's middleware has recorded into the module ones.
+
+Coverage targets:
+  1) Histogram buckets are cumulative exactly once: a value lands in the
+     first bucket whose edge is >= it, and +Inf equals the count.
+  2) Observations from many threads are all counted once the shards merge.
+  3) Label values are escaped in the exposition.
+  4) Multiprocess files from two processes merge: counters and histograms
+     sum, a gauge reports whichever process set it last.
+"""
+
+from __future__ import annotations
+
+import threading
+import uuid
+
+from app.services import metrics as m
+
+
+def _name(prefix: str) -> str:
+    return f"test_{prefix}_{uuid.uuid4().hex[:8]}"
+
+
+def _values(lines: list[str]) -> dict[str, str]:
+    return dict(line.rsplit(" ", 1) for line in lines if not line.startswith("#"))
+
+
+def test_histogram_buckets_accumulate_once():
+    h = m._Histogram(_name("latency"), "t", labels=("route",))
+    for v in (0.005, 0.006, 0.3, 7.0, 42.0):
+        h.observe(v, route="/a")
+    got = _values(h.expose())
+    name = h.name
+    assert got[f'{name}_bucket{{route="/a",le="0.005"}}'] == "1"
+    assert got[f'{name}_bucket{{route="/a",le="0.01"}}'] == "2"
+    assert got[f'{name}_bucket{{route="/a",le="0.25"}}'] == "2"
+    assert got[f'{name}_bucket{{route="/a",le="0.5"}}'] == "3"
+    assert got[f'{name}_bucket{{route="/a",le="10.0"}}'] == "4"
+    assert got[f'{name}_bucket{{route="/a",le="+Inf"}}'] == "5"
+    assert got[f'{name}_count{{route="/a"}}'] == "5"
+    assert float(got[f'{name}_sum{{route="/a"}}']) == 0.005 + 0.006 + 0.3 + 7.0 + 42.0
+
+
+def test_threads_record_without_losing_counts():
+    c = m._Counter(_name("hits"), "t", labels=("k",))
+    series = c.labels(k="x")
+
+    def work():
+        for _ in range(10_000):
+            series.inc()
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert _values(c.expose())[f'{c.name}{{k="x"}}'] == "80000.0"
+
+
+def test_label_values_are_escaped():
+    c = m._Counter(_name("esc"), "t", labels=("path",))
+    c.inc(path='a"b\\c')
+    assert f'{c.name}{{path="a\\"b\\\\c"}} 1.0' in c.expose()
+
+
+def test_multiprocess_files_merge(tmp_path):
+    c = m._Counter(_name("reqs"), "t", labels=("k",))
+    h = m._Histogram(_name("dur"), "t")
+    g = m._Gauge(_name("depth"), "t", labels=("status",))
+
+    # Two workers' files, written the way flush() writes them.
+    for pid, (count, seconds, depth, stamp) in enumerate(((3, 0.02, 5, 100.0), (4, 3.0, 9, 50.0))):
+        f = m._MmapFile(str(tmp_path / f"metrics_{pid}.db"), capacity=64)
+        f.write(m._file_key(c.name, ("x",), 0), count)
+        cells = [0.0] * h.width
+        cells[2] = 1
+        cells[-1] = seconds
+        for slot, value in enumerate(cells):
+            f.write(m._file_key(h.name, (), slot), value)
+        f.write(m._file_key(g.name, ("queued",), 0), depth, stamp)
+        f.close()
+
+    merged = m._merged(str(tmp_path))
+    assert _values(c.render(merged[c.name].items()))[f'{c.name}{{k="x"}}'] == "7.0"
+    hist = _values(h.render(merged[h.name].items()))
+    assert hist[f'{h.name}_count'] == "2"
+    assert hist[f'{h.name}_bucket{{le="0.025"}}'] == "2"
+    assert float(hist[f'{h.name}_sum']) == 3.02
+    assert _values(g.render(merged[g.name].items()))[f'{g.name}{{status="queued"}}'] == "5.0"
@@ -0,0 +1,129 @@
+"""
+Unit tests for blueprint sampling in app/services/mock_exam.py.
+
+The compiled index is built by hand from rows shaped like the compile
+queries' results, so these run without a database; generate_mock_items()
+gets a fake session that answers the bank/generation query and counts the
+compile queries.
+
+Coverage targets:
+  1) Band assignment and proportional allocation: uncalibrated items are in
+     every window, out-of-window items are backfill only, and a quota is
+     split across bands in proportion to their sizes on average.
+  2) A mock meets each skill quota with distinct items, backfills when a
+     skill runs short, and spreads exposure across repeated draws.
+  3) generate_mock_items() reuses the compiled index until a bank's
+     generation moves.
+"""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from app.services import mock_exam as me
+
+
+def _index(n_per_skill=20, out_of_window=5):
+    items, tags = [], []
+    for code in ("BIO", "CHEM"):
+        for k in range(n_per_skill):
+            iid = uuid4()
+            b = None if k % 5 == 0 else -2.5 + 5.0 * k / n_per_skill
+            items.append((iid, b))
+            tags.append((code, iid))
+    for _ in range(out_of_window):
+        iid = uuid4()
+        items.append((iid, 3.5))
+        tags.append(("BIO", iid))
+    return me._build_index(("stamp",), items, tags, {}, -3.0, 3.0), items
+
+
+def test_bands_and_allocation():
+    b = np.array([np.nan, -3.0, -2.6, 0.0, 2.99, 3.0, 3.2, -3.1])
+    assert list(me._bands(b, -3.0, 3.0)) == [-1, 0, 0, 6, 11, 12, -2, -2]
+
+    rng = np.random.default_rng(7)
+    assert list(me._allocate(10, np.array([5, 3, 2]), rng)) == [5, 3, 2]
+    draws = np.array([me._allocate(4, np.array([5, 3, 2]), rng) for _ in range(2000)])
+    assert (draws.sum(axis=1) == 4).all()
+    assert (draws >= [2, 1, 0]).all() and (draws <= [3, 2, 1]).all()
+    assert draws.mean(axis=0) == pytest.approx([2.0, 1.2, 0.8], abs=0.05)
+
+    index, items = _index()
+    assert len(index.by_skill["BIO"]) == 20                 # out-of-window items excluded
+    assert len(index.by_skill["CHEM"]) == 20
+    assert (index.band[index.by_skill["BIO"]] != me._OUTSIDE).all()
+
+
+def test_assemble_meets_quotas_and_spreads_exposure():
+    index, items = _index()
+    rng = np.random.default_rng(7)
+    bio = {index.item_ids[k] for k in index.by_skill["BIO"]}
+
+    picked = me._assemble(index, {"BIO": 8, "CHEM": 6}, 14, rng)
+    assert len(picked) == len(set(picked)) == 14
+    assert sum(1 for iid in picked if iid in bio) == 8
+
+    # BIO only has 20 in-window items; the rest of the mock is backfilled.
+    picked = me._assemble(index, {"BIO": 30}, 30, rng)
+    assert len(picked) == len(set(picked)) == 30
+
+    for _ in range(40):
+        me._assemble(index, {"BIO": 5}, 5, rng)
+    served = index.exposure[index.by_skill["BIO"]]
+    assert served.min() > 0
+    assert served.max() < 2 * served.mean()
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def fetchall(self):
+        return self._rows
+
+
+class _FakeSession:
+    def __init__(self, bank_id, items, tags):
+        self.generation = 1
+        self.bank_id = bank_id
+        self.items = items
+        self.tags = tags
+        self.compiles = 0
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        if "item_bank_generations" in sql:
+            return _Result([(self.bank_id, self.generation)])
+        if "content_skills" in sql:
+            return _Result(self.tags)
+        if "mock_attempt_items" in sql:
+            return _Result([])
+        self.compiles += 1
+        return _Result(self.items)
+
+
+@pytest.mark.asyncio
+async def test_index_is_reused_until_the_generation_moves(monkeypatch):
+    monkeypatch.setattr(me, "_INDEXES", {})
+    _, items = _index()
+    tags = [("BIO", iid) for iid, _ in items]
+    db = _FakeSession(uuid4(), items, tags)
+    blueprint = SimpleNamespace(
+        bank_slugs=["mcat"], item_count=10, difficulty_b_range=[-2.0, 2.0],
+        skill_weights=[{"skill_code": "BIO", "weight": 1}],
+    )
+
+    first = await me.generate_mock_items(db, blueprint, rng=np.random.default_rng(1))
+    await me.generate_mock_items(db, blueprint)
+    assert db.compiles == 1
+    assert [pos for _, pos in first] == list(range(10))
+    assert len({iid for iid, _ in first}) == 10
+
+    db.generation = 2
+    await me.generate_mock_items(db, blueprint)
+    assert db.compiles == 2
@@ -0,0 +1,133 @@
+"""
+Unit tests for manifests, blobs and delta packs in app/services/offline_sync.py.
+
+The candidate query is replaced and a fake session answers the version,
+tag, item and bundle selects by their column list, so these run without a
+database; blobs go through the in-memory cache backend.
+
+Coverage targets:
+  1) The ETag follows item content: a version bump that leaves the
+     serialised item unchanged keeps it, an edit moves it, and items are
+     loaded only for versions not digested before.
+  2) A delta pack against an earlier bundle carries only the changed items,
+     the full manifest and the ids dropped since.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.services import offline_sync as off
+
+
+class _Rows:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+    def scalars(self):
+        return self
+
+    def scalar_one_or_none(self):
+        return self._rows[0] if self._rows else None
+
+
+class _FakeSession:
+    def __init__(self, items):
+        self.items = {it.id: it for it in items}
+        self.tags = {}
+        self.bundles = []
+        self.item_loads = 0
+
+    async def execute(self, stmt):
+        names = [c["name"] for c in stmt.column_descriptions]
+        if names == ["id", "updated_at", "irt_calibrated_at"]:
+            return _Rows([(i, it.updated_at, it.irt_calibrated_at) for i, it in self.items.items()])
+        if names == ["content_id", "skill_id"]:
+            return _Rows([(i, s) for i, sids in self.tags.items() for s in sids])
+        if names == ["Item"]:
+            self.item_loads += 1
+            return _Rows(list(self.items.values()))
+        if names == ["payload_jsonb"]:
+            return _Rows([b.payload_jsonb for b in reversed(self.bundles)])
+        if names == ["OfflineBundle"]:
+            return _Rows([])
+        raise AssertionError(names)
+
+    def add(self, bundle):
+        self.bundles.append(bundle)
+
+    async def commit(self):
+        pass
+
+    async def refresh(self, bundle):
+        pass
+
+
+def _item(stem):
+    return SimpleNamespace(
+        id=uuid4(), content={"stem": stem}, irt_difficulty=None, irt_discrimination=None,
+        updated_at=datetime(2026, 10, 1), irt_calibrated_at=None,
+    )
+
+
+@pytest.fixture
+def session(monkeypatch):
+    items = [_item("a"), _item("b"), _item("c")]
+    db = _FakeSession(items)
+
+    async def _candidates(db_, *, user_id, max_items):
+        return list(db.items)[:max_items]
+
+    monkeypatch.setattr(off, "_candidate_item_ids", _candidates)
+    monkeypatch.setattr(off, "_DIGESTS", type(off._DIGESTS)())
+    return db
+
+
+@pytest.mark.asyncio
+async def test_etag_follows_content_not_version(session):
+    user = uuid4()
+    first = await off.pack_manifest(session, user_id=user)
+    again = await off.pack_manifest(session, user_id=uuid4())
+    assert again.etag == first.etag
+    assert session.item_loads == 1
+
+    a = next(iter(session.items.values()))
+    a.updated_at = datetime(2026, 10, 2)                 # e.g. attempts_count bump
+    bumped = await off.pack_manifest(session, user_id=user)
+    assert session.item_loads == 2
+    assert bumped.etag == first.etag
+
+    a.content = {"stem": "a, revised"}
+    a.updated_at = datetime(2026, 10, 3)
+    edited = await off.pack_manifest(session, user_id=user)
+    assert edited.etag != first.etag
+    assert edited.digests[1:] == first.digests[1:]
+
+
+@pytest.mark.asyncio
+async def test_delta_pack_sends_only_what_the_base_lacks(session):
+    user = uuid4()
+    full = await off.build_item_pack(session, user_id=user)
+    assert len(full.payload["items"]) == 3 and "manifest" not in full.payload
+    assert list(session.bundles[0].payload_jsonb) == ["manifest"]   # no item content stored
+
+    a, b, c = session.items.values()
+    a.content = {"stem": "a, revised"}
+    a.updated_at = datetime(2026, 10, 3)
+    del session.items[c.id]
+    d = _item("d")
+    session.items[d.id] = d
+
+    delta = await off.build_item_pack(session, user_id=user, base_etag=full.bundle.etag)
+    assert delta.delta_base == full.bundle.etag
+    assert sorted(i["id"] for i in delta.payload["items"]) == sorted([str(a.id), str(d.id)])
+    assert delta.payload["removed"] == [str(c.id)]
+    assert [e["id"] for e in delta.payload["manifest"]] == [str(a.id), str(b.id), str(d.id)]
+    assert delta.bundle.etag != full.bundle.etag
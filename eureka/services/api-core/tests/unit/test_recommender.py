@@ -0,0 +1,120 @@
+"""
+Unit tests for the array scorer and result cache in app/services/recommender.py.
+
+The pool and the learner context are built by hand, so these run without a
+database; `recommend()`'s queries are replaced with the same hand-built
+values to exercise the cache path.
+
+Coverage targets:
+  1) Each of the five signals and the weighted total come out as the
+     per-skill rules define them, and mastered skills are never returned.
+  2) Notes are rendered for the returned skills only, with the same wording.
+  3) recommend() serves a repeat view from the cache and recomputes when the
+     learner's context version moves.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+from app.services import recommender as rec
+
+
+NOW = datetime(2026, 10, 19, 12, 0)
+
+
+def _skill(code, tier="undergraduate", framework="ap", name=None):
+    return rec.CandidateSkill(
+        id=uuid4(), framework=framework, code=code, name=name or code.lower(),
+        tier=tier, bloom_level=None,
+    )
+
+
+def _pool():
+    a = _skill("BIO.1")
+    b = _skill("BIO.2", name="cell respiration")
+    c = _skill("STEP1.CARDIO", tier="medical", framework="usmle")
+    d = _skill("CHEM.1", tier="high_school")
+    edges = [(str(b.id), str(a.id), 1.0), (str(c.id), str(a.id), 0.5), (str(c.id), "elsewhere", 0.5)]
+    return rec._build_pool([a, b, c, d], edges), (a, b, c, d)
+
+
+def _ctx(a, b, c, d, **over):
+    ctx = {
+        "mastery_by_skill": {str(a.id): 0.9, str(b.id): 0.5, "elsewhere": 0.3},
+        "next_review_by_skill": {str(b.id): NOW - timedelta(days=1), str(c.id): NOW + timedelta(days=1)},
+        "goals": ["USMLE Step1 cardio", "cell respiration"],
+        "active_tiers": {"undergraduate"},
+        "derived_frameworks": {"usmle"},
+    }
+    ctx.update(over)
+    return ctx
+
+
+def test_signals_match_the_per_skill_rules():
+    pool, (a, b, c, d) = _pool()
+    s = rec._score(pool, _ctx(a, b, c, d), NOW)
+    tier_fit, ready, gap, goal, due = s["components"]
+    assert list(tier_fit) == [1.0, 1.0, 0.9, 0.5]
+    assert ready[0] == 1.0 and ready[3] == 1.0
+    assert ready[1] == pytest.approx(0.9)
+    assert ready[2] == pytest.approx((0.9 * 0.5 + 0.3 * 0.5) / 1.0)
+    assert gap[1] == pytest.approx(1.0) and gap[2] == 0.0
+    assert goal[1] == 1.0 and goal[2] == pytest.approx(2 / 3)
+    assert list(due) == [0.0, 1.0, 0.0, 0.0]
+    reason = rec.RecommendationReason(*(float(v) for v in s["components"][:, 1]))
+    assert s["total"][1] == pytest.approx(reason.total)
+
+    ranked = rec._rank(pool, _ctx(a, b, c, d), NOW, limit=10)
+    assert a not in [r.skill for r in ranked]                    # mastered
+    assert [r.skill for r in ranked] == [b, c, d]
+    assert ranked == sorted(ranked, key=lambda r: -r.score)
+
+
+def test_notes_only_for_returned_skills():
+    pool, (a, b, c, d) = _pool()
+    top = rec._rank(pool, _ctx(a, b, c, d), NOW, limit=1)
+    assert len(top) == 1 and top[0].skill == b
+    assert top[0].reason.notes == [
+        "matches your active undergraduate enrolment",
+        "1 prerequisite(s) at sufficient mastery",
+        "in flight (current mastery 50%)",
+        "matches your goal “cell respiration”",
+        "review is past-due; practice now to prevent decay",
+    ]
+    again = rec.Recommendation.from_dict(top[0].to_dict())
+    assert again.to_dict() == top[0].to_dict()
+
+
+@pytest.mark.asyncio
+async def test_recommend_serves_cached_results_until_the_version_moves(monkeypatch):
+    pool, (a, b, c, d) = _pool()
+    user = type("U", (), {"id": uuid4()})()
+    version = {"v": "one"}
+    loads = []
+
+    async def _versions(db, ids, now):
+        return {user.id: version["v"]}
+
+    async def _contexts(db, ids):
+        loads.append(ids)
+        return {user.id: _ctx(a, b, c, d)}
+
+    async def _candidate_pool(db, tiers, frameworks):
+        return pool
+
+    monkeypatch.setattr(rec, "_versions", _versions)
+    monkeypatch.setattr(rec, "_load_contexts", _contexts)
+    monkeypatch.setattr(rec, "_candidate_pool", _candidate_pool)
+
+    first = await rec.recommend(None, user, limit=2)
+    second = await rec.recommend(None, user, limit=2)
+    assert len(loads) == 1
+    assert [r.to_dict() for r in second] == [r.to_dict() for r in first]
+
+    version["v"] = "two"
+    await rec.recommend(None, user, limit=2)
+    assert len(loads) == 2
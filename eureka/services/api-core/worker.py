@@ -15,19 +15,29 @@ that nothing executes is a promise the platform does not keep.
 
 WHAT IT DOES
 
-Two things, in one loop, because they are both cheap and neither justifies a
+Three things, in one loop, because they are all cheap and none justifies a
 second container:
 
-  1. Drains the job queue. `run_once()` leases with SKIP LOCKED, so running
-     several replicas of this is safe and needs no coordination.
-  2. Every SWEEP_INTERVAL_SECONDS, enqueues a `compliance.delete.sweep`, which
-     is what notices that an erasure has come due. The sweep is itself a job so
-     that its failures land in the same place as everything else's, and its
-     dedupe key stops a slow sweep from being queued twice.
-
-Backoff: when the queue is empty we sleep POLL_INTERVAL_SECONDS. There is no
-LISTEN/NOTIFY here on purpose - erasures are scheduled days out, so a few
-seconds of latency is irrelevant and the simpler loop is easier to trust.
+  1. Drains the job queue in batches. `run_batch()` leases up to
+     WORKER_BATCH_SIZE jobs with one SKIP LOCKED statement and writes their
+     outcomes back in one UPDATE, so running several replicas of this is safe
+     and needs no coordination, and a fan-out of thousands of jobs costs a
+     few round-trips per batch rather than three per job.
+  2. Every SWEEP_INTERVAL_SECONDS, enqueues each kind in SWEEPS:
+     `compliance.delete.sweep`, which is what notices that an erasure has come
+     due, and `cohort.snapshot.sweep`, which refreshes cohort dashboards whose
+     learners have moved. A sweep is itself a job so that its failures land in
+     the same place as everything else's, and its dedupe key stops a slow sweep
+     from being queued twice. `recommender.precompute.sweep` keeps active
+     learners' home-page recommendations warm.
+  3. On the same cadence, `reap_expired()` requeues jobs whose lease ran out
+     because the worker holding them died.
+
+Wakeups: when the queue is empty we wait on NOTIFY background_jobs (sent by
+an insert trigger) on a dedicated asyncpg connection, so new work starts as
+soon as its enqueue commits. POLL_INTERVAL_SECONDS is only the fallback, for
+retries coming off backoff and for when the listener connection is down,
+which is logged and retried rather than fatal.
 
 Run it with `python worker.py`.
 """
@@ -39,8 +49,12 @@ import logging
 import os
 import signal
 import sys
+from typing import Optional
+
+import asyncpg
 
-from app.core.database import AsyncSessionLocal
+from app.core.database import AsyncSessionLocal, database_url
+from app.services import metrics
 
 # Importing the module is what runs the @register decorators. Without this the
 # handler registry is empty and every job dies as "no handler registered".
@@ -52,8 +66,12 @@ logging.basicConfig(
 )
 log = logging.getLogger("worker")
 
-POLL_INTERVAL_SECONDS = float(os.getenv("WORKER_POLL_INTERVAL", "5"))
+POLL_INTERVAL_SECONDS = float(os.getenv("WORKER_POLL_INTERVAL", "30"))
 SWEEP_INTERVAL_SECONDS = float(os.getenv("WORKER_SWEEP_INTERVAL", "300"))
+BATCH_SIZE = int(os.getenv("WORKER_BATCH_SIZE", "20"))
+# Renewed before each job and every third of it while one runs, so it only
+# has to outlast a stalled renewal. A lease that runs out is reaped and requeued.
+LEASE_SECONDS = int(os.getenv("WORKER_LEASE_SECONDS", "300"))
 
 # Touched once per loop. The container healthcheck reads its mtime, so a loop
 # that hangs (rather than exits) is still caught - which matters here, because
@@ -64,6 +82,7 @@ SWEEP_INTERVAL_SECONDS = float(os.getenv("WORKER_SWEEP_INTERVAL", "300"))
 HEARTBEAT_PATH = os.getenv("WORKER_HEARTBEAT_PATH", "/tmp/worker-heartbeat")
 
 _stop = asyncio.Event()
+_wake = asyncio.Event()
 
 
 def _beat() -> None:
@@ -77,48 +96,114 @@ def _beat() -> None:
 
 
 def _request_stop(signum, _frame) -> None:
-    log.info("signal %s received; finishing the current job then exiting", signum)
+    log.info("signal %s received; finishing the current batch then exiting", signum)
     _stop.set()
 
 
-async def _enqueue_sweep() -> None:
-    """Queue the due-erasure sweep. Deduped, so a backed-up queue doesn't stack them."""
-    async with AsyncSessionLocal() as db:
-        job = await jobs_svc.enqueue(
-            db,
-            kind="compliance.delete.sweep",
-            payload={},
-            dedupe_key="compliance.delete.sweep",
-            priority=50,
-        )
-        if job is not None:
-            log.info("queued compliance.delete.sweep")
+# kind -> priority. Erasures outrank dashboards, dashboards outrank warm caches.
+SWEEPS = {
+    "compliance.delete.sweep": 50,
+    "cohort.snapshot.sweep": 150,
+    "recommender.precompute.sweep": 200,
+}
 
 
-async def _drain_one() -> bool:
-    """Run at most one job. Returns True if there was one to run."""
+async def _enqueue_sweep() -> None:
+    """Queue each sweep and reap expired leases. Sweeps are deduped, so a
+    backed-up queue doesn't stack them."""
+    async with AsyncSessionLocal() as db:
+        for kind, priority in SWEEPS.items():
+            job = await jobs_svc.enqueue(
+                db,
+                kind=kind,
+                payload={},
+                dedupe_key=kind,
+                priority=priority,
+            )
+            if job is not None:
+                log.info("queued %s", kind)
+        reaped = await jobs_svc.reap_expired(db)
+        if reaped:
+            log.warning("requeued %d jobs whose lease expired", reaped)
+
+
+class _Listener:
+    """LISTEN background_jobs on its own connection; each NOTIFY sets _wake."""
+
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+        self.conn: Optional[asyncpg.Connection] = None
+
+    def _notified(self, *_args) -> None:
+        _wake.set()
+
+    def _lost(self, _conn) -> None:
+        log.warning("listener connection lost; polling until it reconnects")
+        self.conn = None
+
+    async def ensure(self) -> None:
+        if self.conn is not None and not self.conn.is_closed():
+            return
+        try:
+            conn = await asyncpg.connect(self.dsn)
+            await conn.add_listener("background_jobs", self._notified)
+            conn.add_termination_listener(self._lost)
+        except Exception as exc:
+            log.warning("LISTEN unavailable (%s); polling every %ss", exc, POLL_INTERVAL_SECONDS)
+            return
+        self.conn = conn
+        # Anything enqueued while we weren't listening.
+        _wake.set()
+
+    async def close(self) -> None:
+        if self.conn is not None:
+            await self.conn.close()
+            self.conn = None
+
+
+async def _drain_batch() -> int:
+    """Run up to BATCH_SIZE jobs. Returns how many there were."""
+    # Cleared before leasing, so a NOTIFY that lands mid-batch is not lost.
+    _wake.clear()
     async with AsyncSessionLocal() as db:
-        job = await jobs_svc.run_once(db)
-        if job is None:
-            return False
-        # `run_once` swallows handler exceptions into job.status, so a failure
-        # is visible here rather than as a traceback.
-        level = log.warning if job.status in ("dead", "queued") else log.info
+        outcomes = await jobs_svc.run_batch(
+            db, limit=BATCH_SIZE, lease_seconds=LEASE_SECONDS,
+        )
+    for o in outcomes:
+        metrics.jobs_executed_total.inc(kind=o.kind, outcome=o.status)
+        # `run_batch` swallows handler exceptions into the outcome, so a
+        # failure is visible here rather than as a traceback.
+        level = log.info if o.ok else log.warning
         level(
             "job %s kind=%s status=%s attempt=%s%s",
-            job.id, job.kind, job.status, job.attempt_n,
-            f" error={job.last_error[:200]}" if job.last_error else "",
+            o.job_id, o.kind, o.status, o.attempt_n,
+            f" error={o.error[:200]}" if o.error else "",
         )
-        return True
+    return len(outcomes)
+
+
+async def _idle(listener: _Listener) -> None:
+    """Wait for a NOTIFY, shutdown, or the poll fallback, whichever is first."""
+    await listener.ensure()
+    waiters = [asyncio.ensure_future(_stop.wait()), asyncio.ensure_future(_wake.wait())]
+    try:
+        await asyncio.wait(
+            waiters, timeout=POLL_INTERVAL_SECONDS, return_when=asyncio.FIRST_COMPLETED,
+        )
+    finally:
+        for w in waiters:
+            w.cancel()
 
 
 async def main() -> int:
     log.info(
-        "worker starting; handlers=%s poll=%ss sweep=%ss",
+        "worker starting; handlers=%s batch=%s poll=%ss sweep=%ss",
         ",".join(jobs_svc.registered_kinds()),
+        BATCH_SIZE,
         POLL_INTERVAL_SECONDS,
         SWEEP_INTERVAL_SECONDS,
     )
+    listener = _Listener(database_url.replace("postgresql+asyncpg://", "postgresql://", 1))
     loop = asyncio.get_running_loop()
     for sig in (signal.SIGINT, signal.SIGTERM):
         loop.add_signal_handler(sig, _request_stop, sig, None)
@@ -140,18 +225,15 @@ async def main() -> int:
             next_sweep = now + SWEEP_INTERVAL_SECONDS
 
         try:
-            worked = await _drain_one()
+            worked = await _drain_batch()
         except Exception:
             log.exception("job drain failed")
-            worked = False
+            worked = 0
 
         if not worked:
-            # Wait, but wake immediately on shutdown.
-            try:
-                await asyncio.wait_for(_stop.wait(), timeout=POLL_INTERVAL_SECONDS)
-            except asyncio.TimeoutError:
-                pass
+            await _idle(listener)
 
+    await listener.close()
     log.info("worker stopped")
     return 0
 
@@ -12,6 +12,7 @@ from app.models import AssessmentAttempt, QuestionResponse
 from app.schemas import AutoGradeRequest, AutoGradeResponse, AIGradeRequest, AIGradeResponse
 from app.services.auto_grader import auto_grade_attempt
 from app.services.ai_grader import ai_grade_response
+from app.services.grading_queue import GradingBusy
 from app.core.auth_guard import CurrentUser, require_user
 from app.routes.attempts import _assert_attempt_access
 
@@ -72,13 +73,20 @@ async def ai_grade(
         _assert_attempt_access(user, attempt)
 
     # Grade with AI
-    grading_result = await ai_grade_response(
-        response_id=request.response_id,
-        question_text=request.question_text,
-        response_text=request.response_text,
-        rubric=request.rubric,
-        db=db
-    )
+    try:
+        grading_result = await ai_grade_response(
+            response_id=request.response_id,
+            question_text=request.question_text,
+            response_text=request.response_text,
+            rubric=request.rubric,
+            db=db
+        )
+    except GradingBusy as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "5"},
+        )
     
     return grading_result
 
@@ -1,29 +1,115 @@
 """
 AI grading service using OpenAI GPT-4 for essay grading
+
+Grading runs through app.services.grading_queue on the async OpenAI client,
+so a model round trip no longer holds the event loop: essays are queued,
+micro-batched and graded under a concurrency cap, and repeat submissions
+against the same rubric come from the result cache. Without an API key (or
+with AI_GRADER_BACKEND=stub) the deterministic length-based stub grades
+instead, as the mock grader did before.
+
+Environment:
+  AI_GRADER_BACKEND            openai | stub (default: openai when a key is set)
+  AI_GRADER_MODEL              chat model (gpt-4-turbo-preview)
+  AI_GRADER_QUEUE_SIZE         essays waiting before submitters get a 503 (256)
+  AI_GRADER_BATCH_SIZE         essays per micro-batch (8)
+  AI_GRADER_BATCH_WINDOW_MS    how long a batch waits to fill (20; the
+                               openai backend sends one call per essay and
+                               never waits)
+  AI_GRADER_CONCURRENCY        batches with the backend at once (4)
+  AI_GRADER_TIMEOUT_SECONDS    per model call (60)
+  AI_GRADER_STUB_LATENCY_MS    simulated latency for the stub backend (0)
 """
 
+import asyncio
 import os
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from uuid import UUID
-from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 try:
-    from openai import OpenAI
+    from openai import AsyncOpenAI
     OPENAI_AVAILABLE = True
 except ImportError:
     OPENAI_AVAILABLE = False
 
 from app.models import QuestionResponse, ResponseFeedback
 from app.schemas import AIGradeResponse
+from app.services.grading_queue import (
+    GradeRequest, GradeResult, GradingQueue, StubBackend, stub_grade,
+)
 
-# Initialize OpenAI client
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-if OPENAI_AVAILABLE and OPENAI_API_KEY:
-    client = OpenAI(api_key=OPENAI_API_KEY)
-else:
-    client = None
+AI_GRADER_MODEL = os.getenv("AI_GRADER_MODEL", "gpt-4-turbo-preview")
+AI_GRADER_BACKEND = os.getenv(
+    "AI_GRADER_BACKEND", "openai" if OPENAI_AVAILABLE and OPENAI_API_KEY else "stub"
+)
+AI_GRADER_TIMEOUT_SECONDS = float(os.getenv("AI_GRADER_TIMEOUT_SECONDS", "60"))
+
+SYSTEM_PROMPT = "You are an expert educator grading student essays. Provide detailed, constructive feedback."
+
+
+class OpenAIBackend:
+    """One async chat completion per essay; a batch's calls run together.
+
+    Not a batched request, so the queue does not hold essays back to fill
+    a batch for it."""
+
+    batched = False
+
+    def __init__(self, client: "AsyncOpenAI", model: str):
+        self.client = client
+        self.name = model
+
+    async def grade_batch(self, requests: List[GradeRequest]) -> List[GradeResult]:
+        return list(await asyncio.gather(*(self._grade_one(r) for r in requests)))
+
+    async def _grade_one(self, request: GradeRequest) -> GradeResult:
+        prompt = _build_grading_prompt(
+            request.question_text, request.response_text, request.rubric, request.max_score
+        )
+        try:
+            completion = await self.client.chat.completions.create(
+                model=self.name,
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt},
+                ],
+                temperature=0.3,  # Lower temperature for consistent grading
+                max_tokens=1000,
+                timeout=AI_GRADER_TIMEOUT_SECONDS,
+            )
+        except Exception as e:
+            # Fallback to mock grading on error
+            print(f"AI grading error: {e}")
+            return stub_grade(request)
+        parsed = _parse_ai_response(completion.choices[0].message.content, request.max_score)
+        return GradeResult(
+            score=parsed["score"],
+            feedback=parsed["feedback"],
+            strengths=parsed["strengths"],
+            weaknesses=parsed["weaknesses"],
+            suggestions=parsed["suggestions"],
+            confidence=parsed["confidence"],
+            model=self.name,
+        )
+
+
+def _make_backend():
+    if AI_GRADER_BACKEND == "openai" and OPENAI_AVAILABLE and OPENAI_API_KEY:
+        return OpenAIBackend(AsyncOpenAI(api_key=OPENAI_API_KEY), AI_GRADER_MODEL)
+    return StubBackend(latency=float(os.getenv("AI_GRADER_STUB_LATENCY_MS", "0")) / 1000)
+
+
+grading_queue = GradingQueue(
+    _make_backend(),
+    maxsize=int(os.getenv("AI_GRADER_QUEUE_SIZE", "256")),
+    batch_size=int(os.getenv("AI_GRADER_BATCH_SIZE", "8")),
+    batch_window=float(os.getenv("AI_GRADER_BATCH_WINDOW_MS", "20")) / 1000,
+    concurrency=int(os.getenv("AI_GRADER_CONCURRENCY", "4")),
+)
+
 
 async def ai_grade_response(
     response_id: UUID,
@@ -44,12 +130,11 @@ async def ai_grade_response(
         
     Returns:
         AIGradeResponse with score, feedback, and suggestions
+
+    Raises:
+        GradingBusy: the grading queue is full
     """
     
-    if not client:
-        # Fallback: return mock grading if OpenAI not available
-        return await _mock_ai_grade(response_id, response_text, rubric, db)
-    
     # Get response from database
     result = await db.execute(
         select(QuestionResponse).where(QuestionResponse.id == response_id)
@@ -58,79 +143,40 @@ async def ai_grade_response(
     
     max_score = response.points_possible
     
-    # Build prompt
-    prompt = _build_grading_prompt(question_text, response_text, rubric, max_score)
+    graded = await grading_queue.grade(
+        GradeRequest(question_text, response_text, rubric, max_score)
+    )
     
-    try:
-        # Call OpenAI API
-        completion = client.chat.completions.create(
-            model="gpt-4-turbo-preview",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert educator grading student essays. Provide detailed, constructive feedback."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            temperature=0.3,  # Lower temperature for consistent grading
-            max_tokens=1000
-        )
-        
-        # Parse response
-        ai_response = completion.choices[0].message.content
-        grading_result = _parse_ai_response(ai_response, max_score)
-        
-        # Update response in database
-        response.is_correct = grading_result["score"] >= (max_score * 0.7)  # 70% is passing
-        response.points_earned = grading_result["score"]
-        
-        # Create or update feedback
-        result = await db.execute(
-            select(ResponseFeedback).where(ResponseFeedback.response_id == response_id)
-        )
-        feedback = result.scalar_one_or_none()
-        
-        if not feedback:
-            feedback = ResponseFeedback(
-                response_id=response_id,
-                feedback_text=grading_result["feedback"],
-                is_ai_generated=True,
-                ai_model_used="gpt-4-turbo-preview",
-                confidence_score=grading_result["confidence"],
-                strengths=grading_result["strengths"],
-                weaknesses=grading_result["weaknesses"],
-                suggestions=grading_result["suggestions"]
-            )
-            db.add(feedback)
-        else:
-            feedback.feedback_text = grading_result["feedback"]
-            feedback.is_ai_generated = True
-            feedback.ai_model_used = "gpt-4-turbo-preview"
-            feedback.confidence_score = grading_result["confidence"]
-            feedback.strengths = grading_result["strengths"]
-            feedback.weaknesses = grading_result["weaknesses"]
-            feedback.suggestions = grading_result["suggestions"]
-        
-        await db.commit()
-        
-        return AIGradeResponse(
-            response_id=response_id,
-            score=grading_result["score"],
-            max_score=max_score,
-            feedback=grading_result["feedback"],
-            strengths=grading_result["strengths"],
-            weaknesses=grading_result["weaknesses"],
-            suggestions=grading_result["suggestions"],
-            confidence_score=grading_result["confidence"]
-        )
-        
-    except Exception as e:
-        # Fallback to mock grading on error
-        print(f"AI grading error: {e}")
-        return await _mock_ai_grade(response_id, response_text, rubric, db)
+    # Update response in database
+    response.is_correct = graded.score >= (max_score * 0.7)  # 70% is passing
+    response.points_earned = graded.score
+    
+    # One feedback row per (re)grade
+    db.add(ResponseFeedback(
+        response_id=response_id,
+        feedback_text=graded.feedback,
+        feedback_type="ai" if graded.ai_generated else "mock",
+        model_used=graded.model,
+        extra_metadata={
+            "confidence": graded.confidence,
+            "strengths": graded.strengths,
+            "weaknesses": graded.weaknesses,
+            "suggestions": graded.suggestions,
+        },
+    ))
+    
+    await db.commit()
+    
+    return AIGradeResponse(
+        response_id=response_id,
+        score=graded.score,
+        max_score=max_score,
+        feedback=graded.feedback,
+        strengths=graded.strengths,
+        weaknesses=graded.weaknesses,
+        suggestions=graded.suggestions,
+        confidence_score=graded.confidence
+    )
 
 def _build_grading_prompt(
     question_text: str,
@@ -241,77 +287,3 @@ def _parse_ai_response(ai_response: str, max_score: float) -> Dict[str, Any]:
                 result[current_section].append(item)
     
     return result
-
-async def _mock_ai_grade(
-    response_id: UUID,
-    response_text: str,
-    rubric: Optional[Dict[str, Any]],
-    db: AsyncSession
-) -> AIGradeResponse:
-    """
-    Mock AI grading for when OpenAI is not available
-    """
-    
-    # Get response from database
-    result = await db.execute(
-        select(QuestionResponse).where(QuestionResponse.id == response_id)
-    )
-    response = result.scalar_one()
-    
-    max_score = response.points_possible
-    
-    # Simple mock grading based on length
-    word_count = len(response_text.split())
-    score = min(max_score, max_score * (word_count / 200))  # Assume 200 words is full credit
-    
-    strengths = ["Clear attempt at answering the question"]
-    weaknesses = []
-    suggestions = []
-    
-    if word_count < 50:
-        weaknesses.append("Response is too brief")
-        suggestions.append("Provide more detailed explanation")
-    
-    if word_count < 100:
-        weaknesses.append("Could use more supporting details")
-        suggestions.append("Add specific examples to support your points")
-    
-    feedback = f"Your response demonstrates {'good' if score >= max_score * 0.7 else 'partial'} understanding of the topic. "
-    feedback += " ".join(strengths) + ". " if strengths else ""
-    feedback += "Consider: " + ", ".join(suggestions) + "." if suggestions else ""
-    
-    # Update response
-    response.points_earned = score
-    response.is_correct = score >= (max_score * 0.7)
-    
-    # Create feedback
-    result = await db.execute(
-        select(ResponseFeedback).where(ResponseFeedback.response_id == response_id)
-    )
-    feedback_record = result.scalar_one_or_none()
-    
-    if not feedback_record:
-        feedback_record = ResponseFeedback(
-            response_id=response_id,
-            feedback_text=feedback,
-            is_ai_generated=False,  # Mock grading
-            ai_model_used="mock_grader",
-            confidence_score=0.6,
-            strengths=strengths,
-            weaknesses=weaknesses,
-            suggestions=suggestions
-        )
-        db.add(feedback_record)
-    
-    await db.commit()
-    
-    return AIGradeResponse(
-        response_id=response_id,
-        score=score,
-        max_score=max_score,
-        feedback=feedback,
-        strengths=strengths,
-        weaknesses=weaknesses,
-        suggestions=suggestions,
-        confidence_score=0.6
-    )
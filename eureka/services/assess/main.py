@@ -10,6 +10,7 @@ from contextlib import asynccontextmanager
 
 from app.core.auth_guard import require_user
 from app.utils.database import init_db, close_db
+from app.services.ai_grader import grading_queue
 from app.routes import assessments, questions, attempts, grading
 
 # Lifespan context manager for startup/shutdown
@@ -18,8 +19,10 @@ async def lifespan(app: FastAPI):
     # Startup
     await init_db()
     print("✅ Assessment Engine database initialized")
+    grading_queue.start()
     yield
     # Shutdown
+    await grading_queue.stop()
     await close_db()
     print("👋 Assessment Engine shutting down")
 
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Essay grading throughput and MCQ tail latency, offline.
+
+Runs the same mixed load twice in one event loop: N essays submitted at
+once alongside a steady stream of MCQ checks (auto_grader.check_answer).
+
+  blocking   each essay is graded inline with a synchronous sleep of
+             --latency seconds, the way a blocking model client behaves.
+  queued     essays go through GradingQueue with a StubBackend of the same
+             latency, batched and with limited concurrency.
+
+Prints essays per second and MCQ p50/p99 latency for each. No model, key
+or database is needed; StubBackend's grades are deterministic.
+
+Run:
+  python scripts/bench_grading.py [--essays 64] [--latency 0.05] [--batch 8] [--concurrency 4]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models import QuestionType  # noqa: E402
+from app.services.auto_grader import check_answer  # noqa: E402
+from app.services.grading_queue import (  # noqa: E402
+    GradeRequest, GradingQueue, StubBackend, stub_grade,
+)
+
+
+def _essays(n: int) -> list:
+    return [
+        GradeRequest(
+            question_text="Explain the mechanism of action of loop diuretics.",
+            response_text=" ".join([f"essay{i}"] * (40 + 7 * i)),
+            rubric={"accuracy": "Factual correctness", "clarity": "Clear structure"},
+            max_score=10.0,
+        )
+        for i in range(n)
+    ]
+
+
+async def _mcq_stream(stop: asyncio.Event, latencies: list) -> None:
+    while not stop.is_set():
+        sent = time.perf_counter()
+        await asyncio.sleep(0)   # one trip through the loop, as a request would
+        check_answer("b", "B", QuestionType.MULTIPLE_CHOICE)
+        latencies.append(time.perf_counter() - sent)
+        await asyncio.sleep(0.002)
+
+
+async def _run(label: str, grade, essays: list) -> None:
+    stop = asyncio.Event()
+    latencies: list = []
+    mcq = asyncio.create_task(_mcq_stream(stop, latencies))
+    started = time.perf_counter()
+    await asyncio.gather(*(grade(e) for e in essays))
+    seconds = time.perf_counter() - started
+    stop.set()
+    await mcq
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))] if latencies else 0.0
+    p50 = statistics.median(latencies) if latencies else 0.0
+    print(
+        f"{label:<10} {len(essays):>5} essays  {seconds:7.2f}s  {len(essays) / seconds:8.1f} essays/s"
+        f"   mcq p50 {p50 * 1000:7.2f} ms  p99 {p99 * 1000:7.2f} ms  ({len(latencies)} checks)"
+    )
+
+
+async def main(args) -> None:
+    essays = _essays(args.essays)
+
+    async def blocking(request):
+        time.sleep(args.latency)
+        return stub_grade(request)
+
+    await _run("blocking", blocking, essays)
+
+    queue = GradingQueue(
+        StubBackend(latency=args.latency),
+        batch_size=args.batch,
+        concurrency=args.concurrency,
+        maxsize=max(256, args.essays),
+    )
+    await _run("queued", queue.grade, essays)
+    await queue.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--essays", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per backend call")
+    parser.add_argument("--batch", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=4)
+    asyncio.run(main(parser.parse_args()))
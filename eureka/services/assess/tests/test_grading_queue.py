@@ -0,0 +1,130 @@
+"""
+Tests for the async essay grading queue (app/services/grading_queue.py).
+
+Everything runs against StubBackend, so no model, key or database is needed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.services.grading_queue import (
+    GradeRequest, GradingBusy, GradingQueue, StubBackend, stub_grade,
+)
+
+
+def _essay(n: int, words: int = 120) -> GradeRequest:
+    return GradeRequest(
+        question_text="Explain osmosis.",
+        response_text=" ".join([f"w{n}"] * words),
+        rubric={"accuracy": "Factual correctness"},
+        max_score=10.0,
+    )
+
+
+@pytest.mark.asyncio
+async def test_batches_coalesces_and_caches():
+    backend = StubBackend(latency=0.01)
+    queue = GradingQueue(backend, batch_size=8, batch_window=0.01, concurrency=2)
+
+    requests = [_essay(i % 10) for i in range(20)]
+    results = await asyncio.gather(*(queue.grade(r) for r in requests))
+    assert [r.score for r in results] == [stub_grade(r).score for r in requests]
+    assert backend.calls <= 2                       # 10 distinct essays, batches of 8
+
+    calls = backend.calls
+    await queue.grade(_essay(3))                    # same essay, same rubric: cached
+    assert backend.calls == calls
+    other_rubric = GradeRequest(**{**_essay(3).__dict__, "rubric": {"clarity": "Clear"}})
+    await queue.grade(other_rubric)
+    assert backend.calls == calls + 1
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_grading_does_not_block_the_loop():
+    queue = GradingQueue(StubBackend(latency=0.05), batch_size=1, concurrency=1)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.005)
+
+    task = asyncio.create_task(ticker())
+    await asyncio.gather(*(queue.grade(_essay(i)) for i in range(3)))
+    task.cancel()
+    assert ticks >= 10
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_full_queue_raises_busy_and_failures_fall_back_uncached():
+    queue = GradingQueue(
+        StubBackend(latency=0.2), maxsize=1, batch_size=1, concurrency=1, enqueue_timeout=0.01,
+    )
+    # Essay 0 is with the backend, essay 1 waits in the dispatcher for a
+    # free slot, essay 2 fills the queue; essay 3 has nowhere to go.
+    held = []
+    for i in range(3):
+        held.append(asyncio.create_task(queue.grade(_essay(i))))
+        await asyncio.sleep(0.01)
+    with pytest.raises(GradingBusy):
+        await queue.grade(_essay(3))
+    await asyncio.gather(*held)
+    await queue.stop()
+
+    class Failing(StubBackend):
+        name = "gpt-test"
+
+        async def grade_batch(self, requests):
+            self.calls += 1
+            raise RuntimeError("upstream down")
+
+    backend = Failing()
+    queue = GradingQueue(backend)
+    result = await queue.grade(_essay(4))
+    assert result.model == "mock_grader" and not result.ai_generated
+    await queue.grade(_essay(4))
+    assert backend.calls == 2                       # fallback results are not cached
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_enqueue_leaves_nothing_pending():
+    queue = GradingQueue(StubBackend(latency=0.1), maxsize=1, batch_size=1, concurrency=1)
+    held = []
+    for i in range(3):
+        held.append(asyncio.create_task(queue.grade(_essay(i))))
+        await asyncio.sleep(0.01)
+    # The queue is full: essay 3 waits for room, a duplicate coalesces on it.
+    waiting = asyncio.create_task(queue.grade(_essay(3)))
+    await asyncio.sleep(0.01)
+    duplicate = asyncio.create_task(queue.grade(_essay(3)))
+    await asyncio.sleep(0.01)
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    with pytest.raises(asyncio.CancelledError):
+        await asyncio.wait_for(duplicate, 1)
+    assert len(queue._pending) == 3                 # essays 0-2; essay 3's entry is gone
+
+    await asyncio.gather(*held)
+    result = await asyncio.wait_for(queue.grade(_essay(3)), 1)
+    assert result.score == stub_grade(_essay(3)).score
+    assert not queue._pending
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_unbatched_backend_does_not_wait_for_a_batch_to_fill():
+    class PerEssay(StubBackend):
+        batched = False
+
+    queue = GradingQueue(PerEssay(), batch_window=5.0)
+    assert queue.batch_window == 0.0
+    await asyncio.wait_for(queue.grade(_essay(0)), 1)
+    await queue.stop()
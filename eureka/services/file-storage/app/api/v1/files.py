@@ -4,13 +4,14 @@ File Storage Service - File Management API Endpoints
 import os
 import uuid
 from datetime import timedelta
-from typing import Optional
-from fastapi import APIRouter, File, UploadFile, HTTPException, Depends, Form, Query
+from typing import Optional, Tuple
+from fastapi import APIRouter, File, UploadFile, HTTPException, Depends, Form, Header, Query
 from fastapi.responses import StreamingResponse
-import io
+from starlette.concurrency import run_in_threadpool
 import logging
 
 from app.core.storage import get_storage_client, StorageClient
+from app.core.streaming import FileTooLarge
 from app.core.config import get_settings
 from app.core.auth_guard import CurrentUser, require_user, is_staff
 from app.schemas import (
@@ -110,6 +111,76 @@ def validate_file_size(file_size: int) -> bool:
     return file_size <= max_size_bytes
 
 
+def parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Inclusive (start, end) for a single `bytes=` range, or None to send
+    the whole file.
+
+    Multi-range and non-byte units are ignored (a full 200 is a valid reply
+    to any Range), as are malformed headers. A well-formed range that starts
+    past the end of the file is a 416.
+    """
+    if not range_header:
+        return None
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    if not (first or last).isdigit() or (first and last and not last.isdigit()):
+        return None
+    if not first:
+        # Suffix range: the last N bytes (N == 0 is unsatisfiable)
+        suffix = int(last)
+        start, end = (max(0, size - suffix), size - 1) if suffix else (size, size - 1)
+    else:
+        start = int(first)
+        if last and int(last) < start:
+            return None
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, end
+
+
+async def object_response(
+    storage: StorageClient,
+    file_path: str,
+    info: dict,
+    media_type: str,
+    headers: dict,
+    range_header: Optional[str] = None,
+    if_range: Optional[str] = None,
+) -> StreamingResponse:
+    """Stream an object, honouring Range so interrupted downloads resume.
+
+    If-Range carrying anything but the current ETag means the client's
+    partial copy is stale, so the whole file is sent instead.
+    """
+    size = info["size"]
+    etag = (info.get("etag") or "").strip('"')
+    headers = {**headers, "Accept-Ranges": "bytes"}
+    if etag:
+        headers["ETag"] = f'"{etag}"'
+
+    byte_range = None
+    if if_range is None or if_range.strip().strip('"') == etag:
+        byte_range = parse_range(range_header, size)
+
+    if byte_range is None:
+        body = await run_in_threadpool(storage.open_stream, file_path)
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(body, media_type=media_type, headers=headers)
+
+    start, end = byte_range
+    body = await run_in_threadpool(storage.open_stream, file_path, start, end - start + 1)
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(body, status_code=206, media_type=media_type, headers=headers)
+
+
 @router.post("/upload", response_model=FileUploadResponse, status_code=201)
 async def upload_file(
     file: UploadFile = File(...),
@@ -144,12 +215,10 @@ async def upload_file(
                 detail=f"File type not allowed. Allowed types: {settings.ALLOWED_EXTENSIONS}"
             )
 
-        # Read file content
-        file_content = await file.read()
-        file_size = len(file_content)
-
-        # Validate file size
-        if not validate_file_size(file_size):
+        # The multipart parser has spooled the part to a temp file; it is
+        # streamed from there to storage and never read whole into memory.
+        # Validate file size (again while streaming, if the size is unknown)
+        if file.size is not None and not validate_file_size(file.size):
             raise HTTPException(
                 status_code=413,
                 detail=f"File too large. Maximum size: {settings.MAX_FILE_SIZE_MB}MB"
@@ -158,7 +227,9 @@ async def upload_file(
         # Validate content against the claimed extension (P2-15): the filename
         # is attacker-controlled, so binary formats must carry their magic
         # bytes and executable content is rejected outright.
-        if not validate_magic_bytes(file.filename, file_content):
+        head = await file.read(64)
+        await file.seek(0)
+        if not validate_magic_bytes(file.filename, head):
             raise HTTPException(
                 status_code=400,
                 detail="File content does not match its extension",
@@ -183,20 +254,28 @@ async def upload_file(
         else:
             file_path = f"{folder}/{file_id}{file_extension}"
 
-        # Upload to storage
-        file_stream = io.BytesIO(file_content)
-        upload_result = storage.upload_file(
-            file_data=file_stream,
-            file_path=file_path,
-            content_type=file.content_type or "application/octet-stream",
-            metadata={
-                "original_filename": file.filename,
-                "user_id": user_id or "",
-                "course_id": course_id or "",
-                "assignment_id": assignment_id or "",
-                "description": description or ""
-            }
-        )
+        # Stream to storage (S3 multipart, bounded part buffers) off the loop
+        try:
+            upload_result = await run_in_threadpool(
+                storage.upload_stream,
+                stream=file.file,
+                file_path=file_path,
+                content_type=file.content_type or "application/octet-stream",
+                metadata={
+                    "original_filename": file.filename,
+                    "user_id": user_id or "",
+                    "course_id": course_id or "",
+                    "assignment_id": assignment_id or "",
+                    "description": description or ""
+                },
+                max_size=settings.MAX_FILE_SIZE_MB * 1024 * 1024,
+            )
+        except FileTooLarge:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File too large. Maximum size: {settings.MAX_FILE_SIZE_MB}MB"
+            )
+        file_size = upload_result["size"]
 
         # Generate presigned URL for immediate access (24 hours)
         download_url = storage.get_presigned_url(file_path, expires=timedelta(hours=24))
@@ -242,11 +321,10 @@ async def public_xr_asset(
     full_path = f"xr-assets/{file_path}"
     if not storage.file_exists(full_path):
         raise HTTPException(status_code=404, detail="File not found")
-    file_data = storage.download_file(full_path)
+    info = storage.get_file_info(full_path)
     media = "model/gltf-binary" if full_path.endswith(".glb") else "model/gltf+json"
-    return StreamingResponse(
-        io.BytesIO(file_data),
-        media_type=media,
+    return await object_response(
+        storage, full_path, info, media,
         headers={"Cache-Control": "public, max-age=86400"},
     )
 
@@ -254,6 +332,8 @@ async def public_xr_asset(
 @router.get("/download/{file_path:path}")
 async def download_file(
     file_path: str,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_range: Optional[str] = Header(None, alias="If-Range"),
     storage: StorageClient = Depends(get_storage_client),
     user: CurrentUser = Depends(require_user),
 ):
@@ -263,9 +343,11 @@ async def download_file(
 
     Args:
         file_path: Path to file in storage
+        range_header: Optional `Range: bytes=...` to resume or seek
+        if_range: Optional ETag the client's partial copy was taken from
 
     Returns:
-        File content as streaming response
+        File content as streaming response (206 for a range)
     """
     try:
         # Check if file exists
@@ -275,22 +357,17 @@ async def download_file(
         # Get file info
         file_info = storage.get_file_info(file_path)
 
-        # Download file
-        file_data = storage.download_file(file_path)
-
         # Get original filename from metadata if available
         filename = file_info.get("metadata", {}).get("X-Amz-Meta-Original_filename", file_path.split("/")[-1])
 
         logger.info(f"File downloaded: {file_path}")
 
-        # Return as streaming response
-        return StreamingResponse(
-            io.BytesIO(file_data),
-            media_type=file_info["content_type"],
-            headers={
-                "Content-Disposition": f'attachment; filename="{filename}"',
-                "Content-Length": str(file_info["size"])
-            }
+        # Stream straight from storage, whole or the requested range
+        return await object_response(
+            storage, file_path, file_info, file_info["content_type"],
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+            range_header=range_header,
+            if_range=if_range,
         )
 
     except HTTPException:
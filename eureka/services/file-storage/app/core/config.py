@@ -27,11 +27,21 @@ class Settings(BaseSettings):
     S3_PUBLIC_SECURE: bool = False
     S3_REGION: str = "us-east-1"
 
+    # "minio" (default) or "local": a filesystem stand-in for MinIO, used
+    # in development and by scripts/bench_transfers.py.
+    STORAGE_BACKEND: str = "minio"
+    LOCAL_STORAGE_DIR: str = "/tmp/eureka-storage"
+
     # File Upload Limits
     # Raised from 100 for direct-upload lecture videos (course-media/).
-    # The upload path buffers in memory; revisit with streaming uploads if
-    # lectures regularly exceed this.
+    # Uploads and downloads stream, so this caps object size, not memory.
     MAX_FILE_SIZE_MB: int = 1024
+
+    # Streaming transfers. Uploads go to S3 as multipart parts of this size
+    # (S3's minimum is 5 MB), one part in flight; downloads are sent in
+    # chunks of DOWNLOAD_CHUNK_KB.
+    UPLOAD_PART_SIZE_MB: int = 8
+    DOWNLOAD_CHUNK_KB: int = 256
     ALLOWED_EXTENSIONS: list = [
         # Documents
         ".pdf", ".doc", ".docx", ".txt", ".rtf", ".odt",
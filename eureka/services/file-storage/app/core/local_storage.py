@@ -0,0 +1,191 @@
+"""
+File Storage Service - Local filesystem backend
+
+Stands in for MinIO when STORAGE_BACKEND=local: same methods and return
+shapes as StorageClient, with objects under LOCAL_STORAGE_DIR and their
+content type and metadata in a JSON sidecar under its .meta/ directory.
+Meant for development and for measuring transfer memory and throughput
+(scripts/bench_transfers.py) without an object store; presigned URLs are
+plain API download paths, not signed.
+"""
+import json
+import os
+import shutil
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO, Iterator, Optional
+import logging
+
+from app.core.config import get_settings
+from app.core.streaming import HashingReader
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+_META_DIR = ".meta"
+
+
+class LocalStorageClient:
+    """Filesystem storage client"""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = os.path.abspath(root or settings.LOCAL_STORAGE_DIR)
+        self.bucket_name = settings.S3_BUCKET_NAME
+        os.makedirs(os.path.join(self.root, _META_DIR), exist_ok=True)
+
+    def _path(self, file_path: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, file_path.lstrip("/")))
+        if os.path.commonpath([path, self.root]) != self.root or path == self.root:
+            raise FileNotFoundError(file_path)
+        return path
+
+    def _meta_path(self, file_path: str) -> str:
+        return self._path(os.path.join(_META_DIR, file_path.lstrip("/"))) + ".json"
+
+    def _read_meta(self, file_path: str) -> dict:
+        try:
+            with open(self._meta_path(file_path)) as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return {}
+
+    def upload_stream(
+        self,
+        stream: BinaryIO,
+        file_path: str,
+        content_type: str = "application/octet-stream",
+        metadata: Optional[dict] = None,
+        max_size: Optional[int] = None
+    ) -> dict:
+        """Copy a stream to disk in DOWNLOAD_CHUNK_KB pieces; the object
+        appears only once it is complete."""
+        path = self._path(file_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        reader = HashingReader(stream, limit=max_size)
+        tmp = f"{path}.{uuid.uuid4().hex}.part"
+        try:
+            with open(tmp, "wb") as out:
+                shutil.copyfileobj(reader, out, settings.DOWNLOAD_CHUNK_KB * 1024)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+        etag = reader.hexdigest()[:32]
+        meta_path = self._meta_path(file_path)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        with open(meta_path, "w") as fh:
+            json.dump({
+                "content_type": content_type,
+                "etag": etag,
+                # Keys as MinIO's stat_object reports user metadata.
+                "metadata": {
+                    f"X-Amz-Meta-{k.capitalize()}": v for k, v in (metadata or {}).items()
+                },
+            }, fh)
+
+        logger.info(f"Uploaded file: {file_path} (size: {reader.size} bytes, local)")
+        return {
+            "bucket": self.bucket_name,
+            "file_path": file_path,
+            "etag": etag,
+            "size": reader.size,
+            "content_type": content_type,
+            "file_hash": reader.hexdigest()
+        }
+
+    def upload_file(
+        self,
+        file_data: BinaryIO,
+        file_path: str,
+        content_type: str = "application/octet-stream",
+        metadata: Optional[dict] = None
+    ) -> dict:
+        file_data.seek(0)
+        return self.upload_stream(file_data, file_path, content_type, metadata)
+
+    def open_stream(
+        self,
+        file_path: str,
+        offset: int = 0,
+        length: Optional[int] = None
+    ) -> Iterator[bytes]:
+        fh = open(self._path(file_path), "rb")
+        fh.seek(offset)
+        return self._iter_file(fh, length)
+
+    @staticmethod
+    def _iter_file(fh, length: Optional[int]) -> Iterator[bytes]:
+        chunk_size = settings.DOWNLOAD_CHUNK_KB * 1024
+        remaining = length
+        try:
+            while remaining is None or remaining > 0:
+                chunk = fh.read(chunk_size if remaining is None else min(chunk_size, remaining))
+                if not chunk:
+                    return
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+        finally:
+            fh.close()
+
+    def download_file(self, file_path: str) -> bytes:
+        with open(self._path(file_path), "rb") as fh:
+            return fh.read()
+
+    def delete_file(self, file_path: str) -> bool:
+        os.remove(self._path(file_path))
+        try:
+            os.remove(self._meta_path(file_path))
+        except FileNotFoundError:
+            pass
+        logger.info(f"Deleted file: {file_path}")
+        return True
+
+    def get_presigned_url(
+        self,
+        file_path: str,
+        expires: timedelta = timedelta(hours=1)
+    ) -> str:
+        return f"/api/v1/files/download/{file_path}"
+
+    def list_files(self, prefix: str = "", max_files: int = 1000) -> list:
+        files = []
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            if dirpath == self.root:
+                dirnames[:] = [d for d in dirnames if d != _META_DIR]
+            dirnames.sort()
+            for name in sorted(filenames):
+                if name.endswith(".part"):
+                    continue
+                key = os.path.relpath(os.path.join(dirpath, name), self.root).replace(os.sep, "/")
+                if not key.startswith(prefix):
+                    continue
+                if len(files) >= max_files:
+                    return files
+                info = self.get_file_info(key)
+                files.append({
+                    "name": key,
+                    "size": info["size"],
+                    "last_modified": info["last_modified"],
+                    "etag": info["etag"]
+                })
+        return files
+
+    def file_exists(self, file_path: str) -> bool:
+        try:
+            return os.path.isfile(self._path(file_path))
+        except FileNotFoundError:
+            return False
+
+    def get_file_info(self, file_path: str) -> dict:
+        stat = os.stat(self._path(file_path))
+        meta = self._read_meta(file_path)
+        return {
+            "file_path": file_path,
+            "size": stat.st_size,
+            "last_modified": datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
+            "content_type": meta.get("content_type", "application/octet-stream"),
+            "etag": meta.get("etag", f"{stat.st_mtime_ns:x}-{stat.st_size:x}"),
+            "metadata": meta.get("metadata", {})
+        }
@@ -6,12 +6,13 @@ Handles all interactions with object storage (MinIO/S3).
 import hashlib
 import io
 from datetime import timedelta
-from typing import BinaryIO, Optional
+from typing import BinaryIO, Iterator, Optional
 from minio import Minio
 from minio.error import S3Error
 import logging
 
 from app.core.config import get_settings
+from app.core.streaming import HashingReader
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
@@ -111,6 +112,105 @@ class StorageClient:
             logger.error(f"Error uploading file {file_path}: {e}")
             raise
 
+    def upload_stream(
+        self,
+        stream: BinaryIO,
+        file_path: str,
+        content_type: str = "application/octet-stream",
+        metadata: Optional[dict] = None,
+        max_size: Optional[int] = None
+    ) -> dict:
+        """
+        Upload a file-like stream of unknown length as an S3 multipart upload
+
+        Parts of UPLOAD_PART_SIZE_MB go up one at a time, so one part is
+        held in memory, and the SHA-256 is computed as the parts are read.
+        Passing `max_size` raises FileTooLarge mid-stream, and the SDK
+        aborts the multipart upload.
+
+        Not num_parallel_uploads > 1: the SDK's (7.2.0) worker threads stop
+        releasing their queue slots once one part has failed, so the next
+        parts block the reading thread for good instead of failing the
+        upload. The stream arrives at client speed anyway, which a second
+        part in flight does not raise.
+
+        Args:
+            stream: Readable binary stream, consumed once
+            file_path: Path/key in S3
+            content_type: MIME type of the file
+            metadata: Optional metadata dict
+            max_size: Optional size limit in bytes
+
+        Returns:
+            dict with upload info, as upload_file
+        """
+        reader = HashingReader(stream, limit=max_size)
+        try:
+            result = self.client.put_object(
+                self.bucket_name,
+                file_path,
+                reader,
+                length=-1,
+                content_type=content_type,
+                metadata=metadata or {},
+                part_size=settings.UPLOAD_PART_SIZE_MB * 1024 * 1024,
+                num_parallel_uploads=1
+            )
+
+            logger.info(f"Uploaded file: {file_path} (size: {reader.size} bytes, streamed)")
+
+            return {
+                "bucket": self.bucket_name,
+                "file_path": file_path,
+                "etag": result.etag,
+                "size": reader.size,
+                "content_type": content_type,
+                "file_hash": reader.hexdigest()
+            }
+
+        except S3Error as e:
+            logger.error(f"Error uploading file {file_path}: {e}")
+            raise
+
+    def open_stream(
+        self,
+        file_path: str,
+        offset: int = 0,
+        length: Optional[int] = None
+    ) -> Iterator[bytes]:
+        """
+        Stream a file, or a byte range of it, from S3/MinIO
+
+        The GET is issued before returning, so a missing object raises here
+        rather than after a response has started. Chunks are
+        DOWNLOAD_CHUNK_KB; the connection is released when the iterator is
+        exhausted or closed.
+
+        Args:
+            file_path: Path/key in S3
+            offset: First byte to send
+            length: Bytes to send (None: to the end)
+
+        Returns:
+            Iterator of byte chunks
+        """
+        try:
+            response = self.client.get_object(
+                self.bucket_name, file_path, offset=offset, length=length or 0
+            )
+        except S3Error as e:
+            logger.error(f"Error downloading file {file_path}: {e}")
+            raise
+        return self._iter_response(response)
+
+    @staticmethod
+    def _iter_response(response) -> Iterator[bytes]:
+        try:
+            yield from response.stream(settings.DOWNLOAD_CHUNK_KB * 1024)
+        finally:
+            response.close()
+            response.release_conn()
+
     def download_file(self, file_path: str) -> bytes:
         """
         Download a file from S3/MinIO
@@ -273,8 +373,12 @@ _storage_client: Optional[StorageClient] = None
 
 
 def get_storage_client() -> StorageClient:
-    """Get or create storage client instance"""
+    """Get or create storage client instance (STORAGE_BACKEND picks which)"""
     global _storage_client
     if _storage_client is None:
-        _storage_client = StorageClient()
+        if settings.STORAGE_BACKEND == "local":
+            from app.core.local_storage import LocalStorageClient
+            _storage_client = LocalStorageClient()
+        else:
+            _storage_client = StorageClient()
     return _storage_client
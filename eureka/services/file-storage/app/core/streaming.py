@@ -0,0 +1,38 @@
+"""
+File Storage Service - Streaming helpers
+
+Shared by both storage backends so an upload is hashed, sized and capped
+while it streams, instead of being read into memory first.
+"""
+import hashlib
+from typing import BinaryIO, Optional
+
+
+class FileTooLarge(Exception):
+    """The stream passed its size limit part-way through."""
+
+
+class HashingReader:
+    """File-like wrapper that SHA-256s and counts what is read through it.
+
+    Reading past `limit` bytes raises FileTooLarge, so a backend pulling
+    parts from it aborts the upload without having buffered the rest.
+    """
+
+    def __init__(self, raw: BinaryIO, limit: Optional[int] = None):
+        self.raw = raw
+        self.limit = limit
+        self.size = 0
+        self._sha256 = hashlib.sha256()
+
+    def read(self, n: int = -1) -> bytes:
+        data = self.raw.read(n)
+        if data:
+            self.size += len(data)
+            if self.limit is not None and self.size > self.limit:
+                raise FileTooLarge(f"stream exceeds {self.limit} bytes")
+            self._sha256.update(data)
+        return data
+
+    def hexdigest(self) -> str:
+        return self._sha256.hexdigest()
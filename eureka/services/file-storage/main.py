@@ -108,8 +108,8 @@ async def root():
         "description": "File upload, download, and management with S3/MinIO",
         "docs": "/docs",
         "features": [
-            "File upload (multipart)",
-            "File download",
+            "File upload (multipart, streamed)",
+            "File download (streamed, HTTP Range)",
             "Presigned URLs",
             "File listing",
             "Bulk operations",
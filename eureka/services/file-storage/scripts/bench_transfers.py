@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Memory and throughput of concurrent large transfers, offline.
+
+Writes --files source files of --size-mb each, then moves them through the
+local filesystem backend (app/core/local_storage.py) on --concurrency
+threads, twice:
+
+  buffered   the old route: the whole upload read into memory and wrapped
+             in a BytesIO, the whole download read into bytes.
+  streamed   upload_stream() from the file handle and open_stream()
+             chunks out, as the routes do now; downloads are split into two
+             Range requests, as a resumed transfer would be.
+
+Prints MB/s and the Python heap peak (tracemalloc) for each. No MinIO is
+needed; with MinIO the streamed peak is one UPLOAD_PART_SIZE_MB part per
+upload instead of the copy buffer.
+
+Run:
+  python scripts/bench_transfers.py [--files 8] [--size-mb 64] [--concurrency 4]
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.local_storage import LocalStorageClient  # noqa: E402
+
+
+def _buffered(storage: LocalStorageClient, src: str, key: str) -> int:
+    with open(src, "rb") as fh:
+        content = fh.read()
+    storage.upload_file(io.BytesIO(content), key)
+    return len(storage.download_file(key))
+
+
+def _streamed(storage: LocalStorageClient, src: str, key: str) -> int:
+    with open(src, "rb") as fh:
+        result = storage.upload_stream(fh, key)
+    half = result["size"] // 2
+    received = 0
+    for offset, length in ((0, half), (half, result["size"] - half)):
+        for chunk in storage.open_stream(key, offset, length):
+            received += len(chunk)
+    return received
+
+
+def _run(label: str, transfer, storage, sources, concurrency: int) -> None:
+    tracemalloc.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        moved = sum(pool.map(
+            lambda i: transfer(storage, sources[i], f"{label}/{i}.bin"), range(len(sources))
+        ))
+    seconds = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    mb = moved / 2**20
+    print(f"{label:<10} {mb:8.0f} MB each way  {seconds:7.2f}s  {2 * mb / seconds:8.0f} MB/s   heap peak {peak / 2**20:8.1f} MB")
+
+
+def main(args) -> None:
+    with tempfile.TemporaryDirectory() as work:
+        sources = []
+        block = os.urandom(1 << 20)
+        for i in range(args.files):
+            path = os.path.join(work, f"src-{i}.bin")
+            with open(path, "wb") as fh:
+                for _ in range(args.size_mb):
+                    fh.write(block)
+            sources.append(path)
+
+        storage = LocalStorageClient(root=os.path.join(work, "store"))
+        _run("buffered", _buffered, storage, sources, args.concurrency)
+        _run("streamed", _streamed, storage, sources, args.concurrency)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=8)
+    parser.add_argument("--size-mb", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=4)
+    main(parser.parse_args())
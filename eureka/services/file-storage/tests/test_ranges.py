@@ -0,0 +1,90 @@
+"""
+Tests for ranged downloads (parse_range and object_response in
+app/api/v1/files.py).
+
+The download route runs against LocalStorageClient in a temp directory,
+with require_user overridden, so no MinIO or auth service is needed.
+"""
+
+from __future__ import annotations
+
+import io
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.api.v1 import files
+from app.core.auth_guard import require_user
+from app.core.local_storage import LocalStorageClient
+from app.core.storage import get_storage_client
+
+BODY = bytes(range(256)) * 4          # 1024 bytes
+PATH = "documents/u1/report.pdf"
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("bytes=0-99", (0, 99)),
+    ("bytes=1000-", (1000, 1023)),
+    ("bytes=1000-5000", (1000, 1023)),      # end clamped to the file
+    ("bytes=-24", (1000, 1023)),            # suffix: the last 24 bytes
+    ("bytes=-5000", (0, 1023)),
+    ("bytes=0-0,10-20", None),              # multi-range: send it all
+    ("items=0-10", None),                   # other units: send it all
+    ("bytes=abc", None),
+    ("bytes=20-10", None),                  # inverted: ignored
+])
+def test_parse_range(header, expected):
+    assert files.parse_range(header, len(BODY)) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=1024-", "bytes=5000-6000", "bytes=-0"])
+def test_parse_range_past_the_end_is_416(header):
+    with pytest.raises(HTTPException) as exc:
+        files.parse_range(header, len(BODY))
+    assert exc.value.status_code == 416
+    assert exc.value.headers["Content-Range"] == "bytes */1024"
+
+
+@pytest.fixture
+def client(tmp_path):
+    storage = LocalStorageClient(root=str(tmp_path))
+    storage.upload_stream(io.BytesIO(BODY), PATH, content_type="application/pdf")
+    app = FastAPI()
+    app.include_router(files.router, prefix="/files")
+    app.dependency_overrides[require_user] = lambda: {"user_id": "u1", "role": "student"}
+    app.dependency_overrides[get_storage_client] = lambda: storage
+    with TestClient(app) as c:
+        yield c, storage.get_file_info(PATH)["etag"].strip('"')
+
+
+def test_download_whole_file(client):
+    c, etag = client
+    r = c.get(f"/files/download/{PATH}")
+    assert r.status_code == 200 and r.content == BODY
+    assert r.headers["accept-ranges"] == "bytes"
+    assert r.headers["etag"] == f'"{etag}"'
+
+
+def test_download_range_is_206(client):
+    c, _ = client
+    r = c.get(f"/files/download/{PATH}", headers={"Range": "bytes=100-199"})
+    assert r.status_code == 206 and r.content == BODY[100:200]
+    assert r.headers["content-range"] == "bytes 100-199/1024"
+    assert r.headers["content-length"] == "100"
+
+
+def test_download_unsatisfiable_range_is_416(client):
+    c, _ = client
+    r = c.get(f"/files/download/{PATH}", headers={"Range": "bytes=2048-"})
+    assert r.status_code == 416
+    assert r.headers["content-range"] == "bytes */1024"
+
+
+def test_if_range_resumes_only_an_unchanged_file(client):
+    c, etag = client
+    fresh = c.get(f"/files/download/{PATH}", headers={"Range": "bytes=1000-", "If-Range": f'"{etag}"'})
+    assert fresh.status_code == 206 and fresh.content == BODY[1000:]
+    stale = c.get(f"/files/download/{PATH}", headers={"Range": "bytes=1000-", "If-Range": '"other"'})
+    assert stale.status_code == 200 and stale.content == BODY
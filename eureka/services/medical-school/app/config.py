@@ -44,6 +44,10 @@ class Settings(BaseSettings):
     USMLE_DIFFICULTY_LEVELS: Optional[str] = None
     DEFAULT_CASE_DURATION_MINUTES: int = 20
     OSCE_STATION_DURATION_MINUTES: int = 10
+    # Read USMLE statistics from the usmle_user_subject_stats rollup instead
+    # of aggregating usmle_attempts (one grouped query either way). Only
+    # honoured once app/ddl.py has installed the rollup trigger at startup.
+    USMLE_STATS_ROLLUP: bool = False
 
     # AI Integration
     OPENAI_API_KEY: str = ""
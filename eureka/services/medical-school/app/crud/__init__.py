@@ -12,13 +12,16 @@ Complete implementation of database operations for:
 """
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_, desc, case as sql_case
+from sqlalchemy import select, insert, func, and_, or_, desc, case as sql_case
 from sqlalchemy.orm import selectinload
 from typing import List, Optional, Dict, Any
 from uuid import UUID, uuid4
 from datetime import datetime, timedelta
 import logging
 
+from app import ddl
+from app.config import settings
+
 # Import models
 from app.models import (
     USMLEQuestion, USMLEAttempt,
@@ -28,6 +31,7 @@ from app.models import (
     MedicationDatabase,
     MedicalStudentProfile,
     HIPAAAuditLog,
+    USMLEUserSubjectStats,
     DifficultyLevel, CaseComplexity, DiagnosisConfidence
 )
 
@@ -194,15 +198,66 @@ async def get_user_usmle_attempts(db: AsyncSession, user_id: UUID, limit: int):
         raise
 
 
+def _usmle_breakdown_query(user_id: UUID):
+    """(subject, difficulty, attempts, correct, timed attempts, seconds) rows
+    for one user, from the rollup or straight from usmle_attempts."""
+    if settings.USMLE_STATS_ROLLUP and ddl.stats_rollup:
+        return select(
+            USMLEUserSubjectStats.subject,
+            USMLEUserSubjectStats.difficulty_level,
+            USMLEUserSubjectStats.attempts,
+            USMLEUserSubjectStats.correct,
+            USMLEUserSubjectStats.timed_attempts,
+            USMLEUserSubjectStats.time_spent_seconds,
+        ).where(
+            USMLEUserSubjectStats.user_id == user_id,
+            USMLEUserSubjectStats.attempts > 0
+        ).order_by(USMLEUserSubjectStats.subject)
+
+    timed = USMLEAttempt.time_spent_seconds > 0
+    return select(
+        USMLEQuestion.subject,
+        USMLEQuestion.difficulty_level,
+        func.count(),
+        func.count().filter(USMLEAttempt.is_correct),
+        func.count().filter(timed),
+        func.coalesce(func.sum(USMLEAttempt.time_spent_seconds).filter(timed), 0),
+    ).join(
+        USMLEQuestion, USMLEQuestion.id == USMLEAttempt.question_id
+    ).where(
+        USMLEAttempt.user_id == user_id
+    ).group_by(
+        USMLEQuestion.subject, USMLEQuestion.difficulty_level
+    ).order_by(USMLEQuestion.subject)
+
+
 async def get_usmle_statistics(db: AsyncSession, user_id: UUID):
-    """Get USMLE statistics for user."""
+    """Get USMLE statistics for user.
+
+    One grouped query (subject x difficulty) does the counting in the
+    database; only those few rows are folded here.
+    """
     try:
-        # Get all attempts
-        attempts_query = select(USMLEAttempt).where(USMLEAttempt.user_id == user_id)
-        result = await db.execute(attempts_query)
-        attempts = result.scalars().all()
+        result = await db.execute(_usmle_breakdown_query(user_id))
+        rows = result.all()
 
-        if not attempts:
+        total = correct = timed_total = time_total = 0
+        questions_by_difficulty = {}
+        subject_stats = {}
+        for subject, difficulty_level, attempts, n_correct, n_timed, seconds in rows:
+            total += attempts
+            correct += n_correct
+            timed_total += n_timed
+            time_total += seconds or 0
+
+            difficulty = difficulty_level.value if isinstance(difficulty_level, DifficultyLevel) else str(difficulty_level)
+            questions_by_difficulty[difficulty] = questions_by_difficulty.get(difficulty, 0) + attempts
+
+            stats = subject_stats.setdefault(subject, {"total": 0, "correct": 0})
+            stats["total"] += attempts
+            stats["correct"] += n_correct
+
+        if not total:
             # Return empty statistics
             return {
                 "total_questions_attempted": 0,
@@ -216,44 +271,8 @@ async def get_usmle_statistics(db: AsyncSession, user_id: UUID):
                 "weak_subjects": []
             }
 
-        # Calculate basic stats
-        total = len(attempts)
-        correct = sum(1 for a in attempts if a.is_correct)
-        incorrect = total - correct
-        accuracy_rate = correct / total if total > 0 else 0.0
-
-        # Calculate average time
-        times = [a.time_spent_seconds for a in attempts if a.time_spent_seconds]
-        average_time = sum(times) / len(times) if times else 0.0
-
-        # Get questions for subject/difficulty breakdown
-        question_ids = [a.question_id for a in attempts]
-        questions_query = select(USMLEQuestion).where(USMLEQuestion.id.in_(question_ids))
-        questions_result = await db.execute(questions_query)
-        questions = questions_result.scalars().all()
-
-        # Create lookup map for questions
-        question_map = {q.id: q for q in questions}
-
-        # Count by difficulty
-        questions_by_difficulty = {}
-        for attempt in attempts:
-            question = question_map.get(attempt.question_id)
-            if question:
-                difficulty = question.difficulty_level.value if isinstance(question.difficulty_level, DifficultyLevel) else str(question.difficulty_level)
-                questions_by_difficulty[difficulty] = questions_by_difficulty.get(difficulty, 0) + 1
-
-        # Count by subject and calculate accuracy per subject
-        subject_stats = {}
-        for attempt in attempts:
-            question = question_map.get(attempt.question_id)
-            if question:
-                subject = question.subject
-                if subject not in subject_stats:
-                    subject_stats[subject] = {"total": 0, "correct": 0}
-                subject_stats[subject]["total"] += 1
-                if attempt.is_correct:
-                    subject_stats[subject]["correct"] += 1
+        accuracy_rate = correct / total
+        average_time = time_total / timed_total if timed_total else 0.0
 
         # Count by subject
         questions_by_subject = {subject: stats["total"] for subject, stats in subject_stats.items()}
@@ -281,7 +300,7 @@ async def get_usmle_statistics(db: AsyncSession, user_id: UUID):
         statistics = {
             "total_questions_attempted": total,
             "correct_answers": correct,
-            "incorrect_answers": incorrect,
+            "incorrect_answers": total - correct,
             "accuracy_rate": round(accuracy_rate, 3),
             "average_time_per_question": round(average_time, 1),
             "questions_by_difficulty": questions_by_difficulty,
@@ -1121,20 +1140,39 @@ async def search_medications(
     limit: int,
     offset: int
 ):
-    """Search medications."""
+    """Search medications.
+
+    Matches go through the trigram index on medication_search_text() (generic
+    plus brand names, lower-cased; app/ddl.py): substrings, and close
+    misspellings by word similarity. Results rank an exact generic name
+    first, then generic-name prefixes, then similarity. Without pg_trgm only
+    substrings match.
+    """
     try:
         query = select(MedicationDatabase)
 
         conditions = []
+        order_by = []
         if search:
-            # Search in generic name or brand names
-            search_term = f"%{search.lower()}%"
-            conditions.append(
-                or_(
-                    func.lower(MedicationDatabase.generic_name).like(search_term),
-                    MedicationDatabase.brand_names.any(search_term)
-                )
+            term = search.strip().lower()
+            search_text = func.medication_search_text(
+                MedicationDatabase.generic_name, MedicationDatabase.brand_names
             )
+            generic = func.lower(MedicationDatabase.generic_name)
+            order_by = [
+                desc(generic == term),
+                desc(generic.startswith(term, autoescape=True)),
+            ]
+            if ddl.trigram_search:
+                conditions.append(
+                    or_(
+                        search_text.contains(term, autoescape=True),
+                        search_text.bool_op("%>")(term)
+                    )
+                )
+                order_by.append(desc(func.word_similarity(term, search_text)))
+            else:
+                conditions.append(search_text.contains(term, autoescape=True))
 
         if drug_class:
             conditions.append(MedicationDatabase.drug_class == drug_class)
@@ -1142,7 +1180,7 @@ async def search_medications(
         if conditions:
             query = query.where(and_(*conditions))
 
-        query = query.order_by(MedicationDatabase.generic_name).offset(offset).limit(limit)
+        query = query.order_by(*order_by, MedicationDatabase.generic_name).offset(offset).limit(limit)
 
         result = await db.execute(query)
         medications = result.scalars().all()
@@ -1175,38 +1213,69 @@ async def get_medication(db: AsyncSession, medication_id: UUID):
 # Batch Operations
 # ==========================================
 
-async def batch_import_usmle_questions(db: AsyncSession, batch):
-    """Batch import USMLE questions."""
+async def _insert_usmle_questions(db: AsyncSession, rows: List[Dict[str, Any]], errors: list, offset: int):
+    """Insert one chunk with a single multi-row INSERT. If the chunk is
+    rejected, retry it row by row under savepoints so the good rows still
+    land and each bad one is reported at its index. Returns created ids."""
+    try:
+        await db.execute(insert(USMLEQuestion), rows)
+        await db.commit()
+        return [row["id"] for row in rows]
+    except Exception:
+        await db.rollback()
+
+    created = []
+    for idx, row in enumerate(rows, start=offset):
+        try:
+            async with db.begin_nested():
+                await db.execute(insert(USMLEQuestion), [row])
+            created.append(row["id"])
+        except Exception as e:
+            errors.append({
+                "index": idx,
+                "error": str(e)
+            })
+    await db.commit()
+    return created
+
+
+async def batch_import_usmle_questions(db: AsyncSession, batch, chunk_size: int = 500):
+    """Batch import USMLE questions.
+
+    Questions are inserted in chunks of `chunk_size` with one executemany
+    INSERT and one commit per chunk, instead of an add/commit/refresh round
+    trip per question.
+    """
     try:
-        imported_count = 0
-        failed_count = 0
         errors = []
         created_ids = []
 
-        for idx, question in enumerate(batch.questions):
-            try:
-                if not batch.validate_only:
-                    db_question = await create_usmle_question(db, question)
-                    created_ids.append(db_question.id)
-                imported_count += 1
-            except Exception as e:
-                failed_count += 1
-                errors.append({
-                    "index": idx,
-                    "error": str(e)
-                })
+        if batch.validate_only:
+            imported_count = len(batch.questions)
+        else:
+            rows = []
+            for question in batch.questions:
+                row = question.model_dump()
+                row["id"] = uuid4()
+                rows.append(row)
+            for start in range(0, len(rows), chunk_size):
+                created_ids.extend(
+                    await _insert_usmle_questions(db, rows[start:start + chunk_size], errors, start)
+                )
+            imported_count = len(created_ids)
 
         result = {
             "total_submitted": len(batch.questions),
             "successful": imported_count,
-            "failed": failed_count,
+            "failed": len(errors),
             "errors": errors,
             "created_ids": created_ids
         }
 
-        logger.info(f"Batch import completed: {imported_count} success, {failed_count} failed")
+        logger.info(f"Batch import completed: {imported_count} success, {len(errors)} failed")
         return result
     except Exception as e:
+        await db.rollback()
         logger.error(f"Error in batch import: {str(e)}")
         raise
 
@@ -0,0 +1,131 @@
+"""
+Database objects that Base.metadata.create_all() cannot make
+
+- usmle_attempts_rollup(): the statement-level AFTER INSERT trigger that
+  keeps usmle_user_subject_stats current, and the backfill that seeds the
+  rollup from existing attempts when the trigger is first installed.
+- medication_search_text(): generic + brand names as one lower-cased
+  string, and the pg_trgm GIN index over it used by search_medications.
+
+apply_ddl() runs at startup right after create_all(), in the same
+transaction. Every statement is idempotent, so each restart and each
+replica may run it. ops/db/medical_school_tables.sql carries the same
+objects for databases bootstrapped from SQL.
+"""
+
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+logger = logging.getLogger(__name__)
+
+# What apply_ddl() managed to install in this process's database. Until it
+# has run, statistics aggregate usmle_attempts directly and medication
+# search matches substrings only.
+stats_rollup = False
+trigram_search = False
+
+
+_ROLLUP_FUNCTION = """
+CREATE OR REPLACE FUNCTION usmle_attempts_rollup() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO usmle_user_subject_stats AS s
+           (user_id, subject, difficulty_level, attempts, correct,
+            timed_attempts, time_spent_seconds, updated_at)
+    SELECT n.user_id, q.subject, q.difficulty_level,
+           count(*),
+           count(*) FILTER (WHERE n.is_correct),
+           count(*) FILTER (WHERE n.time_spent_seconds > 0),
+           coalesce(sum(n.time_spent_seconds) FILTER (WHERE n.time_spent_seconds > 0), 0),
+           CURRENT_TIMESTAMP
+      FROM new_rows n
+      JOIN usmle_questions q ON q.id = n.question_id
+     GROUP BY n.user_id, q.subject, q.difficulty_level
+    ON CONFLICT (user_id, subject, difficulty_level) DO UPDATE
+       SET attempts = s.attempts + EXCLUDED.attempts,
+           correct = s.correct + EXCLUDED.correct,
+           timed_attempts = s.timed_attempts + EXCLUDED.timed_attempts,
+           time_spent_seconds = s.time_spent_seconds + EXCLUDED.time_spent_seconds,
+           updated_at = EXCLUDED.updated_at;
+    RETURN NULL;
+END $$
+"""
+
+# Installs the trigger only when it is missing, rebuilding the rollup from
+# usmle_attempts first: without the trigger the rollup cannot be trusted.
+# The advisory lock lets replicas that start together take turns (the
+# second then finds the trigger), and the table lock keeps attempts from
+# landing between the backfill and the trigger.
+_ROLLUP_TRIGGER = """
+DO $$
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('usmle_attempts_rollup'));
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_trigger
+         WHERE tgname = 'trg_usmle_attempts_rollup'
+           AND tgrelid = 'usmle_attempts'::regclass
+    ) THEN
+        LOCK TABLE usmle_attempts IN SHARE ROW EXCLUSIVE MODE;
+        DELETE FROM usmle_user_subject_stats;
+        INSERT INTO usmle_user_subject_stats
+               (user_id, subject, difficulty_level, attempts, correct,
+                timed_attempts, time_spent_seconds, updated_at)
+        SELECT a.user_id, q.subject, q.difficulty_level,
+               count(*),
+               count(*) FILTER (WHERE a.is_correct),
+               count(*) FILTER (WHERE a.time_spent_seconds > 0),
+               coalesce(sum(a.time_spent_seconds) FILTER (WHERE a.time_spent_seconds > 0), 0),
+               CURRENT_TIMESTAMP
+          FROM usmle_attempts a
+          JOIN usmle_questions q ON q.id = a.question_id
+         GROUP BY a.user_id, q.subject, q.difficulty_level;
+        CREATE TRIGGER trg_usmle_attempts_rollup
+            AFTER INSERT ON usmle_attempts
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION usmle_attempts_rollup();
+    END IF;
+END $$
+"""
+
+# array_to_string is only STABLE, so the wrapper is declared IMMUTABLE to be
+# indexable; it only ever sees text[].
+_MEDICATION_SEARCH_FUNCTION = """
+CREATE OR REPLACE FUNCTION medication_search_text(generic_name TEXT, brand_names TEXT[])
+RETURNS TEXT LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT lower(generic_name || ' ' || coalesce(array_to_string(brand_names, ' '), ''))
+$$
+"""
+
+_TRIGRAM = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    CREATE INDEX IF NOT EXISTS idx_medication_search_trgm
+        ON medication_database
+        USING GIN (medication_search_text(generic_name, brand_names) gin_trgm_ops)
+    """,
+]
+
+
+async def apply_ddl(conn: AsyncConnection) -> None:
+    """Create or update the rollup trigger and the medication search objects.
+
+    pg_trgm needs a role allowed to create it. Without it the service still
+    starts, and search_medications falls back to substring matching.
+    """
+    global stats_rollup, trigram_search
+
+    await conn.execute(text(_ROLLUP_FUNCTION))
+    await conn.execute(text(_ROLLUP_TRIGGER))
+    stats_rollup = True
+
+    await conn.execute(text(_MEDICATION_SEARCH_FUNCTION))
+    try:
+        async with conn.begin_nested():
+            for statement in _TRIGRAM:
+                await conn.execute(text(statement))
+        trigram_search = True
+    except Exception as e:
+        trigram_search = False
+        logger.warning(f"pg_trgm unavailable, medication search matches substrings only: {e}")
@@ -109,6 +109,27 @@ class USMLEAttempt(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
+class USMLEUserSubjectStats(Base):
+    """Per-user rollup of USMLE attempts by subject and difficulty.
+
+    Maintained by an AFTER INSERT trigger on usmle_attempts (app/ddl.py,
+    installed at startup), so statistics read a handful of rows instead of
+    a user's whole attempt history.
+    """
+    __tablename__ = "usmle_user_subject_stats"
+
+    user_id = Column(UUID(as_uuid=True), primary_key=True)
+    subject = Column(String(100), primary_key=True)
+    difficulty_level = Column(SQLEnum(DifficultyLevel), primary_key=True)
+
+    attempts = Column(Integer, nullable=False, default=0)
+    correct = Column(Integer, nullable=False, default=0)
+    timed_attempts = Column(Integer, nullable=False, default=0)  # time_spent_seconds > 0
+    time_spent_seconds = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
 # ==========================================
 # Clinical Cases
 # ==========================================
@@ -18,7 +18,10 @@ import logging
 import time
 
 from app.config import settings
-from app.database import engine, Base
+from app.database import engine
+from app.ddl import apply_ddl
+# The models' Base: app.database.Base has no tables registered on it.
+from app.models import Base
 from app.api.v1 import router as api_router
 
 # Configure logging
@@ -38,9 +41,11 @@ async def lifespan(app: FastAPI):
     logger.info(f"HIPAA Mode: {settings.HIPAA_MODE}")
     logger.info(f"Database: {settings.DATABASE_URL.split('@')[1] if '@' in settings.DATABASE_URL else 'configured'}")
     
-    # Create database tables
+    # Create database tables, then the trigger, function and index
+    # create_all() cannot
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await apply_ddl(conn)
     
     logger.info("✅ Medical School Service started successfully")
     
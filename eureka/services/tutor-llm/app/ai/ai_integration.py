@@ -14,12 +14,15 @@ Features:
 
 import openai
 import anthropic
-from typing import List, Dict, Optional, AsyncGenerator
+from typing import List, Dict, Optional, AsyncGenerator, Awaitable, Callable
+import asyncio
 import os
 from datetime import datetime
 import json
 from enum import Enum
 
+from app.services.vector_index import VectorIndex
+
 # ========================================
 # Configuration
 # ========================================
@@ -109,11 +112,27 @@ Format your response as JSON:
 # ========================================
 
 class RAGSystem:
-    """Simple RAG implementation using vector similarity"""
+    """RAG over an in-memory VectorIndex of document embeddings"""
     
-    def __init__(self):
-        self.documents = []
-        self.embeddings = []
+    def __init__(
+        self,
+        embed: Optional[Callable[[str], Awaitable[List[float]]]] = None,
+        dimensions: Optional[int] = None,
+    ):
+        """
+        Args:
+            embed: Async text -> vector function; defaults to the tutor
+                service's embedding client
+            dimensions: Vector width; defaults to EMBEDDING_DIMENSIONS
+        """
+        if embed is None or dimensions is None:
+            from app.core.config import get_settings
+            from app.services.ai_service import ai_service
+            embed = embed or ai_service.generate_embedding
+            dimensions = dimensions or get_settings().EMBEDDING_DIMENSIONS
+        self._embed = embed
+        self.documents: List[Dict] = []
+        self.index = VectorIndex(dimensions)
     
     async def add_documents(self, documents: List[Dict[str, str]]):
         """
@@ -122,9 +141,9 @@ class RAGSystem:
         Args:
             documents: List of dicts with 'content' and 'metadata'
         """
-        for doc in documents:
-            # In production, generate embeddings using OpenAI or similar
-            # For now, store documents as-is
+        vectors = await asyncio.gather(*(self._embed(doc["content"]) for doc in documents))
+        for doc, vector in zip(documents, vectors):
+            self.index.upsert(len(self.documents), vector)
             self.documents.append(doc)
     
     async def search(self, query: str, top_k: int = 3) -> List[Dict]:
@@ -138,21 +157,32 @@ class RAGSystem:
         Returns:
             List of relevant documents with scores
         """
-        # In production: 
-        # 1. Generate embedding for query
-        # 2. Calculate cosine similarity with all document embeddings
-        # 3. Return top K matches
-        
-        # Placeholder: Return first N documents
-        results = []
-        for i, doc in enumerate(self.documents[:top_k]):
-            results.append({
-                "content": doc["content"],
-                "metadata": doc.get("metadata", {}),
-                "score": 0.9 - (i * 0.1)  # Fake scores
-            })
-        
-        return results
+        hits = self.index.search(await self._embed(query), top_k)
+        return [
+            {
+                "content": self.documents[i]["content"],
+                "metadata": self.documents[i].get("metadata", {}),
+                "score": score,
+            }
+            for i, score in hits
+        ]
+    
+    def save(self, path: str):
+        """Persist documents and vectors to `path` (.npz) so a restart skips re-embedding"""
+        self.index.save(path, documents=json.dumps(self.documents, default=str))
+    
+    @classmethod
+    def load(
+        cls,
+        path: str,
+        embed: Optional[Callable[[str], Awaitable[List[float]]]] = None,
+    ) -> "RAGSystem":
+        """Restore a RAGSystem written by save()"""
+        index, extra = VectorIndex.load(path, key_type=int)
+        rag = cls(embed=embed, dimensions=index.dimensions)
+        rag.index = index
+        rag.documents = json.loads(extra.get("documents", "[]"))
+        return rag
     
     async def generate_answer(
         self,
@@ -31,6 +31,7 @@ from app.schemas import (
     FeedbackCreate, FeedbackResponse
 )
 from app.services.ai_service import AITutoringService
+from app.services.vector_index import course_indexes
 
 router = APIRouter()
 ai_service = AITutoringService()
@@ -213,6 +214,7 @@ async def add_course_content(
     db.add(db_content)
     await db.commit()
     await db.refresh(db_content)
+    course_indexes.note(db_content)
     return db_content
 
 
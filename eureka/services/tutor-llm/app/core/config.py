@@ -35,6 +35,8 @@ class Settings(BaseSettings):
     # RAG Configuration
     TOP_K_RESULTS: int = 5  # Number of similar chunks to retrieve
     SIMILARITY_THRESHOLD: float = 0.7  # Minimum similarity score
+    VECTOR_INDEX_DIR: str = ""  # Persist per-course indexes here; empty = memory only
+    VECTOR_INDEX_REFRESH_SECONDS: int = 60  # How often a course index checks for changed rows
     
     # Teaching Configuration
     USE_SOCRATIC_METHOD: bool = True
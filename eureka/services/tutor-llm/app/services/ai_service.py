@@ -6,7 +6,6 @@ Handles RAG, embeddings, and AI model interactions.
 from datetime import datetime
 from typing import List, Optional, Dict
 from uuid import UUID
-import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 
@@ -16,6 +15,7 @@ from app.core.models import (
     StudentKnowledge, TutorSession
 )
 from app.schemas import TutorResponse, SourceDocument
+from app.services.vector_index import course_indexes
 from app.crud import (
     create_message, get_conversation_messages,
     create_or_update_knowledge
@@ -84,35 +84,17 @@ class AITutoringService:
         # Generate query embedding
         query_embedding = await self.generate_embedding(query)
         
-        # Get all content for the course
-        result = await db.execute(
-            select(CourseContent).where(CourseContent.course_id == course_id)
-        )
-        all_content = result.scalars().all()
-        
-        if not all_content:
+        # Score against the course's in-memory index, then load only the hits
+        index = await course_indexes.get(db, course_id)
+        hits = index.search(query_embedding, top_k, threshold=settings.SIMILARITY_THRESHOLD)
+        if not hits:
             return []
         
-        # Calculate cosine similarity for each content item
-        similarities = []
-        for content in all_content:
-            if content.embedding:
-                similarity = self._cosine_similarity(query_embedding, content.embedding)
-                if similarity >= settings.SIMILARITY_THRESHOLD:
-                    similarities.append((content, similarity))
-        
-        # Sort by similarity and return top k
-        similarities.sort(key=lambda x: x[1], reverse=True)
-        return [content for content, _ in similarities[:top_k]]
-    
-    def _cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
-        """Calculate cosine similarity between two vectors"""
-        try:
-            a = np.array(vec1)
-            b = np.array(vec2)
-            return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
-        except Exception:
-            return 0.0
+        result = await db.execute(
+            select(CourseContent).where(CourseContent.id.in_([cid for cid, _ in hits]))
+        )
+        by_id = {content.id: content for content in result.scalars().all()}
+        return [by_id[cid] for cid, _ in hits if cid in by_id]
     
     # ============= AI Response Generation =============
     
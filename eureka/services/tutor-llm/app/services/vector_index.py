@@ -0,0 +1,294 @@
+"""
+AI Tutor Service - In-memory vector index
+
+Retrieval used to load every course_content row for the course on each
+tutor turn and score them one by one in Python. A course's embeddings now
+live in one row-normalised float32 matrix, so a query is a single
+matrix-vector product plus a partial sort, and the database is only asked
+for rows that changed since the index last looked.
+
+VectorIndex        Key -> vector store with upsert/remove/search and
+                   save/load to a local .npz file. Used per course here and
+                   by RAGSystem in app/ai/ai_integration.py.
+
+CourseIndexes      One VectorIndex per course, built on first use (or
+                   loaded from VECTOR_INDEX_DIR on a warm restart) and
+                   topped up from `updated_at` at most every
+                   VECTOR_INDEX_REFRESH_SECONDS. A row count that no longer
+                   matches means rows were deleted, and the course is
+                   rebuilt. The .npz is rewritten only when a vector was
+                   actually added, changed or removed, and file reads and
+                   writes run in a worker thread.
+"""
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.models import CourseContent
+
+settings = get_settings()
+
+
+class VectorIndex:
+    """Cosine-similarity index over fixed-width vectors.
+
+    `version` counts changes to the stored vectors; an upsert of the vector
+    already stored is not a change."""
+
+    def __init__(self, dimensions: int, capacity: int = 64):
+        self.dimensions = dimensions
+        self._matrix = np.zeros((capacity, dimensions), dtype=np.float32)
+        self._keys: List[Hashable] = []
+        self._slots: Dict[Hashable, int] = {}
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._slots
+
+    def keys(self) -> List[Hashable]:
+        return list(self._keys)
+
+    def _normalise(self, vector: Sequence[float]) -> Optional[np.ndarray]:
+        v = np.asarray(vector, dtype=np.float32)
+        if v.shape != (self.dimensions,):
+            return None
+        norm = float(np.linalg.norm(v))
+        # Zero vectors (the no-API-key placeholder) stay zero and never match.
+        return v / norm if norm > 0 else v
+
+    def upsert(self, key: Hashable, vector: Optional[Sequence[float]]) -> bool:
+        """Add or replace one vector. Missing or wrong-width vectors remove
+        the key instead, and False is returned."""
+        v = self._normalise(vector) if vector is not None else None
+        if v is None:
+            self.remove(key)
+            return False
+        slot = self._slots.get(key)
+        if slot is not None and np.array_equal(self._matrix[slot], v):
+            return True
+        if slot is None:
+            slot = len(self._keys)
+            if slot == len(self._matrix):
+                grown = np.zeros((max(64, 2 * slot), self.dimensions), dtype=np.float32)
+                grown[:slot] = self._matrix[:slot]
+                self._matrix = grown
+            self._keys.append(key)
+            self._slots[key] = slot
+        self._matrix[slot] = v
+        self.version += 1
+        return True
+
+    def remove(self, key: Hashable) -> None:
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return
+        last = len(self._keys) - 1
+        if slot != last:
+            moved = self._keys[last]
+            self._matrix[slot] = self._matrix[last]
+            self._keys[slot] = moved
+            self._slots[moved] = slot
+        self._keys.pop()
+        self.version += 1
+
+    def search(
+        self,
+        query: Sequence[float],
+        top_k: int,
+        threshold: Optional[float] = None,
+    ) -> List[Tuple[Hashable, float]]:
+        """Top `top_k` (key, cosine) pairs, best first; ties keep insertion
+        order. Pairs below `threshold` are dropped."""
+        n = len(self._keys)
+        q = self._normalise(query)
+        if n == 0 or q is None or top_k <= 0:
+            return []
+        scores = self._matrix[:n] @ q
+        if top_k < n:
+            top = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            top = np.arange(n)
+        top = top[np.lexsort((top, -scores[top]))]
+        hits = [(self._keys[i], float(scores[i])) for i in top]
+        if threshold is not None:
+            hits = [(k, s) for k, s in hits if s >= threshold]
+        return hits
+
+    def copy(self) -> "VectorIndex":
+        """An independent copy, e.g. to save from another thread while this
+        one keeps changing."""
+        n = len(self._keys)
+        other = VectorIndex(self.dimensions, capacity=max(64, n))
+        other._matrix[:n] = self._matrix[:n]
+        other._keys = list(self._keys)
+        other._slots = dict(self._slots)
+        other.version = self.version
+        return other
+
+    def save(self, path: str, **extra: str) -> None:
+        """Write the index to `path` (.npz) atomically. `extra` strings are
+        stored alongside and come back from load()."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as fh:
+            np.savez(
+                fh,
+                matrix=self._matrix[: len(self._keys)],
+                keys=np.array([str(k) for k in self._keys]),
+                **{f"extra_{name}": np.array(value) for name, value in extra.items()},
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, key_type=str) -> Tuple["VectorIndex", Dict[str, str]]:
+        with np.load(path, allow_pickle=False) as data:
+            matrix = data["matrix"].astype(np.float32)
+            keys = [key_type(k) for k in data["keys"].tolist()]
+            extra = {
+                name[len("extra_"):]: str(data[name])
+                for name in data.files if name.startswith("extra_")
+            }
+        index = cls(matrix.shape[1], capacity=max(64, len(keys)))
+        index._matrix[: len(keys)] = matrix
+        index._keys = keys
+        index._slots = {k: i for i, k in enumerate(keys)}
+        return index, extra
+
+
+class _CourseIndex:
+    def __init__(self, index: VectorIndex, watermark: Optional[datetime]):
+        self.index = index
+        self.watermark = watermark
+        self.checked_at = time.monotonic()
+        # index.version as of the last save (or load); equal means the file
+        # on disk is current.
+        self.saved_version = index.version
+
+
+class CourseIndexes:
+    """Per-course VectorIndex cache kept in step with course_content."""
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        refresh_seconds: Optional[float] = None,
+        dimensions: Optional[int] = None,
+    ):
+        self.directory = settings.VECTOR_INDEX_DIR if directory is None else directory
+        self.refresh_seconds = (
+            settings.VECTOR_INDEX_REFRESH_SECONDS if refresh_seconds is None else refresh_seconds
+        )
+        self.dimensions = dimensions or settings.EMBEDDING_DIMENSIONS
+        self._courses: Dict[UUID, _CourseIndex] = {}
+        self._locks: Dict[UUID, asyncio.Lock] = {}
+
+    def _path(self, course_id: UUID) -> Optional[str]:
+        if not self.directory:
+            return None
+        return os.path.join(self.directory, f"{course_id}.npz")
+
+    def _apply(self, entry: _CourseIndex, rows: Iterable[Tuple[UUID, Optional[List[float]], Optional[datetime]]]) -> None:
+        for content_id, embedding, updated_at in rows:
+            entry.index.upsert(content_id, embedding)
+            if updated_at is not None and (entry.watermark is None or updated_at > entry.watermark):
+                entry.watermark = updated_at
+
+    async def _rows_since(self, db: AsyncSession, course_id: UUID, since: Optional[datetime]):
+        q = select(CourseContent.id, CourseContent.embedding, CourseContent.updated_at).where(
+            CourseContent.course_id == course_id
+        )
+        if since is not None:
+            # >= so a row committed late with the watermark's own timestamp
+            # is not skipped. The boundary row comes back on every refresh;
+            # re-applying it leaves the index version, so nothing is saved.
+            q = q.where(CourseContent.updated_at >= since)
+        return (await db.execute(q)).all()
+
+    def _load(self, course_id: UUID) -> Optional[_CourseIndex]:
+        path = self._path(course_id)
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            index, extra = VectorIndex.load(path, key_type=UUID)
+        except Exception as e:
+            print(f"Vector index {path} unreadable, rebuilding: {e}")
+            return None
+        if index.dimensions != self.dimensions:
+            return None
+        watermark = extra.get("watermark")
+        return _CourseIndex(index, datetime.fromisoformat(watermark) if watermark else None)
+
+    async def _save(self, course_id: UUID, entry: _CourseIndex) -> None:
+        path = self._path(course_id)
+        if path is None or entry.index.version == entry.saved_version:
+            return
+        extra = {"watermark": entry.watermark.isoformat()} if entry.watermark else {}
+        # Copy on the loop so note()/forget() can't change it mid-write.
+        snapshot = entry.index.copy()
+        try:
+            await asyncio.to_thread(snapshot.save, path, **extra)
+            entry.saved_version = snapshot.version
+        except OSError as e:
+            print(f"Vector index save failed for course {course_id}: {e}")
+
+    async def get(self, db: AsyncSession, course_id: UUID) -> VectorIndex:
+        """The course's index, built, loaded or refreshed as needed."""
+        entry = self._courses.get(course_id)
+        if entry is not None and time.monotonic() - entry.checked_at < self.refresh_seconds:
+            return entry.index
+
+        lock = self._locks.setdefault(course_id, asyncio.Lock())
+        async with lock:
+            entry = self._courses.get(course_id)
+            if entry is not None and time.monotonic() - entry.checked_at < self.refresh_seconds:
+                return entry.index
+            if entry is None:
+                entry = await asyncio.to_thread(self._load, course_id)
+            if entry is not None:
+                self._apply(entry, await self._rows_since(db, course_id, entry.watermark))
+                # Rows without a usable vector never enter the index, so
+                # compare against the count of those that would.
+                if len(entry.index) != await self._indexable_count(db, course_id):
+                    entry = None
+            if entry is None:
+                entry = _CourseIndex(VectorIndex(self.dimensions), None)
+                self._apply(entry, await self._rows_since(db, course_id, None))
+            entry.checked_at = time.monotonic()
+            self._courses[course_id] = entry
+            await self._save(course_id, entry)
+            return entry.index
+
+    async def _indexable_count(self, db: AsyncSession, course_id: UUID) -> int:
+        q = select(func.count()).select_from(CourseContent).where(
+            CourseContent.course_id == course_id,
+            func.cardinality(CourseContent.embedding) == self.dimensions,
+        )
+        return int((await db.execute(q)).scalar_one())
+
+    def note(self, content: CourseContent) -> None:
+        """Fold a row this process just wrote into its course's index, if
+        that index is loaded; otherwise the next get() picks it up."""
+        entry = self._courses.get(content.course_id)
+        if entry is not None:
+            # The watermark stays put: other processes may have written rows
+            # older than this one that the next refresh still has to see.
+            entry.index.upsert(content.id, content.embedding)
+
+    def forget(self, course_id: UUID, content_id: UUID) -> None:
+        entry = self._courses.get(course_id)
+        if entry is not None:
+            entry.index.remove(content_id)
+
+
+course_indexes = CourseIndexes()
@@ -0,0 +1,134 @@
+"""
+Unit tests for app/services/vector_index.py.
+
+CourseIndexes reads course_content through _rows_since() and
+_indexable_count(); the tests replace those two with an in-memory table, so
+no database is needed.
+
+Coverage targets:
+  1) VectorIndex.version moves only when a stored vector changes.
+  2) A refresh that re-reads the watermark's boundary row does not rewrite
+     the .npz; a changed, new or deleted row does.
+  3) A warm restart loads the saved index and asks only for rows from the
+     saved watermark on.
+  4) .npz reads and writes run off the event loop.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+
+from app.services import vector_index as vi
+
+
+T0 = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+
+
+class _Table:
+    """course_content rows for one course: id -> (embedding, updated_at)."""
+
+    def __init__(self):
+        self.rows = {}
+        self.since = []
+
+    def put(self, content_id, embedding, minutes):
+        self.rows[content_id] = (embedding, T0 + timedelta(minutes=minutes))
+
+    def install(self, indexes: vi.CourseIndexes):
+        async def rows_since(db, course_id, since):
+            self.since.append(since)
+            return [
+                (cid, emb, at) for cid, (emb, at) in self.rows.items()
+                if since is None or at >= since
+            ]
+
+        async def indexable_count(db, course_id):
+            return sum(1 for emb, _ in self.rows.values() if emb is not None and len(emb) == 3)
+
+        indexes._rows_since = rows_since
+        indexes._indexable_count = indexable_count
+        return indexes
+
+
+@pytest.fixture
+def saves(monkeypatch):
+    calls = []
+    real = vi.VectorIndex.save
+
+    def spy(self, path, **extra):
+        calls.append(threading.current_thread() is threading.main_thread())
+        real(self, path, **extra)
+
+    monkeypatch.setattr(vi.VectorIndex, "save", spy)
+    return calls
+
+
+def test_version_moves_only_on_a_real_change():
+    index = vi.VectorIndex(3)
+    index.upsert("a", [1.0, 0.0, 0.0])
+    v = index.version
+    index.upsert("a", [2.0, 0.0, 0.0])  # same direction, same normalised vector
+    assert index.version == v
+    index.upsert("a", [0.0, 1.0, 0.0])
+    index.remove("missing")
+    assert index.version == v + 1
+    index.upsert("a", None)
+    assert "a" not in index and index.version == v + 2
+
+
+@pytest.mark.asyncio
+async def test_refresh_saves_only_when_vectors_change(tmp_path, saves):
+    table = _Table()
+    course, a, b = uuid4(), uuid4(), uuid4()
+    table.put(a, [1.0, 0.0, 0.0], 0)
+    table.put(b, [0.0, 1.0, 0.0], 1)
+    indexes = table.install(vi.CourseIndexes(str(tmp_path), refresh_seconds=0, dimensions=3))
+
+    await indexes.get(None, course)
+    assert len(saves) == 1
+    # The boundary row (b, at the watermark) comes back on every refresh.
+    await indexes.get(None, course)
+    await indexes.get(None, course)
+    assert table.since[-1] == T0 + timedelta(minutes=1)
+    assert len(saves) == 1
+
+    table.put(b, [0.0, 0.0, 1.0], 2)
+    index = await indexes.get(None, course)
+    assert len(saves) == 2
+    assert index.search([0.0, 0.0, 1.0], 1)[0][0] == b
+
+    del table.rows[a]
+    index = await indexes.get(None, course)
+    assert index.keys() == [b] and len(saves) == 3
+    # Files are written from a worker thread.
+    assert not any(saves)
+
+
+@pytest.mark.asyncio
+async def test_warm_restart_reads_only_from_the_saved_watermark(tmp_path, saves, monkeypatch):
+    table = _Table()
+    course, a = uuid4(), uuid4()
+    table.put(a, [1.0, 0.0, 0.0], 5)
+    await table.install(vi.CourseIndexes(str(tmp_path), refresh_seconds=0, dimensions=3)).get(None, course)
+    assert os.path.exists(tmp_path / f"{course}.npz")
+
+    loads = []
+    real_load = vi.CourseIndexes._load
+
+    def spy(self, course_id):
+        loads.append(threading.current_thread() is threading.main_thread())
+        return real_load(self, course_id)
+
+    monkeypatch.setattr(vi.CourseIndexes, "_load", spy)
+    table.since.clear()
+    restarted = table.install(vi.CourseIndexes(str(tmp_path), refresh_seconds=0, dimensions=3))
+    index = await restarted.get(None, course)
+    assert index.keys() == [a]
+    assert table.since == [T0 + timedelta(minutes=5)]
+    assert loads == [False]
+    assert len(saves) == 1
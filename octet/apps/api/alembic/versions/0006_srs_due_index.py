@@ -0,0 +1,53 @@
+"""Spaced repetition read path: due index and per node seen counters.
+
+Revision ID: 0006_srs_due_index
+Revises: 0005_srs
+
+The review queue now asks the database for the due cards in due order with
+the limit applied there, which wants an index on (user_id, due_at). The stats
+rollup reads per node seen counters instead of every state row, so the
+counters are backfilled from the states that already exist. A card id is
+f"{node_code}:{kind}" and node codes never contain a colon, so the node is
+everything before the first one.
+"""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0006_srs_due_index"
+down_revision: str | None = "0005_srs"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_srs_states_user_due", "srs_states", ["user_id", "due_at"])
+
+    op.create_table(
+        "srs_node_counters",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("user_id", sa.String(length=64), nullable=False),
+        sa.Column("node_code", sa.String(length=64), nullable=False),
+        sa.Column("seen", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id", "node_code", name="uq_srs_counter_user_node"),
+    )
+    op.create_index("ix_srs_node_counters_user_id", "srs_node_counters", ["user_id"])
+
+    op.execute(
+        """
+        INSERT INTO srs_node_counters (id, user_id, node_code, seen)
+        SELECT gen_random_uuid(), user_id, split_part(card_id, ':', 1), count(*)
+        FROM srs_states
+        GROUP BY user_id, split_part(card_id, ':', 1)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("srs_node_counters")
+    op.drop_index("ix_srs_states_user_due", table_name="srs_states")
@@ -0,0 +1,49 @@
+"""Exam forms prepared ahead of the window.
+
+Revision ID: 0007_exam_prepared_forms
+Revises: 0006_srs_due_index
+
+Forms built and verified for a roster before a scheduled exam, so starting an
+attempt reads one row instead of assembling a paper. version ties a stored
+form to the compiled blueprint it came from; a stale one is ignored at start.
+"""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0007_exam_prepared_forms"
+down_revision: str | None = "0006_srs_due_index"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "exam_prepared_forms",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("user_id", sa.String(length=64), nullable=False),
+        sa.Column("blueprint_code", sa.String(length=80), nullable=False),
+        sa.Column("version", sa.String(length=16), nullable=False),
+        sa.Column("form", sa.JSON(), nullable=False),
+        sa.Column(
+            "prepared_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "user_id", "blueprint_code", name="uq_exam_prepared_user_blueprint"
+        ),
+    )
+    op.create_index(
+        "ix_exam_prepared_forms_blueprint", "exam_prepared_forms", ["blueprint_code"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("exam_prepared_forms")
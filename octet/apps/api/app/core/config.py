@@ -48,6 +48,9 @@ class Settings(BaseSettings):
     grading_sandbox: bool = True
     grading_timeout_seconds: float = 5.0
     grading_max_workers: int = 2
+    # Variant generation (practice sessions, prepared exam forms) runs in its
+    # own pool, so a 40 item session start never queues in front of grades.
+    generation_max_workers: int = 2
 
     cors_origins: str = "http://localhost:4200,http://localhost:4040"
 
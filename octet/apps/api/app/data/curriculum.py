@@ -23,6 +23,10 @@ links are declared separately. Hand listing 388 edges across 312 nodes would
 not survive a single revision. A test regenerates and compares, so the two
 cannot drift apart silently.
 
+curriculum.snapshot is a pickled copy of the parsed rows, keyed on a digest
+of curriculum.json, so a process starting up skips the parse. It is an
+optimisation only; see _load.
+
 Authoring metadata. lab_adjacent and triangle_eligible are instructions to
 content authors and are never learner-facing labels. A learner sees a flask
 icon with a tooltip, and Johnstone triangle eligibility shows up as a view
@@ -35,12 +39,15 @@ displayed to a learner, who sees generated positional numbering instead
 
 from __future__ import annotations
 
+import hashlib
 import json
-from dataclasses import dataclass
+import pickle
+from dataclasses import dataclass, fields
 from functools import lru_cache
 from pathlib import Path
 
 _DATA = Path(__file__).with_name("curriculum.json")
+_SNAPSHOT = Path(__file__).with_name("curriculum.snapshot")
 
 
 @dataclass(frozen=True)
@@ -87,10 +94,12 @@ class Course:
     unit_ids: tuple[str, ...]
 
 
-def _load() -> tuple[
+Loaded = tuple[
     tuple[Course, ...], tuple[Unit, ...], tuple[Node, ...], tuple[tuple[str, str], ...]
-]:
-    raw = json.loads(_DATA.read_text())
+]
+
+
+def _parse(raw: dict) -> Loaded:
     courses: list[Course] = []
     units: list[Unit] = []
     nodes: list[Node] = []
@@ -150,6 +159,65 @@ def _load() -> tuple[
     return tuple(courses), tuple(units), tuple(nodes), tuple(edges)
 
 
+# The snapshot. Parsing curriculum.json and building 312 nodes from it was the
+# bulk of importing this module, and every worker process imports it at boot.
+# curriculum.snapshot holds the already flattened rows, pickled, keyed on a
+# digest of the JSON it was built from and on the field layout of the three
+# dataclasses. Either one changing makes the snapshot stale, and a stale or
+# missing snapshot falls back to parsing the JSON, so the snapshot can make
+# startup faster but can never make the curriculum wrong. The JSON remains
+# the source of truth.
+#
+#     python scripts/gen_curriculum_snapshot.py
+
+
+class _RowUnpickler(pickle.Unpickler):
+    """Rows are tuples of builtins, so a snapshot never needs to name a class."""
+
+    def find_class(self, module: str, name: str):
+        raise pickle.UnpicklingError(f"curriculum snapshot may not reference {module}.{name}")
+
+
+def _layout() -> tuple[tuple[str, ...], ...]:
+    return tuple(tuple(f.name for f in fields(cls)) for cls in (Course, Unit, Node))
+
+
+def _rows(loaded: Loaded) -> tuple:
+    courses, units, nodes, edges = loaded
+    flat = [tuple(tuple(getattr(x, f.name) for f in fields(x)) for x in group)
+            for group in (courses, units, nodes)]
+    return (*flat, edges)
+
+
+def render_snapshot(source: bytes) -> bytes:
+    """Snapshot bytes for curriculum.json as given. Used by the generator script."""
+    loaded = _parse(json.loads(source))
+    payload = (hashlib.sha256(source).hexdigest(), _layout(), _rows(loaded))
+    return pickle.dumps(payload, protocol=4)
+
+
+def _from_snapshot(source: bytes) -> Loaded | None:
+    try:
+        with _SNAPSHOT.open("rb") as fh:
+            digest, layout, rows = _RowUnpickler(fh).load()
+    except (OSError, pickle.UnpicklingError, ValueError, EOFError):
+        return None
+    if digest != hashlib.sha256(source).hexdigest() or layout != _layout():
+        return None
+    courses, units, nodes, edges = rows
+    return (
+        tuple(Course(*r) for r in courses),
+        tuple(Unit(*r) for r in units),
+        tuple(Node(*r) for r in nodes),
+        edges,
+    )
+
+
+def _load() -> Loaded:
+    source = _DATA.read_bytes()
+    return _from_snapshot(source) or _parse(json.loads(source))
+
+
 COURSES, UNITS, NODES, EDGES = _load()
 
 NODES_BY_CODE = {n.code: n for n in NODES}
@@ -200,6 +268,12 @@ def prerequisites_of(code: str) -> list[str]:
 
 def topological_order() -> list[str] | None:
     """Kahn's algorithm. None when the graph contains a cycle."""
+    order = _topological_order()
+    return list(order) if order is not None else None
+
+
+@lru_cache(maxsize=1)
+def _topological_order() -> tuple[str, ...] | None:
     indegree = {n.code: 0 for n in NODES}
     adjacency: dict[str, list[str]] = {n.code: [] for n in NODES}
     for a, b in EDGES:
@@ -217,4 +291,4 @@ def topological_order() -> list[str] | None:
             indegree[nxt] -= 1
             if indegree[nxt] == 0:
                 ready.append(nxt)
-    return order if len(order) == len(NODES) else None
+    return tuple(order) if len(order) == len(NODES) else None
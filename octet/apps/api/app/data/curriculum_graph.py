@@ -0,0 +1,105 @@
+"""The curriculum graph, compiled once for the per-question path.
+
+The path planner and the picker run on every next-item request, and each one
+used to rebuild what never changes between requests: Kahn's algorithm over
+all 312 nodes, a prerequisite list per node, an authored check per node. What
+varies per request is only the learner's mastery.
+
+So the graph is compiled once into bitsets. A node's position is its place in
+topological order and its bit is 1 << position. Each node carries the bitset
+of its prerequisites, and the authored nodes are one more bitset. A learner's
+mastery becomes two bitsets (at PREREQ_BAR, at MASTERED_BAR), and "ready"
+is then a subset test: prereqs & ~ok == 0. Because bits follow topological
+order, "the first ready authored node in course order" is the lowest set bit
+that passes, and the search stops there instead of planning the whole map.
+
+Python integers are the bitsets. At 312 bits every operation is a handful of
+machine words, and there is no array library to import for it.
+
+Authored flags come from the lessons, which are code, so like the curriculum
+itself they change only when the process does.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Iterable, Mapping
+
+from app.data.coverage import is_authored
+from app.data.curriculum import prerequisites_of, topological_order
+
+
+@dataclass(frozen=True)
+class CurriculumGraph:
+    """Topological order, prerequisite bitsets and authored flags."""
+
+    order: tuple[str, ...]
+    position: Mapping[str, int]
+    prereqs: tuple[int, ...]
+    authored: int
+
+    def mask(self, codes: Iterable[str]) -> int:
+        """The bitset of codes, ignoring any that are not in the curriculum."""
+        bits = 0
+        for code in codes:
+            i = self.position.get(code)
+            if i is not None:
+                bits |= 1 << i
+        return bits
+
+    def codes(self, bits: int) -> list[str]:
+        """The codes in a bitset, in topological order."""
+        out: list[str] = []
+        while bits:
+            low = bits & -bits
+            out.append(self.order[low.bit_length() - 1])
+            bits ^= low
+        return out
+
+    def ready(self, ok: int) -> int:
+        """Every node whose prerequisites all lie inside ok."""
+        bits = 0
+        for i, need in enumerate(self.prereqs):
+            if not need & ~ok:
+                bits |= 1 << i
+        return bits
+
+    def first_ready(self, candidates: int, ok: int) -> str | None:
+        """The earliest candidate, in topological order, whose prerequisites are in ok."""
+        while candidates:
+            low = candidates & -candidates
+            i = low.bit_length() - 1
+            if not self.prereqs[i] & ~ok:
+                return self.order[i]
+            candidates ^= low
+        return None
+
+    def frontier(self, ok: int, done: int) -> str | None:
+        """The first authored node that is ready and not yet mastered."""
+        return self.first_ready(self.authored & ~done, ok)
+
+
+@lru_cache(maxsize=1)
+def compiled_graph() -> CurriculumGraph:
+    order = topological_order()
+    if order is None:
+        raise ValueError("curriculum graph has a cycle")
+    position = {code: i for i, code in enumerate(order)}
+    prereqs = []
+    for code in order:
+        bits = 0
+        for q in prerequisites_of(code):
+            bits |= 1 << position[q]
+        prereqs.append(bits)
+    authored = 0
+    for i, code in enumerate(order):
+        if is_authored(code):
+            authored |= 1 << i
+    return CurriculumGraph(
+        order=tuple(order),
+        position=MappingProxyType(position),
+        prereqs=tuple(prereqs),
+        authored=authored,
+    )
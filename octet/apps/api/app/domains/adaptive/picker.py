@@ -11,7 +11,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 
 from app.data.coverage import is_authored
-from app.data.curriculum import NODES, NODES_BY_CODE, prerequisites_of, topological_order
+from app.data.curriculum import NODES, NODES_BY_CODE, prerequisites_of
+from app.data.curriculum_graph import CurriculumGraph, compiled_graph
 from app.domains.adaptive.bkt import MASTERED_BAR, PREREQ_BAR, level_for
 
 
@@ -22,26 +23,45 @@ class Choice:
     reason: str
 
 
+def _learner_bits(graph: CurriculumGraph, mastery: dict[str, float]) -> tuple[int, int]:
+    """(at PREREQ_BAR, at MASTERED_BAR) as bitsets over the compiled graph."""
+    ok = graph.mask(c for c, p in mastery.items() if p >= PREREQ_BAR)
+    done = graph.mask(c for c, p in mastery.items() if p >= MASTERED_BAR)
+    return ok, done
+
+
+def frontier_node(mastery: dict[str, float]) -> str | None:
+    """plan_path's recommended node, without planning the rest of the map."""
+    graph = compiled_graph()
+    ok, done = _learner_bits(graph, mastery)
+    return graph.frontier(ok, done)
+
+
 def plan_path(mastery: dict[str, float]) -> dict:
     """Order the graph and mark each node ready, blocked or mastered.
 
     A node is ready when every prerequisite is at or above PREREQ_BAR. The
     reason string is written for the learner, not for a log.
     """
-    order = topological_order()
-    if order is None:
-        raise ValueError("curriculum graph has a cycle")
+    graph = compiled_graph()
+    ok, done = _learner_bits(graph, mastery)
+    ready = graph.ready(ok)
+    # The map is deliberately larger than the content: 312 nodes, and most
+    # have no lesson yet. A node with nothing behind it is not a
+    # recommendation, it is a dead end, so the first ready node that is also
+    # authored wins. Every node still appears in the plan, because the plan is
+    # the route and the route includes what has not been written yet.
+    recommended = graph.frontier(ok, done)
 
     plan = []
-    recommended = None
-    for code in order:
+    for i, code in enumerate(graph.order):
+        bit = 1 << i
         node = NODES_BY_CODE[code]
         p = mastery.get(code, 0.0)
-        prereqs = prerequisites_of(code)
-        blocking = [q for q in prereqs if mastery.get(q, 0.0) < PREREQ_BAR]
-        if p >= MASTERED_BAR:
+        if done & bit:
             state, reason = "mastered", f"You can do {node.title.lower()} unaided."
-        elif blocking:
+        elif not ready & bit:
+            blocking = [q for q in prerequisites_of(code) if mastery.get(q, 0.0) < PREREQ_BAR]
             names = ", ".join(NODES_BY_CODE[b].title.lower() for b in blocking[:2])
             state = "blocked"
             reason = f"Waiting on {names}, because {node.title.lower()} builds directly on it."
@@ -51,14 +71,6 @@ def plan_path(mastery: dict[str, float]) -> dict:
                 f"Ready now. Its prerequisites are in place and you are at "
                 f"{level_for(p)} on this."
             )
-            # The map is deliberately larger than the content: 312 nodes, and
-            # most have no lesson yet. A node with nothing behind it is not a
-            # recommendation, it is a dead end, so the first ready node that
-            # is also authored wins. Every node still appears in the plan,
-            # because the plan is the route and the route includes what has
-            # not been written yet.
-            if recommended is None and is_authored(code):
-                recommended = code
         plan.append(
             {
                 "node": code,
@@ -70,7 +82,7 @@ def plan_path(mastery: dict[str, float]) -> dict:
                 "level": level_for(p),
                 "state": state,
                 "reason": reason,
-                "authored": is_authored(code),
+                "authored": bool(graph.authored & bit),
             }
         )
     return {"plan": plan, "recommended_node": recommended}
@@ -97,9 +109,10 @@ def pick_next(
                 "so we are practicing that before moving on.",
             )
 
-    planned = plan_path(mastery)
-    if planned["recommended_node"]:
-        code = planned["recommended_node"]
+    # Only the recommendation is needed here, so this asks the compiled graph
+    # for it directly rather than planning all 312 nodes to read one field.
+    code = frontier_node(mastery)
+    if code:
         return Choice(
             code,
             "frontier",
@@ -24,15 +24,27 @@ than there are templates on its nodes is still satisfiable: it takes further
 variants of the same templates. That is legitimate, and it is also a weaker
 exam, because two variants of one template measure one skill twice. The
 assembler reports how much of that it had to do so the caller can judge.
+
+Assembly is split in two. compile_blueprint() decides which template fills
+each position, which depends only on the blueprint and the registry, and is
+done once per blueprint (and molecule pool and generator code, which the
+plan's version carries).
+Resolving the slots with the learner's seeds is the per learner part, done
+inline by assemble() or all at once in the generation pool by
+assemble_in_pool().
 """
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
 from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
 
 import chem_core as cc
 
+from app.domains.grading.generate import generate_variant
 from app.domains.grading.serve import public_meta as serve_public_meta
 
 from app.data.curriculum import NODES_BY_CODE
@@ -74,14 +86,61 @@ class Form:
     notes: tuple[str, ...] = ()
 
 
+@lru_cache(maxsize=None)
+def _node_templates(node: str) -> tuple[str, ...]:
+    """Template ids serving one node, sorted.
+
+    The registry is code, so it changes only when the process does.
+    template_ids_for_node reads the built-ins and the manifest and imports
+    nothing; scanning REGISTRY would import every module in the bank to find
+    the few on one unit's nodes. Resolving a slot imports its module later.
+    """
+    return tuple(sorted(cc.template_ids_for_node(node)))
+
+
 def _templates_for(node_codes: tuple[str, ...]) -> dict[str, list[str]]:
     """Template ids available per node, in a stable order."""
-    available: dict[str, list[str]] = {code: [] for code in node_codes}
-    for tid, entry in sorted(cc.REGISTRY.items()):
-        node = str(entry.get("node"))
-        if node in available:
-            available[node].append(tid)
-    return available
+    return {code: list(_node_templates(code)) for code in node_codes}
+
+
+@lru_cache(maxsize=None)
+def generator_version() -> str:
+    """A digest of chem_core's source: its templates, generators and verifiers.
+
+    A template id and seed only name an item for the code that generated it.
+    After a deploy that changes a generator, a form prepared by the old code
+    no longer shows what grading now re-resolves, even though the ids, the
+    blueprint and the pool are all unchanged. The source is read, not
+    imported, so the bank stays unloaded; the code only changes with the
+    process, so this is read once.
+    """
+    package = Path(cc.__file__).resolve().parent
+    digest = hashlib.sha256()
+    for path in sorted(package.rglob("*.py")):
+        digest.update(str(path.relative_to(package)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+# (pool object, digest), recomputed when set_pool installs a new pool.
+_pool_digest: tuple[tuple, str] | None = None
+
+
+def pool_version() -> str:
+    """A digest of the molecule pool the generators draw from, and their code.
+
+    A form is (template, seed) pairs, and grading re-resolves each pair
+    against the pool and generators live at the time, so a stored form is
+    only current for the pool and the chem_core code it was built from.
+    """
+    global _pool_digest
+    pool = cc.get_pool()
+    if _pool_digest is None or _pool_digest[0] is not pool:
+        digest = hashlib.sha256(generator_version().encode())
+        for m in pool:
+            digest.update(f"{m.name}|{m.smiles}|{m.formula};".encode())
+        _pool_digest = (pool, digest.hexdigest()[:16])
+    return _pool_digest[1]
 
 
 def _form_seed(user_id: str, blueprint_code: str, position: int) -> int:
@@ -89,11 +148,48 @@ def _form_seed(user_id: str, blueprint_code: str, position: int) -> int:
     return int(digest[:8], 16) & 0x7FFFFFFF
 
 
-def check_feasible(blueprint: Blueprint) -> list[str]:
-    """Problems that would stop this blueprint being assembled, in plain words.
+@dataclass(frozen=True)
+class Slot:
+    """One position on a compiled blueprint: which template fills it."""
 
-    Separate from assemble() so a catalogue can show which exams are actually
-    takeable without building a form for every one of them.
+    position: int
+    section_id: str
+    template_id: str
+
+
+@dataclass(frozen=True)
+class CompiledBlueprint:
+    """Everything about a form that does not depend on who sits it.
+
+    Which template fills which position is a function of the blueprint and the
+    registry alone; only the seed is per learner. So the walk over sections,
+    nodes and templates happens once per blueprint, and building a form is the
+    plan plus one resolve per slot.
+
+    version changes whenever the plan, the molecule pool behind its items or
+    the generator code could, and a stored form is only handed out while it
+    matches.
+    """
+
+    code: str
+    version: str
+    slots: tuple[Slot, ...]
+    repeated_templates: int
+    notes: tuple[str, ...] = ()
+    problems: tuple[str, ...] = ()
+
+
+def compile_blueprint(blueprint: Blueprint) -> CompiledBlueprint:
+    return _compile(blueprint, pool_version())
+
+
+@lru_cache(maxsize=128)
+def _compile(blueprint: Blueprint, molecule_pool: str) -> CompiledBlueprint:
+    """Deal the templates onto positions, or record why that is impossible.
+
+    Items are dealt round robin across the nodes of a section so the section
+    spreads over its nodes rather than exhausting one before moving on. Within
+    a node the templates cycle for the same reason.
     """
     problems: list[str] = []
     for section in blueprint.sections:
@@ -109,21 +205,13 @@ def check_feasible(blueprint: Blueprint) -> list[str]:
             )
         elif section.items < 1:
             problems.append(f"{section.id} asks for {section.items} items")
-    return problems
-
-
-def assemble(blueprint: Blueprint, user_id: str) -> Form:
-    """Build the form, or raise.
-
-    Items are dealt round robin across the nodes of a section so the section
-    spreads over its nodes rather than exhausting one before moving on. Within
-    a node the templates cycle for the same reason.
-    """
-    problems = check_feasible(blueprint)
     if problems:
-        raise AssemblyError("; ".join(problems))
+        return CompiledBlueprint(
+            code=blueprint.code, version=molecule_pool, slots=(), repeated_templates=0,
+            problems=tuple(problems),
+        )
 
-    items: list[FormItem] = []
+    slots: list[Slot] = []
     repeated = 0
     notes: list[str] = []
     position = 0
@@ -132,8 +220,6 @@ def assemble(blueprint: Blueprint, user_id: str) -> Form:
         available = _templates_for(section.node_codes)
         # Nodes that actually carry items, in blueprint order.
         live_nodes = [c for c in section.node_codes if available.get(c)]
-        if not live_nodes:
-            raise AssemblyError(f"{section.id} has no node carrying a generated item")
 
         distinct = sum(len(available[c]) for c in live_nodes)
         if section.items > distinct:
@@ -160,43 +246,104 @@ def assemble(blueprint: Blueprint, user_id: str) -> Form:
             if template_id in used:
                 repeated += 1
             used.add(template_id)
-
             position += 1
-            seed = _form_seed(user_id, blueprint.code, position)
-            try:
-                variant = cc.resolve_generated(template_id, seed)
-            except RuntimeError as exc:
-                # resolve_generated only returns a variant whose key an
-                # independent path confirmed. Exhausting its retries means the
-                # bank cannot produce a verifiable item, which is a reason to
-                # refuse the exam rather than serve an unverified one.
-                raise AssemblyError(
-                    f"{template_id} could not produce a verifiable item: {exc}"
-                ) from exc
-
-            # Whitelisted, fail-closed. This line used to be a blacklist
-            # dropping two named keys and passing the rest, which leaked every
-            # numeric item's answer (value, key_text, wrong_paths) into the
-            # attempt payload once the numeric templates grew those fields.
-            public_meta = serve_public_meta(variant.grader, variant.meta)
-            items.append(
-                FormItem(
-                    position=position,
-                    section_id=section.id,
-                    node=variant.node,
-                    template_id=variant.template_id,
-                    seed=variant.seed,
-                    prompt=variant.prompt,
-                    grader=variant.grader,
-                    meta=public_meta,
-                    verified_by=str(variant.meta.get("verified_by", "")),
-                )
-            )
+            slots.append(Slot(position=position, section_id=section.id, template_id=template_id))
+
+    digest = hashlib.sha256(molecule_pool.encode())
+    for slot in slots:
+        digest.update(f"{slot.position}:{slot.section_id}:{slot.template_id};".encode())
+    return CompiledBlueprint(
+        code=blueprint.code,
+        version=digest.hexdigest()[:16],
+        slots=tuple(slots),
+        repeated_templates=repeated,
+        notes=tuple(notes),
+    )
 
+
+def check_feasible(blueprint: Blueprint) -> list[str]:
+    """Problems that would stop this blueprint being assembled, in plain words.
+
+    Separate from assemble() so a catalogue can show which exams are actually
+    takeable without building a form for every one of them.
+    """
+    return list(compile_blueprint(blueprint).problems)
+
+
+def _form_item(slot: Slot, variant: cc.Variant) -> FormItem:
+    # Whitelisted, fail-closed. This line used to be a blacklist dropping two
+    # named keys and passing the rest, which leaked every numeric item's
+    # answer (value, key_text, wrong_paths) into the attempt payload once the
+    # numeric templates grew those fields.
+    public_meta = serve_public_meta(variant.grader, variant.meta)
+    return FormItem(
+        position=slot.position,
+        section_id=slot.section_id,
+        node=variant.node,
+        template_id=variant.template_id,
+        seed=variant.seed,
+        prompt=variant.prompt,
+        grader=variant.grader,
+        meta=public_meta,
+        verified_by=str(variant.meta.get("verified_by", "")),
+    )
+
+
+def _form(plan: CompiledBlueprint, user_id: str, items: list[FormItem]) -> Form:
     return Form(
-        blueprint_code=blueprint.code,
+        blueprint_code=plan.code,
         user_id=user_id,
         items=tuple(items),
-        repeated_templates=repeated,
-        notes=tuple(notes),
+        repeated_templates=plan.repeated_templates,
+        notes=plan.notes,
     )
+
+
+def assemble(blueprint: Blueprint, user_id: str) -> Form:
+    """Build the form, or raise."""
+    plan = compile_blueprint(blueprint)
+    if plan.problems:
+        raise AssemblyError("; ".join(plan.problems))
+
+    items: list[FormItem] = []
+    for slot in plan.slots:
+        seed = _form_seed(user_id, blueprint.code, slot.position)
+        try:
+            variant = cc.resolve_generated(slot.template_id, seed)
+        except RuntimeError as exc:
+            # resolve_generated only returns a variant whose key an
+            # independent path confirmed. Exhausting its retries means the
+            # bank cannot produce a verifiable item, which is a reason to
+            # refuse the exam rather than serve an unverified one.
+            raise AssemblyError(
+                f"{slot.template_id} could not produce a verifiable item: {exc}"
+            ) from exc
+        items.append(_form_item(slot, variant))
+    return _form(plan, user_id, items)
+
+
+async def assemble_in_pool(blueprint: Blueprint, user_id: str) -> Form:
+    """assemble(), with every slot resolved at once in the generation pool.
+
+    The same plan and the same seeds, so the same form; the pool installs the
+    parent's molecule pool in its workers for that reason. Used by form
+    preparation, where a roster of forms is built ahead of the exam window and
+    the sum of every resolve on the event loop would be the whole roster's
+    wait.
+    """
+    plan = compile_blueprint(blueprint)
+    if plan.problems:
+        raise AssemblyError("; ".join(plan.problems))
+
+    results = await asyncio.gather(
+        *(
+            generate_variant(slot.template_id, [_form_seed(user_id, blueprint.code, slot.position)])
+            for slot in plan.slots
+        )
+    )
+    items: list[FormItem] = []
+    for slot, (variant, _fallback) in zip(plan.slots, results):
+        if variant is None:
+            raise AssemblyError(f"{slot.template_id} could not produce a verifiable item")
+        items.append(_form_item(slot, variant))
+    return _form(plan, user_id, items)
@@ -121,11 +121,12 @@ def _catalogue() -> dict[str, Blueprint]:
 
     from app.data.curriculum import NODES_BY_CODE, UNITS, nodes_in_unit
 
+    # Ids from the manifest: listing the catalogue must not import every
+    # template module in the bank.
     by_unit: dict[str, list[str]] = {}
-    for _tid, entry in cc.REGISTRY.items():
-        node = str(entry.get("node"))
-        if node in NODES_BY_CODE:
-            by_unit.setdefault(NODES_BY_CODE[node].unit, []).append(node)
+    for node, spec in NODES_BY_CODE.items():
+        for _tid in cc.template_ids_for_node(node):
+            by_unit.setdefault(spec.unit, []).append(node)
 
     catalogue: dict[str, Blueprint] = {}
     for unit in UNITS:
@@ -107,3 +107,35 @@ class ExamResponse(Base):
         # and leave scoring to pick.
         UniqueConstraint("attempt_id", "position", name="uq_exam_response_attempt_position"),
     )
+
+
+class PreparedForm(Base):
+    """A form built and verified ahead of an exam window, waiting to be issued.
+
+    When a whole class opens the same exam at the same minute, assembling each
+    form at start means every one of those requests resolves and verifies a
+    full paper at once. Preparing the roster's forms beforehand turns start
+    into a row fetch.
+
+    A prepared form is exactly what assembly would produce for that learner at
+    that moment, because assembly is deterministic per learner. It is only
+    handed out while version matches the compiled blueprint, so a template
+    deployed between preparation and the window falls back to assembling at
+    start rather than issuing a paper the current bank would not build.
+    """
+
+    __tablename__ = "exam_prepared_forms"
+
+    id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    blueprint_code: Mapped[str] = mapped_column(String(80), nullable=False)
+    version: Mapped[str] = mapped_column(String(16), nullable=False)
+    form: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    prepared_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "blueprint_code", name="uq_exam_prepared_user_blueprint"),
+        Index("ix_exam_prepared_forms_blueprint", "blueprint_code"),
+    )
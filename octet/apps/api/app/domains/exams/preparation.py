@@ -0,0 +1,155 @@
+"""Preparing a roster's forms in the background.
+
+Building a form resolves every one of its items, so a full roster is minutes
+of generation. The prepare endpoint used to do that inside the request, which
+held a connection and a worker for the whole roster and gave up the work if
+the client timed out. It now validates the blueprint, starts a job here and
+answers at once; the teacher polls the job for progress.
+
+A job is an asyncio task in this process, not a row, because there is no
+background scheduler in this deployment and none is needed: preparation is
+idempotent, so a job lost to a restart is recovered by starting it again, and
+everything it had committed is kept. It commits a chunk of learners at a
+time for the same reason, and so that a learner whose form is ready can
+start from it while the rest of the roster is still being built.
+
+Two jobs for the same learners are harmless, since prepare_forms inserts with
+ON CONFLICT DO NOTHING, but a second request for a roster already running
+is handed the running job rather than starting a duplicate.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+
+from app.core.db import get_sessionmaker
+from app.domains.exams import service
+
+logger = logging.getLogger("octet.exams")
+
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+# Learners per transaction. Small enough that progress is visible and a
+# failure loses little, large enough that commits are not the cost.
+CHUNK = 25
+
+# Finished jobs kept for polling; the oldest are dropped first.
+KEEP = 200
+
+
+@dataclass
+class Preparation:
+    blueprint_code: str
+    roster: tuple[str, ...]
+    id: uuid.UUID = field(default_factory=uuid.uuid4)
+    status: str = STATUS_RUNNING
+    version: str | None = None
+    prepared: list[str] = field(default_factory=list)
+    already_current: list[str] = field(default_factory=list)
+    failed: dict[str, str] = field(default_factory=dict)
+    error: str | None = None
+    started_at: datetime = field(default_factory=lambda: datetime.now(UTC))
+    finished_at: datetime | None = None
+
+    def view(self) -> dict:
+        return {
+            "id": str(self.id),
+            "blueprint_code": self.blueprint_code,
+            "status": self.status,
+            "version": self.version,
+            "learners": len(self.roster),
+            "done": len(self.prepared) + len(self.already_current) + len(self.failed),
+            "prepared": list(self.prepared),
+            "already_current": list(self.already_current),
+            "failed": dict(self.failed),
+            "error": self.error,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+_jobs: OrderedDict[uuid.UUID, Preparation] = OrderedDict()
+# The event loop holds tasks weakly, so the running ones are kept here.
+_tasks: dict[uuid.UUID, asyncio.Task] = {}
+
+
+def start(blueprint_code: str, user_ids: list[str]) -> Preparation:
+    """Start preparing a roster's forms, or refuse before anything runs.
+
+    The blueprint is checked here rather than in the job so that an unknown
+    or unassemblable exam is still refused to the caller, not reported later
+    as a failed job.
+    """
+    service.preparable(blueprint_code)
+    roster = tuple(dict.fromkeys(user_ids))
+    for job in _jobs.values():
+        if (
+            job.status == STATUS_RUNNING
+            and job.blueprint_code == blueprint_code
+            and job.roster == roster
+        ):
+            return job
+
+    job = Preparation(blueprint_code=blueprint_code, roster=roster)
+    _jobs[job.id] = job
+    while len(_jobs) > KEEP:
+        oldest = next(iter(_jobs))
+        if _jobs[oldest].status == STATUS_RUNNING:
+            break
+        del _jobs[oldest]
+    task = asyncio.create_task(_run(job), name=f"exam-prepare-{job.id}")
+    _tasks[job.id] = task
+    task.add_done_callback(lambda _t: _tasks.pop(job.id, None))
+    return job
+
+
+def get(job_id: uuid.UUID) -> Preparation | None:
+    return _jobs.get(job_id)
+
+
+async def wait(job_id: uuid.UUID) -> None:
+    """Until the job's task has finished. For tests and shutdown."""
+    task = _tasks.get(job_id)
+    if task is not None:
+        await asyncio.gather(task, return_exceptions=True)
+
+
+async def cancel_all() -> None:
+    tasks = list(_tasks.values())
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _run(job: Preparation) -> None:
+    maker = get_sessionmaker()
+    try:
+        for i in range(0, len(job.roster), CHUNK):
+            async with maker() as session:
+                result = await service.prepare_forms(
+                    session, job.blueprint_code, list(job.roster[i : i + CHUNK])
+                )
+                await session.commit()
+            job.version = result["version"]
+            job.prepared.extend(result["prepared"])
+            job.already_current.extend(result["already_current"])
+            job.failed.update(result["failed"])
+    except asyncio.CancelledError:
+        job.status = STATUS_FAILED
+        job.error = "Preparation was interrupted. Start it again to finish the roster."
+        raise
+    except Exception as exc:
+        logger.exception("preparing %s failed", job.blueprint_code)
+        job.status = STATUS_FAILED
+        job.error = str(exc) or exc.__class__.__name__
+    else:
+        job.status = STATUS_DONE
+    finally:
+        job.finished_at = datetime.now(UTC)
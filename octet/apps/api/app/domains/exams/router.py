@@ -16,14 +16,16 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.db import get_session
-from app.core.security import Principal, get_current_principal
+from app.core.security import Principal, get_current_principal, require_roles
 from app.domains.exams import blueprints as bp
-from app.domains.exams import service
+from app.domains.exams import preparation, service
 from app.domains.exams.assembly import check_feasible
 from app.domains.exams.models import ExamAttempt, ExamResponse
 
 router = APIRouter()
 
+teacher_only = require_roles("teacher", "org_admin", "super_admin", "author")
+
 
 async def _refuse(session: AsyncSession, exc: service.ExamError) -> HTTPException:
     """Turn a refusal into a 409, keeping any work the service did first.
@@ -48,6 +50,11 @@ class StartIn(BaseModel):
     blueprint_code: str = Field(max_length=80)
 
 
+class PrepareIn(BaseModel):
+    blueprint_code: str = Field(max_length=80)
+    user_ids: list[str] = Field(min_length=1, max_length=1000)
+
+
 class AnswerIn(BaseModel):
     position: int = Field(ge=1)
     answer: str = Field(default="", max_length=4000)
@@ -174,6 +181,36 @@ async def start(
     return _attempt_view(attempt, {})
 
 
+@router.post("/exams/forms/prepare", status_code=202)
+async def prepare(
+    payload: PrepareIn,
+    principal: Principal = Depends(teacher_only),
+) -> dict:
+    """Start building a roster's forms ahead of a scheduled exam window.
+
+    Run before the window opens, so that starting an attempt at the window is
+    a row fetch rather than an assembly. The forms are built in the
+    background; the response is the job, to poll below. Safe to run again:
+    forms that are still current are left as they are.
+    """
+    try:
+        job = preparation.start(payload.blueprint_code, payload.user_ids)
+    except service.ExamError as exc:
+        raise HTTPException(409, str(exc)) from exc
+    return job.view()
+
+
+@router.get("/exams/forms/prepare/{job_id}")
+async def prepare_progress(
+    job_id: uuid.UUID,
+    principal: Principal = Depends(teacher_only),
+) -> dict:
+    job = preparation.get(job_id)
+    if job is None:
+        raise HTTPException(404, "That preparation was not found.")
+    return job.view()
+
+
 @router.get("/exams/attempts/{attempt_id}")
 async def read(
     attempt_id: uuid.UUID,
@@ -33,15 +33,24 @@ from dataclasses import asdict
 from datetime import UTC, datetime, timedelta
 
 from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.domains.exams import blueprints as bp
-from app.domains.exams.assembly import AssemblyError, Form, FormItem, assemble
+from app.domains.exams.assembly import (
+    AssemblyError,
+    Form,
+    FormItem,
+    assemble,
+    assemble_in_pool,
+    compile_blueprint,
+)
 from app.domains.exams.models import (
     STATUS_IN_PROGRESS,
     STATUS_SUBMITTED,
     ExamAttempt,
     ExamResponse,
+    PreparedForm,
 )
 from app.domains.exams.scoring import score_form
 from app.domains.grading.sandbox import grade_sandboxed
@@ -51,6 +60,11 @@ class ExamError(Exception):
     """A refusal the learner should see, phrased for them."""
 
 
+# Prepared forms insert with ON CONFLICT DO NOTHING; both dialects spell it
+# the same way once the right insert is chosen.
+_DIALECT_INSERT = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
 def _now() -> datetime:
     return datetime.now(UTC)
 
@@ -86,6 +100,9 @@ async def start_attempt(session: AsyncSession, user_id: str, blueprint_code: str
     Refuses a second open attempt on the same blueprint rather than silently
     abandoning the first, because abandoning it would discard answers the
     learner has already given.
+
+    A form prepared ahead of the window is issued as stored. Without one, or
+    with one the current registry would not build, the form is assembled here.
     """
     blueprint = bp.get(blueprint_code)
     if blueprint is None:
@@ -114,15 +131,17 @@ async def start_attempt(session: AsyncSession, user_id: str, blueprint_code: str
                 "before starting another."
             )
 
-    try:
-        form = assemble(blueprint, user_id)
-    except AssemblyError as exc:
-        # The bank cannot honour the blueprint. Refusing is the point; see
-        # assembly.py.
-        raise ExamError(
-            f"This exam cannot be assembled right now, so it has not been "
-            f"started: {exc}"
-        ) from exc
+    form_json = await _prepared_form(session, user_id, blueprint)
+    if form_json is None:
+        try:
+            form_json = _form_to_json(assemble(blueprint, user_id))
+        except AssemblyError as exc:
+            # The bank cannot honour the blueprint. Refusing is the point; see
+            # assembly.py.
+            raise ExamError(
+                f"This exam cannot be assembled right now, so it has not been "
+                f"started: {exc}"
+            ) from exc
 
     started = _now()
     attempt = ExamAttempt(
@@ -131,13 +150,122 @@ async def start_attempt(session: AsyncSession, user_id: str, blueprint_code: str
         status=STATUS_IN_PROGRESS,
         started_at=started,
         expires_at=started + timedelta(minutes=blueprint.total_minutes),
-        form=_form_to_json(form),
+        form=form_json,
     )
     session.add(attempt)
     await session.flush()
     return attempt
 
 
+async def _prepared_form(
+    session: AsyncSession, user_id: str, blueprint: bp.Blueprint
+) -> dict | None:
+    """The stored form for this learner, if one was prepared and is current."""
+    plan = compile_blueprint(blueprint)
+    if plan.problems:
+        return None
+    stored = await session.scalar(
+        select(PreparedForm).where(
+            PreparedForm.user_id == user_id,
+            PreparedForm.blueprint_code == blueprint.code,
+            PreparedForm.version == plan.version,
+        )
+    )
+    return dict(stored.form) if stored is not None else None
+
+
+def preparable(blueprint_code: str) -> bp.Blueprint:
+    """The blueprint forms can be prepared for, or a refusal saying why not."""
+    blueprint = bp.get(blueprint_code)
+    if blueprint is None:
+        raise ExamError(f"There is no exam with the code {blueprint_code}.")
+    plan = compile_blueprint(blueprint)
+    if plan.problems:
+        raise ExamError(
+            f"This exam cannot be assembled right now: {'; '.join(plan.problems)}"
+        )
+    return blueprint
+
+
+async def prepare_forms(
+    session: AsyncSession, blueprint_code: str, user_ids: list[str]
+) -> dict:
+    """Build and store forms for a roster ahead of an exam window.
+
+    Idempotent: a learner whose stored form is current is left alone, and a
+    stale one is rebuilt in place. Learners are prepared one at a time with
+    every item of a form resolved at once in the generation pool, so the pool
+    is kept busy without a whole roster's items in flight at once.
+
+    Safe to run twice at once for the same learners. A new form is inserted
+    with ON CONFLICT DO NOTHING, so when another run stored one first, that
+    one stands and the learner is reported as already current.
+
+    A form that cannot be built is reported rather than refused for everyone.
+    The learner it failed for is not blocked: start assembles as it always
+    did, and refuses there if the bank still cannot honour the blueprint.
+    """
+    blueprint = preparable(blueprint_code)
+    plan = compile_blueprint(blueprint)
+    insert = _DIALECT_INSERT[session.get_bind().dialect.name]
+
+    roster = list(dict.fromkeys(user_ids))
+    stored = {
+        row.user_id: row
+        for row in (
+            await session.scalars(
+                select(PreparedForm).where(
+                    PreparedForm.blueprint_code == blueprint_code,
+                    PreparedForm.user_id.in_(roster),
+                )
+            )
+        ).all()
+    }
+
+    prepared: list[str] = []
+    current: list[str] = []
+    failed: dict[str, str] = {}
+    for user_id in roster:
+        row = stored.get(user_id)
+        if row is not None and row.version == plan.version:
+            current.append(user_id)
+            continue
+        try:
+            form = await assemble_in_pool(blueprint, user_id)
+        except AssemblyError as exc:
+            failed[user_id] = str(exc)
+            continue
+        if row is None:
+            result = await session.execute(
+                insert(PreparedForm)
+                .values(
+                    user_id=user_id,
+                    blueprint_code=blueprint_code,
+                    version=plan.version,
+                    form=_form_to_json(form),
+                )
+                .on_conflict_do_nothing(
+                    index_elements=[PreparedForm.user_id, PreparedForm.blueprint_code]
+                )
+            )
+            if result.rowcount == 0:
+                current.append(user_id)
+                continue
+        else:
+            row.version = plan.version
+            row.form = _form_to_json(form)
+            row.prepared_at = _now()
+        prepared.append(user_id)
+    await session.flush()
+    return {
+        "blueprint_code": blueprint_code,
+        "version": plan.version,
+        "prepared": prepared,
+        "already_current": current,
+        "failed": failed,
+    }
+
+
 async def _load_open(session: AsyncSession, user_id: str, attempt_id: uuid.UUID) -> ExamAttempt:
     attempt = await session.get(ExamAttempt, attempt_id)
     if attempt is None or attempt.user_id != user_id:
@@ -0,0 +1,157 @@
+"""Variant generation in a process pool of its own.
+
+Resolving a variant runs a generator and its independent verifier, and some
+of them (RDKit canonicalisation, equilibrium solves) are not cheap. Done one
+at a time on the event loop, a 40 item practice session paid the sum of 40
+resolves, each through up to eight seed bumps, and every other request on the
+worker waited behind it.
+
+generate_variant() runs one resolve in the generation pool, so a caller that
+starts every item at once and awaits them waits for roughly the slowest
+item rather than the sum, and the loop stays free meanwhile. The pool is not
+the one grade_sandboxed uses: a session start fans out up to 40 resolves, and
+sharing would put every learner's grade behind them, and kill those grades
+along with the pool when a resolve wedged. Jobs are admitted one per free
+worker (sandbox._admit), so the timeout covers the resolve and never the wait
+for a worker; only a resolve that is genuinely stuck recycles the pool. The seed bumps a
+caller needs for deduplication travel with the job: the child tries the seeds
+in order and returns the first verified variant whose fingerprint is not in
+the avoid set, plus the first verified variant at all as the fallback, so a
+collision costs one more pool round trip rather than eight.
+
+Generators draw molecules from chem_core's pool, which the app installs at
+startup. Workers are started with forkserver or spawn and would otherwise
+generate from the fixture set, serving a different item than the one the
+parent later re-resolves to grade; _get_pool installs the parent's pool in
+every worker for exactly that reason.
+
+With the sandbox setting off the resolve runs inline, the same parity
+grade_sandboxed keeps, so callers never branch on configuration.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable
+
+import chem_core as cc
+
+from app.core.config import get_settings
+from app.domains.grading import sandbox
+
+logger = logging.getLogger(__name__)
+
+Fingerprint = tuple[str, tuple[str, ...]]
+
+_pool: ProcessPoolExecutor | None = None
+# The molecule pool the workers were started with. See _get_pool.
+_pool_molecules: tuple | None = None
+
+
+def _install_molecules(molecules: tuple, source: str) -> None:
+    """Pool initializer: give the worker the parent's generator pool."""
+    cc.set_pool(molecules, source=source)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """The generation pool, whose workers generate from the parent's molecules.
+
+    A forkserver or spawn worker starts with chem_core's fixture set rather
+    than the curated library the app installed, and a worker generating from
+    a different pool serves an item the parent cannot reproduce when it
+    re-resolves the seed to grade. So the parent's pool is passed to every
+    worker at start, and a pool installed after the workers started retires
+    them.
+    """
+    global _pool, _pool_molecules
+    molecules = cc.get_pool()
+    if _pool is not None and molecules is not _pool_molecules:
+        if molecules != _pool_molecules:
+            _kill_pool()
+        _pool_molecules = molecules
+    if _pool is None:
+        _pool_molecules = molecules
+        _pool = ProcessPoolExecutor(
+            max_workers=get_settings().generation_max_workers,
+            mp_context=sandbox._mp_context(),
+            initializer=_install_molecules,
+            initargs=(molecules, cc.pool_source()),
+        )
+    return _pool
+
+
+def _kill_pool() -> None:
+    """Terminate a wedged generation pool; the next call builds a fresh one."""
+    global _pool
+    if _pool is not None:
+        try:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        except Exception:  # pragma: no cover - shutdown races are not fatal
+            logger.exception("generation pool shutdown raised")
+        _pool = None
+
+
+def fingerprint(variant: cc.Variant) -> Fingerprint:
+    """The learner-visible face of an item: prompt plus choice texts.
+
+    mc templates may share one prompt across distinct choice sets, so the
+    prompt alone would call two different items the same.
+    """
+    return (variant.prompt, tuple(c["text"] for c in variant.meta.get("choices", [])))
+
+
+def _generate_in_child(
+    template_id: str, seeds: list[int], avoid: frozenset
+) -> tuple[cc.Variant | None, cc.Variant | None]:
+    """Executed inside the pool worker. Must be importable at module level.
+
+    Returns (pick, fallback): the first verified variant over seeds whose face
+    is not in avoid, and the first verified variant at all. A template that
+    cannot verify a variant ends the walk, as the serial loop's break did.
+    """
+    pick = None
+    fallback = None
+    for seed in seeds:
+        try:
+            candidate = cc.resolve_generated(template_id, seed)
+        except RuntimeError:
+            break
+        if fallback is None:
+            fallback = candidate
+        if fingerprint(candidate) not in avoid:
+            pick = candidate
+            break
+    return pick, fallback
+
+
+async def generate_variant(
+    template_id: str, seeds: Iterable[int], *, avoid: Iterable[Fingerprint] = ()
+) -> tuple[cc.Variant | None, cc.Variant | None]:
+    """Resolve one item in the pool. Never raises; (None, None) on failure.
+
+    A resolve that times out once running, or a pool that dies, gets the
+    generation pool killed and rebuilt exactly as a wedged grade does, and
+    the item is reported as unresolvable so the caller's own fallback (skip
+    the template, refuse the session) applies.
+    """
+    settings = get_settings()
+    seeds = list(seeds)
+    avoid = frozenset(avoid)
+    if not settings.grading_sandbox:
+        return _generate_in_child(template_id, seeds, avoid)
+
+    loop = asyncio.get_running_loop()
+    try:
+        async with sandbox._admit("generation", settings.generation_max_workers):
+            future = loop.run_in_executor(_get_pool(), _generate_in_child, template_id, seeds, avoid)
+            return await asyncio.wait_for(future, timeout=settings.grading_timeout_seconds + 2.0)
+    except asyncio.TimeoutError:
+        logger.warning("generation worker unresponsive, rebuilding pool",
+                       extra={"template_id": template_id})
+        _kill_pool()
+    except Exception:  # pool death, pickling failure, anything else
+        logger.exception("generation failed outside the generator")
+        _kill_pool()
+    return None, None
@@ -15,6 +15,11 @@ Two layers, because neither is sufficient alone:
   outlive the parent timeout, because on expiry the pool is killed outright
   and rebuilt.
 
+A grade is only handed to the pool when a worker is free for it (_admit), so
+the parent timeout measures the grade and never the queue in front of it. A
+burst of submissions waits its turn in the parent instead of expiring in the
+executor's queue and recycling a pool whose workers were merely busy.
+
 It is on everywhere today, including the test suite, and nothing in the tree
 turns it off. An earlier version of this note said to "disable only where
 process isolation already exists (the Celery worker) or where it would break
@@ -33,6 +38,7 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import weakref
 from concurrent.futures import ProcessPoolExecutor
 from typing import Any
 
@@ -41,6 +47,8 @@ from app.core.config import get_settings
 logger = logging.getLogger(__name__)
 
 _pool: ProcessPoolExecutor | None = None
+# pool name -> event loop -> admission semaphore. See _admit.
+_admission: dict[str, weakref.WeakKeyDictionary] = {}
 
 
 def _mp_context():
@@ -73,6 +81,7 @@ def _mp_context():
 
 
 def _get_pool() -> ProcessPoolExecutor:
+    """The shared grading pool, built on first use and after a kill."""
     global _pool
     if _pool is None:
         settings = get_settings()
@@ -83,6 +92,22 @@ def _get_pool() -> ProcessPoolExecutor:
     return _pool
 
 
+def _admit(name: str, workers: int) -> asyncio.Semaphore:
+    """The semaphore that lets at most `workers` jobs into the named pool.
+
+    Holding it before submitting keeps the executor's own queue empty, so a
+    job starts on a worker as soon as it is submitted and a timeout wrapped
+    around the submission is a timeout on the job. One per event loop,
+    because an asyncio semaphore belongs to the loop that first waits on it.
+    """
+    loop = asyncio.get_running_loop()
+    per_loop = _admission.setdefault(name, weakref.WeakKeyDictionary())
+    semaphore = per_loop.get(loop)
+    if semaphore is None:
+        semaphore = per_loop[loop] = asyncio.Semaphore(workers)
+    return semaphore
+
+
 def _kill_pool() -> None:
     """Terminate a wedged pool and force a fresh one on the next call."""
     global _pool
@@ -153,13 +178,14 @@ async def grade_sandboxed(grader: str, variant: dict, student_answer: Any, **kwa
     payload["_timeout"] = settings.grading_timeout_seconds
     loop = asyncio.get_running_loop()
     try:
-        future = loop.run_in_executor(
-            _get_pool(), _run_in_child, grader, payload, student_answer, kwargs
-        )
-        # The parent timeout is deliberately longer than the child's, so the
-        # child reports its own timeout cleanly in the normal case and this
-        # only fires when the child is genuinely unresponsive.
-        return await asyncio.wait_for(future, timeout=settings.grading_timeout_seconds + 2.0)
+        async with _admit("grading", settings.grading_max_workers):
+            future = loop.run_in_executor(
+                _get_pool(), _run_in_child, grader, payload, student_answer, kwargs
+            )
+            # The parent timeout is deliberately longer than the child's, so the
+            # child reports its own timeout cleanly in the normal case and this
+            # only fires when the child is genuinely unresponsive.
+            return await asyncio.wait_for(future, timeout=settings.grading_timeout_seconds + 2.0)
     except asyncio.TimeoutError:
         logger.warning("grading worker unresponsive, rebuilding pool", extra={"grader": grader})
         _kill_pool()
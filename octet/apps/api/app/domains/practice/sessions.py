@@ -1,8 +1,9 @@
 """Practice sessions: the UWorld-shaped loop.
 
 A learner picks units, an item count and a mode; the service assembles a
-session from the template registry across those units' nodes; every answer is
-graded in the sandbox, persisted, and folded into mastery.
+session from the template registry across those units' nodes, generating the
+items concurrently in the generation pool; every answer is graded in the
+sandbox, persisted, and folded into mastery.
 
 Two modes, and the difference is only when feedback arrives:
 
@@ -25,6 +26,7 @@ is generated at request time; it is all authored, keyed content.
 
 from __future__ import annotations
 
+import asyncio
 import uuid
 
 import chem_core as cc
@@ -33,6 +35,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import func
 
 from app.data.curriculum import NODES_BY_CODE, UNITS
+from app.domains.grading.generate import Fingerprint, fingerprint, generate_variant
 from app.domains.grading.sandbox import grade_sandboxed
 from app.domains.grading.serve import public_meta as serve_public_meta
 from app.domains.practice.models import (
@@ -135,64 +138,71 @@ async def start_session(
     unit_order = [u.id for u in UNITS if u.id in by_unit]
     cursors = {u: 0 for u in unit_order}
 
+    # Every open slot is planned up front and resolved concurrently in the
+    # generation pool, so start latency is the items spread over its workers
+    # rather than the sum of all of them, and the event loop is free while
+    # they run. Results are
+    # taken in slot order, so the dedup below is decided exactly as a serial
+    # walk would decide it, whatever order the workers finish in.
+    #
+    # A small fixture pool can hand two positions the same variant. Bump the
+    # seed a bounded number of times looking for one the session has not
+    # served yet; a repeat is accepted only once the bumps are spent, because
+    # a duplicate item still beats refusing the session. The bumps are
+    # consecutive seeds on purpose: fixture pools index by seed modulo their
+    # size, so eight consecutive seeds sweep every fixture of any pool of
+    # eight or fewer, making the dedup deterministic rather than a rerolled
+    # dice throw. Only a slot whose first variant collides pays for the bumps,
+    # in one more pool round trip. Identity is the learner-visible face of the
+    # item (prompt plus choice texts), since mc templates may share one prompt
+    # across distinct choice sets.
     items: list[dict] = []
-    served: set[tuple] = set()
-    salt = uuid.uuid4().hex[:8]
-    position = 1
+    served: set[Fingerprint] = set()
+    salt_offset = hash(uuid.uuid4().hex[:8]) % 10_000
     turn = 0
+    draw = 0
     failures = 0
-    while len(items) < count:
-        unit = unit_order[turn % len(unit_order)]
-        turn += 1
-        unit_supply = by_unit[unit]
-        tid, node_code = unit_supply[cursors[unit] % len(unit_supply)]
-        cursors[unit] += 1
-
-        # A small fixture pool can hand two positions the same variant. Bump
-        # the seed a bounded number of times looking for one the session has
-        # not served yet; a repeat is accepted only once the bumps are spent,
-        # because a duplicate item still beats refusing the session. The bumps
-        # are consecutive seeds on purpose: fixture pools index by seed modulo
-        # their size, so eight consecutive seeds sweep every fixture of any
-        # pool of eight or fewer, making the dedup deterministic rather than a
-        # rerolled dice throw. Identity is the learner-visible face of the
-        # item (prompt plus choice texts), since mc templates may share one
-        # prompt across distinct choice sets.
-        base_seed = cc.variant_seed(user_id, tid, hash(salt) % 10_000 + position)
-        variant = None
-        fallback = None
-        for bump in range(8):
-            try:
-                candidate = cc.resolve_generated(tid, base_seed + bump)
-            except RuntimeError:
-                break
-            if fallback is None:
-                fallback = candidate
-            fingerprint = (
-                candidate.prompt,
-                tuple(c["text"] for c in candidate.meta.get("choices", [])),
-            )
-            if fingerprint not in served:
-                variant = candidate
-                break
-        if variant is None:
-            variant = fallback
-        if variant is None:
-            # A template that cannot verify a variant is skipped, and if every
-            # template fails the session cannot start. Refusing beats serving
-            # an unverified key.
-            failures += 1
-            if failures > 3 * len(supply):
-                raise PracticeError(
-                    "The selected units cannot supply verified items right now."
-                )
-            continue
-        served.add(
-            (variant.prompt, tuple(c["text"] for c in variant.meta.get("choices", [])))
-        )
-        node = NODES_BY_CODE[node_code]
-        items.append(_public_item(variant, position, node.title, node.unit))
-        position += 1
+    pending: list[asyncio.Future] = []
+    try:
+        while len(items) < count:
+            wave = []
+            for _ in range(count - len(items)):
+                unit = unit_order[turn % len(unit_order)]
+                turn += 1
+                unit_supply = by_unit[unit]
+                tid, node_code = unit_supply[cursors[unit] % len(unit_supply)]
+                cursors[unit] += 1
+                draw += 1
+                base_seed = cc.variant_seed(user_id, tid, salt_offset + draw)
+                future = asyncio.ensure_future(generate_variant(tid, [base_seed]))
+                pending.append(future)
+                wave.append((tid, node_code, base_seed, future))
+
+            for tid, node_code, base_seed, future in wave:
+                first, _ = await future
+                if first is None:
+                    # A template that cannot verify a variant is skipped and
+                    # its slot refilled from the next template in the
+                    # rotation; if every template fails the session cannot
+                    # start. Refusing beats serving an unverified key.
+                    failures += 1
+                    if failures > 3 * len(supply):
+                        raise PracticeError(
+                            "The selected units cannot supply verified items right now."
+                        )
+                    continue
+                variant = first
+                if fingerprint(first) in served:
+                    bumped, _ = await generate_variant(
+                        tid, range(base_seed + 1, base_seed + 8), avoid=served
+                    )
+                    variant = bumped or first
+                served.add(fingerprint(variant))
+                node = NODES_BY_CODE[node_code]
+                items.append(_public_item(variant, len(items) + 1, node.title, node.unit))
+    finally:
+        for future in pending:
+            future.cancel()
 
     row = PracticeSession(
         user_id=user_id,
@@ -9,6 +9,10 @@ cannot know: where each learner stands with each card on the SM-2 schedule.
 A card that has no row for a learner is "new". The first review creates the
 row; from then on the row carries the whole SM-2 state (repetitions,
 interval, ease) plus when the card is next due.
+
+Beside it, a per node counter of how many of that node's cards the learner
+has seen, bumped in the same transaction as the first review of a card. The
+stats rollup reads these few rows instead of every state the learner owns.
 """
 
 from __future__ import annotations
@@ -19,6 +23,7 @@ from datetime import datetime
 from sqlalchemy import (
     DateTime,
     Float,
+    Index,
     Integer,
     String,
     UniqueConstraint,
@@ -59,4 +64,29 @@ class SrsState(Base):
 
     __table_args__ = (
         UniqueConstraint("user_id", "card_id", name="uq_srs_state_user_card"),
+        # The due queue is a range scan on this: one learner's rows in due
+        # order, cut at now, with the limit applied by the database.
+        Index("ix_srs_states_user_due", "user_id", "due_at"),
+    )
+
+
+class SrsNodeCounter(Base):
+    """Per learner, per node: how many of the node's cards have been seen.
+
+    Keyed by node rather than by course so the rollup stays exact when a
+    lesson retires. A node's cards come and go together (a lesson yields
+    both or neither), so a counter whose node is no longer live is simply
+    skipped, and the node's course is read from the live card set rather
+    than frozen here.
+    """
+
+    __tablename__ = "srs_node_counters"
+
+    id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    node_code: Mapped[str] = mapped_column(String(64), nullable=False)
+    seen: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "node_code", name="uq_srs_counter_user_node"),
     )
@@ -6,11 +6,18 @@ Card derivation. Every complete lesson yields exactly two cards, both taken
 verbatim from the authored text: the try-it retrieval question, and the
 pitfall reframed as a question about the node. Nothing here writes card
 prose; a card that reads badly is a lesson that reads badly, and the fix
-belongs in the lesson. Cards are re-derived on every read rather than stored,
-so a lesson edit propagates immediately. A lesson missing any of the parts a
-card needs is skipped, as is a lesson whose node is no longer in the
-curriculum: a card the app cannot attribute to a live node has nowhere to
-link and nothing to claim.
+belongs in the lesson. Cards are never stored: they are derived from the
+lesson library into an immutable CardIndex once per process, and again on
+reload_cards() when content is reloaded, so a lesson edit still propagates
+without a migration. A lesson missing any of the parts a card needs is
+skipped, as is a lesson whose node is no longer in the curriculum: a card the
+app cannot attribute to a live node has nowhere to link and nothing to claim.
+
+Reads. Every learner opens the review queue every day, so the queue asks the
+database for exactly the due cards it will serve, in due order, with the
+limit applied there (an index on user and due date makes that a range scan),
+and the counts come back from one aggregate. The stats rollup reads the per
+node seen counters rather than every state row the learner owns.
 
 Scheduling. Plain SM-2 (the same family the adaptive planner's port uses),
 as a pure function over (repetitions, interval, ease, grade). Grades run 0
@@ -24,14 +31,18 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping
 
-from sqlalchemy import select
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.data.curriculum import NODES_BY_CODE
 from app.data.lessons import LESSONS
 
-from app.domains.srs.models import SrsState
+from app.domains.srs.models import SrsNodeCounter, SrsState
 
 
 class SrsError(Exception):
@@ -44,6 +55,10 @@ KIND_PITFALL = "pitfall"
 MIN_EASE = 1.3
 DEFAULT_EASE = 2.5
 
+# Both dialects spell the upsert the same way; Postgres in production,
+# SQLite under the test suite.
+_DIALECT_INSERT = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
 
 @dataclass(frozen=True)
 class Card:
@@ -59,13 +74,8 @@ class Card:
     back: str
 
 
-def all_cards() -> list[Card]:
-    """Every card the lesson library currently supports, in node order.
-
-    Derived fresh on each call. The library is a module-level dict of ~130
-    authored lessons, so this is a cheap walk, and paying it per read is
-    what keeps card text impossible to desynchronise from lesson text.
-    """
+def _derive_cards() -> list[Card]:
+    """Every card the lesson library currently supports, in node order."""
     cards: list[Card] = []
     for node_code in sorted(LESSONS):
         lesson = LESSONS[node_code]
@@ -107,8 +117,58 @@ def all_cards() -> list[Card]:
     return cards
 
 
-def cards_by_id() -> dict[str, Card]:
-    return {card.card_id: card for card in all_cards()}
+@dataclass(frozen=True)
+class CardIndex:
+    """The live card set with the lookups every read needs, built once.
+
+    cards: every card in node order, which is the order new cards are served.
+    by_id / by_node: read-only lookups, shared by every request.
+    ids: the card ids as a tuple, bound into queries so the database counts
+        and serves only live cards.
+    totals_by_course: card count per course, in first-appearance order.
+    """
+
+    cards: tuple[Card, ...]
+    by_id: Mapping[str, Card]
+    by_node: Mapping[str, tuple[Card, ...]]
+    ids: tuple[str, ...]
+    totals_by_course: Mapping[str, int]
+
+    @classmethod
+    def build(cls, cards: list[Card]) -> "CardIndex":
+        by_node: dict[str, list[Card]] = {}
+        totals: dict[str, int] = {}
+        for card in cards:
+            by_node.setdefault(card.node, []).append(card)
+            totals[card.course] = totals.get(card.course, 0) + 1
+        return cls(
+            cards=tuple(cards),
+            by_id=MappingProxyType({c.card_id: c for c in cards}),
+            by_node=MappingProxyType({n: tuple(cs) for n, cs in by_node.items()}),
+            ids=tuple(c.card_id for c in cards),
+            totals_by_course=MappingProxyType(totals),
+        )
+
+
+@lru_cache(maxsize=1)
+def card_index() -> CardIndex:
+    """The process-wide card index. Built on first use, or at startup."""
+    return CardIndex.build(_derive_cards())
+
+
+def reload_cards() -> CardIndex:
+    """Rebuild the index after the lesson library has been reloaded."""
+    card_index.cache_clear()
+    return card_index()
+
+
+def all_cards() -> list[Card]:
+    """Every live card, in node order."""
+    return list(card_index().cards)
+
+
+def cards_by_id() -> Mapping[str, Card]:
+    return card_index().by_id
 
 
 def sm2(repetitions: int, interval_days: float, ease: float, q: int) -> tuple[int, float, float]:
@@ -151,7 +211,8 @@ async def review(
     grade: int,
 ) -> dict:
     """Record one graded recall and reschedule the card."""
-    if card_id not in cards_by_id():
+    card = card_index().by_id.get(card_id)
+    if card is None:
         raise SrsError(
             "That card is not in the current card set. Cards are derived "
             "from authored lessons, so a lesson that moved retires its cards."
@@ -179,6 +240,7 @@ async def review(
             last_grade=0,
         )
         db.add(state)
+        await _count_seen(db, user_id, card.node)
 
     repetitions, interval, ease = sm2(
         state.repetitions, state.interval_days, state.ease, grade
@@ -200,6 +262,42 @@ async def review(
     }
 
 
+async def _count_seen(db: AsyncSession, user_id: str, node_code: str) -> None:
+    """Bump the learner's seen counter for a node, in the caller's transaction.
+
+    One upsert on uq_srs_counter_user_node rather than update-then-insert:
+    when two first reviews of the node's two cards land together, the
+    second insert waits on the first's row and increments it instead of
+    failing on the constraint, so both count.
+    """
+    insert = _DIALECT_INSERT[db.get_bind().dialect.name]
+    await db.execute(
+        insert(SrsNodeCounter)
+        .values(user_id=user_id, node_code=node_code, seen=1)
+        .on_conflict_do_update(
+            index_elements=[SrsNodeCounter.user_id, SrsNodeCounter.node_code],
+            set_={"seen": SrsNodeCounter.seen + 1},
+        )
+    )
+
+
+async def _live_counts(db: AsyncSession, user_id: str, index: CardIndex, now: datetime) -> tuple[int, int]:
+    """(seen, due now) over the learner's live cards, in one aggregate.
+
+    A state whose card retired (lesson moved or unfinished) is excluded by
+    the card id filter rather than fetched and discarded.
+    """
+    seen, due = (
+        await db.execute(
+            select(
+                func.count(),
+                func.count().filter(SrsState.due_at <= now),
+            ).where(SrsState.user_id == user_id, SrsState.card_id.in_(index.ids))
+        )
+    ).one()
+    return int(seen or 0), int(due or 0)
+
+
 async def queue(db: AsyncSession, user_id: str, *, limit: int) -> dict:
     """Due cards first, then unseen cards, up to limit.
 
@@ -208,21 +306,22 @@ async def queue(db: AsyncSession, user_id: str, *, limit: int) -> dict:
     nothing to protect here the way item keys are protected, because the
     lesson pages already show this text to anyone who reads them.
     """
-    cards = cards_by_id()
-    states = (
-        await db.scalars(select(SrsState).where(SrsState.user_id == user_id))
-    ).all()
-    # A state whose card retired (lesson moved or unfinished) is ignored
-    # rather than served: there is no card text to put on it.
-    live_states = [s for s in states if s.card_id in cards]
-    seen_ids = {s.card_id for s in live_states}
-
+    index = card_index()
     now = _now()
-    due_states = sorted(
-        (s for s in live_states if as_aware(s.due_at) <= now),
-        key=lambda s: as_aware(s.due_at),
-    )
-    new_cards = [c for c in all_cards() if c.card_id not in seen_ids]
+    seen, due_count = await _live_counts(db, user_id, index, now)
+
+    due_ids = (
+        await db.scalars(
+            select(SrsState.card_id)
+            .where(
+                SrsState.user_id == user_id,
+                SrsState.due_at <= now,
+                SrsState.card_id.in_(index.ids),
+            )
+            .order_by(SrsState.due_at, SrsState.card_id)
+            .limit(limit)
+        )
+    ).all()
 
     def entry(card: Card) -> dict:
         return {
@@ -235,45 +334,65 @@ async def queue(db: AsyncSession, user_id: str, *, limit: int) -> dict:
             "back": card.back,
         }
 
-    serve: list[dict] = [entry(cards[s.card_id]) for s in due_states[:limit]]
-    for card in new_cards:
-        if len(serve) >= limit:
-            break
-        serve.append(entry(card))
+    serve: list[dict] = [entry(index.by_id[c]) for c in due_ids]
+    if len(serve) < limit and seen < len(index.cards):
+        # Only a learner with room left in the queue pays for the list of
+        # cards they have already met, and only the ids come back.
+        seen_ids = set(
+            (
+                await db.scalars(
+                    select(SrsState.card_id).where(SrsState.user_id == user_id)
+                )
+            ).all()
+        )
+        for card in index.cards:
+            if len(serve) >= limit:
+                break
+            if card.card_id not in seen_ids:
+                serve.append(entry(card))
 
     return {
         "due": serve,
         "counts": {
-            "due": len(due_states),
-            "new": len(new_cards),
-            "total": len(cards),
+            "due": due_count,
+            "new": len(index.cards) - seen,
+            "total": len(index.cards),
         },
     }
 
 
 async def stats(db: AsyncSession, user_id: str) -> dict:
-    """Totals and a per-course rollup of this learner's card record."""
-    cards = all_cards()
-    card_ids = {c.card_id for c in cards}
-    states = (
-        await db.scalars(select(SrsState).where(SrsState.user_id == user_id))
-    ).all()
-    live_states = [s for s in states if s.card_id in card_ids]
-    seen_ids = {s.card_id for s in live_states}
+    """Totals and a per-course rollup of this learner's card record.
 
-    now = _now()
-    due_now = sum(1 for s in live_states if as_aware(s.due_at) <= now)
+    Served from the per node counters and the card index; the only query
+    that touches state rows is the due count, which the due index answers.
+    """
+    index = card_index()
+    counters = (
+        await db.execute(
+            select(SrsNodeCounter.node_code, SrsNodeCounter.seen).where(
+                SrsNodeCounter.user_id == user_id
+            )
+        )
+    ).all()
+    _seen, due_now = await _live_counts(db, user_id, index, _now())
 
-    by_course: dict[str, dict[str, int]] = {}
-    for card in cards:
-        slot = by_course.setdefault(card.course, {"total": 0, "seen": 0})
-        slot["total"] += 1
-        if card.card_id in seen_ids:
-            slot["seen"] += 1
+    by_course: dict[str, dict[str, int]] = {
+        course: {"total": total, "seen": 0} for course, total in index.totals_by_course.items()
+    }
+    seen = 0
+    for node_code, count in counters:
+        cards = index.by_node.get(node_code)
+        if not cards:
+            # The node's lesson retired; its cards are not in the set.
+            continue
+        count = min(int(count), len(cards))
+        by_course[cards[0].course]["seen"] += count
+        seen += count
 
     return {
-        "total_cards": len(cards),
-        "seen": len(seen_ids),
+        "total_cards": len(index.cards),
+        "seen": seen,
         "due_now": due_now,
         "by_course": by_course,
     }
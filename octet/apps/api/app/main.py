@@ -104,6 +104,22 @@ def create_app() -> FastAPI:
     @app.on_event("startup")
     async def _startup() -> None:
         install_molecule_pool()
+        # Derive the flashcard index now rather than on the first queue read.
+        from app.domains.srs.service import card_index
+
+        card_index()
+        # Compile every catalogued blueprint against this registry once.
+        from app.domains.exams.assembly import compile_blueprint
+        from app.domains.exams.blueprints import BLUEPRINTS
+
+        for blueprint in BLUEPRINTS.values():
+            compile_blueprint(blueprint)
+
+    @app.on_event("shutdown")
+    async def _shutdown() -> None:
+        from app.domains.exams import preparation
+
+        await preparation.cancel_all()
 
     app.include_router(api_v1)
     return app
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""Regenerate app/data/curriculum.snapshot from app/data/curriculum.json.
+
+The snapshot is the parsed curriculum rows, pickled, so importing the
+curriculum skips the JSON parse. A stale snapshot is ignored at import rather
+than trusted, so forgetting to run this costs startup time, never
+correctness; test_curriculum.py still fails on it so it is not forgotten.
+
+Run after any change to curriculum.json:
+
+    python scripts/gen_curriculum_snapshot.py          # write
+    python scripts/gen_curriculum_snapshot.py --check  # exit 1 if stale
+"""
+from __future__ import annotations
+
+import pathlib
+import sys
+
+HERE = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(HERE))
+
+from app.data import curriculum  # noqa: E402
+
+
+def main(argv: list[str]) -> int:
+    fresh = curriculum.render_snapshot(curriculum._DATA.read_bytes())
+    if "--check" in argv:
+        current = curriculum._SNAPSHOT.read_bytes() if curriculum._SNAPSHOT.exists() else b""
+        if current != fresh:
+            print(f"{curriculum._SNAPSHOT.name} is stale; run {pathlib.Path(__file__).name}")
+            return 1
+        return 0
+    curriculum._SNAPSHOT.write_bytes(fresh)
+    print(f"wrote {curriculum._SNAPSHOT.relative_to(HERE)} ({len(fresh)} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
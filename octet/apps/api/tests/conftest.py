@@ -45,10 +45,14 @@ async def engine():
     async with eng.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
+    # Background work opens its own sessions through the module's
+    # sessionmaker, so that is rebuilt on this engine too.
     db_mod._engine = eng
+    db_mod._sessionmaker = None
     yield eng
     await eng.dispose()
     db_mod._engine = None
+    db_mod._sessionmaker = None
 
 
 @pytest_asyncio.fixture
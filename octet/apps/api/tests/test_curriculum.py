@@ -8,9 +8,10 @@ Three separate risks, tested separately:
    template, misconception or simulation detached from the graph fails
    nowhere at runtime; it just stops being reachable, which is the failure
    mode this file exists to catch.
-3. The vendored JSON still matches what its generator produces. The edges are
-   generated rather than hand listed, and a hand edit to the JSON would be
-   silently undone the next time anyone regenerates.
+3. The vendored JSON still matches what its generator produces, and the
+   snapshot still matches the JSON. The edges are generated rather than hand
+   listed, and a hand edit to the JSON would be silently undone the next time
+   anyone regenerates.
 """
 
 from __future__ import annotations
@@ -244,3 +245,20 @@ def test_vendored_json_matches_its_generator():
     regenerated = json.loads(json.dumps(generator.build()))
     shipped = json.loads((source.parent / "curriculum.json").read_text())
     assert regenerated == shipped, "curriculum.json has drifted from its generator"
+
+
+def test_the_snapshot_is_current_and_loads_the_same_curriculum():
+    """A stale snapshot is ignored at import, so staleness would only show as a slow boot."""
+    from app.data import curriculum
+
+    source = curriculum._DATA.read_bytes()
+    loaded = curriculum._from_snapshot(source)
+    assert loaded is not None, "run scripts/gen_curriculum_snapshot.py"
+    assert loaded == curriculum._parse(json.loads(source))
+    assert loaded == (COURSES, UNITS, NODES, EDGES)
+
+
+def test_a_snapshot_of_different_json_is_not_used():
+    from app.data import curriculum
+
+    assert curriculum._from_snapshot(curriculum._DATA.read_bytes() + b" ") is None
@@ -253,6 +253,7 @@ from app.domains.exams.models import (
     STATUS_SUBMITTED,
     ExamAttempt,
     ExamResponse,
+    PreparedForm,
 )
 
 CODE = "exam.unit.gen1-u3"
@@ -429,6 +430,153 @@ async def test_restarting_after_time_ran_out_scores_the_old_attempt(db_session):
     assert second.status == STATUS_IN_PROGRESS
 
 
+@pytest.mark.asyncio
+async def test_a_prepared_form_is_the_form_assembly_would_build(db_session):
+    """Preparation resolves in the pool; the paper must not change for it."""
+    result = await service.prepare_forms(db_session, CODE, ["prep-a", "prep-b"])
+    assert result["prepared"] == ["prep-a", "prep-b"] and not result["failed"]
+
+    rows = (await db_session.scalars(select(PreparedForm))).all()
+    by_user = {r.user_id: r.form for r in rows}
+    for user_id in ("prep-a", "prep-b"):
+        inline = service._form_to_json(assemble(BLUEPRINTS[CODE], user_id))
+        assert by_user[user_id] == inline
+
+
+@pytest.mark.asyncio
+async def test_starting_with_a_prepared_form_does_not_assemble(db_session, monkeypatch):
+    await service.prepare_forms(db_session, CODE, [USER])
+
+    def _no_assembly(*_args, **_kwargs):
+        raise AssertionError("start assembled a form that was already prepared")
+
+    monkeypatch.setattr(service, "assemble", _no_assembly)
+    attempt = await service.start_attempt(db_session, USER, CODE)
+    assert attempt.form["user_id"] == USER and attempt.form["items"]
+
+
+@pytest.mark.asyncio
+async def test_preparing_again_leaves_current_forms_alone(db_session):
+    await service.prepare_forms(db_session, CODE, ["prep-c"])
+    again = await service.prepare_forms(db_session, CODE, ["prep-c", "prep-c"])
+    assert again["prepared"] == []
+    assert again["already_current"] == ["prep-c"]
+
+
+@pytest.mark.asyncio
+async def test_a_stale_prepared_form_is_not_issued(db_session):
+    """A form built from an older registry is assembled afresh at start."""
+    await service.prepare_forms(db_session, CODE, [USER])
+    row = await db_session.scalar(select(PreparedForm).where(PreparedForm.user_id == USER))
+    row.version = "0" * 16
+    row.form = {**row.form, "items": []}
+    await db_session.flush()
+
+    attempt = await service.start_attempt(db_session, USER, CODE)
+    assert attempt.form["items"], "a stale stored form was handed out"
+
+
+@pytest.mark.asyncio
+async def test_a_new_molecule_pool_retires_prepared_forms(db_session):
+    """Grading re-resolves (template, seed) against the live pool.
+
+    A form prepared from another pool would show items the grader no longer
+    reproduces, so it must stop matching the compiled version.
+    """
+    from app.domains.exams.assembly import compile_blueprint
+
+    await service.prepare_forms(db_session, CODE, [USER])
+    before = compile_blueprint(BLUEPRINTS[CODE]).version
+
+    previous, previous_source = cc.get_pool(), cc.pool_source()
+    cc.set_pool(previous[:-1], source="test")
+    try:
+        assert compile_blueprint(BLUEPRINTS[CODE]).version != before
+        assert await service._prepared_form(db_session, USER, BLUEPRINTS[CODE]) is None
+        again = await service.prepare_forms(db_session, CODE, [USER])
+        assert again["prepared"] == [USER]
+    finally:
+        cc.set_pool(previous, source=previous_source)
+    assert compile_blueprint(BLUEPRINTS[CODE]).version == before
+
+
+@pytest.mark.asyncio
+async def test_a_generator_change_retires_prepared_forms(db_session, monkeypatch):
+    """Same ids, same pool, different generator code: a different paper."""
+    from app.domains.exams import assembly
+
+    await service.prepare_forms(db_session, CODE, [USER])
+    before = assembly.compile_blueprint(BLUEPRINTS[CODE]).version
+
+    monkeypatch.setattr(assembly, "generator_version", lambda: "f" * 16)
+    monkeypatch.setattr(assembly, "_pool_digest", None)
+    assert assembly.compile_blueprint(BLUEPRINTS[CODE]).version != before
+    assert await service._prepared_form(db_session, USER, BLUEPRINTS[CODE]) is None
+
+
+@pytest.mark.asyncio
+async def test_preparing_the_same_learner_twice_at_once_keeps_one_form(
+    db_session, monkeypatch
+):
+    """Another run stores the learner's form while this one is building it.
+
+    This run read no row, so it inserts; the insert must yield to the row
+    that won rather than fail on the unique constraint.
+    """
+    from app.domains.exams.assembly import compile_blueprint
+
+    real = service.assemble_in_pool
+
+    async def _beaten_to_it(blueprint, user_id):
+        form = await real(blueprint, user_id)
+        db_session.add(
+            PreparedForm(
+                user_id=user_id,
+                blueprint_code=CODE,
+                version=compile_blueprint(blueprint).version,
+                form=service._form_to_json(form),
+            )
+        )
+        await db_session.flush()
+        return form
+
+    monkeypatch.setattr(service, "assemble_in_pool", _beaten_to_it)
+    result = await service.prepare_forms(db_session, CODE, ["race-1"])
+    assert result["prepared"] == []
+    assert result["already_current"] == ["race-1"]
+
+    rows = (
+        await db_session.scalars(
+            select(PreparedForm).where(PreparedForm.user_id == "race-1")
+        )
+    ).all()
+    assert len(rows) == 1
+
+
+def test_compiling_a_blueprint_imports_only_its_nodes_templates():
+    """The node index reads the manifest; it must not load the whole bank."""
+    import json
+    import pathlib
+    import subprocess
+    import sys
+
+    code = (
+        "import json, sys\n"
+        "from chem_core import _lazy\n"
+        "from app.domains.exams.assembly import compile_blueprint\n"
+        "from app.domains.exams.blueprints import BLUEPRINTS\n"
+        f"compile_blueprint(BLUEPRINTS[{CODE!r}])\n"
+        "print(json.dumps({'loaded': _lazy.loaded_modules(), 'all': len(_lazy.TEMPLATE_MODULES)}))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=pathlib.Path(__file__).resolve().parents[1],
+        capture_output=True, text=True, check=True,
+    )
+    state = json.loads(out.stdout.strip().splitlines()[-1])
+    assert len(state["loaded"]) < state["all"], state
+
+
 # ---------------------------------------------------------------------------
 # Across the HTTP boundary
 #
@@ -666,3 +814,43 @@ async def test_refresh_tokens_are_not_access_tokens(client):
         "/api/v1/exams", headers={"Authorization": f"Bearer {refresh}"}
     )
     assert res.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_only_teaching_roles_can_prepare_forms(client, auth):
+    payload = {"blueprint_code": CODE, "user_ids": ["roster-1"]}
+    refused = await client.post(
+        "/api/v1/exams/forms/prepare", json=payload, headers=auth("student")
+    )
+    assert refused.status_code == 403
+
+    started = await client.post(
+        "/api/v1/exams/forms/prepare", json=payload, headers=auth("teacher")
+    )
+    assert started.status_code == 202
+    job_id = started.json()["id"]
+
+    from app.domains.exams import preparation
+
+    await preparation.wait(uuid.UUID(job_id))
+    progress = await client.get(
+        f"/api/v1/exams/forms/prepare/{job_id}", headers=auth("teacher")
+    )
+    assert progress.status_code == 200
+    assert progress.json()["status"] == "done"
+    assert progress.json()["prepared"] == ["roster-1"]
+
+    peek = await client.get(
+        f"/api/v1/exams/forms/prepare/{job_id}", headers=auth("student")
+    )
+    assert peek.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_preparing_an_unknown_exam_is_refused_before_any_job(client, auth):
+    res = await client.post(
+        "/api/v1/exams/forms/prepare",
+        json={"blueprint_code": "no-such-exam", "user_ids": ["roster-1"]},
+        headers=auth("teacher"),
+    )
+    assert res.status_code == 409
@@ -202,6 +202,40 @@ def test_path_planner_gates_on_prerequisites_and_explains_itself():
         assert entry["reason"].strip(), f"{entry['node']} has no reason"
 
 
+def test_compiled_frontier_matches_a_per_node_scan():
+    """The bitset search must pick what walking the plan would pick."""
+    import random
+
+    from app.data.coverage import is_authored
+    from app.data.curriculum import prerequisites_of, topological_order
+    from app.data.curriculum_graph import compiled_graph
+    from app.domains.adaptive.bkt import MASTERED_BAR, PREREQ_BAR
+
+    graph = compiled_graph()
+    assert list(graph.order) == topological_order()
+    rng = random.Random(7)
+    codes = list(graph.order)
+    for _ in range(50):
+        mastery = {c: rng.random() for c in rng.sample(codes, rng.randint(0, len(codes)))}
+        expected = next(
+            (
+                c for c in codes
+                if mastery.get(c, 0.0) < MASTERED_BAR
+                and is_authored(c)
+                and all(mastery.get(q, 0.0) >= PREREQ_BAR for q in prerequisites_of(c))
+            ),
+            None,
+        )
+        planned = plan_path(mastery)
+        assert planned["recommended_node"] == expected
+        ready = {p["node"] for p in planned["plan"] if p["state"] != "blocked"}
+        assert ready == {
+            c for c in codes
+            if mastery.get(c, 0.0) >= MASTERED_BAR
+            or all(mastery.get(q, 0.0) >= PREREQ_BAR for q in prerequisites_of(c))
+        }
+
+
 def test_picker_prefers_remediation_over_the_frontier():
     choice = pick_next({}, last_misconception_route="GEN1.STOICH")
     assert choice.policy == "remediation"
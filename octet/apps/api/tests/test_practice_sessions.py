@@ -100,6 +100,73 @@ async def test_session_items_do_not_repeat_a_variant(client, auth):
     assert len(set(faces)) == len(faces), faces
 
 
+async def test_pool_generated_items_are_the_ones_the_parent_grades(client, auth):
+    """Items are generated in the grading pool, but graded from a re-resolve.
+
+    answer() re-resolves (template_id, seed) in the API process and grades
+    against that key, so a worker must generate exactly what the parent
+    would. Generators draw from the molecule pool, which the app installs at
+    startup in the parent only; a spawned worker left on chem_core's
+    fixtures served a different molecule than the one it was graded on.
+    """
+    import chem_core as cc
+
+    from app.main import install_molecule_pool
+
+    # The test transport does not run startup, so install the pool the way
+    # startup would, and put the fixtures back for the rest of the suite.
+    previous, previous_source = cc.get_pool(), cc.pool_source()
+    install_molecule_pool()
+    try:
+        data = await _start(
+            client,
+            auth("student", user_id="pool-parity"),
+            units=["GEN1-U3", "GEN1-U4", "GEN1-U2"],
+            count=12,
+        )
+        for item in data["items"]:
+            again = cc.resolve_generated(item["template_id"], item["seed"])
+            assert again.prompt == item["prompt"], item["template_id"]
+    finally:
+        cc.set_pool(previous, source=previous_source)
+
+
+async def test_a_template_that_cannot_verify_is_skipped_and_its_slot_refilled(
+    client, auth, monkeypatch
+):
+    """A failing template loses its slots to the rest of the rotation."""
+    from app.domains.practice import sessions as sessions_mod
+
+    real = sessions_mod.generate_variant
+    broken: set[str] = set()
+
+    async def flaky(template_id, seeds, *, avoid=()):
+        if not broken:
+            broken.add(template_id)
+        if template_id in broken:
+            return None, None
+        return await real(template_id, seeds, avoid=avoid)
+
+    monkeypatch.setattr(sessions_mod, "generate_variant", flaky)
+    data = await _start(client, auth("student", user_id="flaky-template"), count=6)
+    assert [i["position"] for i in data["items"]] == [1, 2, 3, 4, 5, 6]
+    assert all(i["template_id"] not in broken for i in data["items"])
+
+
+async def test_a_selection_that_cannot_verify_anything_is_refused(client, auth, monkeypatch):
+    from app.domains.practice import sessions as sessions_mod
+
+    async def dead(template_id, seeds, *, avoid=()):
+        return None, None
+
+    monkeypatch.setattr(sessions_mod, "generate_variant", dead)
+    res = await client.post(
+        "/api/v1/practice/sessions", json=BUILD, headers=auth("student")
+    )
+    assert res.status_code == 409
+    assert "verified items" in res.json()["detail"]
+
+
 async def test_empty_selection_is_refused_with_a_reason(client, auth, monkeypatch):
     """The endpoint refuses a selection it cannot fill, and says why.
 
@@ -27,7 +27,7 @@ import time
 import pytest
 
 from app.core.config import Settings
-from app.domains.grading import sandbox
+from app.domains.grading import generate, sandbox
 
 # A grader with no ambiguity, used to prove the pool works before and after a
 # failure. "formula" with key H2O and answer H2O grades correct and graded.
@@ -75,6 +75,18 @@ def _child_that_returns_junk(grader, payload, student_answer, kwargs):
     return lambda: None
 
 
+def _child_that_is_slow(grader, payload, student_answer, kwargs):
+    """A legitimate grade that takes a while, but well inside the timeout."""
+    time.sleep(SLOW_SECONDS)
+    return {"graded": True}
+
+
+def _generator_that_wedges(template_id, seeds, avoid):
+    signal.signal(signal.SIGALRM, signal.SIG_IGN)
+    time.sleep(WEDGE_SECONDS)
+    return None, None  # pragma: no cover - the parent has given up long before this
+
+
 # Long enough to outlive the parent's timeout with margin, short enough that
 # an orphaned child from a failing run is gone within seconds.
 WEDGE_SECONDS = 6.0
@@ -83,12 +95,16 @@ WEDGE_SECONDS = 6.0
 # tiny means the timeout test costs about two seconds instead of seven.
 FAST_TIMEOUT = 0.05
 
+# Under the parent's 2.05 s, but three rounds of it on two workers are not.
+SLOW_SECONDS = 0.9
+
 
 @pytest.fixture
 def fast_sandbox(monkeypatch):
     """Sandbox on, timeouts short, so failure paths are cheap to reach."""
     settings = Settings(grading_sandbox=True, grading_timeout_seconds=FAST_TIMEOUT)
     monkeypatch.setattr(sandbox, "get_settings", lambda: settings)
+    monkeypatch.setattr(generate, "get_settings", lambda: settings)
     return settings
 
 
@@ -100,8 +116,10 @@ def _isolate_pool():
     executor, and the failure would surface somewhere unrelated.
     """
     sandbox._kill_pool()
+    generate._kill_pool()
     yield
     sandbox._kill_pool()
+    generate._kill_pool()
 
 
 # ---------------------------------------------------------------------------
@@ -227,6 +245,47 @@ class TestWorkerDeath:
         assert result["graded"] is False
 
 
+# ---------------------------------------------------------------------------
+# Queueing is not a wedge
+# ---------------------------------------------------------------------------
+
+
+class TestQueueing:
+    @pytest.mark.asyncio
+    async def test_a_burst_beyond_the_workers_waits_instead_of_timing_out(
+        self, fast_sandbox, monkeypatch
+    ):
+        """Six slow grades on two workers take three rounds, each in time.
+
+        With the timeout started at submission, the third round had already
+        spent two rounds queued, expired, and killed a pool whose workers
+        were only busy.
+        """
+        monkeypatch.setattr(sandbox, "_run_in_child", _child_that_is_slow)
+        pool = sandbox._get_pool()
+        results = await asyncio.gather(
+            *(sandbox.grade_sandboxed("formula", GOOD_VARIANT, "H2O") for _ in range(6))
+        )
+        assert all(r.get("graded") is True for r in results), results
+        assert sandbox._pool is pool, "a queued grade recycled the pool"
+
+
+class TestGenerationPool:
+    def test_generation_does_not_share_the_grading_pool(self, fast_sandbox):
+        assert generate._get_pool() is not sandbox._get_pool()
+
+    @pytest.mark.asyncio
+    async def test_a_wedged_generation_leaves_grading_alone(self, fast_sandbox, monkeypatch):
+        monkeypatch.setattr(generate, "_generate_in_child", _generator_that_wedges)
+        grading = sandbox._get_pool()
+        assert await generate.generate_variant("any", [1]) == (None, None)
+        assert generate._pool is None, "the wedged generation pool was left in place"
+        assert sandbox._pool is grading
+
+        result = await sandbox.grade_sandboxed("formula", GOOD_VARIANT, "H2O")
+        assert result["is_correct"] is True
+
+
 # ---------------------------------------------------------------------------
 # The shape contract
 # ---------------------------------------------------------------------------
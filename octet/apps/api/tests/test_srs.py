@@ -158,3 +158,131 @@ async def test_stats_roll_up_by_course(client, auth):
         c["total"] for c in stats["by_course"].values()
     )
     assert sum(c["seen"] for c in stats["by_course"].values()) == 2
+
+
+async def test_the_card_index_is_built_once_and_rebuilt_on_reload():
+    from app.domains.srs.service import _derive_cards, card_index, reload_cards
+
+    index = card_index()
+    assert card_index() is index, "every read shares one index"
+    assert list(index.cards) == _derive_cards()
+    assert set(index.by_id) == set(index.ids) == {c.card_id for c in index.cards}
+    for node, cards in index.by_node.items():
+        assert [c.kind for c in cards] == ["try_it", "pitfall"]
+        assert all(c.node == node for c in cards)
+    assert sum(index.totals_by_course.values()) == len(index.cards)
+
+    rebuilt = reload_cards()
+    assert rebuilt is not index
+    assert rebuilt.ids == index.ids
+    assert card_index() is rebuilt
+
+
+async def test_due_cards_come_back_in_due_order_from_the_database(client, auth, db_session):
+    from datetime import timedelta
+
+    from sqlalchemy import update
+
+    from app.domains.srs.models import SrsState
+    from app.domains.srs.service import _now
+
+    user = "srs-due-order"
+    headers = auth("student", user_id=user)
+    data = await _queue(client, headers, limit=3)
+    ids = [c["card_id"] for c in data["due"]]
+    for card_id in ids:
+        assert (await _review(client, headers, card_id, 4)).status_code == 200
+
+    # Backdate the three so they are due, in the reverse of review order.
+    now = _now()
+    for offset, card_id in enumerate(ids):
+        await db_session.execute(
+            update(SrsState)
+            .where(SrsState.user_id == user, SrsState.card_id == card_id)
+            .values(due_at=now - timedelta(days=1 + offset))
+        )
+    await db_session.commit()
+
+    data = await _queue(client, headers, limit=2)
+    assert data["counts"]["due"] == 3, "the count covers every due card, not the page"
+    assert [c["card_id"] for c in data["due"]] == [ids[2], ids[1]]
+
+    data = await _queue(client, headers, limit=5)
+    assert [c["card_id"] for c in data["due"][:3]] == [ids[2], ids[1], ids[0]]
+    assert all(c["card_id"] not in ids for c in data["due"][3:]), "new cards follow"
+
+
+async def test_a_retired_card_is_neither_served_nor_counted(client, auth, db_session):
+    from app.domains.srs.models import SrsNodeCounter, SrsState
+    from app.domains.srs.service import DEFAULT_EASE, _now
+
+    user = "srs-retired"
+    headers = auth("student", user_id=user)
+    db_session.add(
+        SrsState(
+            user_id=user, card_id="RETIRED.NODE:try_it", repetitions=1,
+            interval_days=1.0, ease=DEFAULT_EASE, due_at=_now(), last_grade=4,
+        )
+    )
+    db_session.add(SrsNodeCounter(user_id=user, node_code="RETIRED.NODE", seen=1))
+    await db_session.commit()
+
+    data = await _queue(client, headers)
+    assert data["counts"]["due"] == 0
+    assert data["counts"]["new"] == data["counts"]["total"]
+    assert all(c["card_id"] != "RETIRED.NODE:try_it" for c in data["due"])
+
+    stats = (await client.get("/api/v1/srs/stats", headers=headers)).json()
+    assert stats["seen"] == 0 and stats["due_now"] == 0
+
+
+async def test_stats_counters_agree_with_a_recount(client, auth, db_session):
+    from sqlalchemy import select
+
+    from app.domains.srs.models import SrsState
+    from app.domains.srs.service import card_index
+
+    user = "srs-counters"
+    headers = auth("student", user_id=user)
+    data = await _queue(client, headers, limit=5)
+    for card in data["due"]:
+        assert (await _review(client, headers, card["card_id"], 4)).status_code == 200
+    # A repeat review of a seen card must not count it twice.
+    assert (await _review(client, headers, data["due"][0]["card_id"], 5)).status_code == 200
+
+    stats = (await client.get("/api/v1/srs/stats", headers=headers)).json()
+    index = card_index()
+    states = (
+        await db_session.scalars(select(SrsState).where(SrsState.user_id == user))
+    ).all()
+    recount: dict[str, int] = {}
+    for s in states:
+        course = index.by_id[s.card_id].course
+        recount[course] = recount.get(course, 0) + 1
+    assert stats["seen"] == len(states) == 5
+    assert {c: v["seen"] for c, v in stats["by_course"].items() if v["seen"]} == recount
+
+
+async def test_seen_counter_upserts_over_a_concurrent_first_review(db_session):
+    from sqlalchemy import select
+
+    from app.domains.srs.models import SrsNodeCounter
+    from app.domains.srs.service import _count_seen
+
+    user = "srs-upsert"
+    await _count_seen(db_session, user, "NODE.A")
+    await db_session.commit()
+    # The racing review finds the row the first one committed: it must
+    # increment it, not trip the unique constraint.
+    await _count_seen(db_session, user, "NODE.A")
+    await _count_seen(db_session, user, "NODE.B")
+    await db_session.commit()
+
+    rows = (
+        await db_session.execute(
+            select(SrsNodeCounter.node_code, SrsNodeCounter.seen)
+            .where(SrsNodeCounter.user_id == user)
+            .order_by(SrsNodeCounter.node_code)
+        )
+    ).all()
+    assert [tuple(r) for r in rows] == [("NODE.A", 2), ("NODE.B", 1)]
@@ -68,7 +68,15 @@ from .prediction import (
     verify_prediction_key,
 )
 from .misconceptions import MISCONCEPTIONS, Misconception
-from .registry import REGISTRY, Variant, resolve_generated, sweep, variant_seed
+from .registry import (
+    REGISTRY,
+    Variant,
+    resolve_generated,
+    sweep,
+    template_ids_for_node,
+    templates_for_node,
+    variant_seed,
+)
 from .stoich import (
     StoichProblem,
     StoichSolution,
@@ -168,6 +176,8 @@ __all__ = [
     "Variant",
     "resolve_generated",
     "sweep",
+    "template_ids_for_node",
+    "templates_for_node",
     "variant_seed",
     "grade",
     "Option",
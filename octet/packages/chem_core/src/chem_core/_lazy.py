@@ -0,0 +1,269 @@
+"""Lazy registration of the template modules.
+
+REGISTRY, HINTS and MISCONCEPTIONS used to be filled at import time by
+importing every templates_* module. Those modules hold most of the source in
+this package, and every process that imports chem_core paid for all of them
+before doing anything: the API at boot, each sandboxed grading child, and every
+recycled forkserver or spawn worker in the grading pool.
+
+Now the three tables are LazyTable instances. A checked-in manifest
+(_manifest.py) records which module owns each template id, hint ladder and
+misconception code, so a lookup imports only the module that owns the key.
+Anything that needs the whole table (iteration, items(), values()) loads every
+module first and then sees the same contents, in the same order, as the eager
+registry always produced.
+
+The manifest is generated, never edited by hand:
+
+    python scripts/gen_chem_core_manifest.py
+
+test_lazy_registry.py fails when it has drifted from the modules, so a new
+template that was not added to the manifest cannot ship silently.
+"""
+
+from __future__ import annotations
+
+import importlib
+import json
+import threading
+
+# (module, templates attr, hints attr, misconceptions attr), in load order. A
+# later module wins a duplicated key, exactly as the sequence of dict.update
+# calls in the eager registry did. A module that is not present yet is simply
+# not live yet.
+TEMPLATE_MODULES: tuple[tuple[str, str, str | None, str | None], ...] = (
+    ("templates_g", "PHASE2_TEMPLATES", None, None),
+    ("templates_s", "PHASE3_TEMPLATES", None, None),
+    ("templates_o", "ORG1_TEMPLATES", None, None),
+    ("templates_retro", "RETRO_TEMPLATES", "RETRO_HINTS", None),
+    ("templates_mech", "MECH_LAB_TEMPLATES", "MECH_LAB_HINTS", None),
+    ("templates_org_chapters", "ORG_CHAPTER_TEMPLATES", "ORG_CHAPTER_HINTS", None),
+    ("templates_o_u12", "TEMPLATES_O_U12", "HINTS_O_U12", "MISCONCEPTIONS_O_U12"),
+    ("templates_o_u567", "TEMPLATES_O_U567", "HINTS_O_U567", "MISCONCEPTIONS_O_U567"),
+    ("templates_o_u89g", "TEMPLATES_O_U89G", "HINTS_O_U89G", "MISCONCEPTIONS_O_U89G"),
+    ("templates_g2", "TEMPLATES_G2", "HINTS_G2", "MISCONCEPTIONS_G2"),
+    ("templates_g1_u5", "TEMPLATES_G1_U5", "HINTS_G1_U5", "MISCONCEPTIONS_G1_U5"),
+    ("templates_g1_u6", "TEMPLATES_G1_U6", "HINTS_G1_U6", "MISCONCEPTIONS_G1_U6"),
+    ("templates_g1_u10", "TEMPLATES_G1_U10", "HINTS_G1_U10", "MISCONCEPTIONS_G1_U10"),
+    ("templates_g2_u8", "TEMPLATES_G2_U8", "HINTS_G2_U8", "MISCONCEPTIONS_G2_U8"),
+    ("templates_org2_u3", "TEMPLATES_ORG2_U3", "HINTS_ORG2_U3", "MISCONCEPTIONS_ORG2_U3"),
+    ("templates_org2_u5", "TEMPLATES_ORG2_U5", "HINTS_ORG2_U5", "MISCONCEPTIONS_ORG2_U5"),
+    ("templates_org2_u67", "TEMPLATES_ORG2_U67", "HINTS_ORG2_U67", "MISCONCEPTIONS_ORG2_U67"),
+    ("templates_org2", "ORG2_TEMPLATES", "ORG2_HINTS", "ORG2_MISCONCEPTIONS"),
+)
+
+_ATTR_INDEX = {"templates": 1, "hints": 2, "misconceptions": 3}
+
+_LOCK = threading.RLock()
+_LOADED: set[str] = set()
+_COMPLETE = False
+_TABLES: dict[str, "LazyTable"] = {}
+_OWNERS: dict[str, dict[str, str]] = {}
+
+
+def _owners(kind: str) -> dict[str, str]:
+    owners = _OWNERS.get(kind)
+    if owners is None:
+        from . import _manifest
+
+        if kind == "templates":
+            owners = {tid: module for tid, (module, _node) in _manifest.TEMPLATES.items()}
+        elif kind == "hints":
+            owners = dict(_manifest.HINTS)
+        else:
+            owners = dict(_manifest.MISCONCEPTIONS)
+        _OWNERS[kind] = owners
+    return owners
+
+
+class LazyTable(dict):
+    """A dict whose manifest-listed keys are imported on first use.
+
+    A single-key lookup or membership test imports only the owning module,
+    so both agree when that module fails to import. len() is answered from
+    the manifest for modules not imported yet. Iteration imports everything,
+    then restores canonical order so callers that depend on registry order
+    (seed picks, node scans) see no difference.
+
+    A key the manifest assigns to a module belongs to that module even if
+    the base table has it too; the drift test keeps the two apart.
+    """
+
+    def __init__(self, kind: str, data: dict):
+        super().__init__(data)
+        self.kind = kind
+        self._base = tuple(data)
+        _TABLES[kind] = self
+
+    def _owner(self, key) -> str | None:
+        return _owners(self.kind).get(key)
+
+    def _fill(self, key) -> None:
+        module = self._owner(key)
+        if module is not None:
+            load_module(module)
+
+    def __getitem__(self, key):
+        self._fill(key)
+        try:
+            return super().__getitem__(key)
+        except KeyError:
+            # A miss is confirmed under the lock, so a lookup that races the
+            # one-time reorder in load_all waits it out instead of missing.
+            with _LOCK:
+                return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key) -> bool:
+        self._fill(key)
+        if super().__contains__(key):
+            return True
+        with _LOCK:
+            return super().__contains__(key)
+
+    def __len__(self) -> int:
+        pending = sum(
+            1 for k, module in _owners(self.kind).items()
+            if module not in _LOADED and not dict.__contains__(self, k)
+        )
+        return super().__len__() + pending
+
+    def __iter__(self):
+        load_all()
+        return super().__iter__()
+
+    def keys(self):
+        load_all()
+        return super().keys()
+
+    def values(self):
+        load_all()
+        return super().values()
+
+    def items(self):
+        load_all()
+        return super().items()
+
+    def copy(self) -> dict:
+        load_all()
+        return dict(super().items())
+
+    def __repr__(self) -> str:
+        return f"LazyTable({self.kind!r}, {super().__len__()} loaded of {len(self)})"
+
+    def _reorder(self) -> None:
+        base = set(self._base)
+        order = list(self._base) + [k for k in _owners(self.kind) if k not in base]
+        seen = set(order)
+        order += [k for k in dict.keys(self) if k not in seen]
+        entries = [(k, dict.__getitem__(self, k)) for k in order if dict.__contains__(self, k)]
+        dict.clear(self)
+        dict.update(self, entries)
+
+
+def _merge(table: LazyTable, module_name: str, entries: dict) -> None:
+    owners = _owners(table.kind)
+    for key, value in entries.items():
+        owner = owners.get(key)
+        # A key the manifest does not list yet still lands, so a stale
+        # manifest degrades to eager behaviour instead of hiding a template.
+        if owner == module_name or (owner is None and not dict.__contains__(table, key)):
+            dict.__setitem__(table, key, value)
+
+
+def load_module(module_name: str) -> None:
+    """Import one template module and merge its entries into the tables."""
+    with _LOCK:
+        if module_name in _LOADED:
+            return
+        spec = next((s for s in TEMPLATE_MODULES if s[0] == module_name), None)
+        if spec is None:
+            raise KeyError(f"unknown template module {module_name}")
+        try:
+            module = importlib.import_module(f"chem_core.{module_name}")
+        except ImportError:
+            _LOADED.add(module_name)
+            return
+        for kind, index in _ATTR_INDEX.items():
+            attr = spec[index]
+            if attr and kind in _TABLES:
+                _merge(_TABLES[kind], module_name, getattr(module, attr, {}))
+        _LOADED.add(module_name)
+
+
+def load_all() -> None:
+    """Import every template module. Idempotent and cheap once done."""
+    global _COMPLETE
+    if _COMPLETE:
+        return
+    with _LOCK:
+        if _COMPLETE:
+            return
+        for module_name, *_ in TEMPLATE_MODULES:
+            load_module(module_name)
+        for table in _TABLES.values():
+            table._reorder()
+        _COMPLETE = True
+
+
+def loaded_modules() -> list[str]:
+    """Template modules imported so far, in load order. For tests and health."""
+    return [m for m, *_ in TEMPLATE_MODULES if m in _LOADED]
+
+
+def template_ids_for_node(node: str) -> list[str]:
+    """Template ids serving one node, from the manifest, importing nothing."""
+    from . import _manifest
+
+    return [tid for tid, (_module, n) in _manifest.TEMPLATES.items() if n == node]
+
+
+def build_manifest() -> dict[str, dict]:
+    """Import every template module eagerly and record who owns each key.
+
+    Order follows the eager dict.update sequence: a duplicated key keeps the
+    position of its first insertion and the owner of its last, which is what
+    the old registry produced. Used by the generator script and the drift test.
+    """
+    templates: dict[str, tuple[str, str]] = {}
+    hints: dict[str, str] = {}
+    misconceptions: dict[str, str] = {}
+    for module_name, templates_attr, hints_attr, misconceptions_attr in TEMPLATE_MODULES:
+        try:
+            module = importlib.import_module(f"chem_core.{module_name}")
+        except ImportError:
+            continue
+        for tid, entry in getattr(module, templates_attr).items():
+            templates[tid] = (module_name, str(entry["node"]))
+        for tid in getattr(module, hints_attr, {}) if hints_attr else ():
+            hints[tid] = module_name
+        for code in getattr(module, misconceptions_attr, {}) if misconceptions_attr else ():
+            misconceptions[code] = module_name
+    return {"templates": templates, "hints": hints, "misconceptions": misconceptions}
+
+
+def render_manifest(manifest: dict[str, dict]) -> str:
+    """Source text for _manifest.py."""
+    lines = [
+        '"""Which template module owns each registry key. Generated, do not edit.',
+        "",
+        "Regenerate with:  python scripts/gen_chem_core_manifest.py",
+        '"""',
+        "",
+        "from __future__ import annotations",
+        "",
+        "TEMPLATES: dict[str, tuple[str, str]] = {",
+    ]
+    q = json.dumps
+    lines += [f"    {q(tid)}: ({q(m)}, {q(n)})," for tid, (m, n) in manifest["templates"].items()]
+    lines += ["}", "", "HINTS: dict[str, str] = {"]
+    lines += [f"    {q(k)}: {q(m)}," for k, m in manifest["hints"].items()]
+    lines += ["}", "", "MISCONCEPTIONS: dict[str, str] = {"]
+    lines += [f"    {q(k)}: {q(m)}," for k, m in manifest["misconceptions"].items()]
+    lines += ["}", ""]
+    return "\n".join(lines)
@@ -0,0 +1,368 @@
+"""Which template module owns each registry key. Generated, do not edit.
+
+Regenerate with:  python scripts/gen_chem_core_manifest.py
+"""
+
+from __future__ import annotations
+
+TEMPLATES: dict[str, tuple[str, str]] = {
+    "molarmass.compute.v1": ("templates_g", "GEN1.MOLE"),
+    "mole.mass_to_moles.v1": ("templates_g", "GEN1.MOLE"),
+    "percentcomp.element.v1": ("templates_g", "GEN1.PERCENTCOMP"),
+    "molarity.compute.v1": ("templates_g", "GEN1.MOLARITY"),
+    "dilution.m1v1.v1": ("templates_g", "GEN1.DILUTION"),
+    "gaslaw.ideal.v1": ("templates_g", "GEN1.IDEALGAS"),
+    "gaslaw.combined.v1": ("templates_g", "GEN1.SIMPLEGASLAWS"),
+    "thermo.calorimetry.v1": ("templates_g1_u5", "GEN1.CALORIMETRY"),
+    "ph.strong_acid.v1": ("templates_g", "GEN2.PH"),
+    "limiting.reactant.v1": ("templates_g", "GEN1.LIMITING"),
+    "ksp.solubility.v1": ("templates_g", "GEN2.KSP"),
+    "density.compute.v1": ("templates_g", "GEN1.DENSITY"),
+    "sigfig.round.v1": ("templates_g", "GEN1.SIGFIGS"),
+    "mc.particulate.v1": ("templates_g", "GEN1.NOMENIONIC"),
+    "structure.draw.v1": ("templates_s", "GEN1.LEWIS"),
+    "org.unsaturation.v1": ("templates_o", "ORG1.ISOMERS"),
+    "org.cip.v1": ("templates_o", "ORG1.RS"),
+    "org.relationship.v1": ("templates_o", "ORG1.ENANTIODIA"),
+    "org.nmr.signals.v1": ("templates_o", "ORG1.NMRINTEGRATION"),
+    "org.elucidation.v1": ("templates_o", "ORG1.ELUCIDATION"),
+    "org.retro.step.v1": ("templates_retro", "ORG2.RETROSYNTHESIS"),
+    "org.mech.hbr_markovnikov.v1": ("templates_mech", "ORG1.HXADDITION"),
+    "org.mech.acid_hydration.v1": ("templates_mech", "ORG1.HXADDITION"),
+    "lab.kinetics_k.v1": ("templates_mech", "GEN2.INTEGRATED"),
+    "lab.titration_pka.v1": ("templates_mech", "GEN2.TITRATIONWEAK"),
+    "org.addition.halogen.v1": ("templates_org_chapters", "ORG1.HALOGENATION"),
+    "org.rings.count.v1": ("templates_org_chapters", "ORG1.RINGSTRAIN"),
+    "org.imf.donors.v1": ("templates_org_chapters", "ORG1.HBONDING"),
+    "org.ether.williamson.v1": ("templates_org_chapters", "ORG2.WILLIAMSON"),
+    "org.ms.molecularion.v1": ("templates_org_chapters", "ORG1.MSBASICS"),
+    "org.carb.stereocentres.v1": ("templates_org_chapters", "ORG2.CARBOHYDRATES"),
+    "org.aromatic.ringcount.v1": ("templates_org_chapters", "ORG2.HETEROCYCLES"),
+    "org.benzylic.hydrogens.v1": ("templates_org_chapters", "ORG2.BENZYLIC"),
+    "org.allylic.hydrogens.v1": ("templates_org_chapters", "ORG2.ALLYLIC"),
+    "org.draw.v1": ("templates_o_u12", "ORG1.DRAWING"),
+    "org.formalcharge.v1": ("templates_o_u12", "ORG1.FORMALCHARGEORG"),
+    "org.functionalgroup.v1": ("templates_o_u12", "ORG1.FUNCTIONALGROUPS"),
+    "org.pka.direction.v1": ("templates_o_u12", "ORG1.PKA"),
+    "org.acidity.stronger.v1": ("templates_o_u12", "ORG1.ACIDITYFACTORS"),
+    "org.nucleophile.v1": ("templates_o_u12", "ORG1.NUCELEC"),
+    "org.carbocation.stability.v1": ("templates_o_u567", "ORG1.CARBOCATION"),
+    "org.reactiontype.v1": ("templates_o_u567", "ORG1.REACTIONTYPES"),
+    "org.ez.v1": ("templates_o_u567", "ORG1.ALKENENOMEN"),
+    "org.markovnikov.v1": ("templates_o_u567", "ORG1.HXADDITION"),
+    "org.hydrogenation.unsat.v1": ("templates_o_u567", "ORG1.HYDROGENATION"),
+    "org.tautomer.keto.v1": ("templates_o_u567", "ORG1.TAUTOMER"),
+    "org.alkyne.terminal.v1": ("templates_o_u567", "ORG1.ALKYNENOMEN"),
+    "org.monochlorination.count.v1": ("templates_o_u89g", "ORG1.RADICALHALOGEN"),
+    "org.halide.class.v1": ("templates_o_u89g", "ORG1.HALIDENOMEN"),
+    "org.sn2.config.v1": ("templates_o_u89g", "ORG1.SN2"),
+    "org.zaitsev.major.v1": ("templates_o_u89g", "ORG1.ZAITSEV"),
+    "gen.hybridization.v1": ("templates_o_u89g", "GEN1.HYBRIDIZATION"),
+    "gen.molality.v1": ("templates_o_u89g", "GEN1.MOLALITY"),
+    "gen.osmotic.v1": ("templates_o_u89g", "GEN1.OSMOSIS"),
+    "gen.halflife.v1": ("templates_o_u89g", "GEN2.HALFLIFE"),
+    "gen.henderson.v1": ("templates_o_u89g", "GEN2.HENDERSON"),
+    "rate.halflife.v1": ("templates_g2", "GEN2.RATES"),
+    "ratelaw.order.v1": ("templates_g2", "GEN2.RATELAW"),
+    "arrhenius.two_temp.v1": ("templates_g2", "GEN2.ARRHENIUS"),
+    "ice.equilibrium.v1": ("templates_g2", "GEN2.ICE"),
+    "poh.strong_base.v1": ("templates_g2", "GEN2.PH"),
+    "buffer.henderson.v1": ("templates_g2", "GEN2.BUFFER"),
+    "galvanic.cell_potential.v1": ("templates_g2", "GEN2.GALVANIC"),
+    "nernst.cell.v1": ("templates_g2", "GEN2.NERNST"),
+    "gibbs.free_energy.v1": ("templates_g2", "GEN2.GIBBS"),
+    "nuclear.decay.v1": ("templates_g2", "GEN2.NUCLEARSTABILITY"),
+    "thermo.heat_capacity.v1": ("templates_g1_u5", "GEN1.HEATCAPACITY"),
+    "thermo.enthalpy_amount.v1": ("templates_g1_u5", "GEN1.ENTHALPY"),
+    "thermo.thermostoich.v1": ("templates_g1_u5", "GEN1.THERMOSTOICH"),
+    "thermo.hess.v1": ("templates_g1_u5", "GEN1.HESS"),
+    "thermo.formation.v1": ("templates_g1_u5", "GEN1.FORMATION"),
+    "thermo.bond_enthalpy.v1": ("templates_g1_u5", "GEN1.BONDENTHALPY"),
+    "thermo.first_law.v1": ("templates_g1_u5", "GEN1.FIRSTLAW"),
+    "thermo.energy_basics.v1": ("templates_g1_u5", "GEN1.ENERGYBASICS"),
+    "light.photon_energy.v1": ("templates_g1_u6", "GEN1.LIGHT"),
+    "spectra.bohr_transition.v1": ("templates_g1_u6", "GEN1.SPECTRA"),
+    "quantum.orbital_meaning.v1": ("templates_g1_u6", "GEN1.QUANTUMMODEL"),
+    "quantum.subshell_capacity.v1": ("templates_g1_u6", "GEN1.QUANTUMNUMBERS"),
+    "config.valence_count.v1": ("templates_g1_u6", "GEN1.ELECTRONCONFIG"),
+    "config.ion_config.v1": ("templates_g1_u6", "GEN1.CONFIGEXCEPTIONS"),
+    "trend.radius.v1": ("templates_g1_u6", "GEN1.RADIUS"),
+    "trend.ionization_jump.v1": ("templates_g1_u6", "GEN1.IONIZATION"),
+    "trend.electronegativity.v1": ("templates_g1_u6", "GEN1.ELECTRONEG"),
+    "imf.dominant.v1": ("templates_g1_u10", "GEN1.IMF"),
+    "imf.boiling_order.v1": ("templates_g1_u10", "GEN1.IMFPROPERTIES"),
+    "phase.heating_curve.v1": ("templates_g1_u10", "GEN1.PHASECHANGE"),
+    "phase.vapor_pressure.v1": ("templates_g1_u10", "GEN1.VAPORPRESSURE"),
+    "phase.diagram_reading.v1": ("templates_g1_u10", "GEN1.PHASEDIAGRAM"),
+    "solid.classify.v1": ("templates_g1_u10", "GEN1.SOLIDTYPES"),
+    "lattice.atoms_per_cell.v1": ("templates_g1_u10", "GEN1.UNITCELLS"),
+    "tm.d_count.v1": ("templates_g2_u8", "GEN2.TRANSITIONMETALS"),
+    "coord.oxidation_state.v1": ("templates_g2_u8", "GEN2.COORDINATION"),
+    "coord.nomenclature.v1": ("templates_g2_u8", "GEN2.COORDNOMEN"),
+    "coord.isomer_count.v1": ("templates_g2_u8", "GEN2.COORDISOMERISM"),
+    "cft.unpaired.v1": ("templates_g2_u8", "GEN2.CRYSTALFIELD"),
+    "maingroup.metallic_trend.v1": ("templates_g2_u8", "GEN2.MAINGROUP"),
+    "eas.intermediate.v1": ("templates_org2_u3", "ORG2.EASMECH"),
+    "eas.electrophile.v1": ("templates_org2_u3", "ORG2.EASREACTIONS"),
+    "eas.friedel_crafts.v1": ("templates_org2_u3", "ORG2.FRIEDELCRAFTS"),
+    "eas.activating.v1": ("templates_org2_u3", "ORG2.ACTIVATING"),
+    "eas.directing_count.v1": ("templates_org2_u3", "ORG2.DIRECTING"),
+    "eas.multiple_substituents.v1": ("templates_org2_u3", "ORG2.MULTIPLESUB"),
+    "nas.position.v1": ("templates_org2_u3", "ORG2.NAS"),
+    "arene.side_chain.v1": ("templates_org2_u3", "ORG2.SIDECHAIN"),
+    "arene.synthesis_order.v1": ("templates_org2_u3", "ORG2.AROMATICSYNTH"),
+    "carbonyl.structure.v1": ("templates_org2_u5", "ORG2.CARBONYLSTRUCTURE"),
+    "carbonyl.prep.v1": ("templates_org2_u5", "ORG2.CARBONYLPREP"),
+    "carbonyl.nuc_addition.v1": ("templates_org2_u5", "ORG2.NUCADDITION"),
+    "carbonyl.acetal_equivalents.v1": ("templates_org2_u5", "ORG2.HYDRATEACETAL"),
+    "carbonyl.acetal_protect.v1": ("templates_org2_u5", "ORG2.ACETALPROTECT"),
+    "carbonyl.imine_enamine.v1": ("templates_org2_u5", "ORG2.IMINEENAMINE"),
+    "carbonyl.wittig.v1": ("templates_org2_u5", "ORG2.WITTIG"),
+    "carbonyl.reductive_amination.v1": ("templates_org2_u5", "ORG2.REDUCTIVEAMINATION"),
+    "carbonyl.conjugate_addition.v1": ("templates_org2_u5", "ORG2.CONJUGATEADDITION"),
+    "spectra.degrees_unsaturation.v1": ("templates_org2_u5", "ORG2.CARBONYLSPECTRA"),
+    "acid.acidity_origin.v1": ("templates_org2_u67", "ORG2.ACIDPROPS"),
+    "acid.substituent.v1": ("templates_org2_u67", "ORG2.ACIDSUBSTITUENT"),
+    "acid.carbon_count.v1": ("templates_org2_u67", "ORG2.ACIDSYNTH"),
+    "nitrile.hydrolysis_count.v1": ("templates_org2_u67", "ORG2.NITRILES"),
+    "acid.spectra_distinction.v1": ("templates_org2_u67", "ORG2.ACIDSPECTRA"),
+    "derivative.reactivity_rank.v1": ("templates_org2_u67", "ORG2.DERIVATIVEREACTIVITY"),
+    "derivative.acyl_mechanism.v1": ("templates_org2_u67", "ORG2.ACYLSUB"),
+    "derivative.acid_chloride.v1": ("templates_org2_u67", "ORG2.ACIDCHLORIDE"),
+    "derivative.fischer_equilibrium.v1": ("templates_org2_u67", "ORG2.ESTERS"),
+    "derivative.amide_stability.v1": ("templates_org2_u67", "ORG2.AMIDES"),
+    "derivative.reduction.v1": ("templates_org2_u67", "ORG2.DERIVATIVEREDUCTION"),
+    "derivative.organometallic_equivalents.v1": ("templates_org2_u67", "ORG2.DERIVATIVEORGANOMETALLIC"),
+    "polymer.monomer_count.v1": ("templates_org2_u67", "ORG2.POLYMERS"),
+    "org2.unsaturation.v1": ("templates_org2", "ORG2.CONJUGATION"),
+    "org2.aromatic.nmr.v1": ("templates_org2", "ORG2.AROMATICSPECTRA"),
+    "org2.oxidation.v1": ("templates_org2", "ORG2.OXIDATION"),
+    "org2.tautomer.v1": ("templates_org2", "ORG2.TAUTOMERISM"),
+    "org2.amine.class.v1": ("templates_org2", "ORG2.AMINEPROPS"),
+    "org2.aminoacid.config.v1": ("templates_org2", "ORG2.AMINOACIDS"),
+}
+
+HINTS: dict[str, str] = {
+    "org.retro.step.v1": "templates_retro",
+    "org.mech.hbr_markovnikov.v1": "templates_mech",
+    "org.mech.acid_hydration.v1": "templates_mech",
+    "lab.kinetics_k.v1": "templates_mech",
+    "lab.titration_pka.v1": "templates_mech",
+    "org.addition.halogen.v1": "templates_org_chapters",
+    "org.rings.count.v1": "templates_org_chapters",
+    "org.imf.donors.v1": "templates_org_chapters",
+    "org.ether.williamson.v1": "templates_org_chapters",
+    "org.ms.molecularion.v1": "templates_org_chapters",
+    "org.carb.stereocentres.v1": "templates_org_chapters",
+    "org.aromatic.ringcount.v1": "templates_org_chapters",
+    "org.benzylic.hydrogens.v1": "templates_org_chapters",
+    "org.allylic.hydrogens.v1": "templates_org_chapters",
+    "org.draw.v1": "templates_o_u12",
+    "org.formalcharge.v1": "templates_o_u12",
+    "org.functionalgroup.v1": "templates_o_u12",
+    "org.pka.direction.v1": "templates_o_u12",
+    "org.acidity.stronger.v1": "templates_o_u12",
+    "org.nucleophile.v1": "templates_o_u12",
+    "org.carbocation.stability.v1": "templates_o_u567",
+    "org.reactiontype.v1": "templates_o_u567",
+    "org.ez.v1": "templates_o_u567",
+    "org.markovnikov.v1": "templates_o_u567",
+    "org.hydrogenation.unsat.v1": "templates_o_u567",
+    "org.tautomer.keto.v1": "templates_o_u567",
+    "org.alkyne.terminal.v1": "templates_o_u567",
+    "org.monochlorination.count.v1": "templates_o_u89g",
+    "org.halide.class.v1": "templates_o_u89g",
+    "org.sn2.config.v1": "templates_o_u89g",
+    "org.zaitsev.major.v1": "templates_o_u89g",
+    "gen.hybridization.v1": "templates_o_u89g",
+    "gen.molality.v1": "templates_o_u89g",
+    "gen.osmotic.v1": "templates_o_u89g",
+    "gen.halflife.v1": "templates_o_u89g",
+    "gen.henderson.v1": "templates_o_u89g",
+    "rate.halflife.v1": "templates_g2",
+    "ratelaw.order.v1": "templates_g2",
+    "arrhenius.two_temp.v1": "templates_g2",
+    "ice.equilibrium.v1": "templates_g2",
+    "poh.strong_base.v1": "templates_g2",
+    "buffer.henderson.v1": "templates_g2",
+    "galvanic.cell_potential.v1": "templates_g2",
+    "nernst.cell.v1": "templates_g2",
+    "gibbs.free_energy.v1": "templates_g2",
+    "nuclear.decay.v1": "templates_g2",
+    "thermo.heat_capacity.v1": "templates_g1_u5",
+    "thermo.calorimetry.v1": "templates_g1_u5",
+    "thermo.enthalpy_amount.v1": "templates_g1_u5",
+    "thermo.thermostoich.v1": "templates_g1_u5",
+    "thermo.hess.v1": "templates_g1_u5",
+    "thermo.formation.v1": "templates_g1_u5",
+    "thermo.bond_enthalpy.v1": "templates_g1_u5",
+    "thermo.first_law.v1": "templates_g1_u5",
+    "thermo.energy_basics.v1": "templates_g1_u5",
+    "light.photon_energy.v1": "templates_g1_u6",
+    "spectra.bohr_transition.v1": "templates_g1_u6",
+    "quantum.orbital_meaning.v1": "templates_g1_u6",
+    "quantum.subshell_capacity.v1": "templates_g1_u6",
+    "config.valence_count.v1": "templates_g1_u6",
+    "config.ion_config.v1": "templates_g1_u6",
+    "trend.radius.v1": "templates_g1_u6",
+    "trend.ionization_jump.v1": "templates_g1_u6",
+    "trend.electronegativity.v1": "templates_g1_u6",
+    "imf.dominant.v1": "templates_g1_u10",
+    "imf.boiling_order.v1": "templates_g1_u10",
+    "phase.heating_curve.v1": "templates_g1_u10",
+    "phase.vapor_pressure.v1": "templates_g1_u10",
+    "phase.diagram_reading.v1": "templates_g1_u10",
+    "solid.classify.v1": "templates_g1_u10",
+    "lattice.atoms_per_cell.v1": "templates_g1_u10",
+    "tm.d_count.v1": "templates_g2_u8",
+    "coord.oxidation_state.v1": "templates_g2_u8",
+    "coord.nomenclature.v1": "templates_g2_u8",
+    "coord.isomer_count.v1": "templates_g2_u8",
+    "cft.unpaired.v1": "templates_g2_u8",
+    "maingroup.metallic_trend.v1": "templates_g2_u8",
+    "eas.intermediate.v1": "templates_org2_u3",
+    "eas.electrophile.v1": "templates_org2_u3",
+    "eas.friedel_crafts.v1": "templates_org2_u3",
+    "eas.activating.v1": "templates_org2_u3",
+    "eas.directing_count.v1": "templates_org2_u3",
+    "eas.multiple_substituents.v1": "templates_org2_u3",
+    "nas.position.v1": "templates_org2_u3",
+    "arene.side_chain.v1": "templates_org2_u3",
+    "arene.synthesis_order.v1": "templates_org2_u3",
+    "carbonyl.structure.v1": "templates_org2_u5",
+    "carbonyl.prep.v1": "templates_org2_u5",
+    "carbonyl.nuc_addition.v1": "templates_org2_u5",
+    "carbonyl.acetal_equivalents.v1": "templates_org2_u5",
+    "carbonyl.acetal_protect.v1": "templates_org2_u5",
+    "carbonyl.imine_enamine.v1": "templates_org2_u5",
+    "carbonyl.wittig.v1": "templates_org2_u5",
+    "carbonyl.reductive_amination.v1": "templates_org2_u5",
+    "carbonyl.conjugate_addition.v1": "templates_org2_u5",
+    "spectra.degrees_unsaturation.v1": "templates_org2_u5",
+    "acid.acidity_origin.v1": "templates_org2_u67",
+    "acid.substituent.v1": "templates_org2_u67",
+    "acid.carbon_count.v1": "templates_org2_u67",
+    "nitrile.hydrolysis_count.v1": "templates_org2_u67",
+    "acid.spectra_distinction.v1": "templates_org2_u67",
+    "derivative.reactivity_rank.v1": "templates_org2_u67",
+    "derivative.acyl_mechanism.v1": "templates_org2_u67",
+    "derivative.acid_chloride.v1": "templates_org2_u67",
+    "derivative.fischer_equilibrium.v1": "templates_org2_u67",
+    "derivative.amide_stability.v1": "templates_org2_u67",
+    "derivative.reduction.v1": "templates_org2_u67",
+    "derivative.organometallic_equivalents.v1": "templates_org2_u67",
+    "polymer.monomer_count.v1": "templates_org2_u67",
+    "org2.unsaturation.v1": "templates_org2",
+    "org2.aromatic.nmr.v1": "templates_org2",
+    "org2.oxidation.v1": "templates_org2",
+    "org2.tautomer.v1": "templates_org2",
+    "org2.amine.class.v1": "templates_org2",
+    "org2.aminoacid.config.v1": "templates_org2",
+}
+
+MISCONCEPTIONS: dict[str, str] = {
+    "HYDROXYL-IS-ACID-GROUP": "templates_o_u12",
+    "CARBONYL-UNDIFFERENTIATED": "templates_o_u12",
+    "ALDEHYDE-KETONE-CONFUSED": "templates_o_u12",
+    "ESTER-IS-ACID": "templates_o_u12",
+    "PKA-TOWARD-STRONGER": "templates_o_u12",
+    "PKA-NEEDS-CONC": "templates_o_u12",
+    "STRONGER-ACID-HIGHER-PKA": "templates_o_u12",
+    "CHARGE-ROLE-INVERTED": "templates_o_u12",
+    "CATION-MORE-SUBST-LESS-STABLE": "templates_o_u567",
+    "REACTION-TYPE-BY-REAGENT": "templates_o_u567",
+    "EZ-BY-DRAWING-SIDE": "templates_o_u567",
+    "ANTI-MARKOVNIKOV-DEFAULT": "templates_o_u567",
+    "ENOL-AS-KETO": "templates_o_u567",
+    "INTERNAL-ALKYNE-AS-TERMINAL": "templates_o_u567",
+    "HALIDE-CLASS-MISCOUNT": "templates_o_u89g",
+    "SN2-RETENTION": "templates_o_u89g",
+    "SN2-LETTER-ALWAYS-FLIPS": "templates_o_u89g",
+    "ELIM-LEAST-SUBSTITUTED": "templates_o_u89g",
+    "HYBRIDIZATION-COUNTS-BONDS": "templates_o_u89g",
+    "OSMOSIS-NO-VANTHOFF": "templates_o_u89g",
+    "HALFLIFE-NO-LN2": "templates_g2",
+    "HH-RATIO-INVERTED": "templates_g2",
+    "RATE-ORDER-ZERO-ASSUMED": "templates_g2",
+    "RATE-ORDER-ASSUME-FIRST": "templates_g2",
+    "RATE-ORDER-FROM-COEFFICIENTS": "templates_g2",
+    "ARRHENIUS-SIGN": "templates_g2",
+    "CELL-ADD-POTENTIALS": "templates_g2",
+    "NERNST-DROP-N": "templates_g2",
+    "GIBBS-ENTROPY-UNITS": "templates_g2",
+    "DECAY-HALVE-ONCE": "templates_g2",
+    "THERMO-HEAT-IS-TEMPERATURE": "templates_g1_u5",
+    "THERMO-MORE-MASS-MORE-RISE": "templates_g1_u5",
+    "QM-ORBIT-IS-A-PATH": "templates_g1_u6",
+    "QM-BOUNDARY-IS-SOLID": "templates_g1_u6",
+    "CONFIG-REMOVE-D-FIRST": "templates_g1_u6",
+    "CONFIG-REMOVE-EVENLY": "templates_g1_u6",
+    "TREND-RADIUS-FOLLOWS-MASS": "templates_g1_u6",
+    "TREND-RADIUS-SHRINKS-DOWN": "templates_g1_u6",
+    "TREND-GRID-IS-UNIFORM": "templates_g1_u6",
+    "IMF-DISPERSION-IS-WEAKEST-ALWAYS": "templates_g1_u10",
+    "IMF-POLAR-BOND-MEANS-POLAR-MOLECULE": "templates_g1_u10",
+    "IMF-ANY-H-IS-A-HYDROGEN-BOND": "templates_g1_u10",
+    "IMF-SIZE-BEATS-EVERYTHING": "templates_g1_u10",
+    "IMF-MASS-SETS-BOILING-POINT": "templates_g1_u10",
+    "PHASE-MUST-MELT-FIRST": "templates_g1_u10",
+    "PHASE-PRESSURE-IRRELEVANT": "templates_g1_u10",
+    "SOLID-HARD-MEANS-IONIC": "templates_g1_u10",
+    "SOLID-COVALENT-MEANS-SOFT": "templates_g1_u10",
+    "SOLID-LOW-MELTING-MEANS-METAL": "templates_g1_u10",
+    "SOLID-CONDUCTS-MEANS-IONIC": "templates_g1_u10",
+    "COORD-ATE-SUFFIX-ALWAYS": "templates_g2_u8",
+    "COORD-OXIDATION-FROM-LIGAND-COUNT": "templates_g2_u8",
+    "MAINGROUP-CHARGE-BEATS-DISTANCE": "templates_g2_u8",
+    "MAINGROUP-GROUP-FIXES-EVERYTHING": "templates_g2_u8",
+    "EAS-INTERMEDIATE-IS-ANIONIC": "templates_org2_u3",
+    "EAS-IS-CONCERTED": "templates_org2_u3",
+    "EAS-ANION-IS-THE-ELECTROPHILE": "templates_org2_u3",
+    "EAS-RADICAL-PATHWAY-ASSUMED": "templates_org2_u3",
+    "FC-FEWER-STEPS-IS-BETTER": "templates_org2_u3",
+    "FC-NO-DIFFERENCE": "templates_org2_u3",
+    "EAS-ELECTRONEGATIVE-MEANS-ACTIVATING": "templates_org2_u3",
+    "EAS-LONE-PAIR-IGNORED": "templates_org2_u3",
+    "MULTISUB-DEACTIVATOR-DIRECTS": "templates_org2_u3",
+    "MULTISUB-EFFECTS-CANCEL": "templates_org2_u3",
+    "NAS-ANY-EWG-WILL-DO": "templates_org2_u3",
+    "NAS-POSITION-IRRELEVANT": "templates_org2_u3",
+    "SIDECHAIN-STERICS-DECIDE": "templates_org2_u3",
+    "SIDECHAIN-RING-IS-MOST-REACTIVE": "templates_org2_u3",
+    "SYNTH-ORDER-DOES-NOT-MATTER": "templates_org2_u3",
+    "SYNTH-DIRECTING-IS-A-MINOR-EFFECT": "templates_org2_u3",
+    "CARBONYL-TETRAHEDRAL": "templates_org2_u5",
+    "CARBONYL-OXYGEN-LONE-PAIRS-BEND-CARBON": "templates_org2_u5",
+    "PREP-ALCOHOL-CLASS-IGNORED": "templates_org2_u5",
+    "ADDITION-ATTACK-THE-ELECTRONEGATIVE-ATOM": "templates_org2_u5",
+    "ADDITION-PI-BOND-IS-SYMMETRIC": "templates_org2_u5",
+    "PROTECT-SACRIFICIAL-GROUP": "templates_org2_u5",
+    "PROTECT-IS-PERMANENT": "templates_org2_u5",
+    "IMINE-AMINE-CLASS-IGNORED": "templates_org2_u5",
+    "WITTIG-CARBONYL-SURVIVES": "templates_org2_u5",
+    "WITTIG-IS-SIMPLE-ADDITION": "templates_org2_u5",
+    "REDAMINATION-REDUCE-FIRST": "templates_org2_u5",
+    "REDAMINATION-CONCERTED": "templates_org2_u5",
+    "CONJUGATE-ALWAYS-1-2": "templates_org2_u5",
+    "CONJUGATE-ALPHA-IS-ELECTROPHILIC": "templates_org2_u5",
+    "ACIDITY-FROM-BOND-STRENGTH": "templates_org2_u67",
+    "ACIDITY-IS-SELF-IONISATION": "templates_org2_u67",
+    "ACIDSUB-SIZE-DECIDES": "templates_org2_u67",
+    "ACIDSUB-INDUCTION-DOES-NOT-REACH": "templates_org2_u67",
+    "SPECTRA-CH-DISTINGUISHES": "templates_org2_u67",
+    "SPECTRA-SAME-MASS-ASSUMED": "templates_org2_u67",
+    "ACYLSUB-IS-SN2": "templates_org2_u67",
+    "ACYLSUB-IS-SN1": "templates_org2_u67",
+    "DERIV-MASS-EXPLAINS-REACTIVITY": "templates_org2_u67",
+    "DERIV-STERICS-EXPLAIN-EVERYTHING": "templates_org2_u67",
+    "ESTER-GOES-TO-COMPLETION": "templates_org2_u67",
+    "ESTER-CATALYST-CONSUMED": "templates_org2_u67",
+    "AMIDE-CARBONYL-NOT-ELECTROPHILIC": "templates_org2_u67",
+    "REDUCTION-PRODUCT-CLASS-CONFUSED": "templates_org2_u67",
+    "OXIDATION-PRIMARY-TO-KETONE": "templates_org2",
+    "OXIDATION-SECONDARY-TO-ALDEHYDE": "templates_org2",
+    "OXIDATION-TERTIARY-REACTS": "templates_org2",
+    "TAUTOMER-KETO-ENOL-CONFUSED": "templates_org2",
+    "AMINE-CLASS-BY-SIZE": "templates_org2",
+    "AA-L-IS-ALWAYS-S": "templates_org2",
+}
@@ -15,6 +15,8 @@ hint_coverage() gates CI. A template with fewer than three rungs cannot ship.
 
 from __future__ import annotations
 
+from ._lazy import LazyTable
+
 HINTS: dict[str, tuple[str, str, str]] = {
     "structure.draw.v1": (
         "You are asked to draw a structure, so the answer is a picture of which "
@@ -115,11 +117,6 @@ HINTS: dict[str, tuple[str, str, str]] = {
         "With the amount constant, the quantity pressure times volume divided by temperature is the same before and after. Set the two states equal.",
         "Write the before state as P1V1 over T1, and stop.",
     ),
-    "thermo.calorimetry.v1": (
-        "You are asked how much heat a mass of water absorbed for a measured temperature rise.",
-        "The heat is the mass times the specific heat times the temperature change. Specific heat is what makes the units come out as energy.",
-        "Identify the three quantities you were given and their units, and stop before multiplying.",
-    ),
     "ph.strong_acid.v1": (
         "You are asked for the pH of a strong acid solution.",
         "A strong acid ionizes completely, so the hydronium concentration equals the acid concentration. pH is the negative base ten logarithm of that.",
@@ -252,3 +249,7 @@ HINTS.update(
         ),
     }
 )
+
+# Ladders authored in the templates_* modules arrive on first lookup, through
+# the manifest in _lazy.py, rather than by importing every module up front.
+HINTS: dict[str, tuple[str, str, str]] = LazyTable("hints", HINTS)
@@ -28,6 +28,8 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
+from ._lazy import LazyTable
+
 
 @dataclass(frozen=True)
 class Misconception:
@@ -917,3 +919,7 @@ MISCONCEPTIONS.update(
         ]
     }
 )
+
+# Codes authored in the templates_* modules arrive on first lookup, through the
+# manifest in _lazy.py, rather than by importing every module up front.
+MISCONCEPTIONS: dict[str, Misconception] = LazyTable("misconceptions", MISCONCEPTIONS)
@@ -23,6 +23,8 @@ from fractions import Fraction
 from typing import Callable
 
 from . import _fixtures as fx
+from ._lazy import LazyTable
+from ._lazy import template_ids_for_node as _manifest_ids_for_node
 from .balance import parse_equation, solve_coefficients, verify_balance_key
 from .equilibrium import EquilibriumProblem, solve_equilibrium, verify_equilibrium_key
 from .formula import empirical, parse_formula, verify_formula_key, verify_molar_mass
@@ -403,7 +405,10 @@ def _ver_mc(v: Variant) -> VerifierResult:
 # Registry
 # ---------------------------------------------------------------------------
 
-REGISTRY: dict[str, dict[str, object]] = {
+# The built-in templates above are live at import. Every templates_* module is
+# registered lazily through the manifest in _lazy.py: a lookup imports only the
+# module that owns the id, and iterating the registry imports them all.
+REGISTRY: dict[str, dict[str, object]] = LazyTable("templates", {
     "formula.molecular.v1": {
         "gen": _gen_formula_molecular,
         "ver": _ver_formula_molecular,
@@ -446,32 +451,8 @@ REGISTRY: dict[str, dict[str, object]] = {
         "node": "GEN1.BALANCE",
         "grader": "mc",
     },
-}
-
-
-# Phase 2 general chemistry templates. Imported at the bottom to avoid a
-# circular import, since templates_g builds Variant objects from this module.
-from .templates_g import PHASE2_TEMPLATES  # noqa: E402
-from .templates_s import PHASE3_TEMPLATES  # noqa: E402
-from .templates_o import ORG1_TEMPLATES  # noqa: E402
-from .templates_retro import RETRO_HINTS, RETRO_TEMPLATES  # noqa: E402
-
-REGISTRY.update(PHASE2_TEMPLATES)
-REGISTRY.update(PHASE3_TEMPLATES)
-REGISTRY.update(ORG1_TEMPLATES)
-REGISTRY.update(RETRO_TEMPLATES)
-from .templates_mech import MECH_LAB_HINTS, MECH_LAB_TEMPLATES  # noqa: E402
-
-REGISTRY.update(MECH_LAB_TEMPLATES)
-from .templates_org_chapters import (  # noqa: E402
-    ORG_CHAPTER_HINTS, ORG_CHAPTER_TEMPLATES,
-)
-
-REGISTRY.update(ORG_CHAPTER_TEMPLATES)
-from .hints import HINTS as _HINTS  # noqa: E402
-_HINTS.update(RETRO_HINTS)
-_HINTS.update(MECH_LAB_HINTS)
-_HINTS.update(ORG_CHAPTER_HINTS)
+})
+_BUILTIN_IDS = tuple(dict.keys(REGISTRY))
 
 
 def resolve_generated(template_id: str, seed: int, *, max_attempts: int = MAX_SEED_RETRIES) -> Variant:
@@ -506,6 +487,28 @@ def resolve_generated(template_id: str, seed: int, *, max_attempts: int = MAX_SE
     )
 
 
+def template_ids_for_node(node: str) -> list[str]:
+    """Template ids serving one node, in registry order, importing nothing.
+
+    The keys templates_for_node would return, read from the built-ins and the
+    manifest alone, for callers that only plan or count with the ids.
+    """
+    ids = [tid for tid in _BUILTIN_IDS if dict.__getitem__(REGISTRY, tid)["node"] == node]
+    ids += [tid for tid in _manifest_ids_for_node(node) if tid not in ids]
+    return ids
+
+
+def templates_for_node(node: str) -> dict[str, dict[str, object]]:
+    """Registry entries serving one node, in registry order.
+
+    Equivalent to scanning REGISTRY.items() for the node, but reads the
+    manifest first so only the template modules that serve the node are
+    imported. Callers that pick an item for one node should use this rather
+    than iterating the registry, which imports every module.
+    """
+    return {tid: REGISTRY[tid] for tid in template_ids_for_node(node)}
+
+
 def sweep(seeds_per_template: int = 12) -> dict[str, dict]:
     """Run every generator over a band of seeds and verify each key.
 
@@ -545,37 +548,3 @@ def sweep(seeds_per_template: int = 12) -> dict[str, dict]:
             "failures": failures,
         }
     return report
-
-# Phase 5b template modules land as separate files so parallel authors never
-# edit this file or hints.py concurrently. Each module exports TEMPLATES_*,
-# HINTS_*, and optionally MISCONCEPTIONS_*; a module that is not present yet
-# is simply not live yet.
-def _wire_optional_templates() -> None:
-    from .hints import HINTS
-    from .misconceptions import MISCONCEPTIONS
-
-    specs = [
-        ("templates_o_u12", "TEMPLATES_O_U12", "HINTS_O_U12", "MISCONCEPTIONS_O_U12"),
-        ("templates_o_u567", "TEMPLATES_O_U567", "HINTS_O_U567", "MISCONCEPTIONS_O_U567"),
-        ("templates_o_u89g", "TEMPLATES_O_U89G", "HINTS_O_U89G", "MISCONCEPTIONS_O_U89G"),
-        ("templates_g2", "TEMPLATES_G2", "HINTS_G2", "MISCONCEPTIONS_G2"),
-        ("templates_g1_u5", "TEMPLATES_G1_U5", "HINTS_G1_U5", "MISCONCEPTIONS_G1_U5"),
-        ("templates_g1_u6", "TEMPLATES_G1_U6", "HINTS_G1_U6", "MISCONCEPTIONS_G1_U6"),
-        ("templates_g1_u10", "TEMPLATES_G1_U10", "HINTS_G1_U10", "MISCONCEPTIONS_G1_U10"),
-        ("templates_g2_u8", "TEMPLATES_G2_U8", "HINTS_G2_U8", "MISCONCEPTIONS_G2_U8"),
-        ("templates_org2_u3", "TEMPLATES_ORG2_U3", "HINTS_ORG2_U3", "MISCONCEPTIONS_ORG2_U3"),
-        ("templates_org2_u5", "TEMPLATES_ORG2_U5", "HINTS_ORG2_U5", "MISCONCEPTIONS_ORG2_U5"),
-        ("templates_org2_u67", "TEMPLATES_ORG2_U67", "HINTS_ORG2_U67", "MISCONCEPTIONS_ORG2_U67"),
-        ("templates_org2", "ORG2_TEMPLATES", "ORG2_HINTS", "ORG2_MISCONCEPTIONS"),
-    ]
-    for module_name, templates_attr, hints_attr, misconceptions_attr in specs:
-        try:
-            module = __import__(f"chem_core.{module_name}", fromlist=[templates_attr])
-        except ImportError:
-            continue
-        REGISTRY.update(getattr(module, templates_attr))
-        HINTS.update(getattr(module, hints_attr, {}))
-        MISCONCEPTIONS.update(getattr(module, misconceptions_attr, {}))
-
-
-_wire_optional_templates()
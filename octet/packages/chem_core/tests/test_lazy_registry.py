@@ -0,0 +1,164 @@
+"""Lazy registration of the templates_* modules.
+
+Importing chem_core used to import every template module, which is most of the
+source in this package, before anything else could run. Every grading pool
+worker is spawned fresh, so every recycled worker paid for all of it. The
+registry now imports a template module on first use of a key it owns.
+
+Two things can go wrong and both would be silent. A manifest that has drifted
+from the modules hides a template from any caller that asks for it by id, and
+a lazy table that fills in a different order than the eager one changes which
+template a seed picks. So the manifest is diffed against a fresh build, and
+the fully loaded tables are compared against the order the manifest records.
+
+The import-state assertions run in a child interpreter. This process has long
+since loaded everything through the other test files.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import pathlib
+import subprocess
+import sys
+
+import pytest
+
+import chem_core as cc
+from chem_core import _lazy, _manifest
+
+SRC = pathlib.Path(cc.__file__).resolve().parents[1]
+
+
+def _child(code: str) -> dict:
+    env = dict(os.environ, PYTHONPATH=str(SRC))
+    out = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_the_checked_in_manifest_matches_the_modules():
+    built = _lazy.build_manifest()
+    assert built["templates"] == _manifest.TEMPLATES, (
+        "run scripts/gen_chem_core_manifest.py"
+    )
+    assert built["hints"] == _manifest.HINTS
+    assert built["misconceptions"] == _manifest.MISCONCEPTIONS
+
+
+def test_no_key_is_in_both_a_base_table_and_the_manifest():
+    # Eagerly the module's entry replaced the base one; lazily the base one
+    # would be served until the module happened to load.
+    for kind, table in _lazy._TABLES.items():
+        overlap = sorted(set(table._base) & set(_lazy._owners(kind)))
+        assert overlap == [], f"{kind} defined in the base table and a module: {overlap}"
+
+
+def test_importing_chem_core_imports_no_template_module():
+    state = _child(
+        "import json, sys\n"
+        "import chem_core as cc\n"
+        "mods = sorted(m for m in sys.modules if m.startswith('chem_core.templates'))\n"
+        "print(json.dumps({'mods': mods, 'n': len(cc.REGISTRY),\n"
+        "    'after_len': sorted(m for m in sys.modules if m.startswith('chem_core.templates')),\n"
+        "    'has': 'thermo.calorimetry.v1' in cc.REGISTRY,\n"
+        "    'after_in': sorted(m for m in sys.modules if m.startswith('chem_core.templates'))}))"
+    )
+    assert state["mods"] == []
+    # len comes from the manifest; membership imports just the owner.
+    assert state["n"] == len(set(_manifest.TEMPLATES) | set(cc.REGISTRY))
+    assert state["after_len"] == []
+    assert state["has"] is True
+    assert state["after_in"] == ["chem_core.templates_g1_u5"]
+
+
+def test_a_lookup_imports_only_the_owning_module():
+    state = _child(
+        "import json\n"
+        "import chem_core as cc\n"
+        "from chem_core import _lazy\n"
+        "v = cc.resolve_generated('thermo.calorimetry.v1', 0)\n"
+        "hint = cc.rung('thermo.calorimetry.v1', 1)\n"
+        "print(json.dumps({'loaded': _lazy.loaded_modules(), 'gen': cc.REGISTRY[v.template_id]['gen'].__module__,\n"
+        "    'hint': bool(hint)}))"
+    )
+    # The id is defined twice; the later module owns it, as it did eagerly.
+    assert state["loaded"] == ["templates_g1_u5"]
+    assert state["gen"] == "chem_core.templates_g1_u5"
+    assert state["hint"] is True
+
+
+def test_partial_loads_then_iteration_give_the_canonical_order():
+    state = _child(
+        "import json\n"
+        "import chem_core as cc\n"
+        "cc.REGISTRY['org2.aromatic.nmr.v1']\n"
+        "cc.MISCONCEPTIONS.get('HALFLIFE-NO-LN2')\n"
+        "cc.HINTS.get('thermo.calorimetry.v1')\n"
+        "print(json.dumps({'r': list(cc.REGISTRY), 'h': list(cc.HINTS), 'm': list(cc.MISCONCEPTIONS)}))"
+    )
+    assert state["r"] == list(cc.REGISTRY)
+    assert state["h"] == list(cc.HINTS)
+    assert state["m"] == list(cc.MISCONCEPTIONS)
+    assert [t for t in state["r"] if t in _manifest.TEMPLATES] == list(_manifest.TEMPLATES)
+
+
+def test_keys_of_a_module_that_fails_to_import_are_absent():
+    state = _child(
+        "import json, sys\n"
+        "sys.modules['chem_core.templates_g1_u5'] = None  # import now raises ImportError\n"
+        "import chem_core as cc\n"
+        "tid = 'thermo.calorimetry.v1'\n"
+        "try:\n"
+        "    cc.REGISTRY[tid]\n"
+        "    missed = False\n"
+        "except KeyError:\n"
+        "    missed = True\n"
+        "print(json.dumps({'in': tid in cc.REGISTRY, 'missed': missed,\n"
+        "    'get': cc.HINTS.get(tid), 'hint_in': tid in cc.HINTS, 'in_list': tid in list(cc.REGISTRY),\n"
+        "    'n': len(cc.REGISTRY), 'n_all': len(list(cc.REGISTRY))}))"
+    )
+    assert state["missed"] is True and state["in"] is False
+    assert state["get"] is None and state["hint_in"] is False
+    assert state["in_list"] is False
+    assert state["n"] == state["n_all"]
+
+
+def test_an_unknown_key_still_misses():
+    assert "no.such.template.v1" not in cc.REGISTRY
+    assert cc.HINTS.get("no.such.template.v1") is None
+    with pytest.raises(KeyError):
+        cc.REGISTRY["no.such.template.v1"]
+
+
+def test_templates_for_node_matches_a_full_scan():
+    for node in ("GEN1.CALORIMETRY", "GEN1.BALANCE", "ORG2.CONJUGATION"):
+        scanned = {t: e for t, e in cc.REGISTRY.items() if e["node"] == node}
+        assert cc.templates_for_node(node) == scanned
+        assert list(cc.templates_for_node(node)) == list(scanned)
+
+
+def test_templates_for_node_imports_only_that_unit():
+    state = _child(
+        "import json\n"
+        "import chem_core as cc\n"
+        "from chem_core import _lazy\n"
+        "ids = list(cc.templates_for_node('GEN1.CALORIMETRY'))\n"
+        "print(json.dumps({'ids': ids, 'loaded': _lazy.loaded_modules()}))"
+    )
+    assert "thermo.calorimetry.v1" in state["ids"]
+    assert state["loaded"] == ["templates_g1_u5"]
+
+
+def test_template_ids_for_node_imports_nothing():
+    state = _child(
+        "import json\n"
+        "import chem_core as cc\n"
+        "from chem_core import _lazy\n"
+        "ids = cc.template_ids_for_node('GEN1.CALORIMETRY')\n"
+        "print(json.dumps({'ids': ids, 'loaded': _lazy.loaded_modules()}))"
+    )
+    assert state["ids"] == list(cc.templates_for_node("GEN1.CALORIMETRY"))
+    assert state["loaded"] == []
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Import-time benchmark for chem_core.
+
+Grading pool workers are started with forkserver or spawn, so every fresh or
+recycled worker pays chem_core's import before it grades anything. Template
+modules are registered lazily (packages/chem_core/src/chem_core/_lazy.py);
+this measures what that buys, each scenario in a fresh interpreter:
+
+  import      import chem_core and nothing else
+  one         import, then resolve one template (imports its owning module)
+  all         import, then touch the whole registry (imports every module)
+
+The interpreter start-up cost is measured separately and subtracted, so the
+numbers are chem_core's own. Medians over --runs fresh processes.
+
+Run:  python3 scripts/bench_chem_core_import.py [--runs 15]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import pathlib
+import statistics
+import subprocess
+import sys
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+SRC = ROOT / "packages" / "chem_core" / "src"
+
+TIMER = (
+    "import time; _t = time.perf_counter()\n"
+    "{body}\n"
+    "print(time.perf_counter() - _t)"
+)
+
+SCENARIOS = {
+    "baseline": "pass",
+    "import": "import chem_core",
+    "one": "import chem_core as cc; cc.resolve_generated('thermo.calorimetry.v1', 0)",
+    "all": "import chem_core as cc; len(list(cc.REGISTRY.items()))",
+}
+
+
+def _time(body: str) -> float:
+    env = dict(os.environ, PYTHONPATH=str(SRC))
+    out = subprocess.run(
+        [sys.executable, "-c", TIMER.format(body=body)],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=15)
+    args = parser.parse_args()
+
+    medians = {
+        name: statistics.median(_time(body) for _ in range(args.runs))
+        for name, body in SCENARIOS.items()
+    }
+    base = medians.pop("baseline")
+    for name, seconds in medians.items():
+        print(f"{name:<8} {1000 * (seconds - base):8.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""Regenerate chem_core's lazy-registration manifest.
+
+chem_core registers its templates_* modules lazily: a checked-in manifest
+records which module owns each template id, hint ladder and misconception
+code, so importing chem_core imports none of them and a lookup imports only
+the owner. See packages/chem_core/src/chem_core/_lazy.py.
+
+Run this after adding or moving a template, hint or misconception. The drift
+test in packages/chem_core/tests/test_lazy_registry.py fails until you do.
+
+Run:  python3 scripts/gen_chem_core_manifest.py [--check]
+
+--check writes nothing and exits 1 when the checked-in manifest is stale.
+"""
+from __future__ import annotations
+
+import pathlib
+import sys
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+SRC = ROOT / "packages" / "chem_core" / "src"
+sys.path.insert(0, str(SRC))
+
+from chem_core import _lazy  # noqa: E402
+
+TARGET = SRC / "chem_core" / "_manifest.py"
+
+
+def main(argv: list[str]) -> int:
+    text = _lazy.render_manifest(_lazy.build_manifest())
+    current = TARGET.read_text() if TARGET.exists() else ""
+    if "--check" in argv:
+        if current != text:
+            print(f"{TARGET.relative_to(ROOT)} is stale; run scripts/gen_chem_core_manifest.py")
+            return 1
+        print("manifest current")
+        return 0
+    if current != text:
+        TARGET.write_text(text)
+        print(f"wrote {TARGET.relative_to(ROOT)}")
+    else:
+        print("manifest current")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
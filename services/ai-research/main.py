@@ -91,6 +91,12 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Error stopping event bus: {e}")
 
+    # Close pooled service-to-service connections
+    try:
+        await app.state.service_client.close()
+    except Exception as e:
+        logger.error(f"Error closing service client: {e}")
+
 
 app = FastAPI(
     title=settings.SERVICE_NAME,
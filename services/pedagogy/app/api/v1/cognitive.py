@@ -9,9 +9,10 @@ from typing import List, Dict, Optional
 from datetime import datetime
 import logging
 
-from app.models.dkt import DKTModel, encode_practice_sequence
+from app.models.dkt import DKTInference, DKTModel
 from app.models.irt import IRTModel
-from app.models.forgetting import SpacedRepetitionScheduler
+from app.models.forgetting import SchedulerStore
+from app.core.config import settings
 from app.core.compliance import compliance
 from app.core.ethics import ethics
 
@@ -21,9 +22,9 @@ router = APIRouter()
 
 # In-memory storage (replace with database in production)
 learner_states = {}
-dkt_model_cache = {}
+dkt_model_cache = {}  # num_concepts -> DKTInference
 irt_model = IRTModel(model_type="2PL")
-sr_scheduler = SpacedRepetitionScheduler()
+sr_store = SchedulerStore(settings.FORGETTING_SNAPSHOT_DIR or None)
 
 
 # Request/Response Models
@@ -69,6 +70,12 @@ class CognitiveUpdateResponse(BaseModel):
     recommendations: List[str]
 
 
+async def _due_reviews(learner_id: str) -> List[Dict]:
+    """Due review items; learners without a schedule have none"""
+    scheduler = await sr_store.get(learner_id)
+    return scheduler.get_due_items(limit=10) if scheduler else []
+
+
 @router.get("/state", response_model=CognitiveStateResponse)
 async def get_cognitive_state(
     learner_id: str,
@@ -98,7 +105,8 @@ async def get_cognitive_state(
             mastery_state={i: 0.5 for i in range(num_concepts)},  # Neutral prior
             ability_estimate=0.0,  # Average ability
             next_item_predictions={i: 0.5 for i in range(num_concepts)} if include_predictions else None,
-            spaced_repetition=[],
+            # Review schedules outlive the in-memory state when snapshotted
+            spaced_repetition=await _due_reviews(learner_id),
             last_updated=datetime.now(),
             total_practices=0
         )
@@ -106,7 +114,7 @@ async def get_cognitive_state(
     state = learner_states[learner_id]
 
     # Get spaced repetition due items
-    sr_due = sr_scheduler.get_due_items(limit=10)
+    sr_due = await _due_reviews(learner_id)
 
     response = CognitiveStateResponse(
         learner_id=learner_id,
@@ -166,25 +174,22 @@ async def update_cognitive_state(request: CognitiveUpdateRequest):
         for item in request.practice_sequence
     ]
 
-    # Update DKT model
-    encoded_sequence = encode_practice_sequence(practice_dicts, request.num_concepts)
-
     # Get or create DKT model for this curriculum
     if request.num_concepts not in dkt_model_cache:
-        dkt_model_cache[request.num_concepts] = DKTModel(
+        dkt_model_cache[request.num_concepts] = DKTInference(DKTModel(
             num_concepts=request.num_concepts,
             hidden_dim=128,
             num_layers=2
-        )
+        ))
 
-    dkt_model = dkt_model_cache[request.num_concepts]
+    dkt = dkt_model_cache[request.num_concepts]
 
-    # Predict mastery for each concept
-    import torch
-    with torch.no_grad():
-        inputs = torch.FloatTensor(encoded_sequence).unsqueeze(0)
-        outputs, _ = dkt_model(inputs)
-        mastery_probs = outputs[0, -1, :].numpy()
+    # Advance the learner's DKT state by the new items only; the stored
+    # history is replayed just when no cached state exists
+    try:
+        mastery_probs = dkt.observe(learner_id, practice_dicts, history=state['history'])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     new_mastery = {i: float(prob) for i, prob in enumerate(mastery_probs)}
 
@@ -192,6 +197,7 @@ async def update_cognitive_state(request: CognitiveUpdateRequest):
     new_ability = irt_model.estimate_ability(learner_id, practice_dicts, method="MAP")
 
     # Update spaced repetition for each practiced item
+    sr_scheduler = await sr_store.for_learner(learner_id)
     for item in request.practice_sequence:
         sr_scheduler.record_review(
             item_id=f"concept_{item.concept_id}",
@@ -42,6 +42,8 @@ class Settings(BaseSettings):
     FORGETTING_INITIAL_STRENGTH: float = 1.0
     FORGETTING_DECAY_RATE: float = 0.5
     FORGETTING_MIN_INTERVAL_DAYS: int = 1
+    FORGETTING_SNAPSHOT_DIR: str = ""  # Per-learner schedule snapshots; empty = memory only
+    FORGETTING_SNAPSHOT_INTERVAL_SECONDS: float = 30.0
 
     # Metacognition Coach
     METACOG_REFLECTION_PROMPTS: List[str] = [
@@ -11,8 +11,10 @@ References:
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
+from torch.nn.utils.rnn import pack_padded_sequence, pad_packed_sequence, pad_sequence
 import numpy as np
-from typing import Dict, List, Tuple, Optional
+from collections import OrderedDict
+from typing import Dict, List, Sequence, Tuple, Optional, Union
 import logging
 
 logger = logging.getLogger(__name__)
@@ -22,7 +24,9 @@ class DKTModel(nn.Module):
     """
     Deep Knowledge Tracing Model using GRU.
 
-    Input: Sequence of (concept_id, correct/incorrect) tuples
+    Input: Sequence of (concept_id, correct/incorrect) tuples, either
+           one-hot encoded (encode_practice_sequence) or as interaction
+           indices (encode_practice_indices)
     Output: Probability of correctness for next item in each concept
     """
 
@@ -69,27 +73,63 @@ class DKTModel(nn.Module):
         # Dropout
         self.dropout = nn.Dropout(dropout)
 
+    def embed(self, x: torch.Tensor) -> torch.Tensor:
+        """
+        Project inputs to the GRU input size.
+
+        An interaction index selects the input_embed column its one-hot
+        vector would multiply, so both input forms give the same result;
+        the index form never materialises the (seq_len, input_dim) one-hot.
+
+        Args:
+            x: Float tensor (..., input_dim) or integer tensor (...) of indices
+
+        Returns:
+            torch.Tensor: Embedded input of shape (..., hidden_dim)
+        """
+        if x.is_floating_point():
+            return self.input_embed(x)
+        return self.input_embed.weight.t()[x.long()] + self.input_embed.bias
+
     def forward(
         self,
         x: torch.Tensor,
-        hidden: Optional[torch.Tensor] = None
+        hidden: Optional[torch.Tensor] = None,
+        lengths: Optional[torch.Tensor] = None
     ) -> Tuple[torch.Tensor, torch.Tensor]:
         """
         Forward pass.
 
         Args:
-            x: Input tensor of shape (batch_size, seq_len, input_dim)
-            hidden: Initial hidden state
+            x: Input tensor of shape (batch_size, seq_len, input_dim), or
+               integer indices of shape (batch_size, seq_len)
+            hidden: Initial hidden state; pass the returned one back in to
+                    continue a sequence where the last call stopped
+            lengths: True lengths of right-padded sequences in the batch;
+                     the GRU then skips the padding and the returned hidden
+                     state is each sequence's state at its last real step
 
         Returns:
             tuple: (output probabilities, final hidden state)
         """
         # Embed input
-        embedded = self.input_embed(x)
+        embedded = self.embed(x)
         embedded = self.dropout(embedded)
 
         # GRU forward
-        gru_out, hidden = self.gru(embedded, hidden)
+        if lengths is None:
+            gru_out, hidden = self.gru(embedded, hidden)
+        else:
+            packed = pack_padded_sequence(
+                embedded,
+                torch.as_tensor(lengths, dtype=torch.int64).cpu(),
+                batch_first=True,
+                enforce_sorted=False
+            )
+            gru_out, hidden = self.gru(packed, hidden)
+            gru_out, _ = pad_packed_sequence(
+                gru_out, batch_first=True, total_length=embedded.size(1)
+            )
 
         # Output layer
         output = self.output(gru_out)
@@ -108,7 +148,7 @@ class DKTModel(nn.Module):
         Predict probability of correctness for next item in a specific concept.
 
         Args:
-            sequence: Practice sequence tensor
+            sequence: Practice sequence tensor (one-hot rows or indices)
             concept_id: Target concept ID
 
         Returns:
@@ -122,6 +162,84 @@ class DKTModel(nn.Module):
         return prob
 
 
+class DKTInference:
+    """
+    Incremental CPU inference for a DKT model.
+
+    Keeps each learner's last GRU hidden state and mastery vector, so new
+    responses advance the state by one GRU step each instead of rerunning
+    the whole history. Cached states belong to the current weights: call
+    reset() after training or reloading the model.
+    """
+
+    def __init__(self, model: DKTModel, max_learners: int = 10000):
+        """
+        Initialize inference cache.
+
+        Args:
+            model: DKT model instance (moved to CPU, put in eval mode)
+            max_learners: Learners kept before the least recently used is dropped
+        """
+        self.model = model.cpu().eval()
+        self.max_learners = max_learners
+        self._states: "OrderedDict[str, Tuple[torch.Tensor, np.ndarray]]" = OrderedDict()
+
+    def observe(
+        self,
+        learner_id: str,
+        sequence: List[Dict],
+        history: Optional[List[Dict]] = None
+    ) -> np.ndarray:
+        """
+        Advance a learner's state by new responses.
+
+        Args:
+            learner_id: Learner identifier
+            sequence: New {concept_id, is_correct} dicts, oldest first
+            history: Earlier responses, replayed only when the learner has
+                     no cached state (first call, eviction or restart)
+
+        Returns:
+            np.ndarray: Mastery probability per concept after the last response
+        """
+        state = self._states.pop(learner_id, None)
+        if state is None:
+            hidden = None
+            sequence = list(history or []) + list(sequence)
+        else:
+            hidden, mastery = state
+            if not sequence:
+                self._states[learner_id] = state
+                return mastery
+        if not sequence:
+            return np.full(self.model.num_concepts, 0.5, dtype=np.float32)
+
+        indices = encode_practice_indices(sequence, self.model.num_concepts)
+        with torch.no_grad():
+            output, hidden = self.model(torch.from_numpy(indices).unsqueeze(0), hidden)
+        mastery = output[0, -1].numpy()
+
+        self._states[learner_id] = (hidden, mastery)
+        while len(self._states) > self.max_learners:
+            self._states.popitem(last=False)
+        return mastery
+
+    def mastery(self, learner_id: str) -> Optional[np.ndarray]:
+        """Cached mastery vector for a learner, or None if not cached."""
+        state = self._states.get(learner_id)
+        if state is None:
+            return None
+        self._states.move_to_end(learner_id)
+        return state[1]
+
+    def reset(self, learner_id: Optional[str] = None) -> None:
+        """Drop one learner's cached state, or every learner's."""
+        if learner_id is None:
+            self._states.clear()
+        else:
+            self._states.pop(learner_id, None)
+
+
 class DKTTrainer:
     """
     Trainer for DKT model.
@@ -146,16 +264,55 @@ class DKTTrainer:
         self.optimizer = torch.optim.Adam(model.parameters(), lr=learning_rate)
         self.criterion = nn.BCELoss()
 
+    def _index_batch(
+        self,
+        sequences: Sequence[np.ndarray]
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Right-pad index sequences into a (batch, max_len) tensor plus lengths."""
+        lengths = torch.tensor([len(seq) for seq in sequences], dtype=torch.int64)
+        padded = pad_sequence(
+            [torch.as_tensor(seq, dtype=torch.int64) for seq in sequences],
+            batch_first=True
+        )
+        return padded.to(self.device), lengths
+
+    def _next_step(
+        self,
+        sequences: Sequence[np.ndarray]
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        DKT next-step objective for a batch of index sequences.
+
+        The output at step t is scored only on the concept answered at step
+        t + 1, against whether that answer was correct; padding is masked out.
+
+        Returns:
+            tuple: (predicted probabilities, labels), both 1-D
+        """
+        padded, lengths = self._index_batch(sequences)
+        outputs, _ = self.model(padded, lengths=lengths)
+
+        num_concepts = self.model.num_concepts
+        following = padded[:, 1:]
+        preds = outputs[:, :-1].gather(2, (following % num_concepts).unsqueeze(-1)).squeeze(-1)
+        labels = (following < num_concepts).float()
+        steps = torch.arange(1, padded.size(1), device=padded.device)
+        mask = steps.unsqueeze(0) < lengths.to(padded.device).unsqueeze(1)
+        return preds[mask], labels[mask]
+
     def train_epoch(
         self,
-        train_data: List[Tuple[np.ndarray, np.ndarray]],
+        train_data: List[Union[Tuple[np.ndarray, np.ndarray], np.ndarray]],
         batch_size: int = 32
     ) -> float:
         """
         Train for one epoch.
 
         Args:
-            train_data: List of (input_sequence, target_labels) tuples
+            train_data: List of (input_sequence, target_labels) tuples of
+                        equal length, or list of index sequences from
+                        encode_practice_indices of any lengths (padded and
+                        packed per batch, trained on the next-step objective)
             batch_size: Batch size
 
         Returns:
@@ -169,13 +326,18 @@ class DKTTrainer:
         for i in range(0, len(train_data), batch_size):
             batch = train_data[i:i + batch_size]
 
-            # Convert to tensors
-            inputs = torch.FloatTensor([x[0] for x in batch]).to(self.device)
-            targets = torch.FloatTensor([x[1] for x in batch]).to(self.device)
-
-            # Forward pass
             self.optimizer.zero_grad()
-            outputs, _ = self.model(inputs)
+            if isinstance(batch[0], tuple):
+                # Convert to tensors
+                inputs = torch.as_tensor(np.stack([x[0] for x in batch]), dtype=torch.float32).to(self.device)
+                targets = torch.as_tensor(np.stack([x[1] for x in batch]), dtype=torch.float32).to(self.device)
+
+                # Forward pass
+                outputs, _ = self.model(inputs)
+            else:
+                outputs, targets = self._next_step(batch)
+                if targets.numel() == 0:
+                    continue
 
             # Calculate loss
             loss = self.criterion(outputs, targets)
@@ -192,13 +354,16 @@ class DKTTrainer:
 
     def evaluate(
         self,
-        eval_data: List[Tuple[np.ndarray, np.ndarray]]
+        eval_data: List[Union[Tuple[np.ndarray, np.ndarray], np.ndarray]],
+        batch_size: int = 64
     ) -> Dict[str, float]:
         """
         Evaluate model on validation data.
 
         Args:
-            eval_data: List of (input_sequence, target_labels) tuples
+            eval_data: List of (input_sequence, target_labels) tuples, or
+                       list of index sequences (scored on the next step)
+            batch_size: Batch size for index sequences
 
         Returns:
             dict: Metrics including AUC, accuracy
@@ -208,15 +373,20 @@ class DKTTrainer:
         all_labels = []
 
         with torch.no_grad():
-            for inputs, labels in eval_data:
-                inputs_tensor = torch.FloatTensor(inputs).unsqueeze(0).to(self.device)
-                labels_tensor = torch.FloatTensor(labels).to(self.device)
+            if eval_data and not isinstance(eval_data[0], tuple):
+                for i in range(0, len(eval_data), batch_size):
+                    preds, labels = self._next_step(eval_data[i:i + batch_size])
+                    all_preds.extend(preds.cpu().numpy())
+                    all_labels.extend(labels.cpu().numpy())
+            else:
+                for inputs, labels in eval_data:
+                    inputs_tensor = torch.FloatTensor(inputs).unsqueeze(0).to(self.device)
 
-                outputs, _ = self.model(inputs_tensor)
-                preds = outputs[0].cpu().numpy()
+                    outputs, _ = self.model(inputs_tensor)
+                    preds = outputs[0].cpu().numpy()
 
-                all_preds.extend(preds.flatten())
-                all_labels.extend(labels.flatten())
+                    all_preds.extend(preds.flatten())
+                    all_labels.extend(labels.flatten())
 
         # Calculate metrics
         all_preds = np.array(all_preds)
@@ -235,41 +405,54 @@ class DKTTrainer:
         }
 
 
-def encode_practice_sequence(
+def encode_practice_indices(
     sequence: List[Dict],
     num_concepts: int
 ) -> np.ndarray:
     """
-    Encode practice sequence for DKT input.
+    Encode practice sequence as DKT interaction indices.
+
+    Index concept_id marks a correct answer and num_concepts + concept_id an
+    incorrect one: the position of the 1 in encode_practice_sequence's row.
 
     Args:
         sequence: List of {concept_id, is_correct} dicts
         num_concepts: Total number of concepts
 
     Returns:
-        np.ndarray: Encoded sequence of shape (seq_len, num_concepts * 2)
+        np.ndarray: int64 indices of shape (seq_len,)
     """
-    encoded = []
+    concepts = np.fromiter(
+        (item['concept_id'] for item in sequence), dtype=np.int64, count=len(sequence)
+    )
+    correct = np.fromiter(
+        (bool(item['is_correct']) for item in sequence), dtype=bool, count=len(sequence)
+    )
+    if concepts.size and (concepts.min() < 0 or concepts.max() >= num_concepts):
+        raise ValueError(f"concept_id must be in [0, {num_concepts})")
+    return concepts + np.where(correct, 0, num_concepts)
 
-    for item in sequence:
-        concept_id = item['concept_id']
-        is_correct = item['is_correct']
 
-        # One-hot encoding for concept_id
-        concept_onehot = np.zeros(num_concepts)
-        concept_onehot[concept_id] = 1.0
-
-        # Combine with correctness
-        if is_correct:
-            # Correct: concept in first half
-            input_vec = np.concatenate([concept_onehot, np.zeros(num_concepts)])
-        else:
-            # Incorrect: concept in second half
-            input_vec = np.concatenate([np.zeros(num_concepts), concept_onehot])
+def encode_practice_sequence(
+    sequence: List[Dict],
+    num_concepts: int
+) -> np.ndarray:
+    """
+    Encode practice sequence for DKT input.
 
-        encoded.append(input_vec)
+    Args:
+        sequence: List of {concept_id, is_correct} dicts
+        num_concepts: Total number of concepts
 
-    return np.array(encoded)
+    Returns:
+        np.ndarray: Encoded sequence of shape (seq_len, num_concepts * 2);
+                    correct answers set the concept in the first half,
+                    incorrect ones in the second
+    """
+    indices = encode_practice_indices(sequence, num_concepts)
+    encoded = np.zeros((len(indices), num_concepts * 2))
+    encoded[np.arange(len(indices)), indices] = 1.0
+    return encoded
 
 
 # Example usage
@@ -292,3 +475,13 @@ if __name__ == "__main__":
     inputs = torch.FloatTensor(encoded)
     prob = model.predict_next(inputs, concept_id=0)
     print(f"Probability of correctness for concept 0: {prob:.3f}")
+
+    # Same prediction from indices, then one more response incrementally
+    indices = encode_practice_indices(sequence, num_concepts)
+    prob = model.predict_next(torch.from_numpy(indices), concept_id=0)
+    print(f"Probability from indices: {prob:.3f}")
+
+    inference = DKTInference(model)
+    inference.observe("learner-1", sequence)
+    mastery = inference.observe("learner-1", [{'concept_id': 1, 'is_correct': True}])
+    print(f"Mastery of concept 1 after one more response: {mastery[1]:.3f}")
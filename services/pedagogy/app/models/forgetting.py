@@ -7,9 +7,15 @@ References:
 - Ebbinghaus (1885) "Memory: A Contribution to Experimental Psychology"
 - Wozniak & Gorzelanczyk (1994) "Optimization of repetition spacing in the practice of learning"
 """
+import asyncio
 import numpy as np
+import hashlib
+import heapq
+import json
+import os
+import uuid
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -156,9 +162,108 @@ class ForgettingCurveModel:
         return float(np.clip(urgency, 0.0, 1.0))
 
 
+class DueQueue:
+    """
+    Indexed binary min-heap of item ids keyed by next review date.
+
+    schedule() and remove() are O(log n); due() returns the k items due by
+    a given date in O(k) without visiting the rest of the deck.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[datetime, str]] = ()):
+        """
+        Initialize queue.
+
+        Args:
+            entries: (next_review, item_id) pairs, heapified in O(n)
+        """
+        self._heap: List[Tuple[datetime, str]] = list(entries)
+        self._pos: Dict[str, int] = {item_id: i for i, (_, item_id) in enumerate(self._heap)}
+        for i in reversed(range(len(self._heap) // 2)):
+            self._sift_down(i)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._pos
+
+    def _swap(self, i: int, j: int):
+        heap = self._heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self._pos[heap[i][1]] = i
+        self._pos[heap[j][1]] = j
+
+    def _sift_up(self, i: int) -> int:
+        heap = self._heap
+        while i > 0:
+            parent = (i - 1) // 2
+            if heap[i] >= heap[parent]:
+                break
+            self._swap(i, parent)
+            i = parent
+        return i
+
+    def _sift_down(self, i: int) -> int:
+        heap = self._heap
+        n = len(heap)
+        while True:
+            smallest = i
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < n and heap[child] < heap[smallest]:
+                    smallest = child
+            if smallest == i:
+                return i
+            self._swap(i, smallest)
+            i = smallest
+
+    def schedule(self, item_id: str, next_review: datetime):
+        """Insert an item or move it to a new review date."""
+        i = self._pos.get(item_id)
+        if i is None:
+            self._heap.append((next_review, item_id))
+            i = self._pos[item_id] = len(self._heap) - 1
+        else:
+            self._heap[i] = (next_review, item_id)
+        self._sift_down(self._sift_up(i))
+
+    def remove(self, item_id: str):
+        """Drop an item from the queue."""
+        i = self._pos.pop(item_id)
+        last = self._heap.pop()
+        if i < len(self._heap):
+            self._heap[i] = last
+            self._pos[last[1]] = i
+            self._sift_down(self._sift_up(i))
+
+    def peek(self) -> Optional[Tuple[datetime, str]]:
+        """Earliest (next_review, item_id), or None if empty."""
+        return self._heap[0] if self._heap else None
+
+    def due(self, current_date: datetime) -> List[str]:
+        """
+        Item ids with next_review <= current_date, in no particular order.
+
+        Walks the heap from the root and stops at every node not yet due,
+        since nothing below it can be due either.
+        """
+        heap = self._heap
+        due_ids = []
+        stack = [0] if heap else []
+        while stack:
+            i = stack.pop()
+            if i < len(heap) and heap[i][0] <= current_date:
+                due_ids.append(heap[i][1])
+                stack.extend((2 * i + 1, 2 * i + 2))
+        return due_ids
+
+
 class SpacedRepetitionScheduler:
     """
     Schedules reviews using spaced repetition and forgetting curve.
+
+    Holds one learner's items; a DueQueue keyed by next review date keeps
+    get_due_items proportional to the number of due items.
     """
 
     def __init__(
@@ -173,8 +278,13 @@ class SpacedRepetitionScheduler:
         """
         self.forgetting_model = forgetting_model or ForgettingCurveModel()
 
-        # Item states: {item_id: {'strength': float, 'last_review': datetime, 'review_count': int}}
+        # Item states: {item_id: {'strength': float, 'last_review': datetime,
+        #                         'review_count': int, 'next_review': datetime}}
         self.item_states: Dict[str, Dict] = {}
+        self.due_queue = DueQueue()
+
+        # Set by record_review, cleared once a snapshot is taken
+        self.dirty = False
 
     def record_review(
         self,
@@ -216,6 +326,11 @@ class SpacedRepetitionScheduler:
         state['strength'] = new_strength
         state['last_review'] = review_date
         state['review_count'] += 1
+        state['next_review'] = self.forgetting_model.next_review_date(review_date, new_strength)
+
+        # Reschedule: O(log n)
+        self.due_queue.schedule(item_id, state['next_review'])
+        self.dirty = True
 
         logger.info(f"Item {item_id}: strength {state['strength']:.2f}, reviews {state['review_count']}")
 
@@ -232,48 +347,211 @@ class SpacedRepetitionScheduler:
             limit: Maximum number of items to return
 
         Returns:
-            List[Dict]: Items sorted by urgency (most urgent first)
+            List[Dict]: Due items sorted by urgency (most urgent first)
         """
         if current_date is None:
             current_date = datetime.now()
 
         due_items = []
 
-        for item_id, state in self.item_states.items():
+        for item_id in self.due_queue.due(current_date):
+            state = self.item_states[item_id]
             urgency = self.forgetting_model.calculate_urgency(
                 state['last_review'],
                 state['strength'],
                 current_date
             )
 
-            # Calculate next review date
-            next_review = self.forgetting_model.next_review_date(
-                state['last_review'],
-                state['strength']
-            )
-
-            is_due = current_date >= next_review
-
             due_items.append({
                 'item_id': item_id,
                 'urgency': urgency,
-                'next_review': next_review,
-                'is_due': is_due,
+                'next_review': state['next_review'],
+                'is_due': True,
                 'strength': state['strength'],
                 'review_count': state['review_count']
             })
 
-        # Sort by urgency (descending)
-        due_items.sort(key=lambda x: x['urgency'], reverse=True)
+        # Most urgent first; ties by due date, then id, independent of heap layout
+        def order(x):
+            return -x['urgency'], x['next_review'], x['item_id']
 
         if limit:
-            due_items = due_items[:limit]
-
+            return heapq.nsmallest(limit, due_items, key=order)
+        due_items.sort(key=order)
         return due_items
 
     def get_item_state(self, item_id: str) -> Optional[Dict]:
-        """Get current state for an item"""
-        return self.item_states.get(item_id)
+        """Get current state for an item (a copy; use record_review to change it)"""
+        state = self.item_states.get(item_id)
+        return dict(state) if state is not None else None
+
+    def snapshot(self) -> Dict:
+        """
+        Serialisable copy of every item's state, for restore().
+
+        Returns:
+            dict: {'items': [[item_id, strength, last_review, review_count, next_review], ...]}
+        """
+        return {
+            'items': [
+                [
+                    item_id,
+                    state['strength'],
+                    state['last_review'].isoformat(),
+                    state['review_count'],
+                    state['next_review'].isoformat()
+                ]
+                for item_id, state in self.item_states.items()
+            ]
+        }
+
+    @classmethod
+    def restore(
+        cls,
+        snapshot: Dict,
+        forgetting_model: Optional[ForgettingCurveModel] = None
+    ) -> "SpacedRepetitionScheduler":
+        """
+        Rebuild a scheduler from snapshot() output in O(n), without replaying reviews.
+
+        Args:
+            snapshot: Output of snapshot()
+            forgetting_model: Forgetting curve model (default: create new)
+
+        Returns:
+            SpacedRepetitionScheduler: Scheduler with the same items and due dates
+        """
+        scheduler = cls(forgetting_model)
+        for item_id, strength, last_review, review_count, next_review in snapshot.get('items', []):
+            scheduler.item_states[item_id] = {
+                'strength': strength,
+                'last_review': datetime.fromisoformat(last_review),
+                'review_count': review_count,
+                'next_review': datetime.fromisoformat(next_review)
+            }
+        scheduler.due_queue = DueQueue(
+            (state['next_review'], item_id) for item_id, state in scheduler.item_states.items()
+        )
+        return scheduler
+
+
+class SchedulerStore:
+    """
+    One SpacedRepetitionScheduler per learner, snapshotted to local storage.
+
+    With a snapshot directory, a learner's scheduler is loaded from its
+    snapshot on first use, and flush() writes the schedulers changed since
+    the last flush, so schedules survive restarts without replaying reviews.
+    """
+
+    def __init__(
+        self,
+        snapshot_dir: Optional[str] = None,
+        forgetting_model: Optional[ForgettingCurveModel] = None
+    ):
+        """
+        Initialize store.
+
+        Args:
+            snapshot_dir: Directory for snapshots (None: memory only)
+            forgetting_model: Forgetting curve model shared by all learners
+        """
+        self.snapshot_dir = snapshot_dir
+        self.forgetting_model = forgetting_model or ForgettingCurveModel()
+        self._schedulers: Dict[str, SpacedRepetitionScheduler] = {}
+
+        if snapshot_dir:
+            os.makedirs(snapshot_dir, exist_ok=True)
+
+    def _snapshot_path(self, learner_id: str) -> str:
+        name = hashlib.sha256(learner_id.encode("utf-8")).hexdigest()
+        return os.path.join(self.snapshot_dir, f"{name}.json")
+
+    def _load(self, learner_id: str) -> Optional[SpacedRepetitionScheduler]:
+        """Read a learner's snapshot from disk, if there is a usable one."""
+        if not self.snapshot_dir:
+            return None
+        try:
+            with open(self._snapshot_path(learner_id)) as f:
+                return SpacedRepetitionScheduler.restore(json.load(f), self.forgetting_model)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable schedule snapshot for {learner_id}: {e}")
+            return None
+
+    async def get(self, learner_id: str) -> Optional[SpacedRepetitionScheduler]:
+        """
+        Get a learner's scheduler if they have one, loading its snapshot on first use.
+
+        Learners with neither a scheduler nor a snapshot get None, and
+        nothing is cached for them, so reads for unknown learner IDs do not
+        grow the store.
+        """
+        scheduler = self._schedulers.get(learner_id)
+        if scheduler is not None:
+            return scheduler
+
+        scheduler = await asyncio.to_thread(self._load, learner_id)
+        if scheduler is None:
+            return None
+        # Another request may have loaded or created it meanwhile
+        return self._schedulers.setdefault(learner_id, scheduler)
+
+    async def for_learner(self, learner_id: str) -> SpacedRepetitionScheduler:
+        """Get a learner's scheduler, creating one if they have none yet."""
+        scheduler = await self.get(learner_id)
+        if scheduler is None:
+            scheduler = self._schedulers.setdefault(
+                learner_id, SpacedRepetitionScheduler(self.forgetting_model)
+            )
+        return scheduler
+
+    def collect_dirty(self) -> Dict[str, str]:
+        """
+        Serialise the schedulers changed since the last call and mark them clean.
+
+        Cheap enough to run on the event loop; pass the result to write(),
+        which does the file I/O and can run in a worker thread.
+
+        Returns:
+            dict: {learner_id: snapshot JSON}
+        """
+        if not self.snapshot_dir:
+            return {}
+        snapshots = {}
+        for learner_id, scheduler in self._schedulers.items():
+            if scheduler.dirty:
+                data = scheduler.snapshot()
+                data['learner_id'] = learner_id
+                snapshots[learner_id] = json.dumps(data)
+                scheduler.dirty = False
+        return snapshots
+
+    def write(self, snapshots: Dict[str, str]):
+        """Write snapshots atomically (temporary file, then rename)."""
+        for learner_id, payload in snapshots.items():
+            path = self._snapshot_path(learner_id)
+            tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+            try:
+                with open(tmp, "w") as f:
+                    f.write(payload)
+                os.replace(tmp, path)
+            except OSError as e:
+                logger.error(f"Failed to write schedule snapshot for {learner_id}: {e}")
+                # Retry on the next flush
+                self._schedulers[learner_id].dirty = True
+
+    def flush(self) -> int:
+        """
+        Snapshot every changed scheduler.
+
+        Returns:
+            int: Number of snapshots written
+        """
+        snapshots = self.collect_dirty()
+        self.write(snapshots)
+        return len(snapshots)
 
 
 # Example usage
@@ -17,6 +17,8 @@ from scipy.special import expit  # Logistic sigmoid
 from typing import Dict, List, Optional, Tuple
 import logging
 
+from app.models.irt_calibration import JointCalibrator, ResponseMatrix
+
 logger = logging.getLogger(__name__)
 
 
@@ -150,108 +152,35 @@ class IRTModel:
         """
         Calibrate item parameters from response data.
 
+        All items are fitted jointly (see irt_calibration.JointCalibrator).
+        If every response carries the learner's 'theta', items are fitted at
+        those abilities; otherwise abilities are integrated out by EM and
+        the learners' EAP estimates are stored as their abilities.
+
         Args:
             response_data: List of {learner_id, item_id, is_correct, theta} dicts
 
         Returns:
             dict: Calibrated item parameters
         """
-        # Group responses by item
-        item_responses: Dict[int, List] = {}
-        for response in response_data:
-            item_id = response['item_id']
-            if item_id not in item_responses:
-                item_responses[item_id] = []
-            item_responses[item_id].append(response)
-
-        # Calibrate each item
-        for item_id, responses in item_responses.items():
-            if self.model_type == "1PL":
-                # Estimate difficulty only
-                params = self._calibrate_1pl(responses)
-            elif self.model_type == "2PL":
-                # Estimate difficulty and discrimination
-                params = self._calibrate_2pl(responses)
-            elif self.model_type == "3PL":
-                # Estimate difficulty, discrimination, and guessing
-                params = self._calibrate_3pl(responses)
-
-            self.item_params[item_id] = params
-
-        return self.item_params
-
-    def _calibrate_2pl(self, responses: List[Dict]) -> Dict[str, float]:
-        """Calibrate 2PL parameters"""
-
-        def neg_log_likelihood(params: np.ndarray) -> float:
-            a, b = params
-            nll = 0.0
-            for response in responses:
-                theta = response.get('theta', 0.0)
-                is_correct = response['is_correct']
-
-                prob = expit(a * (theta - b))
-                prob = np.clip(prob, 1e-10, 1 - 1e-10)
-
-                if is_correct:
-                    nll -= np.log(prob)
-                else:
-                    nll -= np.log(1 - prob)
-
-            return nll
-
-        # Optimize
-        result = minimize(
-            neg_log_likelihood,
-            x0=[1.0, 0.0],  # Initial: a=1, b=0
-            method='L-BFGS-B',
-            bounds=[(0.1, 3.0), (-3.0, 3.0)],  # Reasonable bounds
-            options={'disp': False}
-        )
-
-        a_est, b_est = result.x
-
-        return {'a': a_est, 'b': b_est, 'c': 0.0}
-
-    def _calibrate_1pl(self, responses: List[Dict]) -> Dict[str, float]:
-        """Calibrate 1PL (Rasch) parameters"""
-        # Fix a=1, estimate b only
-        params = self._calibrate_2pl(responses)
-        params['a'] = 1.0
-        return params
-
-    def _calibrate_3pl(self, responses: List[Dict]) -> Dict[str, float]:
-        """Calibrate 3PL parameters"""
-
-        def neg_log_likelihood(params: np.ndarray) -> float:
-            a, b, c = params
-            nll = 0.0
-            for response in responses:
-                theta = response.get('theta', 0.0)
-                is_correct = response['is_correct']
-
-                prob = c + (1 - c) * expit(a * (theta - b))
-                prob = np.clip(prob, 1e-10, 1 - 1e-10)
-
-                if is_correct:
-                    nll -= np.log(prob)
-                else:
-                    nll -= np.log(1 - prob)
-
-            return nll
-
-        # Optimize
-        result = minimize(
-            neg_log_likelihood,
-            x0=[1.0, 0.0, 0.2],  # Initial: a=1, b=0, c=0.2
-            method='L-BFGS-B',
-            bounds=[(0.1, 3.0), (-3.0, 3.0), (0.0, 0.35)],  # Guessing < 0.35
-            options={'disp': False}
-        )
+        if not response_data:
+            return self.item_params
+
+        responses = ResponseMatrix.from_records(response_data)
+        calibrator = JointCalibrator(self.model_type)
+
+        if all('theta' in response for response in response_data):
+            theta = np.array([response['theta'] for response in response_data], dtype=np.float64)
+            result = calibrator.fit(responses, theta=theta)
+        elif all('learner_id' in response for response in response_data):
+            result = calibrator.fit(responses)
+            self.learner_abilities.update(result.abilities())
+        else:
+            raise ValueError("Responses need 'theta', or 'learner_id' to estimate abilities by EM")
 
-        a_est, b_est, c_est = result.x
+        self.item_params.update(result.item_params())
 
-        return {'a': a_est, 'b': b_est, 'c': c_est}
+        return self.item_params
 
     def get_ability(self, learner_id: str) -> float:
         """Get estimated ability for a learner"""
@@ -0,0 +1,356 @@
+"""
+EUREKA Pedagogical Intelligence Layer - Joint IRT Item Calibration
+
+Fits every item of a bank in one optimisation over a sparse
+person-by-item response matrix, instead of one scipy fit per item.
+
+- Known abilities: joint maximum likelihood over all responses.
+- Unknown abilities: marginal maximum likelihood by EM over a fixed
+  ability quadrature (Bock & Aitkin), with an N(0, 1) ability prior.
+
+Likelihoods and gradients are vectorised NumPy; each M-step is a single
+L-BFGS-B run over all item parameters with analytic gradients. Parameter
+bounds match the per-item fits this replaces.
+
+References:
+- Bock & Aitkin (1981) "Marginal maximum likelihood estimation of item
+  parameters: Application of an EM algorithm"
+- Baker & Kim (2004) "Item Response Theory: Parameter Estimation Techniques"
+"""
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, List, Optional, Tuple
+import logging
+
+import numpy as np
+from scipy import sparse
+from scipy.optimize import Bounds, minimize
+from scipy.special import expit, logsumexp
+
+logger = logging.getLogger(__name__)
+
+_EPS = 1e-10
+
+# (low, high) per parameter
+A_BOUNDS = (0.1, 3.0)
+B_BOUNDS = (-3.0, 3.0)
+C_BOUNDS = (0.0, 0.35)
+
+
+@dataclass
+class ResponseMatrix:
+    """
+    Sparse person-by-item responses in coordinate form.
+
+    Row r of the arrays is one response: person_index[r] answered
+    item_index[r], correctly if correct[r] is 1.
+    """
+    person_index: np.ndarray
+    item_index: np.ndarray
+    correct: np.ndarray
+    person_ids: List[Hashable] = field(default_factory=list)
+    item_ids: List[Hashable] = field(default_factory=list)
+
+    @classmethod
+    def from_records(cls, records: List[Dict]) -> "ResponseMatrix":
+        """
+        Build from {learner_id, item_id, is_correct} dicts.
+
+        Args:
+            records: Response dicts, as passed to IRTModel.calibrate_items
+
+        Returns:
+            ResponseMatrix: Persons and items numbered in first-seen order
+        """
+        person_ids: Dict[Hashable, int] = {}
+        item_ids: Dict[Hashable, int] = {}
+        n = len(records)
+        person_index = np.empty(n, dtype=np.int64)
+        item_index = np.empty(n, dtype=np.int64)
+        correct = np.empty(n, dtype=np.float64)
+        for r, record in enumerate(records):
+            person_index[r] = person_ids.setdefault(record.get('learner_id', r), len(person_ids))
+            item_index[r] = item_ids.setdefault(record['item_id'], len(item_ids))
+            correct[r] = 1.0 if record['is_correct'] else 0.0
+        return cls(person_index, item_index, correct, list(person_ids), list(item_ids))
+
+    @property
+    def n_persons(self) -> int:
+        return len(self.person_ids) if self.person_ids else int(self.person_index.max(initial=-1)) + 1
+
+    @property
+    def n_items(self) -> int:
+        return len(self.item_ids) if self.item_ids else int(self.item_index.max(initial=-1)) + 1
+
+    def matrices(self) -> Tuple[sparse.csr_matrix, sparse.csr_matrix]:
+        """(correct, incorrect) indicator matrices, persons by items."""
+        shape = (self.n_persons, self.n_items)
+        right = sparse.csr_matrix(
+            (self.correct, (self.person_index, self.item_index)), shape=shape
+        )
+        wrong = sparse.csr_matrix(
+            (1.0 - self.correct, (self.person_index, self.item_index)), shape=shape
+        )
+        return right, wrong
+
+
+@dataclass
+class CalibrationResult:
+    """Fitted item parameters (and EAP abilities when fitted by EM)."""
+    a: np.ndarray
+    b: np.ndarray
+    c: np.ndarray
+    item_ids: List[Hashable]
+    person_ids: List[Hashable]
+    theta: Optional[np.ndarray] = None
+    log_likelihood: float = 0.0
+    iterations: int = 0
+    converged: bool = True
+
+    def item_params(self) -> Dict[Hashable, Dict[str, float]]:
+        """Parameters in IRTModel.item_params form."""
+        return {
+            item_id: {'a': float(self.a[i]), 'b': float(self.b[i]), 'c': float(self.c[i])}
+            for i, item_id in enumerate(self.item_ids)
+        }
+
+    def abilities(self) -> Dict[Hashable, float]:
+        """EAP abilities by learner id (empty for known-ability fits)."""
+        if self.theta is None:
+            return {}
+        return {pid: float(t) for pid, t in zip(self.person_ids, self.theta)}
+
+
+class JointCalibrator:
+    """
+    Calibrates all items of a 1PL, 2PL or 3PL bank together.
+    """
+
+    def __init__(
+        self,
+        model_type: str = "2PL",
+        quadrature_points: int = 41,
+        max_em_iter: int = 200,
+        tol: float = 1e-8,
+        m_step_iter: int = 25,
+        guessing_prior: Optional[Tuple[float, float]] = (5.0, 17.0)
+    ):
+        """
+        Initialize calibrator.
+
+        Args:
+            model_type: "1PL", "2PL", or "3PL"
+            quadrature_points: Ability nodes on [-4, 4] for EM
+            max_em_iter: EM cycle limit
+            tol: Stop EM when the marginal log-likelihood improves by less
+                 than this fraction
+            m_step_iter: L-BFGS-B iterations per M-step
+            guessing_prior: Beta(alpha, beta) prior on 3PL guessing, which
+                            is poorly identified by the data alone; None
+                            for plain maximum likelihood
+        """
+        if model_type not in ["1PL", "2PL", "3PL"]:
+            raise ValueError(f"Invalid model type: {model_type}. Must be 1PL, 2PL, or 3PL")
+
+        self.model_type = model_type
+        self.nodes = np.linspace(-4.0, 4.0, quadrature_points)
+        log_w = -0.5 * self.nodes ** 2
+        self.log_weights = log_w - logsumexp(log_w)
+        self.max_em_iter = max_em_iter
+        self.tol = tol
+        self.m_step_iter = m_step_iter
+        self.guessing_prior = guessing_prior
+
+    # Parameter vector layout: 1PL [b], 2PL [a, b], 3PL [a, b, c]
+
+    def _unpack(self, params: np.ndarray, n_items: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if self.model_type == "1PL":
+            return np.ones(n_items), params, np.zeros(n_items)
+        a, b = params[:n_items], params[n_items:2 * n_items]
+        c = params[2 * n_items:] if self.model_type == "3PL" else np.zeros(n_items)
+        return a, b, c
+
+    def _pack(self, a: np.ndarray, b: np.ndarray, c: np.ndarray) -> np.ndarray:
+        if self.model_type == "1PL":
+            return b.copy()
+        if self.model_type == "2PL":
+            return np.concatenate([a, b])
+        return np.concatenate([a, b, c])
+
+    def _bounds(self, n_items: int) -> Bounds:
+        per_param = {"1PL": [B_BOUNDS], "2PL": [A_BOUNDS, B_BOUNDS],
+                     "3PL": [A_BOUNDS, B_BOUNDS, C_BOUNDS]}[self.model_type]
+        lower = np.repeat([lo for lo, _ in per_param], n_items)
+        upper = np.repeat([hi for _, hi in per_param], n_items)
+        return Bounds(lower, upper)
+
+    def probabilities(self, a: np.ndarray, b: np.ndarray, c: np.ndarray, theta: np.ndarray) -> np.ndarray:
+        """P(correct) for every item (rows) at every ability (columns)."""
+        s = expit(a[:, None] * (theta[None, :] - b[:, None]))
+        return c[:, None] + (1.0 - c[:, None]) * s
+
+    def neg_log_likelihood(
+        self,
+        params: np.ndarray,
+        item: np.ndarray,
+        x: np.ndarray,
+        r: np.ndarray,
+        n: np.ndarray,
+        n_items: int
+    ) -> Tuple[float, np.ndarray]:
+        """
+        Negative log-likelihood of weighted (item, ability) cells and its gradient.
+
+        Cell k contributes r[k] correct and n[k] - r[k] incorrect answers to
+        item[k] at ability x[k]: single responses for known abilities,
+        expected counts at quadrature nodes in EM.
+
+        Includes the guessing prior for 3PL.
+
+        Returns:
+            tuple: (value, gradient with respect to params)
+        """
+        a, b, c = self._unpack(params, n_items)
+        ai, bi, ci = a[item], b[item], c[item]
+        s = expit(ai * (x - bi))
+        p = np.clip(ci + (1.0 - ci) * s, _EPS, 1.0 - _EPS)
+        ll = r * np.log(p) + (n - r) * np.log1p(-p)
+
+        if self.model_type == "3PL":
+            dl_dp = (r - n * p) / (p * (1.0 - p))
+            dl_dz = dl_dp * (1.0 - ci) * s * (1.0 - s)
+        else:
+            dl_dz = r - n * s
+
+        value = float(ll.sum())
+        grads = []
+        if self.model_type != "1PL":
+            grads.append(np.bincount(item, weights=dl_dz * (x - bi), minlength=n_items))
+        grads.append(np.bincount(item, weights=-ai * dl_dz, minlength=n_items))
+        if self.model_type == "3PL":
+            grad_c = np.bincount(item, weights=dl_dp * (1.0 - s), minlength=n_items)
+            if self.guessing_prior is not None:
+                alpha, beta = self.guessing_prior
+                cc = np.clip(c, _EPS, 1.0 - _EPS)
+                value += float(((alpha - 1.0) * np.log(cc) + (beta - 1.0) * np.log1p(-cc)).sum())
+                grad_c = grad_c + (alpha - 1.0) / cc - (beta - 1.0) / (1.0 - cc)
+            grads.append(grad_c)
+
+        return -value, -np.concatenate(grads)
+
+    def _m_step(
+        self,
+        params: np.ndarray,
+        item: np.ndarray,
+        x: np.ndarray,
+        r: np.ndarray,
+        n: np.ndarray,
+        n_items: int,
+        maxiter: int
+    ) -> np.ndarray:
+        result = minimize(
+            self.neg_log_likelihood,
+            x0=params,
+            args=(item, x, r, n, n_items),
+            jac=True,
+            method='L-BFGS-B',
+            bounds=self._bounds(n_items),
+            options={'maxiter': maxiter, 'ftol': 1e-12}
+        )
+        return result.x
+
+    def _initial_params(self, responses: ResponseMatrix) -> np.ndarray:
+        """a = 1, b from each item's proportion correct, c = 0.2 (3PL)."""
+        n_items = responses.n_items
+        answered = np.bincount(responses.item_index, minlength=n_items)
+        right = np.bincount(responses.item_index, weights=responses.correct, minlength=n_items)
+        p = np.clip((right + 0.5) / (answered + 1.0), 0.05, 0.95)
+        b = np.clip(-np.log(p / (1.0 - p)), *B_BOUNDS)
+        c = np.full(n_items, 0.2)
+        return self._pack(np.ones(n_items), b, c)
+
+    def fit(
+        self,
+        responses: ResponseMatrix,
+        theta: Optional[np.ndarray] = None
+    ) -> CalibrationResult:
+        """
+        Calibrate all items.
+
+        Args:
+            responses: Sparse responses
+            theta: Known ability per response (aligned with responses'
+                   rows); omit to integrate abilities out by EM
+
+        Returns:
+            CalibrationResult: Item parameters, plus EAP abilities for EM fits
+        """
+        if theta is not None:
+            return self._fit_known_theta(responses, np.asarray(theta, dtype=np.float64))
+        return self._fit_em(responses)
+
+    def _fit_known_theta(self, responses: ResponseMatrix, theta: np.ndarray) -> CalibrationResult:
+        n_items = responses.n_items
+        ones = np.ones_like(responses.correct)
+        params = self._m_step(
+            self._initial_params(responses), responses.item_index, theta,
+            responses.correct, ones, n_items, maxiter=15000
+        )
+        value, _ = self.neg_log_likelihood(
+            params, responses.item_index, theta, responses.correct, ones, n_items
+        )
+        a, b, c = self._unpack(params, n_items)
+        return CalibrationResult(
+            a=a, b=b, c=c,
+            item_ids=responses.item_ids or list(range(n_items)),
+            person_ids=responses.person_ids,
+            log_likelihood=-value,
+            iterations=1
+        )
+
+    def _fit_em(self, responses: ResponseMatrix) -> CalibrationResult:
+        n_items = responses.n_items
+        right, wrong = responses.matrices()
+        answered = right + wrong
+        right_t, answered_t = right.T.tocsr(), answered.T.tocsr()
+
+        q = len(self.nodes)
+        cell_item = np.repeat(np.arange(n_items), q)
+        cell_x = np.tile(self.nodes, n_items)
+
+        params = self._initial_params(responses)
+        previous = -np.inf
+        converged = False
+        for iteration in range(1, self.max_em_iter + 1):
+            # E-step: posterior over nodes for every person
+            a, b, c = self._unpack(params, n_items)
+            p = np.clip(self.probabilities(a, b, c, self.nodes), _EPS, 1.0 - _EPS)
+            log_joint = right @ np.log(p) + wrong @ np.log1p(-p) + self.log_weights
+            log_marginal = logsumexp(log_joint, axis=1)
+            posterior = np.exp(log_joint - log_marginal[:, None])
+            log_likelihood = float(log_marginal.sum())
+
+            if abs(log_likelihood - previous) <= self.tol * abs(log_likelihood):
+                converged = True
+                break
+            previous = log_likelihood
+
+            # Expected correct / total answers per item at each node
+            r = np.asarray(right_t @ posterior).ravel()
+            n = np.asarray(answered_t @ posterior).ravel()
+
+            # M-step: all items at once
+            params = self._m_step(params, cell_item, cell_x, r, n, n_items, self.m_step_iter)
+
+        if not converged:
+            logger.warning(f"IRT EM stopped after {self.max_em_iter} cycles without converging")
+
+        a, b, c = self._unpack(params, n_items)
+        return CalibrationResult(
+            a=a, b=b, c=c,
+            item_ids=responses.item_ids or list(range(n_items)),
+            person_ids=responses.person_ids,
+            theta=posterior @ self.nodes,
+            log_likelihood=log_likelihood,
+            iterations=iteration,
+            converged=converged
+        )
@@ -71,6 +71,12 @@ async def lifespan(app: FastAPI):
     # Initialize ML models here if needed
     # model_manager.initialize()
 
+    # Periodically snapshot spaced-repetition schedules
+    app.state.snapshot_task = None
+    if settings.FORGETTING_SNAPSHOT_DIR:
+        app.state.snapshot_task = asyncio.create_task(snapshot_schedules())
+        logger.info(f"✅ Schedule snapshots in {settings.FORGETTING_SNAPSHOT_DIR}")
+
     yield
 
     # Cleanup
@@ -81,12 +87,39 @@ async def lifespan(app: FastAPI):
         for task in app.state.event_tasks:
             task.cancel()
 
+    # Final schedule snapshot
+    if app.state.snapshot_task:
+        app.state.snapshot_task.cancel()
+        try:
+            written = cognitive.sr_store.flush()
+            logger.info(f"Snapshotted {written} learner schedules")
+        except Exception as e:
+            logger.error(f"Error snapshotting schedules: {e}")
+
     # Stop event bus
     try:
         await event_bus.stop()
     except Exception as e:
         logger.error(f"Error stopping event bus: {e}")
 
+    # Close pooled service-to-service connections
+    try:
+        await app.state.service_client.close()
+    except Exception as e:
+        logger.error(f"Error closing service client: {e}")
+
+
+async def snapshot_schedules():
+    """Write changed learner schedules every FORGETTING_SNAPSHOT_INTERVAL_SECONDS"""
+    while True:
+        await asyncio.sleep(settings.FORGETTING_SNAPSHOT_INTERVAL_SECONDS)
+        try:
+            snapshots = cognitive.sr_store.collect_dirty()
+            if snapshots:
+                await asyncio.to_thread(cognitive.sr_store.write, snapshots)
+        except Exception as e:
+            logger.error(f"Error snapshotting schedules: {e}")
+
 
 # Create FastAPI app
 app = FastAPI(
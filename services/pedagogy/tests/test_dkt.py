@@ -4,7 +4,9 @@ Unit tests for Deep Knowledge Tracing (DKT) model
 import pytest
 import torch
 import numpy as np
-from app.models.dkt import DKTModel, DKTTrainer, encode_practice_sequence
+from app.models.dkt import (
+    DKTInference, DKTModel, DKTTrainer, encode_practice_indices, encode_practice_sequence,
+)
 
 
 class TestDKTModel:
@@ -220,3 +222,130 @@ class TestDKTIntegration:
         # All outputs valid probabilities
         assert torch.all(output >= 0)
         assert torch.all(output <= 1)
+
+
+class TestSparseInput:
+    """Test index-based input and padded batches"""
+
+    def _sequence(self, length, num_concepts, seed=0):
+        rng = np.random.default_rng(seed)
+        return [
+            {'concept_id': int(c), 'is_correct': bool(r)}
+            for c, r in zip(rng.integers(0, num_concepts, length), rng.integers(0, 2, length))
+        ]
+
+    def test_indices_match_one_hot(self):
+        """Test each index is the position of the 1 in the one-hot row"""
+        num_concepts = 7
+        sequence = self._sequence(12, num_concepts)
+
+        indices = encode_practice_indices(sequence, num_concepts)
+        encoded = encode_practice_sequence(sequence, num_concepts)
+
+        assert indices.dtype == np.int64
+        assert np.array_equal(indices, encoded.argmax(axis=1))
+
+    def test_out_of_range_concept_rejected(self):
+        """Test concept ids outside the curriculum raise ValueError"""
+        with pytest.raises(ValueError):
+            encode_practice_indices([{'concept_id': 5, 'is_correct': True}], 5)
+        with pytest.raises(ValueError):
+            encode_practice_indices([{'concept_id': -1, 'is_correct': True}], 5)
+
+    def test_index_forward_matches_dense(self):
+        """Test index input gives the same outputs as one-hot input"""
+        num_concepts = 9
+        model = DKTModel(num_concepts=num_concepts, hidden_dim=16).eval()
+        sequence = self._sequence(6, num_concepts)
+
+        dense = torch.FloatTensor(encode_practice_sequence(sequence, num_concepts)).unsqueeze(0)
+        sparse = torch.from_numpy(encode_practice_indices(sequence, num_concepts)).unsqueeze(0)
+
+        with torch.no_grad():
+            dense_out, dense_hidden = model(dense)
+            sparse_out, sparse_hidden = model(sparse)
+
+        assert torch.allclose(dense_out, sparse_out, atol=1e-6)
+        assert torch.allclose(dense_hidden, sparse_hidden, atol=1e-6)
+
+    def test_packed_batch_matches_single_sequences(self):
+        """Test padding does not leak into outputs or final hidden states"""
+        num_concepts = 9
+        model = DKTModel(num_concepts=num_concepts, hidden_dim=16).eval()
+        sequences = [
+            torch.from_numpy(encode_practice_indices(self._sequence(n, num_concepts, seed=n), num_concepts))
+            for n in (5, 2, 8)
+        ]
+        lengths = torch.tensor([len(seq) for seq in sequences])
+        padded = torch.nn.utils.rnn.pad_sequence(sequences, batch_first=True)
+
+        with torch.no_grad():
+            batch_out, batch_hidden = model(padded, lengths=lengths)
+            for row, seq in enumerate(sequences):
+                out, hidden = model(seq.unsqueeze(0))
+                assert torch.allclose(batch_out[row, :len(seq)], out[0], atol=1e-5)
+                assert torch.allclose(batch_hidden[:, row], hidden[:, 0], atol=1e-5)
+
+    def test_train_and_evaluate_on_indices(self):
+        """Test trainer accepts variable-length index sequences"""
+        num_concepts = 10
+        trainer = DKTTrainer(DKTModel(num_concepts=num_concepts, hidden_dim=32, num_layers=1))
+        data = [
+            encode_practice_indices(self._sequence(n, num_concepts, seed=n), num_concepts)
+            for n in (3, 9, 1, 6, 4, 12)
+        ]
+
+        loss = trainer.train_epoch(data, batch_size=4)
+        metrics = trainer.evaluate(data, batch_size=4)
+
+        assert isinstance(loss, float) and loss > 0
+        assert metrics['num_samples'] == sum(len(seq) - 1 for seq in data)
+
+
+class TestDKTInference:
+    """Test cached, incremental inference"""
+
+    def _sequence(self, length, num_concepts, seed=0):
+        rng = np.random.default_rng(seed)
+        return [
+            {'concept_id': int(c), 'is_correct': bool(r)}
+            for c, r in zip(rng.integers(0, num_concepts, length), rng.integers(0, 2, length))
+        ]
+
+    def test_incremental_matches_full_history(self):
+        """Test advancing one response at a time equals a full rerun"""
+        num_concepts = 8
+        model = DKTModel(num_concepts=num_concepts, hidden_dim=16)
+        inference = DKTInference(model)
+        history = self._sequence(10, num_concepts)
+
+        inference.observe('learner', history[:4])
+        for item in history[4:]:
+            mastery = inference.observe('learner', [item])
+
+        with torch.no_grad():
+            full, _ = model(torch.from_numpy(encode_practice_indices(history, num_concepts)).unsqueeze(0))
+
+        assert np.allclose(mastery, full[0, -1].numpy(), atol=1e-5)
+        assert np.array_equal(inference.mastery('learner'), mastery)
+
+    def test_history_replayed_when_not_cached(self):
+        """Test an evicted learner's state is rebuilt from history"""
+        num_concepts = 8
+        inference = DKTInference(DKTModel(num_concepts=num_concepts, hidden_dim=16), max_learners=1)
+        history = self._sequence(6, num_concepts)
+
+        expected = inference.observe('a', history[:3])
+        expected = inference.observe('a', history[3:])
+        inference.observe('b', history[:2])
+
+        assert inference.mastery('a') is None
+        rebuilt = inference.observe('a', history[3:], history=history[:3])
+        assert np.allclose(rebuilt, expected, atol=1e-5)
+
+    def test_reset(self):
+        """Test reset drops cached states"""
+        inference = DKTInference(DKTModel(num_concepts=4, hidden_dim=8))
+        inference.observe('a', [{'concept_id': 1, 'is_correct': True}])
+        inference.reset()
+        assert inference.mastery('a') is None
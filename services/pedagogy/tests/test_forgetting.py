@@ -4,7 +4,9 @@ Unit tests for Forgetting Curve and Spaced Repetition
 import pytest
 import numpy as np
 from datetime import datetime, timedelta
-from app.models.forgetting import ForgettingCurveModel, SpacedRepetitionScheduler
+from app.models.forgetting import (
+    DueQueue, ForgettingCurveModel, SchedulerStore, SpacedRepetitionScheduler,
+)
 
 
 class TestForgettingCurveModel:
@@ -316,3 +318,105 @@ class TestSpacedRepetitionIntegration:
 
         # Easy item should have higher strength (longer interval)
         assert easy_state['strength'] > hard_state['strength']
+
+
+class TestDueQueue:
+    """Test indexed due-date heap"""
+
+    def test_matches_brute_force(self):
+        """Test random schedule/remove sequences against a plain dict"""
+        rng = np.random.default_rng(0)
+        start = datetime(2025, 1, 1)
+        queue = DueQueue()
+        expected = {}
+
+        for step in range(2000):
+            item_id = f"item_{rng.integers(0, 200)}"
+            if item_id in expected and rng.random() < 0.2:
+                queue.remove(item_id)
+                del expected[item_id]
+            else:
+                due = start + timedelta(hours=int(rng.integers(0, 24 * 60)))
+                queue.schedule(item_id, due)
+                expected[item_id] = due
+
+            if step % 100 == 0:
+                now = start + timedelta(days=int(rng.integers(0, 60)))
+                assert sorted(queue.due(now)) == sorted(k for k, v in expected.items() if v <= now)
+                assert queue.peek()[0] == min(expected.values())
+
+        assert len(queue) == len(expected)
+
+    def test_heapify_entries(self):
+        """Test building from entries keeps heap order"""
+        start = datetime(2025, 1, 1)
+        queue = DueQueue((start + timedelta(days=d), f"item_{d}") for d in [5, 3, 9, 1, 7])
+
+        assert queue.peek() == (start + timedelta(days=1), "item_1")
+        assert sorted(queue.due(start + timedelta(days=5))) == ["item_1", "item_3", "item_5"]
+
+
+class TestSchedulerSnapshots:
+    """Test due-only retrieval and snapshot/restore"""
+
+    def test_get_due_items_only_due(self):
+        """Test items not yet due are not returned"""
+        scheduler = SpacedRepetitionScheduler()
+        now = datetime(2025, 1, 10)
+        scheduler.record_review("old", True, review_date=now - timedelta(days=10))
+        scheduler.record_review("fresh", True, review_date=now)
+
+        due_items = scheduler.get_due_items(current_date=now)
+
+        assert [item['item_id'] for item in due_items] == ["old"]
+        assert due_items[0]['is_due']
+
+    def test_get_item_state_is_copy(self):
+        """Test mutating a returned state does not desync the schedule"""
+        scheduler = SpacedRepetitionScheduler()
+        scheduler.record_review("item", True)
+
+        scheduler.get_item_state("item")['strength'] = 100.0
+
+        assert scheduler.get_item_state("item")['strength'] != 100.0
+
+    @pytest.mark.asyncio
+    async def test_store_round_trip(self, tmp_path):
+        """Test schedules survive a restart without replaying reviews"""
+        now = datetime(2025, 1, 10)
+        store = SchedulerStore(str(tmp_path))
+        scheduler = await store.for_learner("learner_1")
+        for i in range(50):
+            scheduler.record_review(f"item_{i}", i % 3 != 0, review_date=now - timedelta(days=i % 7))
+        await store.for_learner("learner_2")  # untouched, not written
+
+        assert store.flush() == 1
+        assert store.flush() == 0  # nothing changed since
+
+        restored = await SchedulerStore(str(tmp_path)).get("learner_1")
+
+        assert restored.item_states == scheduler.item_states
+        later = now + timedelta(days=2)
+        assert restored.get_due_items(current_date=later) == scheduler.get_due_items(current_date=later)
+        assert not restored.dirty
+
+    @pytest.mark.asyncio
+    async def test_store_without_directory(self):
+        """Test memory-only store keeps learners separate"""
+        store = SchedulerStore()
+        (await store.for_learner("a")).record_review("item", True)
+
+        assert (await store.for_learner("b")).get_item_state("item") is None
+        assert store.flush() == 0
+
+    @pytest.mark.asyncio
+    async def test_store_get_does_not_cache_unknown_learners(self, tmp_path):
+        """Test reads for learners without a schedule leave the store unchanged"""
+        store = SchedulerStore(str(tmp_path))
+        for i in range(100):
+            assert await store.get(f"stranger_{i}") is None
+        assert store._schedulers == {}
+
+        scheduler = await store.for_learner("learner")
+        assert await store.get("learner") is scheduler
+        assert list(store._schedulers) == ["learner"]
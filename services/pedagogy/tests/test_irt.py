@@ -3,7 +3,10 @@ Unit tests for Item Response Theory (IRT) models
 """
 import pytest
 import numpy as np
+from scipy.optimize import check_grad
+from scipy.special import expit
 from app.models.irt import IRTModel
+from app.models.irt_calibration import JointCalibrator, ResponseMatrix
 
 
 class TestIRTModel:
@@ -230,3 +233,77 @@ class TestIRTIntegration:
         # Should have a valid ability estimate
         assert -3 <= final_theta <= 3
         assert learner_id in model.learner_abilities
+
+
+class TestJointCalibration:
+    """Test joint item calibration"""
+
+    def _bank(self, n_items=40, n_persons=3000, per_person=15, seed=0):
+        rng = np.random.default_rng(seed)
+        a = rng.uniform(0.7, 2.0, n_items)
+        b = rng.uniform(-2.0, 2.0, n_items)
+        theta = rng.normal(0.0, 1.0, n_persons)
+        person = np.repeat(np.arange(n_persons), per_person)
+        item = np.concatenate([rng.choice(n_items, per_person, replace=False) for _ in range(n_persons)])
+        correct = (rng.random(len(person)) < expit(a[item] * (theta[person] - b[item]))).astype(float)
+        return ResponseMatrix(person, item, correct), a, b, theta
+
+    @pytest.mark.parametrize("model_type", ["1PL", "2PL", "3PL"])
+    def test_analytic_gradient(self, model_type):
+        """Test analytic gradient matches finite differences"""
+        rng = np.random.default_rng(1)
+        calibrator = JointCalibrator(model_type)
+        n_items = 4
+        item = rng.integers(0, n_items, 100)
+        x = rng.normal(size=100)
+        r = rng.random(100)
+        n = r + rng.random(100)
+        params = calibrator._pack(
+            rng.uniform(0.5, 2.0, n_items), rng.normal(size=n_items), rng.uniform(0.05, 0.3, n_items)
+        )
+
+        error = check_grad(
+            lambda p: calibrator.neg_log_likelihood(p, item, x, r, n, n_items)[0],
+            lambda p: calibrator.neg_log_likelihood(p, item, x, r, n, n_items)[1],
+            params
+        )
+        assert error < 1e-4
+
+    def test_em_recovers_parameters(self):
+        """Test EM recovers generating item parameters without known abilities"""
+        responses, a, b, theta = self._bank()
+
+        result = JointCalibrator("2PL").fit(responses)
+
+        assert result.converged
+        assert np.corrcoef(b, result.b)[0, 1] > 0.95
+        assert np.corrcoef(a, result.a)[0, 1] > 0.7
+        assert np.corrcoef(theta, result.theta)[0, 1] > 0.8
+
+    def test_known_theta_fit(self):
+        """Test known-ability fit recovers difficulties within bounds"""
+        responses, a, b, theta = self._bank(seed=2)
+
+        result = JointCalibrator("2PL").fit(responses, theta=theta[responses.person_index])
+
+        assert np.corrcoef(b, result.b)[0, 1] > 0.95
+        assert np.all((result.a >= 0.1) & (result.a <= 3.0))
+
+    def test_calibrate_items_by_em_stores_abilities(self):
+        """Test calibration without theta estimates learner abilities"""
+        model = IRTModel(model_type="2PL")
+        response_data = [
+            {'learner_id': f'l{p}', 'item_id': i, 'is_correct': (p + i) % 3 != 0}
+            for p in range(30) for i in range(5)
+        ]
+
+        params = model.calibrate_items(response_data)
+
+        assert set(params) == set(range(5))
+        assert len(model.learner_abilities) == 30
+
+    def test_calibrate_items_needs_theta_or_learner(self):
+        """Test calibration without theta or learner_id is rejected"""
+        model = IRTModel(model_type="2PL")
+        with pytest.raises(ValueError):
+            model.calibrate_items([{'item_id': 0, 'is_correct': True}])
@@ -5,6 +5,7 @@ Provides common functionality for Phase 2 microservices:
 - Authentication middleware (JWT validation)
 - Service-to-service communication client
 - Kafka event bus for async messaging
+- In-process broker for running the event bus without Kafka
 """
 
 from .auth_middleware import (
@@ -17,6 +18,8 @@ from .auth_middleware import (
 )
 
 from .service_client import (
+    CircuitBreaker,
+    CircuitOpenError,
     ServiceClient,
     get_service_client,
 )
@@ -27,6 +30,12 @@ from .event_bus import (
     Topics,
 )
 
+from .memory_broker import (
+    InMemoryBroker,
+    MemoryBrokerError,
+    get_memory_broker,
+)
+
 __all__ = [
     # Auth
     "get_current_user",
@@ -38,8 +47,14 @@ __all__ = [
     # Service Client
     "ServiceClient",
     "get_service_client",
+    "CircuitBreaker",
+    "CircuitOpenError",
     # Event Bus
     "EventBus",
     "get_event_bus",
     "Topics",
+    # In-process broker
+    "InMemoryBroker",
+    "MemoryBrokerError",
+    "get_memory_broker",
 ]
@@ -0,0 +1,5 @@
+"""Test fixtures and path setup."""
+import os
+import sys
+# Tests import the package as `shared`, like the services do
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
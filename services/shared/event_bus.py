@@ -3,15 +3,32 @@ Kafka Event Bus for EUREKA Phase 2 Services
 
 Provides event publishing and consumption for asynchronous
 service-to-service communication and event-driven architecture.
+
+Publishing is batched by the producer (KAFKA_LINGER_MS, KAFKA_MAX_BATCH_SIZE,
+KAFKA_COMPRESSION_TYPE) and events are keyed by user_id, so one user's
+events stay in order. EVENT_BUS_BACKEND=memory runs the same bus on the
+in-process broker in memory_broker.py instead of Kafka.
 """
 
 import os
 import json
+import asyncio
 import logging
+from functools import partial
 from typing import Dict, Any, Optional, Callable, List
 from datetime import datetime
-from aiokafka import AIOKafkaProducer, AIOKafkaConsumer
-from aiokafka.errors import KafkaError
+from uuid import uuid4
+
+from .memory_broker import MemoryBrokerError, MemoryConsumer, MemoryProducer, get_memory_broker
+
+try:
+    from aiokafka import AIOKafkaProducer, AIOKafkaConsumer
+    from aiokafka.errors import KafkaError
+except ImportError:  # only the in-process backend is usable
+    AIOKafkaProducer = AIOKafkaConsumer = None
+
+    class KafkaError(Exception):
+        """Stand-in so error handling works without aiokafka installed."""
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +36,9 @@ logger = logging.getLogger(__name__)
 class EventBus:
     """
     Kafka event bus for publishing and consuming events.
+
+    Handlers registered with batch=True receive every polled batch as a
+    list; the others are called once per event.
     """
 
     def __init__(self, service_name: str):
@@ -33,26 +53,40 @@ class EventBus:
             "KAFKA_BOOTSTRAP_SERVERS",
             "kafka:9092"
         )
-
-        self.producer: Optional[AIOKafkaProducer] = None
-        self.consumers: Dict[str, AIOKafkaConsumer] = {}
+        self.backend = os.getenv("EVENT_BUS_BACKEND", "kafka")
+        self.linger_ms = int(os.getenv("KAFKA_LINGER_MS", "5"))
+        self.max_batch_size = int(os.getenv("KAFKA_MAX_BATCH_SIZE", "65536"))
+        self.compression_type = os.getenv("KAFKA_COMPRESSION_TYPE") or None
+        self.max_poll_records = int(os.getenv("EVENT_BUS_MAX_POLL_RECORDS", "500"))
+
+        self.producer = None
+        self.consumers: Dict[str, Any] = {}
         self.event_handlers: Dict[str, List[Callable]] = {}
+        self.batch_handlers: Dict[str, List[Callable]] = {}
 
     async def start(self):
         """Start the event bus producer."""
+        options = dict(
+            value_serializer=lambda v: json.dumps(v).encode('utf-8'),
+            linger_ms=self.linger_ms,
+            max_batch_size=self.max_batch_size,
+            compression_type=self.compression_type,
+        )
         try:
-            self.producer = AIOKafkaProducer(
-                bootstrap_servers=self.kafka_bootstrap_servers,
-                value_serializer=lambda v: json.dumps(v).encode('utf-8'),
-            )
+            if self.backend == "memory":
+                self.producer = MemoryProducer(get_memory_broker(), **options)
+            elif AIOKafkaProducer is None:
+                raise RuntimeError("aiokafka is not installed; install it or set EVENT_BUS_BACKEND=memory")
+            else:
+                self.producer = AIOKafkaProducer(bootstrap_servers=self.kafka_bootstrap_servers, **options)
             await self.producer.start()
-            logger.info(f"Kafka producer started for {self.service_name}")
+            logger.info(f"{self.backend} producer started for {self.service_name}")
         except Exception as e:
             logger.error(f"Failed to start Kafka producer: {e}")
             raise
 
     async def stop(self):
-        """Stop the event bus."""
+        """Stop the event bus, delivering any events still batched."""
         if self.producer:
             await self.producer.stop()
             logger.info("Kafka producer stopped")
@@ -61,12 +95,28 @@ class EventBus:
             await consumer.stop()
         logger.info("All Kafka consumers stopped")
 
+    def _build_event(self, event_type: str, data: Dict[str, Any], user_id: Optional[str]) -> Dict[str, Any]:
+        return {
+            "event_id": f"{self.service_name}_{uuid4().hex}",
+            "event_type": event_type,
+            "service": self.service_name,
+            "timestamp": datetime.utcnow().isoformat(),
+            "user_id": user_id,
+            "data": data,
+        }
+
+    @staticmethod
+    def _key(user_id: Optional[str]) -> Optional[bytes]:
+        # Same user, same partition: per-user ordering survives batching
+        return str(user_id).encode('utf-8') if user_id is not None else None
+
     async def publish_event(
         self,
         topic: str,
         event_type: str,
         data: Dict[str, Any],
         user_id: Optional[str] = None,
+        wait: bool = True,
     ) -> bool:
         """
         Publish an event to a Kafka topic.
@@ -76,36 +126,75 @@ class EventBus:
             event_type: Type of event (e.g., "user.created")
             data: Event payload data
             user_id: Optional user ID associated with event
+            wait: Wait for the broker to acknowledge the event. With
+                  False the event joins the producer's current batch and
+                  delivery failures are only logged.
 
         Returns:
-            True if published successfully, False otherwise
+            True if published (or, with wait=False, queued) successfully,
+            False otherwise
         """
         if not self.producer:
             logger.error("Kafka producer not started")
             return False
 
-        event = {
-            "event_id": f"{self.service_name}_{datetime.utcnow().timestamp()}",
-            "event_type": event_type,
-            "service": self.service_name,
-            "timestamp": datetime.utcnow().isoformat(),
-            "user_id": user_id,
-            "data": data,
-        }
+        event = self._build_event(event_type, data, user_id)
 
         try:
-            await self.producer.send_and_wait(topic, event)
+            delivery = await self.producer.send(topic, event, key=self._key(user_id))
+            if not wait:
+                delivery.add_done_callback(partial(self._log_delivery, topic, event_type))
+                return True
+            await delivery
             logger.info(f"Published event {event_type} to topic {topic}")
             return True
-        except KafkaError as e:
+        except (KafkaError, MemoryBrokerError) as e:
             logger.error(f"Failed to publish event {event_type}: {e}")
             return False
 
+    async def publish_events(self, topic: str, events: List[Dict[str, Any]]) -> int:
+        """
+        Publish several events to one topic, waiting once for all of them.
+
+        Args:
+            topic: Kafka topic name
+            events: Dicts with "event_type", "data" and optional "user_id"
+
+        Returns:
+            Number of events the broker acknowledged
+        """
+        if not self.producer:
+            logger.error("Kafka producer not started")
+            return 0
+
+        deliveries = []
+        try:
+            for item in events:
+                event = self._build_event(item["event_type"], item["data"], item.get("user_id"))
+                deliveries.append(await self.producer.send(topic, event, key=self._key(item.get("user_id"))))
+        except (KafkaError, MemoryBrokerError) as e:
+            logger.error(f"Failed to publish events to {topic}: {e}")
+
+        results = await asyncio.gather(*deliveries, return_exceptions=True)
+        failed = [r for r in results if isinstance(r, Exception)]
+        if failed:
+            logger.error(f"Failed to publish {len(failed)} of {len(events)} events to {topic}: {failed[0]}")
+        logger.info(f"Published {len(results) - len(failed)} events to topic {topic}")
+        return len(results) - len(failed)
+
+    @staticmethod
+    def _log_delivery(topic: str, event_type: str, delivery: asyncio.Future):
+        if delivery.cancelled():
+            logger.error(f"Publishing event {event_type} to {topic} was cancelled")
+        elif delivery.exception() is not None:
+            logger.error(f"Failed to publish event {event_type}: {delivery.exception()}")
+
     async def subscribe(
         self,
         topic: str,
-        handler: Callable[[Dict[str, Any]], None],
+        handler: Callable[[Any], None],
         group_id: Optional[str] = None,
+        batch: bool = False,
     ):
         """
         Subscribe to a Kafka topic and register event handler.
@@ -114,22 +203,27 @@ class EventBus:
             topic: Kafka topic to subscribe to
             handler: Async function to handle events
             group_id: Consumer group ID (defaults to service name)
+            batch: Call handler with a list of events per poll instead
+                   of once per event
         """
-        if topic not in self.event_handlers:
-            self.event_handlers[topic] = []
-
-        self.event_handlers[topic].append(handler)
+        handlers = self.batch_handlers if batch else self.event_handlers
+        handlers.setdefault(topic, []).append(handler)
 
         # Create consumer if not exists for this topic
         if topic not in self.consumers:
             group = group_id or f"{self.service_name}_group"
 
-            consumer = AIOKafkaConsumer(
-                topic,
-                bootstrap_servers=self.kafka_bootstrap_servers,
+            options = dict(
                 group_id=group,
                 value_deserializer=lambda v: json.loads(v.decode('utf-8')),
+                max_poll_records=self.max_poll_records,
             )
+            if self.backend == "memory":
+                consumer = MemoryConsumer(topic, broker=get_memory_broker(), **options)
+            elif AIOKafkaConsumer is None:
+                raise RuntimeError("aiokafka is not installed; install it or set EVENT_BUS_BACKEND=memory")
+            else:
+                consumer = AIOKafkaConsumer(topic, bootstrap_servers=self.kafka_bootstrap_servers, **options)
 
             await consumer.start()
             self.consumers[topic] = consumer
@@ -147,23 +241,33 @@ class EventBus:
             return
 
         consumer = self.consumers[topic]
-        handlers = self.event_handlers.get(topic, [])
 
         try:
-            async for message in consumer:
-                event = message.value
-                logger.info(f"Received event {event.get('event_type')} from topic {topic}")
-
-                # Call all registered handlers for this topic
-                for handler in handlers:
-                    try:
-                        await handler(event)
-                    except Exception as e:
-                        logger.error(f"Event handler error: {e}")
+            while True:
+                polled = await consumer.getmany(timeout_ms=1000, max_records=self.max_poll_records)
+                for messages in polled.values():
+                    await self._dispatch(topic, [message.value for message in messages])
 
         except Exception as e:
             logger.error(f"Error consuming events from {topic}: {e}")
 
+    async def _dispatch(self, topic: str, events: List[Dict[str, Any]]):
+        """Hand one polled batch to the topic's batch and per-event handlers."""
+        logger.debug(f"Received {len(events)} events from topic {topic}")
+
+        for handler in self.batch_handlers.get(topic, []):
+            try:
+                await handler(events)
+            except Exception as e:
+                logger.error(f"Batch event handler error: {e}")
+
+        for event in events:
+            for handler in self.event_handlers.get(topic, []):
+                try:
+                    await handler(event)
+                except Exception as e:
+                    logger.error(f"Event handler error: {e}")
+
 
 # Event Topics
 class Topics:
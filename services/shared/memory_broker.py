@@ -0,0 +1,499 @@
+"""
+In-process Event Broker for EUREKA Phase 2 Services
+
+A small stand-in for Kafka that lives inside one Python process: topics
+split into partitions, producer-side batching with linger time, size
+limits and optional gzip compression, consumer groups with committed
+offsets, and bounded partitions that make producers wait when consumers
+fall behind. MemoryProducer and MemoryConsumer implement the parts of
+AIOKafkaProducer / AIOKafkaConsumer that EventBus uses, so the bus runs
+on it unchanged with EVENT_BUS_BACKEND=memory.
+
+Meant for tests and load tests of throughput, ordering and backpressure
+without a Kafka cluster; nothing is persisted.
+"""
+
+import asyncio
+import bisect
+import gzip
+import logging
+import struct
+import time
+import zlib
+from collections import namedtuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Field names follow aiokafka's structures
+TopicPartition = namedtuple("TopicPartition", ["topic", "partition"])
+RecordMetadata = namedtuple("RecordMetadata", ["topic", "partition", "offset", "timestamp"])
+ConsumerRecord = namedtuple(
+    "ConsumerRecord", ["topic", "partition", "offset", "timestamp", "key", "value"]
+)
+
+_FRAME = struct.Struct(">iiq")  # key length (-1 = None), value length, timestamp ms
+
+
+class MemoryBrokerError(Exception):
+    """Raised for misuse of the in-process broker (e.g. sending before start)."""
+
+
+def _encode_batch(records: List[Tuple[Optional[bytes], bytes, int]]) -> bytes:
+    parts = []
+    for key, value, timestamp in records:
+        parts.append(_FRAME.pack(-1 if key is None else len(key), len(value), timestamp))
+        if key is not None:
+            parts.append(key)
+        parts.append(value)
+    return b"".join(parts)
+
+
+def _decode_batch(blob: bytes) -> List[Tuple[Optional[bytes], bytes, int]]:
+    records = []
+    pos = 0
+    while pos < len(blob):
+        key_len, value_len, timestamp = _FRAME.unpack_from(blob, pos)
+        pos += _FRAME.size
+        key = None
+        if key_len >= 0:
+            key = blob[pos:pos + key_len]
+            pos += key_len
+        records.append((key, blob[pos:pos + value_len], timestamp))
+        pos += value_len
+    return records
+
+
+class _StoredBatch:
+    """One producer batch as appended to a partition log."""
+
+    __slots__ = ("base_offset", "count", "payload", "compressed", "_records")
+
+    def __init__(self, base_offset: int, records: List[Tuple[Optional[bytes], bytes, int]], compression: Optional[str]):
+        self.base_offset = base_offset
+        self.count = len(records)
+        self.compressed = compression == "gzip"
+        if self.compressed:
+            self.payload = gzip.compress(_encode_batch(records), compresslevel=1)
+            self._records = None
+        else:
+            self.payload = None
+            self._records = records
+
+    @property
+    def size(self) -> int:
+        if self.compressed:
+            return len(self.payload)
+        return sum(len(value) + (len(key) if key else 0) for key, value, _ in self._records)
+
+    def records(self) -> List[Tuple[Optional[bytes], bytes, int]]:
+        if self._records is None:
+            return _decode_batch(gzip.decompress(self.payload))
+        return self._records
+
+
+class _Partition:
+    """Append-only log of batches, trimmed once every group has read past them."""
+
+    def __init__(self):
+        self.batches: List[_StoredBatch] = []
+        self.base_offsets: List[int] = []
+        self.start_offset = 0
+        self.end_offset = 0
+        self.bytes_in = 0
+        self.data_available = asyncio.Event()
+        self.space_available = asyncio.Event()
+        self.space_available.set()
+        # FIFO, so a small batch cannot overtake one waiting for space
+        self.append_lock = asyncio.Lock()
+
+    def append(self, records, compression: Optional[str]) -> int:
+        batch = _StoredBatch(self.end_offset, records, compression)
+        self.batches.append(batch)
+        self.base_offsets.append(batch.base_offset)
+        self.end_offset += batch.count
+        self.bytes_in += batch.size
+        self.data_available.set()
+        return batch.base_offset
+
+    def read(self, offset: int, max_records: int) -> List[Tuple[int, Tuple[Optional[bytes], bytes, int]]]:
+        """Up to max_records (offset, record) pairs from offset on."""
+        out = []
+        offset = max(offset, self.start_offset)
+        i = max(bisect.bisect_right(self.base_offsets, offset) - 1, 0)
+        while i < len(self.batches) and len(out) < max_records:
+            batch = self.batches[i]
+            start = offset - batch.base_offset
+            take = min(batch.count - start, max_records - len(out))
+            if take > 0:
+                records = batch.records()
+                out.extend((offset + j, records[start + j]) for j in range(take))
+                offset += take
+            i += 1
+        return out
+
+    def trim(self, committed: int):
+        """Drop whole batches below the lowest committed offset."""
+        drop = 0
+        while drop < len(self.batches) and \
+                self.batches[drop].base_offset + self.batches[drop].count <= committed:
+            drop += 1
+        if drop:
+            del self.batches[:drop]
+            del self.base_offsets[:drop]
+        self.start_offset = self.batches[0].base_offset if self.batches else self.end_offset
+
+
+class InMemoryBroker:
+    """
+    Partitioned topics with consumer-group offsets.
+
+    A partition holds at most `max_backlog` records that some consumer
+    group has not committed; producers appending past that wait until
+    consumers catch up, and fail with MemoryBrokerError after
+    `max_block_ms` (a joined consumer that never polls would otherwise
+    block them for good). A new group starts at the end of the log
+    (Kafka's default auto_offset_reset="latest"). Only groups with members
+    count: records no group subscribes to are dropped as they arrive, and
+    a group's backlog is released when its last member leaves.
+    """
+
+    def __init__(self, num_partitions: int = 4, max_backlog: int = 100_000, max_block_ms: int = 60_000):
+        """
+        Initialize broker.
+
+        Args:
+            num_partitions: Partitions per topic (created on first use)
+            max_backlog: Uncommitted records a partition holds before
+                         producers have to wait
+            max_block_ms: How long an append waits for space before failing
+        """
+        self.num_partitions = num_partitions
+        self.max_backlog = max_backlog
+        self.max_block = max_block_ms / 1000.0
+        self._topics: Dict[str, List[_Partition]] = {}
+        # (group, topic, partition) -> next offset to read
+        self._committed: Dict[Tuple[str, str, int], int] = {}
+        # (group, topic) -> member consumers, in join order
+        self._members: Dict[Tuple[str, str], List["MemoryConsumer"]] = {}
+        self._round_robin: Dict[str, int] = {}
+
+    def partitions(self, topic: str) -> List[_Partition]:
+        if topic not in self._topics:
+            self._topics[topic] = [_Partition() for _ in range(self.num_partitions)]
+        return self._topics[topic]
+
+    def partition_for(self, topic: str, key: Optional[bytes]) -> int:
+        """Same key, same partition (crc32); no key, round robin."""
+        count = len(self.partitions(topic))
+        if key is None:
+            n = self._round_robin.get(topic, 0)
+            self._round_robin[topic] = n + 1
+            return n % count
+        return zlib.crc32(key) % count
+
+    def _groups(self, topic: str) -> List[str]:
+        return [group for group, t in self._members if t == topic]
+
+    def _low_watermark(self, topic: str, partition: int) -> int:
+        groups = self._groups(topic)
+        if not groups:
+            return self.partitions(topic)[partition].end_offset
+        return min(self._committed.get((g, topic, partition), 0) for g in groups)
+
+    def backlog(self, topic: str, partition: int) -> int:
+        """Records in a partition not yet committed by every group."""
+        return self.partitions(topic)[partition].end_offset - self._low_watermark(topic, partition)
+
+    async def append(self, topic: str, partition: int, records, compression: Optional[str]) -> int:
+        """Append a batch, waiting while the partition is full. Returns its base offset."""
+        log = self.partitions(topic)[partition]
+        deadline = time.monotonic() + self.max_block
+        async with log.append_lock:
+            while self.backlog(topic, partition) + len(records) > self.max_backlog and \
+                    self.backlog(topic, partition) > 0:
+                log.space_available.clear()
+                try:
+                    await asyncio.wait_for(log.space_available.wait(), deadline - time.monotonic())
+                except asyncio.TimeoutError:
+                    raise MemoryBrokerError(
+                        f"{topic}[{partition}] still full after {self.max_block:g}s: "
+                        f"{self.backlog(topic, partition)} records not yet consumed"
+                    ) from None
+            base = log.append(records, compression)
+        if not self._groups(topic):
+            log.trim(log.end_offset)
+        return base
+
+    def commit(self, group: str, topic: str, partition: int, offset: int):
+        key = (group, topic, partition)
+        if offset <= self._committed.get(key, 0):
+            return
+        self._committed[key] = offset
+        self._release(topic, partition)
+
+    def _release(self, topic: str, partition: int):
+        """Trim what every group has read and wake producers if there is room."""
+        log = self.partitions(topic)[partition]
+        log.trim(self._low_watermark(topic, partition))
+        if self.backlog(topic, partition) < self.max_backlog:
+            log.space_available.set()
+
+    def committed(self, group: str, topic: str, partition: int) -> int:
+        return self._committed.get((group, topic, partition), 0)
+
+    def join(self, consumer: "MemoryConsumer"):
+        for topic in consumer.topics:
+            for p, log in enumerate(self.partitions(topic)):
+                # A returning group skips what was trimmed while it was empty
+                key = (consumer.group_id, topic, p)
+                self._committed[key] = max(self._committed.get(key, log.end_offset), log.start_offset)
+            self._members.setdefault((consumer.group_id, topic), []).append(consumer)
+            self._rebalance(consumer.group_id, topic)
+
+    def leave(self, consumer: "MemoryConsumer"):
+        for topic in consumer.topics:
+            key = (consumer.group_id, topic)
+            members = self._members.get(key, [])
+            if consumer not in members:
+                continue
+            members.remove(consumer)
+            if members:
+                self._rebalance(consumer.group_id, topic)
+                continue
+            # An empty group no longer holds records back; its committed
+            # offsets stay, so a member rejoining resumes where it left off
+            del self._members[key]
+            for p in range(len(self.partitions(topic))):
+                self._release(topic, p)
+
+    def _rebalance(self, group: str, topic: str):
+        """Deal a topic's partitions round robin over the group's members."""
+        members = self._members.get((group, topic), [])
+        count = len(self.partitions(topic))
+        for index, member in enumerate(members):
+            assigned = [TopicPartition(topic, p) for p in range(index, count, len(members))]
+            member._assign(topic, assigned)
+
+
+class MemoryProducer:
+    """
+    In-process counterpart of AIOKafkaProducer.
+
+    send() appends to a per-partition batch; a batch is handed to the
+    broker when it reaches max_batch_size bytes or after linger_ms.
+    """
+
+    def __init__(
+        self,
+        broker: InMemoryBroker,
+        value_serializer: Optional[Callable[[Any], bytes]] = None,
+        linger_ms: int = 0,
+        max_batch_size: int = 16384,
+        compression_type: Optional[str] = None,
+        **_ignored
+    ):
+        if compression_type not in (None, "gzip"):
+            raise MemoryBrokerError(f"Unsupported compression for the in-process broker: {compression_type}")
+        self.broker = broker
+        self.value_serializer = value_serializer or (lambda v: v)
+        self.linger = linger_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self.compression_type = compression_type
+        # (topic, partition) -> [records, futures, size in bytes, linger timer]
+        self._pending: Dict[Tuple[str, int], list] = {}
+        self._in_flight: set = set()
+        self._started = False
+        self.batches_sent = 0
+
+    async def start(self):
+        self._started = True
+
+    async def stop(self):
+        await self.flush()
+        self._started = False
+
+    async def flush(self):
+        """Hand every open batch to the broker and wait for all appends."""
+        for tp in list(self._pending):
+            self._close_batch(tp)
+        while self._in_flight:
+            await asyncio.gather(*list(self._in_flight), return_exceptions=True)
+
+    async def send(
+        self,
+        topic: str,
+        value: Any = None,
+        key: Optional[bytes] = None,
+        partition: Optional[int] = None,
+        timestamp_ms: Optional[int] = None,
+        **_ignored
+    ) -> asyncio.Future:
+        """Queue a record; the returned future resolves to its RecordMetadata."""
+        if not self._started:
+            raise MemoryBrokerError("Producer not started")
+        payload = self.value_serializer(value)
+        if partition is None:
+            partition = self.broker.partition_for(topic, key)
+        timestamp = timestamp_ms if timestamp_ms is not None else int(time.time() * 1000)
+
+        tp = (topic, partition)
+        batch = self._pending.get(tp)
+        if batch is None:
+            batch = self._pending[tp] = [[], [], 0, None]
+            if self.linger > 0:
+                batch[3] = asyncio.get_running_loop().call_later(self.linger, self._close_batch, tp)
+        future = asyncio.get_running_loop().create_future()
+        batch[0].append((key, payload, timestamp))
+        batch[1].append(future)
+        batch[2] += len(payload) + (len(key) if key else 0)
+
+        if self.linger <= 0 or batch[2] >= self.max_batch_size:
+            self._close_batch(tp)
+        # Let a full batch's append run, so a producer outrunning its
+        # consumers feels the broker's backpressure here
+        while len(self._in_flight) > len(self.broker.partitions(topic)):
+            await asyncio.wait(list(self._in_flight), return_when=asyncio.FIRST_COMPLETED)
+        return future
+
+    async def send_and_wait(self, topic: str, value: Any = None, key: Optional[bytes] = None, **kwargs):
+        future = await self.send(topic, value, key=key, **kwargs)
+        return await future
+
+    def _close_batch(self, tp: Tuple[str, int]):
+        batch = self._pending.pop(tp, None)
+        if batch is None:
+            return
+        records, futures, _, timer = batch
+        if timer is not None:
+            timer.cancel()
+        task = asyncio.get_running_loop().create_task(self._append(tp, records, futures))
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+    async def _append(self, tp, records, futures):
+        topic, partition = tp
+        try:
+            base = await self.broker.append(topic, partition, records, self.compression_type)
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.batches_sent += 1
+        for i, (future, (_, _, timestamp)) in enumerate(zip(futures, records)):
+            if not future.done():
+                future.set_result(RecordMetadata(topic, partition, base + i, timestamp))
+
+
+class MemoryConsumer:
+    """
+    In-process counterpart of AIOKafkaConsumer.
+
+    Members of a group split a topic's partitions between them; records
+    are committed as they are returned (like aiokafka's auto-commit).
+    """
+
+    def __init__(
+        self,
+        *topics: str,
+        broker: InMemoryBroker,
+        group_id: str,
+        value_deserializer: Optional[Callable[[bytes], Any]] = None,
+        max_poll_records: int = 500,
+        **_ignored
+    ):
+        self.topics = list(topics)
+        self.broker = broker
+        self.group_id = group_id
+        self.value_deserializer = value_deserializer or (lambda v: v)
+        self.max_poll_records = max_poll_records
+        self._assignment: Dict[str, List[TopicPartition]] = {}
+        self._next_partition = 0
+
+    def _assign(self, topic: str, partitions: List[TopicPartition]):
+        self._assignment[topic] = partitions
+
+    def assignment(self) -> List[TopicPartition]:
+        return [tp for tps in self._assignment.values() for tp in tps]
+
+    async def start(self):
+        self.broker.join(self)
+
+    async def stop(self):
+        self.broker.leave(self)
+
+    def _poll(self, max_records: int) -> Dict[TopicPartition, List[ConsumerRecord]]:
+        result = {}
+        assigned = self.assignment()
+        # Rotate the starting partition so none is starved under load
+        for n in range(len(assigned)):
+            if max_records <= 0:
+                break
+            tp = assigned[(self._next_partition + n) % len(assigned)]
+            log = self.broker.partitions(tp.topic)[tp.partition]
+            position = self.broker.committed(self.group_id, tp.topic, tp.partition)
+            rows = log.read(position, max_records)
+            if not rows:
+                continue
+            result[tp] = [
+                ConsumerRecord(tp.topic, tp.partition, offset, timestamp, key, self.value_deserializer(value))
+                for offset, (key, value, timestamp) in rows
+            ]
+            max_records -= len(rows)
+            self.broker.commit(self.group_id, tp.topic, tp.partition, rows[-1][0] + 1)
+        if assigned:
+            self._next_partition = (self._next_partition + 1) % len(assigned)
+        return result
+
+    async def getmany(
+        self,
+        timeout_ms: int = 0,
+        max_records: Optional[int] = None
+    ) -> Dict[TopicPartition, List[ConsumerRecord]]:
+        """Records from assigned partitions, waiting up to timeout_ms for any."""
+        max_records = max_records or self.max_poll_records
+        deadline = time.monotonic() + timeout_ms / 1000.0
+        while True:
+            result = self._poll(max_records)
+            remaining = deadline - time.monotonic()
+            if result or remaining <= 0:
+                return result
+            logs = [self.broker.partitions(tp.topic)[tp.partition] for tp in self.assignment()]
+            for log in logs:
+                log.data_available.clear()
+            waiters = [asyncio.ensure_future(log.data_available.wait()) for log in logs]
+            if not waiters:
+                await asyncio.sleep(remaining)
+                continue
+            try:
+                await asyncio.wait(waiters, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for waiter in waiters:
+                    waiter.cancel()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> ConsumerRecord:
+        while True:
+            batch = await self.getmany(timeout_ms=1000, max_records=1)
+            for records in batch.values():
+                return records[0]
+
+
+# Singleton instance, shared by every EventBus in the process
+_memory_broker: Optional[InMemoryBroker] = None
+
+
+def get_memory_broker() -> InMemoryBroker:
+    """
+    Get or create the process-wide in-memory broker.
+
+    Returns:
+        InMemoryBroker instance
+    """
+    global _memory_broker
+    if _memory_broker is None:
+        _memory_broker = InMemoryBroker()
+    return _memory_broker
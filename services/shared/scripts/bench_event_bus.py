@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Event bus publishing strategies on the in-process broker.
+
+Publishes --events events for --users users through EventBus with
+EVENT_BUS_BACKEND=memory and consumes them with a batch handler, once per
+strategy:
+
+  per-event  publish_event() awaited one by one with linger 0, i.e. one
+             broker request per event (the bus before batching);
+  queued     publish_event(wait=False) with --linger-ms batching;
+  bulk       publish_events() in chunks of --chunk.
+
+Prints end-to-end events/s, broker batches, stored bytes, the largest
+partition backlog seen and the consumer's mean poll size, and checks that
+every user's events arrive in publish order (exit 1 if not).
+
+Run:
+  python shared/scripts/bench_event_bus.py [--events 50000] [--linger-ms 5] [--compression gzip] [--handler-delay-ms 0]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from shared.event_bus import EventBus  # noqa: E402
+from shared.memory_broker import get_memory_broker  # noqa: E402
+
+
+async def _run(strategy: str, args) -> bool:
+    broker = get_memory_broker()
+    topic = f"bench.{strategy}"
+    bus = EventBus(f"bench-{strategy}")
+    bus.backend = "memory"
+    bus.linger_ms = 0 if strategy == "per-event" else args.linger_ms
+    bus.compression_type = args.compression
+    await bus.start()
+
+    last_seq = {}
+    in_order = True
+    polls = []
+    max_backlog = 0
+
+    async def consume(events):
+        nonlocal in_order, max_backlog
+        polls.append(len(events))
+        max_backlog = max(max_backlog, max(broker.backlog(topic, p) for p in range(broker.num_partitions)))
+        for event in events:
+            user, seq = event["user_id"], event["data"]["seq"]
+            in_order &= last_seq.get(user, -1) < seq
+            last_seq[user] = seq
+        if args.handler_delay_ms:
+            await asyncio.sleep(args.handler_delay_ms / 1000.0)
+
+    await bus.subscribe(topic, consume, batch=True)
+    consumer = asyncio.create_task(bus.consume_events(topic))
+    payload = "x" * args.payload_bytes
+
+    def event(seq):
+        return {"event_type": "bench.event", "data": {"seq": seq, "payload": payload},
+                "user_id": f"user{seq % args.users}"}
+
+    started = time.perf_counter()
+    if strategy == "bulk":
+        for first in range(0, args.events, args.chunk):
+            await bus.publish_events(topic, [event(seq) for seq in range(first, min(first + args.chunk, args.events))])
+    else:
+        for seq in range(args.events):
+            item = event(seq)
+            await bus.publish_event(topic, item["event_type"], item["data"], item["user_id"],
+                                    wait=strategy == "per-event")
+    await bus.producer.flush()
+    while sum(polls) < args.events:
+        await asyncio.sleep(0.001)
+    seconds = time.perf_counter() - started
+
+    consumer.cancel()
+    await bus.stop()
+    stored = sum(log.bytes_in for log in broker.partitions(topic))
+    print(f"{strategy:<10} {args.events / seconds:10.0f} events/s  {bus.producer.batches_sent:7d} batches  "
+          f"{stored / 1e6:7.2f} MB  max backlog {max_backlog:6d}  mean poll {sum(polls) / len(polls):6.1f}  "
+          f"order {'ok' if in_order else 'BROKEN'}")
+    return in_order
+
+
+async def main(args) -> int:
+    logging.basicConfig(level=logging.WARNING)
+    get_memory_broker().max_backlog = args.max_backlog
+    print(f"{args.events} events, {args.users} users, linger {args.linger_ms} ms, "
+          f"compression {args.compression or 'none'}, max backlog {args.max_backlog}")
+    ok = True
+    for strategy in ("per-event", "queued", "bulk"):
+        ok &= await _run(strategy, args)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=50000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--payload-bytes", type=int, default=200)
+    parser.add_argument("--linger-ms", type=int, default=5)
+    parser.add_argument("--compression", choices=["gzip"], default=None)
+    parser.add_argument("--chunk", type=int, default=500)
+    parser.add_argument("--max-backlog", type=int, default=10000)
+    parser.add_argument("--handler-delay-ms", type=float, default=0.0)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -2,12 +2,20 @@
 Service Communication Client for EUREKA Phase 2 Services
 
 Provides HTTP client for secure service-to-service communication
-with automatic authentication, retries, and circuit breaking.
+with automatic authentication, a keep-alive connection pool per host,
+coalescing of identical in-flight reads, short-lived GET caching,
+per-service circuit breaking and latency histograms.
 """
 
 import os
+import re
+import json
+import time
+import asyncio
+import bisect
 import logging
-from typing import Dict, Any, Optional
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
 import httpx
 from datetime import datetime, timedelta
 
@@ -15,25 +23,189 @@ from .auth_middleware import create_service_token
 
 logger = logging.getLogger(__name__)
 
+# Requests that may share one in-flight call
+COALESCED_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised without a network call while a service's circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one downstream service.
+
+    Opens after `failure_threshold` failures in a row (transport errors,
+    timeouts, 5xx). Once `reset_timeout` seconds have passed it is half
+    open: up to `half_open_max_calls` probe requests go through, and the
+    first result decides between closed and open again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probes = 0
+
+    def allow(self) -> bool:
+        """Whether a request may go out now (counts half-open probes)."""
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+            self.probes = 0
+        if self.state == self.HALF_OPEN:
+            if self.probes >= self.half_open_max_calls:
+                return False
+            self.probes += 1
+        return True
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self.probes = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self.probes = 0
+
+    def release(self):
+        """Give back a probe slot for a request that ended without a verdict."""
+        if self.state == self.HALF_OPEN and self.probes > 0:
+            self.probes -= 1
+
+
+class LatencyHistogram:
+    """Request latencies in fixed buckets (seconds), Prometheus style."""
+
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last one is +Inf
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (None if empty)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self) -> Dict[str, Any]:
+        cumulative, seen = {}, 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            seen += n
+            cumulative["+Inf" if bound == float("inf") else str(bound)] = seen
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "buckets": cumulative,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+def _freeze(mapping: Optional[Dict[str, Any]]) -> str:
+    return json.dumps(mapping or {}, sort_keys=True, default=str)
+
 
 class ServiceClient:
     """
     HTTP client for service-to-service communication with authentication.
+
+    Connections are pooled per host and kept alive across calls; call
+    close() at shutdown. Identical concurrent GET/HEAD/OPTIONS requests
+    share one upstream call, and GET responses are cached briefly when
+    the caller passes cache_ttl or the response's Cache-Control allows.
+    Each target service has its own circuit breaker and latency histogram
+    (see stats()).
     """
 
-    def __init__(self, service_name: str, timeout: float = 30.0):
+    def __init__(
+        self,
+        service_name: str,
+        timeout: float = 30.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        cache_max_ttl: float = 5.0,
+        cache_max_entries: int = 1024,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
         """
         Initialize service client.
 
         Args:
             service_name: Name of this service (for authentication)
             timeout: Request timeout in seconds
+            max_connections: Connection limit per host pool
+            max_keepalive_connections: Idle connections kept per host pool
+            keepalive_expiry: Seconds an idle connection is kept
+            cache_max_ttl: Upper bound on how long a GET response is cached
+            cache_max_entries: Cached responses kept (least recently used go first)
+            failure_threshold: Consecutive failures that open a service's circuit
+            reset_timeout: Seconds an open circuit waits before probing
+            transport: httpx transport for every host (e.g. httpx.MockTransport
+                       in tests); by default each host gets its own pool
         """
         self.service_name = service_name
         self.timeout = timeout
         self._token_cache: Optional[str] = None
         self._token_expiry: Optional[datetime] = None
 
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.cache_max_ttl = cache_max_ttl
+        self.cache_max_entries = cache_max_entries
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.transport = transport
+
+        # (scheme, host, port) -> pooled client
+        self._clients: Dict[Tuple[str, str, int], httpx.AsyncClient] = {}
+        # request key -> task of the one upstream call serving it
+        self._in_flight: Dict[Tuple[str, ...], asyncio.Task] = {}
+        # request key -> (expiry, response)
+        self._cache: "OrderedDict[Tuple[str, ...], Tuple[float, httpx.Response]]" = OrderedDict()
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.latency: Dict[str, LatencyHistogram] = {}
+        self.counters: Dict[str, Dict[str, int]] = {}
+
         # Service URLs from environment
         self.service_urls = {
             "api-core": os.getenv("API_CORE_URL", "http://api-core:8000"),
@@ -92,6 +264,107 @@ class ServiceClient:
 
         return headers
 
+    def _client_for(self, url: str) -> httpx.AsyncClient:
+        """Pooled keep-alive client for the URL's host."""
+        parsed = httpx.URL(url)
+        origin = (parsed.scheme, parsed.host, parsed.port or 0)
+        client = self._clients.get(origin)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits, transport=self.transport)
+            self._clients[origin] = client
+        return client
+
+    def _count(self, service: str, name: str):
+        counters = self.counters.setdefault(
+            service,
+            {"requests": 0, "failures": 0, "rejected": 0, "coalesced": 0, "cache_hits": 0},
+        )
+        counters[name] += 1
+
+    def _cached(self, key: Tuple[str, ...]) -> Optional[httpx.Response]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires, response = entry
+        if expires <= time.monotonic():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return response
+
+    def _store(self, key: Tuple[str, ...], response: httpx.Response, cache_ttl: Optional[float]):
+        """Cache a successful GET for cache_ttl, or what its Cache-Control allows."""
+        if key[0] != "GET" or not response.is_success:
+            return
+        cache_control = response.headers.get("cache-control", "").lower()
+        if "no-store" in cache_control:
+            return
+        ttl = cache_ttl
+        if ttl is None:
+            max_age = _MAX_AGE.search(cache_control)
+            if "no-cache" in cache_control or "private" in cache_control or not max_age:
+                return
+            ttl = int(max_age.group(1))
+        ttl = min(ttl, self.cache_max_ttl)
+        if ttl <= 0:
+            return
+        self._cache[key] = (time.monotonic() + ttl, response)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_max_entries:
+            self._cache.popitem(last=False)
+
+    async def _send(
+        self,
+        method: str,
+        service: str,
+        url: str,
+        data: Optional[Dict[str, Any]],
+        params: Optional[Dict[str, Any]],
+        headers: Optional[Dict[str, str]],
+    ) -> httpx.Response:
+        """One upstream call, guarded by the service's circuit breaker."""
+        breaker = self.breakers.setdefault(
+            service, CircuitBreaker(self.failure_threshold, self.reset_timeout)
+        )
+        if not breaker.allow():
+            self._count(service, "rejected")
+            raise CircuitOpenError(f"Circuit open for service {service}")
+
+        self._count(service, "requests")
+        histogram = self.latency.setdefault(service, LatencyHistogram())
+        started = time.perf_counter()
+        try:
+            response = await self._client_for(url).request(
+                method=method,
+                url=url,
+                json=data,
+                params=params,
+                headers=self._get_headers(headers),
+            )
+        except httpx.TransportError:
+            self._count(service, "failures")
+            breaker.record_failure()
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+        finally:
+            histogram.observe(time.perf_counter() - started)
+
+        if response.status_code >= 500:
+            self._count(service, "failures")
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    def _settle(self, key: Tuple[str, ...], cache_ttl: Optional[float], task: asyncio.Task):
+        self._in_flight.pop(key, None)
+        if task.cancelled():
+            return
+        if task.exception() is None:
+            self._store(key, task.result(), cache_ttl)
+
     async def request(
         self,
         method: str,
@@ -100,6 +373,7 @@ class ServiceClient:
         data: Optional[Dict[str, Any]] = None,
         params: Optional[Dict[str, Any]] = None,
         headers: Optional[Dict[str, str]] = None,
+        cache_ttl: Optional[float] = None,
     ) -> Dict[str, Any]:
         """
         Make an authenticated request to another service.
@@ -111,41 +385,72 @@ class ServiceClient:
             data: Request body data
             params: Query parameters
             headers: Additional headers
+            cache_ttl: Seconds to cache a successful GET response
+                       (capped by cache_max_ttl); by default the
+                       response's Cache-Control max-age decides
 
         Returns:
             Response data as dict
 
         Raises:
             httpx.HTTPStatusError: If request fails
+            CircuitOpenError: If the service's circuit is open
         """
         base_url = self.service_urls.get(service)
         if not base_url:
             raise ValueError(f"Unknown service: {service}")
 
+        method = method.upper()
         url = f"{base_url}{path}"
-        request_headers = self._get_headers(headers)
-
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
-                logger.info(f"Service request: {method} {service}{path}")
-
-                response = await client.request(
-                    method=method,
-                    url=url,
-                    json=data,
-                    params=params,
-                    headers=request_headers,
-                )
-
-                response.raise_for_status()
-                return response.json()
-
-            except httpx.HTTPStatusError as e:
-                logger.error(f"Service request failed: {method} {service}{path} - {e}")
-                raise
-            except Exception as e:
-                logger.error(f"Service request error: {method} {service}{path} - {e}")
-                raise
+
+        try:
+            logger.info(f"Service request: {method} {service}{path}")
+
+            if method in COALESCED_METHODS and data is None:
+                key = (method, url, _freeze(params), _freeze(headers))
+                response = self._cached(key)
+                if response is not None:
+                    self._count(service, "cache_hits")
+                else:
+                    task = self._in_flight.get(key)
+                    if task is None:
+                        task = asyncio.ensure_future(self._send(method, service, url, data, params, headers))
+                        task.add_done_callback(lambda done: self._settle(key, cache_ttl, done))
+                        self._in_flight[key] = task
+                    else:
+                        self._count(service, "coalesced")
+                    # Shielded: a cancelled caller must not cancel the others' call
+                    response = await asyncio.shield(task)
+            else:
+                response = await self._send(method, service, url, data, params, headers)
+
+            response.raise_for_status()
+            return response.json()
+
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Service request failed: {method} {service}{path} - {e}")
+            raise
+        except Exception as e:
+            logger.error(f"Service request error: {method} {service}{path} - {e}")
+            raise
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per target service: circuit state, counters and latency histogram."""
+        return {
+            service: {
+                "circuit": self.breakers[service].state if service in self.breakers else CircuitBreaker.CLOSED,
+                **self.counters.get(service, {}),
+                "latency": self.latency[service].snapshot() if service in self.latency else None,
+            }
+            for service in sorted(set(self.counters) | set(self.latency))
+        }
+
+    async def close(self):
+        """Close the pooled connections."""
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+        self._cache.clear()
 
     async def get(
         self,
@@ -153,6 +458,7 @@ class ServiceClient:
         path: str,
         params: Optional[Dict[str, Any]] = None,
         headers: Optional[Dict[str, str]] = None,
+        cache_ttl: Optional[float] = None,
     ) -> Dict[str, Any]:
         """
         Make a GET request to another service.
@@ -162,11 +468,12 @@ class ServiceClient:
             path: API path
             params: Query parameters
             headers: Additional headers
+            cache_ttl: Seconds to cache the response (see request())
 
         Returns:
             Response data
         """
-        return await self.request("GET", service, path, params=params, headers=headers)
+        return await self.request("GET", service, path, params=params, headers=headers, cache_ttl=cache_ttl)
 
     async def post(
         self,
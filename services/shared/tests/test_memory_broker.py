@@ -0,0 +1,206 @@
+"""
+Unit tests for the in-process broker and the event bus running on it
+"""
+import asyncio
+
+import pytest
+
+from shared import memory_broker
+from shared.event_bus import EventBus
+from shared.memory_broker import (
+    InMemoryBroker, MemoryBrokerError, MemoryConsumer, MemoryProducer,
+)
+
+
+async def _drain(consumer, expected):
+    records = []
+    while len(records) < expected:
+        polled = await consumer.getmany(timeout_ms=200)
+        if not polled:
+            break
+        for batch in polled.values():
+            records.extend(batch)
+    return records
+
+
+class TestInMemoryBroker:
+    """Test ordering, backpressure and trimming"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("compression", [None, "gzip"])
+    async def test_keyed_records_arrive_in_order(self, compression):
+        """Test each key's records are consumed in the order they were sent"""
+        broker = InMemoryBroker(num_partitions=3)
+        consumer = MemoryConsumer("t", broker=broker, group_id="g")
+        await consumer.start()
+        producer = MemoryProducer(broker, linger_ms=5, max_batch_size=256, compression_type=compression)
+        await producer.start()
+
+        for i in range(300):
+            await producer.send("t", f"{i % 7}:{i}".encode(), key=str(i % 7).encode())
+        await producer.flush()
+
+        records = await _drain(consumer, 300)
+        assert len(records) == 300
+        assert producer.batches_sent < 300
+        by_key = {}
+        for record in records:
+            by_key.setdefault(record.key, []).append(int(record.value.split(b":")[1]))
+        for key, values in by_key.items():
+            assert values == sorted(values)
+            assert {v % 7 for v in values} == {int(key)}
+
+    @pytest.mark.asyncio
+    async def test_producer_waits_for_consumer(self):
+        """Test a full partition holds the producer until the group commits"""
+        broker = InMemoryBroker(num_partitions=1, max_backlog=10)
+        consumer = MemoryConsumer("t", broker=broker, group_id="g")
+        await consumer.start()
+        producer = MemoryProducer(broker)
+        await producer.start()
+
+        for i in range(10):
+            await producer.send_and_wait("t", b"x")
+        blocked = asyncio.ensure_future(producer.send_and_wait("t", b"eleventh"))
+        await asyncio.sleep(0.05)
+        assert not blocked.done()
+        assert broker.backlog("t", 0) == 10
+
+        assert len(await _drain(consumer, 10)) == 10
+        metadata = await asyncio.wait_for(blocked, 1)
+        assert metadata.offset == 10
+        assert broker.backlog("t", 0) == 1
+
+    @pytest.mark.asyncio
+    async def test_unpolled_consumer_fails_the_send(self):
+        """Test a send to a partition no one drains fails after max_block_ms"""
+        broker = InMemoryBroker(num_partitions=1, max_backlog=10, max_block_ms=50)
+        await MemoryConsumer("t", broker=broker, group_id="g").start()
+        producer = MemoryProducer(broker)
+        await producer.start()
+
+        for i in range(10):
+            await producer.send_and_wait("t", b"x")
+        with pytest.raises(MemoryBrokerError):
+            await asyncio.wait_for(producer.send_and_wait("t", b"x"), 1)
+
+    @pytest.mark.asyncio
+    async def test_leaving_releases_the_backlog(self):
+        """Test a group without members does not block producers"""
+        broker = InMemoryBroker(num_partitions=1, max_backlog=10)
+        consumer = MemoryConsumer("t", broker=broker, group_id="g")
+        await consumer.start()
+        producer = MemoryProducer(broker)
+        await producer.start()
+        for i in range(10):
+            await producer.send_and_wait("t", b"x")
+
+        blocked = asyncio.ensure_future(producer.send_and_wait("t", b"x"))
+        await asyncio.sleep(0.05)
+        await consumer.stop()
+        await asyncio.wait_for(blocked, 1)
+        for i in range(20):
+            await asyncio.wait_for(producer.send_and_wait("t", b"x"), 1)
+        assert broker.backlog("t", 0) == 0
+        assert broker.partitions("t")[0].batches == []
+
+        # Rejoining skips what was dropped while the group was empty
+        await consumer.start()
+        await producer.send_and_wait("t", b"new")
+        assert [r.value for r in await _drain(consumer, 1)] == [b"new"]
+
+    @pytest.mark.asyncio
+    async def test_trim_keeps_what_a_group_has_not_read(self):
+        """Test batches are dropped only once every group has read them"""
+        broker = InMemoryBroker(num_partitions=1)
+        fast = MemoryConsumer("t", broker=broker, group_id="fast")
+        slow = MemoryConsumer("t", broker=broker, group_id="slow")
+        await fast.start()
+        await slow.start()
+        producer = MemoryProducer(broker)
+        await producer.start()
+        for i in range(5):
+            await producer.send_and_wait("t", str(i).encode())
+
+        log = broker.partitions("t")[0]
+        assert len(await _drain(fast, 5)) == 5
+        assert log.start_offset == 0 and len(log.batches) == 5
+
+        polled = await slow.getmany(timeout_ms=0, max_records=3)
+        assert [r.offset for r in polled[slow.assignment()[0]]] == [0, 1, 2]
+        assert log.start_offset == 3 and len(log.batches) == 2
+        assert broker.backlog("t", 0) == 2
+
+    @pytest.mark.asyncio
+    async def test_records_without_groups_are_dropped(self):
+        """Test a topic nobody subscribes to keeps nothing"""
+        broker = InMemoryBroker(num_partitions=1, max_backlog=2)
+        producer = MemoryProducer(broker)
+        await producer.start()
+        for i in range(5):
+            await asyncio.wait_for(producer.send_and_wait("t", b"x"), 1)
+        assert broker.partitions("t")[0].batches == []
+
+
+class TestEventBusOnMemoryBroker:
+    """Test batch dispatch through EventBus with EVENT_BUS_BACKEND=memory"""
+
+    @pytest.fixture
+    def broker(self, monkeypatch):
+        broker = InMemoryBroker(num_partitions=2)
+        monkeypatch.setattr(memory_broker, "_memory_broker", broker)
+        return broker
+
+    @pytest.mark.asyncio
+    async def test_batch_and_event_handlers(self, broker, monkeypatch):
+        """Test batch handlers get whole polls and per-event handlers every event"""
+        monkeypatch.setenv("EVENT_BUS_BACKEND", "memory")
+        monkeypatch.setenv("EVENT_BUS_MAX_POLL_RECORDS", "50")
+        bus = EventBus("test")
+        batches, events = [], []
+
+        async def on_batch(batch):
+            batches.append(batch)
+
+        async def on_event(event):
+            events.append(event)
+
+        await bus.subscribe("t", on_batch, batch=True)
+        await bus.subscribe("t", on_event)
+        await bus.start()
+        consuming = asyncio.create_task(bus.consume_events("t"))
+        try:
+            sent = await bus.publish_events("t", [
+                {"event_type": "e", "data": {"n": i}, "user_id": f"u{i % 3}"} for i in range(120)
+            ])
+            assert sent == 120
+            for _ in range(100):
+                if len(events) == 120:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            consuming.cancel()
+            await bus.stop()
+
+        assert len(events) == 120
+        assert sum(len(b) for b in batches) == 120
+        assert max(len(b) for b in batches) > 1
+        assert all(len(b) <= 50 for b in batches)
+        for user in ("u0", "u1", "u2"):
+            numbers = [e["data"]["n"] for e in events if e["user_id"] == user]
+            assert numbers == sorted(numbers)
+
+    @pytest.mark.asyncio
+    async def test_publish_reports_a_full_partition(self, monkeypatch):
+        """Test publish_event returns False when the broker gives up waiting"""
+        monkeypatch.setattr(memory_broker, "_memory_broker",
+                            InMemoryBroker(num_partitions=1, max_backlog=1, max_block_ms=20))
+        monkeypatch.setenv("EVENT_BUS_BACKEND", "memory")
+        monkeypatch.setenv("KAFKA_LINGER_MS", "0")
+        bus = EventBus("test")
+        await bus.subscribe("t", lambda batch: None, batch=True)
+        await bus.start()
+
+        assert await bus.publish_event("t", "e", {}) is True
+        assert await bus.publish_event("t", "e", {}) is False
+        await bus.stop()
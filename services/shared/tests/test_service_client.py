@@ -0,0 +1,234 @@
+"""
+Unit tests for ServiceClient: coalescing, circuit breaking and caching
+"""
+import asyncio
+import time
+import types
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from shared import service_client
+from shared.service_client import CircuitBreaker, CircuitOpenError, ServiceClient
+
+
+class FakeClock:
+    """Stands in for service_client.time; the event loop keeps the real clock"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def install(self, monkeypatch):
+        monkeypatch.setattr(service_client, "time", types.SimpleNamespace(
+            monotonic=lambda: self.now, perf_counter=time.perf_counter,
+        ))
+        return self
+
+
+class Upstream:
+    """MockTransport handler that counts calls and can hold or fail them"""
+
+    def __init__(self):
+        self.calls = 0
+        self.status = 200
+        self.headers = {}
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        await self.release.wait()
+        return httpx.Response(self.status, json={"call": self.calls}, headers=self.headers)
+
+
+@pytest.fixture
+def upstream():
+    return Upstream()
+
+
+@pytest_asyncio.fixture
+async def client(upstream):
+    client = ServiceClient(
+        "test", failure_threshold=2, reset_timeout=10.0,
+        transport=httpx.MockTransport(upstream),
+    )
+    yield client
+    await client.close()
+
+
+class TestCoalescing:
+    """Test identical in-flight reads share one upstream call"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_gets_share_one_call(self, client, upstream):
+        upstream.release.clear()
+        callers = [asyncio.ensure_future(client.get("pedagogy", "/x", params={"a": 1})) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        upstream.release.set()
+
+        assert await asyncio.gather(*callers) == [{"call": 1}] * 5
+        assert upstream.calls == 1
+        assert client.stats()["pedagogy"]["coalesced"] == 4
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_the_others(self, client, upstream):
+        upstream.release.clear()
+        first = asyncio.ensure_future(client.get("pedagogy", "/x"))
+        second = asyncio.ensure_future(client.get("pedagogy", "/x"))
+        await asyncio.sleep(0.01)
+
+        first.cancel()
+        await asyncio.sleep(0.01)
+        assert not second.done()
+        upstream.release.set()
+
+        assert await asyncio.wait_for(second, 1) == {"call": 1}
+        assert first.cancelled()
+        assert upstream.calls == 1
+        assert client._in_flight == {}
+
+    @pytest.mark.asyncio
+    async def test_call_outlives_all_cancelled_callers(self, client, upstream):
+        upstream.release.clear()
+        caller = asyncio.ensure_future(client.get("pedagogy", "/x"))
+        await asyncio.sleep(0.01)
+        caller.cancel()
+        # A new caller joins the call that is still in flight
+        late = asyncio.ensure_future(client.get("pedagogy", "/x"))
+        await asyncio.sleep(0.01)
+        upstream.release.set()
+
+        assert await asyncio.wait_for(late, 1) == {"call": 1}
+        assert upstream.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_writes_are_never_coalesced(self, client, upstream):
+        upstream.release.clear()
+        callers = [asyncio.ensure_future(client.post("pedagogy", "/x", data={})) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        upstream.release.set()
+        await asyncio.gather(*callers)
+        assert upstream.calls == 3
+
+
+class TestCircuitBreaker:
+    """Test closed -> open -> half open -> closed/open transitions"""
+
+    def test_half_open_allows_limited_probes(self, monkeypatch):
+        clock = FakeClock().install(monkeypatch)
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10.0, half_open_max_calls=1)
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow()
+
+        clock.now += 10
+        assert breaker.allow()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert not breaker.allow()  # one probe at a time
+
+        breaker.release()  # the probe ended without a verdict
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow()
+
+        clock.now += 10
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED and breaker.failures == 0
+
+    @pytest.mark.asyncio
+    async def test_client_opens_and_recovers(self, client, upstream, monkeypatch):
+        clock = FakeClock().install(monkeypatch)
+        upstream.status = 503
+        for _ in range(2):
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.post("futures", "/x")
+
+        with pytest.raises(CircuitOpenError):
+            await client.post("futures", "/x")
+        assert upstream.calls == 2
+        assert client.stats()["futures"]["circuit"] == CircuitBreaker.OPEN
+        assert client.stats()["futures"]["rejected"] == 1
+
+        # Other services keep their own breakers
+        upstream.status = 200
+        assert await client.post("institutions", "/x") == {"call": 3}
+
+        clock.now += 10
+        upstream.release.clear()
+        probe = asyncio.ensure_future(client.post("futures", "/x"))
+        await asyncio.sleep(0.01)
+        with pytest.raises(CircuitOpenError):
+            await client.post("futures", "/x")
+        upstream.release.set()
+        assert await probe == {"call": 4}
+        assert client.stats()["futures"]["circuit"] == CircuitBreaker.CLOSED
+
+    @pytest.mark.asyncio
+    async def test_cancelled_probe_frees_its_slot(self, client, upstream, monkeypatch):
+        clock = FakeClock().install(monkeypatch)
+        upstream.status = 500
+        for _ in range(2):
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.post("futures", "/x")
+        clock.now += 10
+
+        upstream.release.clear()
+        probe = asyncio.ensure_future(client.post("futures", "/x"))
+        await asyncio.sleep(0.01)
+        probe.cancel()
+        await asyncio.sleep(0.01)
+
+        upstream.status = 200
+        upstream.release.set()
+        assert await client.post("futures", "/x") == {"call": 4}
+        assert client.stats()["futures"]["circuit"] == CircuitBreaker.CLOSED
+
+
+class TestCache:
+    """Test GET responses are cached for their TTL only"""
+
+    @pytest.mark.asyncio
+    async def test_cache_ttl_expires(self, client, upstream, monkeypatch):
+        clock = FakeClock().install(monkeypatch)
+        assert await client.get("pedagogy", "/x", cache_ttl=2) == {"call": 1}
+        clock.now += 1.9
+        assert await client.get("pedagogy", "/x", cache_ttl=2) == {"call": 1}
+        assert await client.get("pedagogy", "/x", params={"page": 2}, cache_ttl=2) == {"call": 2}
+        clock.now += 0.2
+        assert await client.get("pedagogy", "/x", cache_ttl=2) == {"call": 3}
+        assert client.stats()["pedagogy"]["cache_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_ttl_capped_by_cache_max_ttl(self, client, upstream, monkeypatch):
+        clock = FakeClock().install(monkeypatch)
+        await client.get("pedagogy", "/x", cache_ttl=60)
+        clock.now += client.cache_max_ttl
+        assert await client.get("pedagogy", "/x") == {"call": 2}
+
+    @pytest.mark.asyncio
+    async def test_cache_control_decides_by_default(self, client, upstream, monkeypatch):
+        clock = FakeClock().install(monkeypatch)
+        assert await client.get("pedagogy", "/x") == {"call": 1}
+        assert await client.get("pedagogy", "/x") == {"call": 2}  # no header, no caching
+
+        upstream.headers = {"Cache-Control": "max-age=3"}
+        await client.get("pedagogy", "/y")
+        clock.now += 2.5
+        assert await client.get("pedagogy", "/y") == {"call": 3}
+
+        upstream.headers = {"Cache-Control": "private, max-age=3"}
+        await client.get("pedagogy", "/z")
+        assert await client.get("pedagogy", "/z") == {"call": 5}
+
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cached(self, client, upstream):
+        upstream.status = 404
+        for _ in range(2):
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.get("pedagogy", "/x", cache_ttl=5)
+        assert upstream.calls == 2
@@ -108,6 +108,13 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Error stopping event bus: {e}")
 
+    # Close pooled service-to-service connections
+    if app.state.service_client:
+        try:
+            await app.state.service_client.close()
+        except Exception as e:
+            logger.error(f"Error closing service client: {e}")
+
 
 app = FastAPI(
     title="EUREKA XR Labs",